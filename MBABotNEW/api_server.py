@@ -1,89 +1,291 @@
 """
 API Server for MBA Bot - Handles web app transaction requests
 Runs alongside the Discord bot to process sign/release requests from the website
+
+The server is aiohttp running on the bot's own event loop. Sign and release
+requests are validated, queued as durable jobs (utils/api_jobs.py) and
+answered with 202 and a job ID to poll at GET /api/jobs/<id>, so the
+website never waits on Discord. At most API_MAX_CONCURRENCY requests are
+handled at once and up to API_MAX_PENDING more wait for a slot; beyond that
+requests get a 503. Connections are kept alive for API_KEEPALIVE_SECONDS, and
+on shutdown in-flight requests get API_SHUTDOWN_SECONDS to finish.
+POSTs may carry an Idempotency-Key header so a retry gets the first answer
+back, with the same job ID, instead of queueing the transaction again
+(utils/idempotency.py).
 """
 
-from flask import Flask, request, jsonify
+from aiohttp import web
 import discord
 import asyncio
+import hashlib
 import os
 from dotenv import load_dotenv
-from threading import Thread
+from utils.api_jobs import JobQueue, job_view
+from utils.idempotency import IdempotencyStore, IdempotencyConflict
 
 load_dotenv()
 
-app = Flask(__name__)
+MAX_CONCURRENCY = int(os.getenv('API_MAX_CONCURRENCY', 16))
+MAX_PENDING = int(os.getenv('API_MAX_PENDING', 64))
+KEEPALIVE_SECONDS = float(os.getenv('API_KEEPALIVE_SECONDS', 75))
+SHUTDOWN_SECONDS = float(os.getenv('API_SHUTDOWN_SECONDS', 15))
+EXPORT_CHUNK_BYTES = 256 * 1024
+
+# Used when a guild hasn't set server_config.roster_cap
+ROSTER_CAP = 10
+BATCH_OPERATIONS = ('sign', 'release', 'move')
+MAX_BATCH_OPERATIONS = 100
+
+routes = web.RouteTableDef()
 
 # Store bot reference
 bot_instance = None
+_runner = None
+_jobs = None
 
 def set_bot(bot):
     """Set the bot instance for API to use"""
     global bot_instance
     bot_instance = bot
 
+def roster_cap(config: dict) -> int:
+    """A guild's roster cap from its server_config row"""
+    return (config.get('roster_cap') if config else None) or ROSTER_CAP
+
 def verify_api_key(req):
     """Verify API key from request"""
     api_key = req.headers.get('X-API-Key')
     expected_key = os.getenv('API_SECRET_KEY')
-    return api_key == expected_key
+    # An unset key must not match a request without the header
+    return bool(expected_key) and api_key == expected_key
 
-@app.route('/health', methods=['GET'])
-def health():
-    """Health check endpoint"""
-    return jsonify({'status': 'ok', 'bot_ready': bot_instance is not None and bot_instance.is_ready()})
+def create_limit_middleware(max_concurrency: int = MAX_CONCURRENCY, max_pending: int = MAX_PENDING):
+    """Middleware that runs at most max_concurrency handlers, queueing up to max_pending more"""
+    semaphore = asyncio.Semaphore(max_concurrency)
+    waiting = 0
+    
+    @web.middleware
+    async def limit(request, handler):
+        nonlocal waiting
+        if semaphore.locked() and waiting >= max_pending:
+            return web.json_response({'error': 'Server busy'}, status=503, headers={'Retry-After': '1'})
+        waiting += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            waiting -= 1
+        try:
+            return await handler(request)
+        finally:
+            semaphore.release()
+    
+    return limit
 
-@app.route('/api/transaction/sign', methods=['POST'])
-def sign_player():
-    """Sign a player to a team"""
+# Response headers worth replaying along with the body
+REPLAYED_HEADERS = ('Content-Type', 'Location')
+
+def create_idempotency_middleware(store: IdempotencyStore):
+    """Middleware that answers a POST with an Idempotency-Key once and replays it for retries"""
+    @web.middleware
+    async def idempotency(request, handler):
+        key = request.headers.get('Idempotency-Key')
+        # Unauthorized requests never reach the store, so keys can't be probed
+        if request.method != 'POST' or not key or not verify_api_key(request):
+            return await handler(request)
+        
+        body = await request.read()
+        fingerprint = hashlib.sha256(request.path.encode() + b'\n' + body).hexdigest()
+        
+        async def call():
+            response = await handler(request)
+            headers = {h: response.headers[h] for h in REPLAYED_HEADERS if h in response.headers}
+            return response.status, response.body, headers
+        
+        try:
+            (status, payload, headers), replayed = await store.run(
+                (request.path, key), fingerprint, call,
+                # 5xx means try again, so the retry must run for real
+                keep=lambda result: result[0] < 500
+            )
+        except IdempotencyConflict:
+            return web.json_response(
+                {'error': 'Idempotency-Key was already used for a different request'}, status=422
+            )
+        
+        response = web.Response(status=status, body=payload, headers=headers)
+        if replayed:
+            response.headers['Idempotent-Replayed'] = 'true'
+        return response
+    
+    return idempotency
+
+async def read_transaction(request) -> tuple:
+    """(payload, webhook_url) from a transaction request body, raising if it is malformed"""
+    data = await request.json()
+    payload = {
+        # Discord IDs stay strings so they survive JSON readers without 64-bit ints
+        'guild_id': str(int(data['guild_id'])),
+        'player_id': str(int(data['player_id'])),
+        'team_id': str(data['team_id']),
+        'coach_id': str(data['coach_id'])
+    }
+    return payload, read_webhook_url(data)
+
+async def read_batch(request) -> tuple:
+    """(payload, webhook_url) from a batch request body, raising if it is malformed"""
+    data = await request.json()
+    operations = data['operations']
+    if not isinstance(operations, list) or not operations:
+        raise ValueError('operations must be a non-empty list')
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        raise ValueError(f'at most {MAX_BATCH_OPERATIONS} operations per batch')
+    
+    parsed = []
+    for i, op in enumerate(operations, 1):
+        kind = op.get('op')
+        if kind not in BATCH_OPERATIONS:
+            raise ValueError(f"operation {i}: op must be one of {', '.join(BATCH_OPERATIONS)}")
+        if kind != 'release' and not op.get('team_id'):
+            raise ValueError(f'operation {i}: {kind} needs a team_id')
+        parsed.append({
+            'op': kind,
+            'player_id': str(int(op['player_id'])),
+            'team_id': str(op['team_id']) if op.get('team_id') else None
+        })
+    
+    payload = {
+        'guild_id': str(int(data['guild_id'])),
+        'coach_id': str(data['coach_id']),
+        'operations': parsed
+    }
+    return payload, read_webhook_url(data)
+
+def read_webhook_url(data: dict) -> str:
+    """The optional webhook_url of a request body"""
+    webhook_url = data.get('webhook_url')
+    if webhook_url and not str(webhook_url).startswith(('https://', 'http://')):
+        raise ValueError('webhook_url must be an http(s) URL')
+    return webhook_url
+
+async def queue_transaction(request, kind: str, read_body=read_transaction):
+    """Validate a transaction request and queue it, answering 202 with the job ID"""
     if not verify_api_key(request):
-        return jsonify({'error': 'Unauthorized'}), 401
+        return web.json_response({'error': 'Unauthorized'}, status=401)
     
-    if not bot_instance or not bot_instance.is_ready():
-        return jsonify({'error': 'Bot not ready'}), 503
+    if not bot_instance or not bot_instance.is_ready() or _jobs is None:
+        return web.json_response({'error': 'Bot not ready'}, status=503)
     
     try:
-        data = request.json
-        guild_id = int(data['guild_id'])
-        player_id = int(data['player_id'])
-        team_id = data['team_id']
-        coach_id = data['coach_id']
-        
-        # Run the async transaction
-        result = asyncio.run_coroutine_threadsafe(
-            execute_sign(guild_id, player_id, team_id, coach_id),
-            bot_instance.loop
-        ).result(timeout=10)
-        
-        return jsonify(result)
+        payload, webhook_url = await read_body(request)
     except Exception as e:
-        return jsonify({'success': False, 'message': str(e)}), 500
+        return web.json_response({'success': False, 'message': f'Invalid request: {e}'}, status=400)
+    
+    # Checks that only need the bot's cache; everything else runs in the job
+    guild = bot_instance.get_guild(int(payload['guild_id']))
+    if not guild:
+        return web.json_response({'success': False, 'message': 'Guild not found'}, status=404)
+    if 'player_id' in payload and not guild.get_member(int(payload['player_id'])):
+        return web.json_response({'success': False, 'message': 'Player not found in Discord server'}, status=404)
+    
+    try:
+        job = await _jobs.submit(kind, payload['guild_id'], payload, webhook_url)
+    except Exception as e:
+        print(f"Error queueing {kind} job: {e}")
+        return web.json_response({'success': False, 'message': 'Could not queue the transaction'}, status=503)
+    
+    status_url = f"/api/jobs/{job['id']}"
+    return web.json_response(
+        {'success': True, 'job_id': job['id'], 'status': job['status'], 'status_url': status_url},
+        status=202,
+        headers={'Location': status_url}
+    )
+
+@routes.get('/health')
+async def health(request):
+    """Health check endpoint"""
+    return web.json_response({
+        'status': 'ok',
+        'bot_ready': bot_instance is not None and bot_instance.is_ready(),
+        'jobs_queued': _jobs.depth() if _jobs else 0
+    })
 
-@app.route('/api/transaction/release', methods=['POST'])
-def release_player():
+@routes.post('/api/transaction/sign')
+async def sign_player(request):
+    """Sign a player to a team"""
+    return await queue_transaction(request, 'sign')
+
+@routes.post('/api/transaction/release')
+async def release_player(request):
     """Release a player from a team"""
+    return await queue_transaction(request, 'release')
+
+@routes.post('/api/transaction/batch')
+async def batch_transaction(request):
+    """Sign, release and move many players in one validated, all-or-nothing job"""
+    return await queue_transaction(request, 'batch', read_batch)
+
+@routes.get('/api/jobs/{job_id}')
+async def job_status(request):
+    """Status of a queued transaction, with its result once finished"""
+    if not verify_api_key(request):
+        return web.json_response({'error': 'Unauthorized'}, status=401)
+    if _jobs is None:
+        return web.json_response({'error': 'Bot not ready'}, status=503)
+    
+    job = await _jobs.get(request.match_info['job_id'])
+    if not job:
+        return web.json_response({'error': 'Job not found'}, status=404)
+    return web.json_response(job_view(job))
+
+@routes.get(r'/api/export/{guild_id:\d+}')
+async def export_stats(request):
+    """Download a season's games and stats as a zip of CSV or Parquet files"""
+    from database import get_active_season, get_season_by_name
+    from utils.export import export_season, parquet_available, EXPORT_FORMATS
+    
     if not verify_api_key(request):
-        return jsonify({'error': 'Unauthorized'}), 401
+        return web.json_response({'error': 'Unauthorized'}, status=401)
     
-    if not bot_instance or not bot_instance.is_ready():
-        return jsonify({'error': 'Bot not ready'}), 503
+    guild_id = int(request.match_info['guild_id'])
+    fmt = request.query.get('format', 'csv').lower()
+    if fmt not in EXPORT_FORMATS:
+        return web.json_response({'error': f"Unknown format, expected one of: {', '.join(EXPORT_FORMATS)}"}, status=400)
+    if fmt == 'parquet' and not parquet_available():
+        return web.json_response({'error': 'Parquet export requires pyarrow'}, status=501)
+    
+    season_name = request.query.get('season')
+    if season_name:
+        season = await asyncio.to_thread(get_season_by_name, guild_id, season_name.upper())
+    else:
+        season = await asyncio.to_thread(get_active_season, guild_id)
+    if not season:
+        return web.json_response({'error': 'Season not found'}, status=404)
     
     try:
-        data = request.json
-        guild_id = int(data['guild_id'])
-        player_id = int(data['player_id'])
-        team_id = data['team_id']
-        coach_id = data['coach_id']
-        
-        # Run the async transaction
-        result = asyncio.run_coroutine_threadsafe(
-            execute_release(guild_id, player_id, team_id, coach_id),
-            bot_instance.loop
-        ).result(timeout=10)
-        
-        return jsonify(result)
+        path, stats = await asyncio.to_thread(export_season, season['id'], fmt)
     except Exception as e:
-        return jsonify({'success': False, 'message': str(e)}), 500
+        return web.json_response({'success': False, 'message': str(e)}, status=500)
+    
+    # The file is streamed from disk and removed once the response is sent
+    response = web.StreamResponse(headers={
+        'Content-Type': 'application/zip',
+        'Content-Disposition': f'attachment; filename="{season["season_name"]}_stats_{fmt}.zip"',
+        'X-Export-Rows': str(stats['rows']),
+        'X-Export-Rows-Per-Second': f"{stats['rows_per_second']:.0f}"
+    })
+    try:
+        response.content_length = os.path.getsize(path)
+        await response.prepare(request)
+        with open(path, 'rb') as f:
+            while True:
+                chunk = await asyncio.to_thread(f.read, EXPORT_CHUNK_BYTES)
+                if not chunk:
+                    break
+                await response.write(chunk)
+        await response.write_eof()
+    finally:
+        os.remove(path)
+    return response
 
 async def execute_sign(guild_id: int, player_id: int, team_id: str, coach_id: str):
     """Execute player signing (mirrors /sign command logic)"""
@@ -100,7 +302,7 @@ async def execute_sign(guild_id: int, player_id: int, team_id: str, coach_id: st
             return {'success': False, 'message': 'Player not found in Discord server'}
         
         # Get team info
-        team = get_team_by_id(team_id)
+        team = await asyncio.to_thread(get_team_by_id, team_id)
         if not team:
             return {'success': False, 'message': 'Team not found'}
         
@@ -112,14 +314,15 @@ async def execute_sign(guild_id: int, player_id: int, team_id: str, coach_id: st
             return {'success': False, 'message': 'Team does not have a Discord role configured'}
         
         # Check roster cap
-        roster_count = get_roster_count(team_id)
-        roster_cap = 10  # TODO: Make configurable
+        config = await asyncio.to_thread(get_server_config, guild_id)
+        roster_count = await asyncio.to_thread(get_roster_count, team_id)
+        cap = roster_cap(config)
         
-        if roster_count >= roster_cap:
-            return {'success': False, 'message': f'Roster is full ({roster_count}/{roster_cap})'}
+        if roster_count >= cap:
+            return {'success': False, 'message': f'Roster is full ({roster_count}/{cap})'}
         
         # Add to database
-        add_player_to_team(guild_id, player_id, team_id)
+        await asyncio.to_thread(add_player_to_team, guild_id, player_id, team_id)
         
         # Add team role
         role = guild.get_role(team_role_id)
@@ -127,7 +330,6 @@ async def execute_sign(guild_id: int, player_id: int, team_id: str, coach_id: st
             await player.add_roles(role)
         
         # Remove free agent role
-        config = get_server_config(guild_id)
         if config and config.get('free_agent_role_id'):
             fa_role = guild.get_role(int(config['free_agent_role_id']))
             if fa_role and fa_role in player.roles:
@@ -154,7 +356,7 @@ async def execute_sign(guild_id: int, player_id: int, team_id: str, coach_id: st
                     team_logo,
                     coach,
                     roster_count + 1,
-                    roster_cap,
+                    cap,
                     role_color
                 )
                 await channel.send(embed=embed)
@@ -180,7 +382,7 @@ async def execute_release(guild_id: int, player_id: int, team_id: str, coach_id:
             return {'success': False, 'message': 'Player not found in Discord server'}
         
         # Get team info
-        team = get_team_by_id(team_id)
+        team = await asyncio.to_thread(get_team_by_id, team_id)
         if not team:
             return {'success': False, 'message': 'Team not found'}
         
@@ -192,7 +394,7 @@ async def execute_release(guild_id: int, player_id: int, team_id: str, coach_id:
             return {'success': False, 'message': 'Team does not have a Discord role configured'}
         
         # Remove from database
-        remove_player_from_team(guild_id, player_id, team_id)
+        await asyncio.to_thread(remove_player_from_team, guild_id, player_id, team_id)
         
         # Remove team role
         team_role = guild.get_role(team_role_id)
@@ -200,7 +402,7 @@ async def execute_release(guild_id: int, player_id: int, team_id: str, coach_id:
             await player.remove_roles(team_role)
         
         # Add free agent role
-        config = get_server_config(guild_id)
+        config = await asyncio.to_thread(get_server_config, guild_id)
         if config and config.get('free_agent_role_id'):
             fa_role = guild.get_role(int(config['free_agent_role_id']))
             if fa_role:
@@ -212,8 +414,7 @@ async def execute_release(guild_id: int, player_id: int, team_id: str, coach_id:
         if transactions_channel_id:
             channel = guild.get_channel(transactions_channel_id)
             if channel:
-                roster_count = get_roster_count(team_id)
-                roster_cap = 10
+                roster_count = await asyncio.to_thread(get_roster_count, team_id)
                 
                 role_color = team_role.color if team_role else None
                 
@@ -228,7 +429,7 @@ async def execute_release(guild_id: int, player_id: int, team_id: str, coach_id:
                     team_logo,
                     coach,
                     roster_count,
-                    roster_cap,
+                    roster_cap(config),
                     role_color
                 )
                 await channel.send(embed=embed)
@@ -239,14 +440,253 @@ async def execute_release(guild_id: int, player_id: int, team_id: str, coach_id:
         print(f"Error in execute_release: {e}")
         return {'success': False, 'message': str(e)}
 
-def run_flask():
-    """Run Flask server"""
-    port = int(os.getenv('API_PORT', 5000))
-    app.run(host='0.0.0.0', port=port, debug=False)
+async def execute_batch(guild_id: int, coach_id: str, operations: list):
+    """
+    Execute a batch of sign/release/move operations. Every operation is checked
+    in order against one snapshot of the guild's rosters and the cap; if any
+    fails nothing changes. Otherwise the database is updated with one write per
+    destination team, each member's roles are edited once, and each team
+    involved gets one digest embed. If a team's write fails, the writes
+    already made stand: roles and digests follow them, and the result names
+    the teams that were and weren't updated.
+    """
+    from collections import Counter
+    from database import (
+        get_all_teams, get_server_config, get_team_rosters,
+        get_users_by_discord_ids, set_users_team
+    )
+    from utils.mc_roster import discord_id_from_user
+    from utils.embeds import create_roster_digest_embed
+    
+    try:
+        guild = bot_instance.get_guild(guild_id)
+        if not guild:
+            return {'success': False, 'message': 'Guild not found'}
+        
+        # Snapshot: teams, their rosters, the players involved and the config
+        teams = {str(t['id']): t for t in await asyncio.to_thread(get_all_teams, guild_id)}
+        rosters = await asyncio.to_thread(get_team_rosters, list(teams))
+        users = {
+            discord_id_from_user(row['id']): row
+            for row in await asyncio.to_thread(get_users_by_discord_ids, sorted({op['player_id'] for op in operations}))
+        }
+        config = await asyncio.to_thread(get_server_config, guild_id)
+        cap = roster_cap(config)
+        
+        roster_counts = Counter(str(row['team_id']) for row in rosters)
+        counts = Counter(roster_counts)
+        start = {player_id: (str(row['team_id']) if row.get('team_id') else None) for player_id, row in users.items()}
+        current = dict(start)
+        
+        errors = []
+        for i, op in enumerate(operations, 1):
+            player_id, target = op['player_id'], op.get('team_id')
+            member = guild.get_member(int(player_id))
+            label = f"#{i} {op['op']} {member.display_name if member else player_id}"
+            if not member:
+                errors.append(f"{label}: player not found in Discord server")
+                continue
+            if player_id not in users:
+                errors.append(f"{label}: player has not logged in to the website")
+                continue
+            
+            team_now = current[player_id]
+            if op['op'] == 'release':
+                if team_now is None or (target and team_now != target):
+                    errors.append(f"{label}: player is not on that team")
+                    continue
+                counts[team_now] -= 1
+                current[player_id] = None
+                continue
+            
+            team = teams.get(target)
+            if not team:
+                errors.append(f"{label}: team not found")
+            elif not team.get('team_role_id'):
+                errors.append(f"{label}: team does not have a Discord role configured")
+            elif op['op'] == 'sign' and team_now is not None:
+                errors.append(f"{label}: player is already on a team, use move")
+            elif op['op'] == 'move' and team_now is None:
+                errors.append(f"{label}: player is not on a team, use sign")
+            elif team_now == target:
+                errors.append(f"{label}: player is already on that team")
+            elif counts[target] >= cap:
+                errors.append(f"{label}: roster is full ({counts[target]}/{cap})")
+            else:
+                if team_now is not None:
+                    counts[team_now] -= 1
+                counts[target] += 1
+                current[player_id] = target
+        
+        if errors:
+            return {
+                'success': False,
+                'message': f"{len(errors)} of {len(operations)} operations can't be applied, nothing was changed",
+                'errors': errors
+            }
+        
+        # Net effect per player, so sign-then-release in one batch is a no-op
+        changed = {player_id: team_id for player_id, team_id in current.items() if team_id != start[player_id]}
+        by_team = {}
+        for player_id, team_id in changed.items():
+            by_team.setdefault(team_id, []).append(users[player_id]['id'])
+        
+        def team_label(team_id):
+            if team_id is None:
+                return "free agency"
+            return teams[team_id].get('name') or teams[team_id].get('team_name')
+        
+        applied_teams = []
+        failed_team = None
+        for team_id, user_ids in by_team.items():
+            try:
+                await asyncio.to_thread(set_users_team, user_ids, team_id)
+            except Exception as e:
+                print(f"Error in execute_batch writing {team_label(team_id)}: {e}")
+                failed_team = team_id
+                break
+            applied_teams.append(team_id)
+        
+        if failed_team is not None:
+            # Later writes never ran: keep only the moves that landed and recount from them
+            changed = {player_id: team_id for player_id, team_id in changed.items() if team_id in applied_teams}
+            counts = Counter(roster_counts)
+            for player_id, team_id in changed.items():
+                if start[player_id] is not None:
+                    counts[start[player_id]] -= 1
+                if team_id is not None:
+                    counts[team_id] += 1
+        
+        # One role edit per member
+        team_roles = {team_id: guild.get_role(int(t['team_role_id'])) for team_id, t in teams.items() if t.get('team_role_id')}
+        fa_role = guild.get_role(int(config['free_agent_role_id'])) if config and config.get('free_agent_role_id') else None
+        warnings = []
+        for player_id, team_id in changed.items():
+            member = guild.get_member(int(player_id))
+            if member is None:
+                # Left the server since the batch was checked
+                warnings.append(f"Couldn't update roles for {player_id}: no longer in the Discord server")
+                continue
+            roles = {role for role in member.roles if not role.is_default()}
+            before = set(roles)
+            roles.discard(team_roles.get(start[player_id]))
+            if team_id is not None:
+                roles.add(team_roles.get(team_id))
+                roles.discard(fa_role)
+            elif fa_role:
+                roles.add(fa_role)
+            roles.discard(None)
+            if roles != before:
+                try:
+                    await member.edit(roles=list(roles), reason="Roster update from the website")
+                except discord.HTTPException as e:
+                    warnings.append(f"Couldn't update roles for {member.display_name}: {e}")
+        
+        # One digest per team involved
+        transactions_channel_id = int(config['transactions_channel_id']) if config and config.get('transactions_channel_id') else None
+        channel = guild.get_channel(transactions_channel_id) if transactions_channel_id else None
+        if channel:
+            coach = guild.get_member(int(coach_id.replace('discord-', ''))) if coach_id.startswith('discord-') else None
+            if not coach:
+                coach = guild.get_member(guild.owner_id)
+            
+            touched = {t for t in changed.values() if t} | {start[p] for p in changed if start[p]}
+            for team_id in touched:
+                team = teams.get(team_id)
+                if not team:
+                    continue
+                signed = [guild.get_member(int(p)) for p, t in changed.items() if t == team_id]
+                released = [guild.get_member(int(p)) for p, t in changed.items() if start[p] == team_id]
+                signed = [m for m in signed if m is not None]
+                released = [m for m in released if m is not None]
+                team_role = team_roles.get(team_id)
+                embed = create_roster_digest_embed(
+                    team.get('name') or team.get('team_name'),
+                    team.get('team_logo_emoji'),
+                    coach,
+                    signed,
+                    released,
+                    counts[team_id],
+                    cap,
+                    team_role.color if team_role else None
+                )
+                await channel.send(embed=embed)
+        
+        if failed_team is not None:
+            applied = ', '.join(team_label(t) for t in applied_teams) or "none"
+            not_applied = ', '.join(team_label(t) for t in list(by_team)[len(applied_teams):])
+            result = {
+                'success': False,
+                'message': f"Saving {team_label(failed_team)} failed. {len(changed)} roster moves were applied "
+                           f"(teams updated: {applied}); not applied: {not_applied}",
+                'applied': len(changed),
+                'applied_teams': applied_teams,
+                'failed_teams': list(by_team)[len(applied_teams):]
+            }
+        else:
+            result = {'success': True, 'message': f"{len(changed)} roster moves applied", 'applied': len(changed)}
+        if warnings:
+            result['warnings'] = warnings
+        return result
+    
+    except Exception as e:
+        print(f"Error in execute_batch: {e}")
+        return {'success': False, 'message': str(e)}
+
+async def run_sign_job(payload: dict) -> dict:
+    return await execute_sign(int(payload['guild_id']), int(payload['player_id']), payload['team_id'], payload['coach_id'])
+
+async def run_release_job(payload: dict) -> dict:
+    return await execute_release(int(payload['guild_id']), int(payload['player_id']), payload['team_id'], payload['coach_id'])
+
+async def run_batch_job(payload: dict) -> dict:
+    return await execute_batch(int(payload['guild_id']), payload['coach_id'], payload['operations'])
 
-def start_api_server(bot):
-    """Start the API server in a separate thread"""
+JOB_HANDLERS = {
+    'sign': run_sign_job,
+    'release': run_release_job,
+    'batch': run_batch_job
+}
+
+def create_app() -> web.Application:
+    """The API application with its routes and concurrency limit"""
+    app = web.Application(middlewares=[
+        create_limit_middleware(),
+        create_idempotency_middleware(IdempotencyStore())
+    ])
+    app.add_routes(routes)
+    return app
+
+async def start_api_server(bot):
+    """Start the API server on the bot's event loop"""
+    global _runner
+    if _runner is not None:
+        return
+    global _jobs
     set_bot(bot)
-    thread = Thread(target=run_flask, daemon=True)
-    thread.start()
-    print(f"API Server started on port {os.getenv('API_PORT', 5000)}")
+    _jobs = JobQueue(JOB_HANDLERS)
+    await _jobs.start()
+    port = int(os.getenv('API_PORT', 5000))
+    runner = web.AppRunner(
+        create_app(),
+        keepalive_timeout=KEEPALIVE_SECONDS,
+        shutdown_timeout=SHUTDOWN_SECONDS,
+        access_log=None
+    )
+    await runner.setup()
+    await web.TCPSite(runner, '0.0.0.0', port).start()
+    _runner = runner
+    print(f"API Server started on port {port}")
+
+async def stop_api_server():
+    """Stop accepting requests and let in-flight requests and jobs finish (up to API_SHUTDOWN_SECONDS each)"""
+    global _runner, _jobs
+    if _runner is None:
+        return
+    runner, _runner = _runner, None
+    await runner.cleanup()
+    if _jobs is not None:
+        # Jobs that don't get to run stay queued in the database for the next start
+        jobs, _jobs = _jobs, None
+        await jobs.stop(SHUTDOWN_SECONDS)
+    print("API Server stopped")
@@ -3,6 +3,7 @@ from discord.ext import commands
 import os
 from dotenv import load_dotenv
 from database import init_database, get_connection
+from api_server import start_api_server, stop_api_server
 
 # Load environment variables
 load_dotenv()
@@ -25,6 +26,14 @@ class MBABot(commands.Bot):
         await self.load_cogs()
         await self.tree.sync()
         print("Slash commands synced!")
+        # The website API shares the bot's event loop
+        if os.getenv('API_SECRET_KEY'):
+            await start_api_server(self)
+    
+    async def close(self):
+        """Finish in-flight API requests before disconnecting"""
+        await stop_api_server()
+        await super().close()
     
     async def load_cogs(self):
         """Load all cog files from the cogs directory"""
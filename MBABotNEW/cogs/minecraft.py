@@ -1,65 +1,195 @@
 import discord
 from discord import app_commands
 from discord.ext import commands, tasks
-from datetime import datetime
-from mcstatus import JavaServer
+from datetime import datetime, timedelta
+from typing import Optional
 import asyncio
+import io
+import time
+import numpy as np
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from database import get_supabase, get_server_config, ensure_server_config, update_server_config
+from database import (
+    get_server_config, ensure_server_config, update_server_config,
+    get_mc_status_configs, get_pending_gametimes, insert_mc_activity, get_mc_activity,
+    get_minecraft_links, get_rostered_users, get_teams_for_guilds
+)
+from utils.mc_status import get_probe_cache, status_fingerprint, MAX_LISTED_PLAYERS
+from utils.mc_schedule import PollScheduler, poll_bounds, parse_gametime, gametime_near
+from utils.mc_activity import ActivityRecorder, rows_to_arrays, summarize_activity
+from utils.mc_roster import get_roster_index, load_roster_index
+from utils.cards import render_activity_chart
+
+# Most status messages edited at once, to stay clear of Discord rate limits
+EMBED_UPDATE_CONCURRENCY = 5
+
+# How often the loop checks which servers are due, and how often it re-reads configs and gametimes
+TICK_SECONDS = 10
+CONFIG_REFRESH_SECONDS = 120
+# Links and roster moves made through the bot update the index as they happen;
+# this full rebuild only catches changes made on the website
+ROSTER_REFRESH_SECONDS = 1800
 
 class MinecraftStatus(commands.Cog):
     """Minecraft server status monitoring"""
     
     def __init__(self, bot):
         self.bot = bot
+        self.probes = get_probe_cache()
+        # message ID -> fingerprint of what it currently shows
+        self.shown = {}
+        self.edits = 0
+        self.edits_skipped = 0
+        self.reposts = 0
+        self.scheduler = PollScheduler()
+        self.servers = {}       # address -> guild configs watching it
+        self.gametimes = {}     # guild_id -> unix times of pending gametimes
+        self.configs_loaded_at = None
+        self.roster_loaded_at = None
+        self.activity = ActivityRecorder()
         self.update_status.start()
     
-    def cog_unload(self):
+    async def cog_unload(self):
         self.update_status.cancel()
+        await self.flush_activity()
+    
+    async def flush_activity(self):
+        """Write buffered probe samples to mc_activity"""
+        try:
+            await asyncio.to_thread(self.activity.flush, insert_mc_activity)
+        except Exception as e:
+            print(f"Error saving MC activity: {e}")
+    
+    async def load_configs(self):
+        """Re-read which guilds watch which servers, and their pending gametimes"""
+        configs = await asyncio.to_thread(get_mc_status_configs)
+        gametimes = await asyncio.to_thread(get_pending_gametimes, [c['guild_id'] for c in configs])
+        
+        servers = {}
+        for config in configs:
+            servers.setdefault(config['mc_server_address'], []).append(config)
+        self.servers = servers
+        
+        self.gametimes = {}
+        for row in gametimes:
+            when = parse_gametime(row.get('scheduled_time'))
+            if when is not None:
+                self.gametimes.setdefault(str(row['guild_id']), []).append(when)
+        
+        self.scheduler.forget_except(servers)
+        self.configs_loaded_at = time.monotonic()
+        
+        if self.roster_loaded_at is None or time.monotonic() - self.roster_loaded_at > ROSTER_REFRESH_SECONDS:
+            try:
+                await self.load_roster([c['guild_id'] for c in configs])
+            except Exception as e:
+                print(f"Error loading MC roster index: {e}")
     
-    @tasks.loop(minutes=5)
+    async def load_roster(self, guild_ids: list):
+        """Rebuild the Minecraft name -> team index for the guilds with a status embed"""
+        links = await asyncio.to_thread(get_minecraft_links, guild_ids)
+        users = await asyncio.to_thread(get_rostered_users)
+        teams = await asyncio.to_thread(get_teams_for_guilds, guild_ids)
+        load_roster_index(links, users, teams)
+        self.roster_loaded_at = time.monotonic()
+    
+    def guild_view(self, guild_id, status: dict) -> tuple:
+        """
+        (online players grouped by team for this guild, fingerprint). The
+        grouping is part of the fingerprint so a trade re-renders the embed.
+        """
+        fingerprint = status_fingerprint(status)
+        index = get_roster_index()
+        if index is None or not status['online'] or not status['players']:
+            return None, fingerprint
+        teams, others = index.group_online(guild_id, status['players'])
+        grouping = (tuple((label, tuple(names)) for label, names in teams), tuple(others))
+        return (teams, others), fingerprint + (grouping,)
+    
+    @tasks.loop(seconds=TICK_SECONDS)
     async def update_status(self):
-        """Update all Minecraft status embeds every 5 minutes"""
-        client = get_supabase()
+        """Poll each server whose adaptive interval has passed and update its embeds"""
+        if self.configs_loaded_at is None or time.monotonic() - self.configs_loaded_at > CONFIG_REFRESH_SECONDS:
+            try:
+                await self.load_configs()
+            except Exception as e:
+                print(f"Error loading MC status configs: {e}")
+                if self.configs_loaded_at is None:
+                    return
         
-        # Get all guilds with MC status enabled
-        result = client.table('server_config').select(
-            'guild_id, mc_status_channel_id, mc_status_message_id, mc_server_address'
-        ).not_.is_('mc_status_channel_id', 'null').not_.is_('mc_status_message_id', 'null').execute()
+        if self.activity.flush_due():
+            await self.flush_activity()
         
-        configs = result.data or []
+        # Guilds sharing a server share one probe
+        due = self.scheduler.due(self.servers)
+        if not due:
+            return
+        # The scheduler decides when to probe, so skip the cache's TTL (its minimum interval still applies)
+        statuses = await asyncio.gather(*(self.probes.get(address, force=True) for address in due))
+        for status in statuses:
+            self.activity.record(status)
         
-        for config in configs:
-            guild_id = int(config['guild_id'])
-            channel_id = int(config['mc_status_channel_id'])
-            message_id = int(config['mc_status_message_id'])
-            server_address = config['mc_server_address']
+        semaphore = asyncio.Semaphore(EMBED_UPDATE_CONCURRENCY)
+        updates = []
+        for address, status in zip(due, statuses):
+            guild_configs = self.servers[address]
+            floor, ceiling = poll_bounds(guild_configs)
+            busy = any(gametime_near(self.gametimes.get(str(c['guild_id']), [])) for c in guild_configs)
+            self.scheduler.record(address, status, floor, ceiling, busy)
+            
+            # Guilds whose players group the same way share one embed
+            embeds = {}
+            for config in guild_configs:
+                grouped, fingerprint = self.guild_view(config['guild_id'], status)
+                embed = embeds.get(fingerprint)
+                if embed is None:
+                    embed = embeds[fingerprint] = self.build_status_embed(address, status, grouped)
+                updates.append(self.update_guild_status(config, embed, fingerprint, semaphore))
+        
+        edits, skipped = self.edits, self.edits_skipped
+        await asyncio.gather(*updates)
+        if self.edits != edits:
+            print(f"MC status: {self.edits - edits} embeds edited, {self.edits_skipped - skipped} unchanged "
+                  f"({self.edits_skipped} edits avoided since start)")
+    
+    async def update_guild_status(self, config: dict, embed: discord.Embed, fingerprint: tuple,
+                                  semaphore: asyncio.Semaphore):
+        """Edit one guild's status message if what it shows changed, re-posting it if it was deleted"""
+        guild_id = int(config['guild_id'])
+        channel_id = int(config['mc_status_channel_id'])
+        message_id = int(config['mc_status_message_id'])
+        
+        if self.shown.get(message_id) == fingerprint:
+            self.edits_skipped += 1
+            return
+        
+        async with semaphore:
             try:
                 guild = self.bot.get_guild(guild_id)
                 if not guild:
-                    continue
+                    return
                 
                 channel = guild.get_channel(channel_id)
                 if not channel:
-                    continue
+                    return
                 
-                # Get the message
+                # Edit by ID, no fetch needed
                 try:
-                    message = await channel.fetch_message(message_id)
+                    await channel.get_partial_message(message_id).edit(embed=embed)
+                    self.edits += 1
+                    self.shown[message_id] = fingerprint
                 except discord.NotFound:
                     # Message was deleted, create a new one
-                    embed = await self.create_status_embed(server_address)
                     new_message = await channel.send(embed=embed)
-                    
+                    self.reposts += 1
+                    self.shown.pop(message_id, None)
+                    self.shown[new_message.id] = fingerprint
+                    # The cached config is reused until the next refresh, point it at the new message
+                    config['mc_status_message_id'] = str(new_message.id)
+
                     # Update database with new message ID
-                    update_server_config(guild_id, mc_status_message_id=new_message.id)
-                    continue
-                
-                # Update the existing message
-                embed = await self.create_status_embed(server_address)
-                await message.edit(embed=embed)
+                    await asyncio.to_thread(update_server_config, guild_id, mc_status_message_id=new_message.id)
                 
             except Exception as e:
                 print(f"Error updating MC status for guild {guild_id}: {e}")
@@ -69,27 +199,21 @@ class MinecraftStatus(commands.Cog):
         """Wait until the bot is ready before starting the loop"""
         await self.bot.wait_until_ready()
     
-    async def create_status_embed(self, server_address: str):
-        """Create the status embed for a Minecraft server"""
-        # Parse address and port
-        if ':' in server_address:
-            address, port = server_address.split(':')
-            port = int(port)
-        else:
-            address = server_address
-            port = 25565
-        
+    async def create_status(self, server_address: str, guild_id: int, force: bool = False) -> tuple:
+        """(embed, fingerprint) for a guild's server from the shared probe cache"""
+        status = await self.probes.get(server_address, force=force)
+        grouped, fingerprint = self.guild_view(guild_id, status)
+        return self.build_status_embed(server_address, status, grouped), fingerprint
+    
+    def build_status_embed(self, server_address: str, status: dict, grouped: tuple = None):
+        """Create the status embed for a probe result, with players grouped by team when given"""
         embed = discord.Embed(
             title="🎮 MBA Minecraft Server",
             color=discord.Color.green(),
             timestamp=datetime.utcnow()
         )
         
-        try:
-            # Query the server
-            server = JavaServer(address, port)
-            status = await asyncio.to_thread(server.status)
-            
+        if status['online']:
             # Server is online
             embed.color = discord.Color.green()
             embed.add_field(
@@ -106,91 +230,87 @@ class MinecraftStatus(commands.Cog):
             )
             
             # Player count
-            player_count = f"{status.players.online}/{status.players.max}"
             embed.add_field(
                 name="👥 Players",
-                value=player_count,
+                value=f"{status['players_online']}/{status['players_max']}",
                 inline=True
             )
             
             # Version
             embed.add_field(
                 name="📦 Version",
-                value=status.version.name,
+                value=status['version'],
                 inline=True
             )
             
             # Latency
             embed.add_field(
                 name="⚡ Ping",
-                value=f"{round(status.latency)}ms",
+                value=f"{status['latency']}ms",
                 inline=True
             )
             
             # MOTD (if available)
-            if hasattr(status, 'description') and status.description:
-                motd = status.description
-                if isinstance(motd, dict):
-                    motd = motd.get('text', '')
+            if status['motd'] is not None:
                 embed.add_field(
                     name="📝 MOTD",
-                    value=str(motd)[:100] if motd else "No MOTD",
+                    value=status['motd'] or "No MOTD",
                     inline=False
                 )
             
             # Player list
-            if status.players.online > 0:
-                player_list_shown = False
-                
-                # First try: Check if sample list is available in status
-                if hasattr(status.players, 'sample') and status.players.sample:
-                    player_names = [player.name for player in status.players.sample[:20]]
-                    player_list = "\n".join([f"• {name}" for name in player_names])
-                    if status.players.online > len(player_names):
-                        remaining = status.players.online - len(player_names)
-                        player_list += f"\n*...and {remaining} more*"
-                    
-                    embed.add_field(
-                        name="🎮 Online Players",
-                        value=player_list,
-                        inline=False
-                    )
-                    player_list_shown = True
-                
-                # Second try: Use query if available
-                if not player_list_shown:
-                    try:
-                        query = await asyncio.to_thread(server.query)
-                        
-                        if query.players.names:
-                            player_list = "\n".join([f"• {name}" for name in query.players.names[:20]])
-                            if len(query.players.names) > 20:
-                                player_list += f"\n*...and {len(query.players.names) - 20} more*"
-                            
-                            embed.add_field(
-                                name="🎮 Online Players",
-                                value=player_list,
-                                inline=False
-                            )
-                            player_list_shown = True
-                    except Exception:
-                        pass
-                
+            online = status['players_online']
+            names = status['players']
+            if online > 0 and names and grouped and grouped[0]:
+                teams, others = grouped
+                embed.add_field(
+                    name="🏀 Teams Online",
+                    value=", ".join(f"{len(team_names)} {label}" for label, team_names in teams),
+                    inline=False
+                )
+                # Team sections first, largest team on top, capped at MAX_LISTED_PLAYERS names in all
+                lines = []
+                shown = 0
+                sections = teams + ([("No Team", others)] if others else [])
+                for label, section_names in sections:
+                    if shown >= MAX_LISTED_PLAYERS:
+                        break
+                    listed = section_names[:MAX_LISTED_PLAYERS - shown]
+                    lines.append(f"**{label}**")
+                    lines.extend(f"• {name}" for name in listed)
+                    shown += len(listed)
+                player_list = "\n".join(lines)
+                if online > shown:
+                    player_list += f"\n*...and {online - shown} more*"
+                embed.add_field(
+                    name="🎮 Online Players",
+                    value=player_list,
+                    inline=False
+                )
+            elif online > 0 and names:
+                player_list = "\n".join([f"• {name}" for name in names[:MAX_LISTED_PLAYERS]])
+                shown = min(len(names), MAX_LISTED_PLAYERS)
+                if online > shown:
+                    player_list += f"\n*...and {online - shown} more*"
+                embed.add_field(
+                    name="🎮 Online Players",
+                    value=player_list,
+                    inline=False
+                )
+            elif online > 0:
                 # Fallback: Just show count
-                if not player_list_shown:
-                    embed.add_field(
-                        name="🎮 Online Players",
-                        value=f"{status.players.online} player{'s' if status.players.online != 1 else ''} online",
-                        inline=False
-                    )
+                embed.add_field(
+                    name="🎮 Online Players",
+                    value=f"{online} player{'s' if online != 1 else ''} online",
+                    inline=False
+                )
             else:
                 embed.add_field(
                     name="🎮 Online Players",
                     value="No players online",
                     inline=False
                 )
-            
-        except Exception as e:
+        else:
             # Server is offline or unreachable
             embed.color = discord.Color.red()
             embed.add_field(
@@ -209,7 +329,8 @@ class MinecraftStatus(commands.Cog):
                 inline=False
             )
         
-        embed.set_footer(text="Updates every 5 minutes")
+        # Edits are skipped while nothing changes, so the timestamp is the last change
+        embed.set_footer(text="Checked more often while players are on • Last change")
         return embed
     
     @app_commands.command(name="mcstatus", description="Set up Minecraft server status monitoring")
@@ -226,10 +347,11 @@ class MinecraftStatus(commands.Cog):
         await interaction.response.defer(ephemeral=True)
         
         # Create the initial embed
-        embed = await self.create_status_embed(server_address)
+        embed, fingerprint = await self.create_status(server_address, interaction.guild_id)
         
         # Send the status message
         message = await channel.send(embed=embed)
+        self.shown[message.id] = fingerprint
         
         # Save to database
         ensure_server_config(interaction.guild_id)
@@ -240,10 +362,12 @@ class MinecraftStatus(commands.Cog):
             mc_server_address=server_address
         )
         
+        self.configs_loaded_at = None
+        
         await interaction.followup.send(
             f"✅ Minecraft server status set up in {channel.mention}!\n"
             f"Server: `{server_address}`\n"
-            f"The status will update automatically every 5 minutes.",
+            f"The status will update automatically (every few minutes, faster while players are on).",
             ephemeral=True
         )
     
@@ -275,9 +399,11 @@ class MinecraftStatus(commands.Cog):
                 )
                 return
             
-            message = await channel.fetch_message(message_id)
-            embed = await self.create_status_embed(server_address)
-            await message.edit(embed=embed)
+            # Forced, but at most one real probe per MC_PROBE_MIN_INTERVAL however often this is run
+            embed, fingerprint = await self.create_status(server_address, interaction.guild_id, force=True)
+            await channel.get_partial_message(message_id).edit(embed=embed)
+            self.edits += 1
+            self.shown[message_id] = fingerprint
             
             await interaction.followup.send(
                 "✅ Server status updated!",
@@ -302,12 +428,114 @@ class MinecraftStatus(commands.Cog):
         
         ensure_server_config(interaction.guild_id)
         update_server_config(interaction.guild_id, mc_server_address=server_address)
+        # Pick up the new address on the next tick and poll it straight away
+        self.configs_loaded_at = None
+        self.scheduler.poll_now(server_address)
         
         await interaction.response.send_message(
             f"✅ Minecraft server address updated to: `{server_address}`\n"
-            f"The status will update on the next cycle.",
+            f"The status will update within a few seconds.",
+            ephemeral=True
+        )
+
+    @app_commands.command(name="mcpolling", description="Set how often the Minecraft status may be refreshed")
+    @app_commands.default_permissions(administrator=True)
+    @app_commands.describe(
+        min_seconds="Fastest refresh, used while players are on or a gametime is near (default 30)",
+        max_seconds="Slowest refresh, reached while the server is offline (default 1800)"
+    )
+    async def mcpolling(self, interaction: discord.Interaction,
+                        min_seconds: app_commands.Range[int, 15, 3600],
+                        max_seconds: Optional[app_commands.Range[int, 60, 86400]] = None):
+        """Set this guild's status polling floor and ceiling"""
+        max_seconds = max_seconds or max(min_seconds, 1800)
+        if max_seconds < min_seconds:
+            await interaction.response.send_message(
+                "❌ max_seconds can't be lower than min_seconds.",
+                ephemeral=True
+            )
+            return
+        
+        ensure_server_config(interaction.guild_id)
+        update_server_config(interaction.guild_id, mc_poll_min_seconds=min_seconds, mc_poll_max_seconds=max_seconds)
+        self.configs_loaded_at = None
+        
+        await interaction.response.send_message(
+            f"✅ Minecraft status will refresh between every {min_seconds}s and every {max_seconds}s.",
             ephemeral=True
         )
 
+    @app_commands.command(name="mcactivity", description="See when players are on the Minecraft server")
+    @app_commands.default_permissions(administrator=True)
+    @app_commands.describe(
+        days="How many days of history to include (default 14)",
+        utc_offset="Your timezone's offset from UTC in hours, e.g. -5 for EST (default 0)"
+    )
+    async def mcactivity(self, interaction: discord.Interaction,
+                         days: app_commands.Range[int, 1, 90] = 14,
+                         utc_offset: app_commands.Range[int, -12, 14] = 0):
+        """Peak hours, daily unique players and a chart from recorded status probes"""
+        config = get_server_config(interaction.guild_id)
+        if not config or not config.get('mc_server_address'):
+            await interaction.response.send_message(
+                "❌ Minecraft status not set up. Use `/mcstatus` first.",
+                ephemeral=True
+            )
+            return
+        
+        await interaction.response.defer()
+        address = config['mc_server_address']
+        since = (datetime.utcnow() - timedelta(days=days)).isoformat()
+        
+        try:
+            rows = await asyncio.to_thread(get_mc_activity, address, since)
+        except Exception as e:
+            await interaction.followup.send(f"❌ Couldn't load activity: {e}", ephemeral=True)
+            return
+        
+        # Stored samples plus whatever hasn't been flushed yet
+        times, counts, names = rows_to_arrays(rows)
+        pending_times, pending_counts, pending_names = self.activity.unflushed(address)
+        summary = summarize_activity(
+            np.concatenate([times, pending_times]),
+            np.concatenate([counts, pending_counts]),
+            names + pending_names,
+            utc_offset
+        )
+        
+        if summary['samples'] == 0:
+            await interaction.followup.send("📊 No activity recorded yet. Check back once the status has been running a while.")
+            return
+        
+        zone = f"UTC{utc_offset:+d}" if utc_offset else "UTC"
+        peak_hours = ", ".join(
+            f"{h:02d}:00 ({summary['hourly_avg'][h]:.1f} avg)" for h in summary['peak_hours']
+        ) or "-"
+        unique_days = summary['daily_unique']
+        
+        embed = discord.Embed(
+            title="📈 Minecraft Server Activity",
+            description=f"`{address}` | last {days} days | times in {zone}",
+            color=discord.Color.green()
+        )
+        embed.add_field(name="⏰ Peak Hours", value=peak_hours, inline=False)
+        embed.add_field(name="👥 Unique Players", value=str(summary['unique_players']), inline=True)
+        embed.add_field(
+            name="📅 Per Day",
+            value=f"{sum(unique_days) / len(unique_days):.1f} avg, {max(unique_days)} max" if unique_days else "-",
+            inline=True
+        )
+        embed.add_field(name="🔎 Samples", value=str(summary['samples']), inline=True)
+        
+        png = await asyncio.to_thread(
+            render_activity_chart,
+            "Server Activity", f"{address} • last {days} days • {zone}",
+            summary['hourly_avg'], summary['hourly_peak'],
+            summary['days'], summary['daily_unique']
+        )
+        embed.set_image(url="attachment://activity.png")
+        
+        await interaction.followup.send(embed=embed, file=discord.File(io.BytesIO(png), filename="activity.png"))
+
 async def setup(bot):
     await bot.add_cog(MinecraftStatus(bot))
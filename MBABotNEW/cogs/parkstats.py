@@ -0,0 +1,217 @@
+import discord
+from discord import app_commands
+from discord.ext import commands, tasks
+from typing import Optional
+import asyncio
+import re
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database import get_park_stats, link_minecraft, get_minecraft_identity
+from utils.mc_identity import get_resolver
+from utils.park_sync import ParkStatsSync, mysql_configured, SYNC_MINUTES
+from utils.park_stats import ParkStatsCache
+from utils.park_analytics import get_park_table, format_park_metric, PARK_METRICS
+
+MINECRAFT_NAME = re.compile(r'^[A-Za-z0-9_]{3,16}$')
+
+class ParkStats(commands.Cog):
+    """Park stats synced from the game server's MySQL"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.sync = None
+        self.park = ParkStatsCache(get_park_stats)
+        self.resolver = get_resolver()
+        if mysql_configured():
+            self.sync_park_stats.start()
+        else:
+            print("Park stats sync disabled (PARK_MYSQL_HOST not set or mysql-connector-python missing)")
+
+    def cog_unload(self):
+        self.sync_park_stats.cancel()
+
+    @tasks.loop(minutes=SYNC_MINUTES)
+    async def sync_park_stats(self):
+        """Pull changed park stats every PARK_SYNC_MINUTES"""
+        try:
+            if self.sync is None:
+                self.sync = await asyncio.to_thread(ParkStatsSync)
+            summary = await asyncio.to_thread(self.sync.run_once)
+        except Exception as e:
+            print(f"Park stats sync failed: {e}")
+            return
+        # Rows landed or went away, so don't wait for the snapshot to go stale
+        if (summary['rows_written'] or summary['rows_deleted']) and self.park.snapshot is not None:
+            self.park.refresh()
+
+    @sync_park_stats.before_loop
+    async def before_sync_park_stats(self):
+        await self.bot.wait_until_ready()
+
+    @app_commands.command(name="linkmc", description="Link your Minecraft account for park stats")
+    @app_commands.describe(username="Your Minecraft username")
+    async def linkmc(self, interaction: discord.Interaction, username: str):
+        """Link the caller's Discord account to a Minecraft username"""
+        username = username.strip()
+        if not MINECRAFT_NAME.match(username):
+            await interaction.response.send_message(
+                "❌ That isn't a valid Minecraft username (3-16 letters, numbers or underscores).",
+                ephemeral=True
+            )
+            return
+
+        await interaction.response.defer(ephemeral=True)
+        uuid = await self.resolver.resolve_name(username)
+        if not uuid:
+            await interaction.followup.send(f"❌ Couldn't find a Minecraft account named **{username}**.")
+            return
+
+        # Store the current capitalization along with the UUID
+        username = self.resolver.cached_name(uuid) or username
+        if not await asyncio.to_thread(link_minecraft, interaction.guild_id, interaction.user.id, username, uuid):
+            await interaction.followup.send("❌ Couldn't save your link, try again.")
+            return
+
+        await interaction.followup.send(f"✅ Linked to **{username}**.")
+
+    @app_commands.command(name="parkstats", description="View a player's park stats")
+    @app_commands.describe(
+        player="The player to view (leave empty for yourself)",
+        username="Look up a Minecraft username instead",
+        season="Park season number (leave empty for the latest)"
+    )
+    async def parkstats(self, interaction: discord.Interaction,
+                        player: Optional[discord.Member] = None,
+                        username: Optional[str] = None,
+                        season: Optional[int] = None):
+        """Park season line for a linked Discord user or a Minecraft username"""
+        # The first snapshot load and a Mojang lookup can both outlast the 3s interaction deadline
+        await interaction.response.defer()
+        snapshot = await self.park.get()
+        if snapshot is None:
+            await interaction.followup.send("❌ Park stats are unavailable right now.")
+            return
+
+        if username:
+            uuid = (self.resolver.cached_uuid(username) or snapshot.find(username)
+                    or await self.resolver.resolve_name(username))
+        else:
+            target = player or interaction.user
+            link = await asyncio.to_thread(get_minecraft_identity, interaction.guild_id, target.id)
+            if not link:
+                who = "You haven't" if target == interaction.user else f"{target.display_name} hasn't"
+                await interaction.followup.send(f"❌ {who} linked a Minecraft account. Use `/linkmc` first.")
+                return
+            username = link['minecraft_username']
+            # Links made before UUIDs were stored are resolved by name
+            uuid = link.get('minecraft_uuid') or await self.resolver.resolve_name(username)
+
+        season = season or snapshot.latest_season
+        row = snapshot.player(uuid, season) if uuid else None
+        if not row:
+            await interaction.followup.send(f"📊 No park stats found for **{username}** in season {season}.")
+            return
+
+        games = row.get('games_played') or 0
+
+        def avg(column):
+            return f"{(row.get(column) or 0) / games:.1f}" if games else "0.0"
+
+        def pct(made, attempted):
+            made, attempted = row.get(made) or 0, row.get(attempted) or 0
+            return f"{made / attempted * 100:.1f}%" if attempted else "-"
+
+        embed = discord.Embed(
+            title=f"🏀 {self.resolver.cached_name(uuid) or row.get('player_name') or username}'s Park Stats",
+            description=f"**Season {season}** | {row.get('wins') or 0}-{row.get('losses') or 0} in {games} games",
+            color=discord.Color.green()
+        )
+        embed.add_field(name="PPG", value=avg('points'), inline=True)
+        embed.add_field(name="RPG", value=avg('rebounds'), inline=True)
+        embed.add_field(name="APG", value=avg('assists'), inline=True)
+        embed.add_field(name="SPG", value=avg('steals'), inline=True)
+        embed.add_field(name="BPG", value=avg('blocks'), inline=True)
+        embed.add_field(name="TOV", value=avg('turnovers'), inline=True)
+        embed.add_field(name="FG", value=f"{row.get('fg_made') or 0}/{row.get('fg_attempted') or 0} ({pct('fg_made', 'fg_attempted')})", inline=True)
+        embed.add_field(name="3P", value=f"{row.get('three_fg_made') or 0}/{row.get('three_fg_attempted') or 0} ({pct('three_fg_made', 'three_fg_attempted')})", inline=True)
+        embed.add_field(name="Totals", value=f"{row.get('points') or 0} PTS | {row.get('rebounds') or 0} REB | {row.get('assists') or 0} AST", inline=False)
+
+        # League ranks among qualified players this season
+        ranks = get_park_table(snapshot, season).percentiles(uuid) or {}
+        rank_lines = []
+        for metric in ('ppg', 'rpg', 'apg', 'efg_pct', 'win_pct'):
+            if metric not in ranks or ranks[metric][1] is None:
+                continue
+            value, rank, total, percentile = ranks[metric]
+            rank_lines.append(f"{PARK_METRICS[metric][0]}: #{rank} of {total} ({percentile:.0f}th pct)")
+        if rank_lines:
+            embed.add_field(name="📈 League Ranks", value="\n".join(rank_lines), inline=False)
+        embed.set_thumbnail(url=f"https://mc-heads.net/avatar/{row['player_uuid']}")
+
+        await interaction.followup.send(embed=embed)
+
+    @app_commands.command(name="parkleaders", description="View park stat leaderboards")
+    @app_commands.describe(
+        stat="The stat to rank by",
+        season="Park season number (leave empty for the latest)"
+    )
+    @app_commands.choices(stat=[
+        app_commands.Choice(name="Points (PPG)", value="ppg"),
+        app_commands.Choice(name="Rebounds (RPG)", value="rpg"),
+        app_commands.Choice(name="Assists (APG)", value="apg"),
+        app_commands.Choice(name="Steals (SPG)", value="spg"),
+        app_commands.Choice(name="Blocks (BPG)", value="bpg"),
+        app_commands.Choice(name="Threes Made (3PM)", value="tpg"),
+        app_commands.Choice(name="Field Goal % (FG%)", value="fg_pct"),
+        app_commands.Choice(name="Three Point % (3P%)", value="three_pct"),
+        app_commands.Choice(name="Effective FG % (eFG%)", value="efg_pct"),
+        app_commands.Choice(name="Win % (WIN%)", value="win_pct"),
+        app_commands.Choice(name="Wins", value="wins"),
+    ])
+    async def parkleaders(self, interaction: discord.Interaction, stat: str = "ppg",
+                          season: Optional[int] = None):
+        """Top 10 qualified park players for a stat, with the league spread"""
+        # The first snapshot load can outlast the 3s interaction deadline
+        await interaction.response.defer()
+        snapshot = await self.park.get()
+        if snapshot is None:
+            await interaction.followup.send("❌ Park stats are unavailable right now.")
+            return
+
+        season = season or snapshot.latest_season
+        # Built once per synced snapshot, then every board is an array slice
+        table = get_park_table(snapshot, season)
+        leaders = table.leaders(stat, limit=10)
+        if not leaders:
+            await interaction.followup.send(f"📊 No qualified players for season {season}.")
+            return
+
+        label, full_name, _, _, column, minimum = PARK_METRICS[stat]
+        medals = ["🥇", "🥈", "🥉"]
+        lines = []
+        for i, (_, name, value, games) in enumerate(leaders):
+            rank = medals[i] if i < 3 else f"**{i + 1}.**"
+            lines.append(f"{rank} {name} - **{format_park_metric(stat, value)}** {label} ({games} GP)")
+
+        embed = discord.Embed(
+            title=f"🏀 Park Leaders - {full_name}",
+            description="\n".join(lines),
+            color=discord.Color.green()
+        )
+
+        spread = table.percentile_table(stat, (25, 50, 75, 90))
+        if spread:
+            embed.add_field(
+                name="📊 League Spread",
+                value=" | ".join(f"{p}th: {format_park_metric(stat, v)}" for p, v in spread.items()),
+                inline=False
+            )
+
+        qualifier = "games" if column == 'games_played' else "attempts"
+        embed.set_footer(text=f"Season {season} | {table.qualified(stat)} qualified (minimum {minimum} {qualifier})")
+
+        await interaction.followup.send(embed=embed)
+
+async def setup(bot):
+    await bot.add_cog(ParkStats(bot))
@@ -3,6 +3,9 @@ from discord import app_commands
 from discord.ext import commands
 from datetime import datetime
 from typing import Optional
+import aiohttp
+import asyncio
+import io
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -10,8 +13,179 @@ from database import (
     get_supabase, get_server_config, get_team_by_role, get_player_team,
     get_active_season, create_or_activate_season,
     record_game, add_player_game_stats, update_player_season_stats,
-    get_player_season_stats, get_leaderboard, get_recent_games
+    get_player_season_stats, get_leaderboard, get_recent_games,
+    get_team_standings, get_team_standing, get_head_to_head,
+    get_season_by_name, get_all_teams, get_user_directory, get_team_by_id,
+    get_player_game_log, get_season_version, get_season_player_stats,
+    get_season_by_id
 )
+from utils.standings import (
+    sort_standings, group_by_conference, format_streak, head_to_head_for,
+    pair_key, CONFERENCES
+)
+from utils.analytics import get_season_metrics, format_metric, METRICS
+from utils.pagination import PAGE_SIZE, encode_timestamp, decode_timestamp, pack_id, unpack_id
+from utils.cards import CardRenderer, player_card, team_card, inputs_digest
+from utils.embeds import get_team_logo_url
+from utils.ranks import get_season_ranks, RANK_STATS
+from utils.archive import get_archive, archive_season
+from utils.export import export_season, parquet_available
+from utils.importer import (
+    build_team_directory, build_player_directory, parse_box_scores, import_box_scores
+)
+
+# stat choice -> (player_season_stats column, abbreviation, full name)
+LEADERBOARD_STATS = {
+    "ppg": ("points", "PPG", "Points Per Game"),
+    "rpg": ("rebounds", "RPG", "Rebounds Per Game"),
+    "apg": ("assists", "APG", "Assists Per Game"),
+    "spg": ("steals", "SPG", "Steals Per Game"),
+    "bpg": ("blocks", "BPG", "Blocks Per Game"),
+}
+
+
+class LeaderboardPageButton(discord.ui.DynamicItem[discord.ui.Button],
+                            template=r'lb:(?P<direction>[pn]):(?P<stat>[a-z_]+):(?P<page>-?\d+):(?P<season>[^:]+):(?P<value>[^:]*):(?P<player>\d*)'):
+    """
+    Persistent Previous/Next button for /leaderboard.
+    The custom_id carries the target page and the (total, player_id)
+    of the row to seek from, so buttons keep working after a restart.
+    IDs are packed with pack_id to fit Discord's 100 characters.
+    """
+    def __init__(self, direction: str, stat: str, page: int, season_id,
+                 value='', player_id='', disabled: bool = False):
+        super().__init__(discord.ui.Button(
+            label="◀ Previous" if direction == 'p' else "Next ▶",
+            style=discord.ButtonStyle.secondary,
+            custom_id=f'lb:{direction}:{stat}:{page}:{pack_id(season_id)}:{value}:{player_id}',
+            disabled=disabled
+        ))
+        self.direction = direction
+        self.stat = stat
+        self.page = page
+        self.season_id = str(season_id)
+        self.cursor = (value, player_id) if value != '' else None
+    
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        return cls(match['direction'], match['stat'], int(match['page']), unpack_id(match['season']),
+                   match['value'], match['player'])
+    
+    async def callback(self, interaction: discord.Interaction):
+        season = get_active_season(interaction.guild_id)
+        if not season or str(season['id']) != self.season_id:
+            # Past seasons come from their snapshot when one exists
+            archive = get_archive(self.season_id)
+            season = archive.season if archive else get_season_by_id(self.season_id)
+        if not season or str(season.get('guild_id')) != str(interaction.guild_id):
+            await interaction.response.send_message(
+                "❌ This leaderboard's season no longer exists. Run /leaderboard again.",
+                ephemeral=True
+            )
+            return
+        
+        await interaction.response.defer()
+        cog = interaction.client.get_cog('StatsCommands')
+        embed, view = await cog.build_leaderboard_page(
+            season, self.stat, max(self.page, 0), self.cursor, self.direction == 'p'
+        )
+        if embed:
+            await interaction.edit_original_response(embed=embed, view=view)
+
+
+class GameHistoryPageButton(discord.ui.DynamicItem[discord.ui.Button],
+                            template=r'gh:(?P<direction>[pn]):(?P<team>[^:]*):(?P<season>[^:]*):(?P<page>-?\d+):(?P<played>[0-9a-z]+):(?P<game>[^:]+)'):
+    """
+    Persistent Previous/Next button for /gamehistory.
+    The custom_id carries the team and season filters, the target page and
+    the (played_at, id) of the game to seek from, with IDs packed by pack_id.
+    """
+    def __init__(self, direction: str, team_id: str, page: int, played_at: str, game_id: str,
+                 season_id: str = '', disabled: bool = False):
+        super().__init__(discord.ui.Button(
+            label="◀ Previous" if direction == 'p' else "Next ▶",
+            style=discord.ButtonStyle.secondary,
+            custom_id=f'gh:{direction}:{pack_id(team_id)}:{pack_id(season_id)}:{page}:{played_at}:{pack_id(game_id)}',
+            disabled=disabled
+        ))
+        self.direction = direction
+        self.team_id = team_id or None
+        self.season_id = season_id or None
+        self.page = page
+        self.cursor = (decode_timestamp(played_at), game_id)
+    
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        return cls(match['direction'], unpack_id(match['team']), int(match['page']),
+                   match['played'], unpack_id(match['game']), unpack_id(match['season']))
+    
+    async def callback(self, interaction: discord.Interaction):
+        season = None
+        if self.season_id:
+            season = get_season_by_id(self.season_id)
+            if not season or str(season.get('guild_id')) != str(interaction.guild_id):
+                await interaction.response.send_message(
+                    "❌ This season no longer exists. Run /gamehistory again.",
+                    ephemeral=True
+                )
+                return
+        
+        team_name = None
+        if self.team_id:
+            team = get_team_by_id(self.team_id)
+            team_name = team['team_name'] if team else None
+        
+        await interaction.response.defer()
+        cog = interaction.client.get_cog('StatsCommands')
+        embed, view = await cog.build_game_history_page(
+            interaction.guild_id, self.team_id, team_name, max(self.page, 0),
+            self.cursor, self.direction == 'p', season=season
+        )
+        if embed:
+            await interaction.edit_original_response(embed=embed, view=view)
+
+
+class ArchivedGamesPageButton(discord.ui.DynamicItem[discord.ui.Button],
+                              template=r'ga:(?P<direction>[pn]):(?P<season>[^:]+):(?P<team>[^:]*):(?P<page>-?\d+)'):
+    """
+    Previous/Next button for /gamehistory over an archived season.
+    Archived games are pre-sorted, so the page number is the whole cursor.
+    """
+    def __init__(self, direction: str, season_id, team_id: str, page: int, disabled: bool = False):
+        super().__init__(discord.ui.Button(
+            label="◀ Previous" if direction == 'p' else "Next ▶",
+            style=discord.ButtonStyle.secondary,
+            custom_id=f'ga:{direction}:{pack_id(season_id)}:{pack_id(team_id)}:{page}',
+            disabled=disabled
+        ))
+        self.season_id = str(season_id)
+        self.team_id = team_id or None
+        self.page = page
+    
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        return cls(match['direction'], unpack_id(match['season']), unpack_id(match['team']), int(match['page']))
+    
+    async def callback(self, interaction: discord.Interaction):
+        archive = get_archive(self.season_id)
+        if not archive or str(archive.season.get('guild_id')) != str(interaction.guild_id):
+            await interaction.response.send_message(
+                "❌ This season is no longer archived. Run /gamehistory again.",
+                ephemeral=True
+            )
+            return
+        
+        team_name = None
+        if self.team_id:
+            team_name = (archive.teams.get(self.team_id) or {}).get('team_name')
+        
+        await interaction.response.defer()
+        cog = interaction.client.get_cog('StatsCommands')
+        embed, view = await cog.build_game_history_page(
+            interaction.guild_id, self.team_id, team_name, max(self.page, 0), archive=archive
+        )
+        if embed:
+            await interaction.edit_original_response(embed=embed, view=view)
 
 
 class StatsCommands(commands.Cog):
@@ -19,6 +193,21 @@ class StatsCommands(commands.Cog):
     
     def __init__(self, bot):
         self.bot = bot
+        self.cards = CardRenderer()
+        self._http = None
+    
+    async def cog_unload(self):
+        self.cards.shutdown()
+        if self._http:
+            await self._http.close()
+    
+    async def fetch_image(self, url: str) -> bytes:
+        """Download an avatar or logo for a card render"""
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
+        async with self._http.get(url) as response:
+            response.raise_for_status()
+            return await response.read()
     
     def is_referee(self, member: discord.Member, guild_id: int) -> bool:
         """Check if member has referee role"""
@@ -32,6 +221,7 @@ class StatsCommands(commands.Cog):
     @app_commands.describe(season_name="Season name (e.g., S1, S2)")
     async def setseason(self, interaction: discord.Interaction, season_name: str):
         """Set the current active season"""
+        previous = get_active_season(interaction.guild_id)
         result = create_or_activate_season(interaction.guild_id, season_name.upper())
         
         if result:
@@ -39,12 +229,60 @@ class StatsCommands(commands.Cog):
                 f"✅ Season **{season_name.upper()}** is now active!",
                 ephemeral=True
             )
+            
+            # The season that just ended is frozen so history reads skip the live tables
+            if previous and str(previous['id']) != str(result['id']):
+                try:
+                    await asyncio.to_thread(archive_season, previous)
+                    await interaction.followup.send(
+                        f"🗄️ Season **{previous['season_name']}** has been archived.",
+                        ephemeral=True
+                    )
+                except Exception as e:
+                    print(f"Error archiving season {previous['id']}: {e}")
         else:
             await interaction.response.send_message(
                 "❌ Failed to set season. Please try again.",
                 ephemeral=True
             )
     
+    @app_commands.command(name="archiveseason", description="Snapshot a completed season for fast history lookups")
+    @app_commands.default_permissions(administrator=True)
+    @app_commands.describe(season_name="Season to archive (e.g., S1)")
+    async def archiveseason(self, interaction: discord.Interaction, season_name: str):
+        """Freeze a past season (for seasons that ended before archiving existed, or to refresh one)"""
+        season = get_season_by_name(interaction.guild_id, season_name.upper())
+        
+        if not season:
+            await interaction.response.send_message(
+                f"❌ Season **{season_name.upper()}** not found.",
+                ephemeral=True
+            )
+            return
+        
+        if season.get('is_active'):
+            await interaction.response.send_message(
+                "❌ The active season can't be archived. It is archived automatically when /setseason moves on.",
+                ephemeral=True
+            )
+            return
+        
+        await interaction.response.defer(ephemeral=True)
+        
+        try:
+            archive = await asyncio.to_thread(archive_season, season)
+        except Exception as e:
+            print(f"Error archiving season {season['id']}: {e}")
+            await interaction.followup.send(f"❌ Archive failed: {e}", ephemeral=True)
+            return
+        
+        counts = archive.meta['counts']
+        await interaction.followup.send(
+            f"🗄️ Archived **{season['season_name']}**: {counts['games']} games, "
+            f"{counts['player_game_stats']} stat lines, {counts['player_season_stats']} players.",
+            ephemeral=True
+        )
+    
     @app_commands.command(name="addgame", description="Record a game result (Referees only)")
     @app_commands.describe(
         team1="First team",
@@ -194,17 +432,35 @@ class StatsCommands(commands.Cog):
         await interaction.response.send_message(embed=embed, ephemeral=True)
     
     @app_commands.command(name="playerstats", description="View a player's season stats")
-    @app_commands.describe(player="The player to view (leave empty for yourself)")
+    @app_commands.describe(
+        player="The player to view (leave empty for yourself)",
+        season_name="Past season to view (leave empty for the active season)"
+    )
     async def playerstats(self, interaction: discord.Interaction, 
-                         player: Optional[discord.Member] = None):
+                         player: Optional[discord.Member] = None,
+                         season_name: Optional[str] = None):
         """View player statistics"""
         target = player or interaction.user
         
-        stats = get_player_season_stats(target.id, interaction.guild_id)
+        if season_name:
+            season = get_season_by_name(interaction.guild_id, season_name.upper())
+            if not season:
+                await interaction.response.send_message(
+                    f"❌ Season **{season_name.upper()}** not found.",
+                    ephemeral=True
+                )
+                return
+            archive = get_archive(season['id'])
+            if archive:
+                stats = archive.player_stats(target.id)
+            else:
+                stats = get_player_season_stats(target.id, interaction.guild_id, season['id'])
+        else:
+            stats = get_player_season_stats(target.id, interaction.guild_id)
         
         if not stats:
             await interaction.response.send_message(
-                f"📊 No stats found for {target.display_name} this season.",
+                f"📊 No stats found for {target.display_name} {'in ' + season_name.upper() if season_name else 'this season'}.",
                 ephemeral=True
             )
             return
@@ -250,76 +506,459 @@ class StatsCommands(commands.Cog):
         
         await interaction.response.send_message(embed=embed)
     
+    @app_commands.command(name="advancedstats", description="View a player's advanced stats")
+    @app_commands.describe(player="The player to view (leave empty for yourself)")
+    async def advancedstats(self, interaction: discord.Interaction,
+                            player: Optional[discord.Member] = None):
+        """View efficiency, usage shares and ratio stats for the active season"""
+        target = player or interaction.user
+        
+        season = get_active_season(interaction.guild_id)
+        
+        if not season:
+            await interaction.response.send_message(
+                "❌ No active season.",
+                ephemeral=True
+            )
+            return
+        
+        await interaction.response.defer()
+        
+        metrics = await asyncio.to_thread(get_season_metrics, season['id'])
+        stats = metrics.for_player(target.id)
+        
+        if not stats:
+            await interaction.followup.send(
+                f"📊 No stats found for {target.display_name} this season."
+            )
+            return
+        
+        embed = discord.Embed(
+            title=f"🧠 {target.display_name}'s Advanced Stats",
+            description=f"**{season['season_name']}** | {stats['games_played']} Games Played",
+            color=discord.Color.purple()
+        )
+        
+        def line(metric):
+            abbrev = METRICS[metric][0]
+            rank, qualified = metrics.rank(target.id, metric)
+            rank_text = f" (#{rank}/{qualified})" if rank else ""
+            return f"**{abbrev}:** {format_metric(metric, stats[metric])}{rank_text}"
+        
+        embed.add_field(
+            name="⚡ Impact",
+            value="\n".join(line(m) for m in ('eff', 'gmsc')),
+            inline=True
+        )
+        embed.add_field(
+            name="📊 Team Share",
+            value="\n".join(line(m) for m in ('pts_share', 'reb_share', 'ast_share')),
+            inline=True
+        )
+        embed.add_field(
+            name="🛡️ Ratios",
+            value="\n".join(line(m) for m in ('stocks', 'ast_to', 'stk_to')),
+            inline=True
+        )
+        
+        embed.set_thumbnail(url=target.display_avatar.url)
+        embed.set_footer(text="EFF = PTS+REB+AST+STL+BLK-TOV • GmSc uses box-score weights")
+        
+        await interaction.followup.send(embed=embed)
+    
+    @app_commands.command(name="myrank", description="See where a player ranks in the league")
+    @app_commands.describe(player="The player to view (leave empty for yourself)")
+    async def myrank(self, interaction: discord.Interaction,
+                     player: Optional[discord.Member] = None):
+        """League rank and percentile for every per-game stat at once"""
+        target = player or interaction.user
+        
+        season = get_active_season(interaction.guild_id)
+        
+        if not season:
+            await interaction.response.send_message(
+                "❌ No active season.",
+                ephemeral=True
+            )
+            return
+        
+        # Rebuilt from the database whenever the season's stats version moves
+        ranks = await asyncio.to_thread(
+            get_season_ranks, season['id'], get_season_player_stats, get_season_version(season['id'])
+        )
+        result = ranks.lookup(target.id)
+        
+        if not result:
+            await interaction.response.send_message(
+                f"📊 No stats found for {target.display_name} this season.",
+                ephemeral=True
+            )
+            return
+        
+        embed = discord.Embed(
+            title=f"📈 {target.display_name}'s League Ranks",
+            description=f"**{season['season_name']}** | {len(ranks)} players ranked",
+            color=discord.Color.teal()
+        )
+        
+        for stat, (value, rank, total, percentile) in result.items():
+            label = RANK_STATS[stat][1]
+            embed.add_field(
+                name=label,
+                value=f"**{value:.1f}**\n#{rank} of {total}\n{percentile:.0f}th percentile",
+                inline=True
+            )
+        
+        embed.set_thumbnail(url=target.display_avatar.url)
+        
+        await interaction.response.send_message(embed=embed)
+    
+    @app_commands.command(name="playercard", description="View a player's season stat card")
+    @app_commands.describe(player="The player to view (leave empty for yourself)")
+    async def playercard(self, interaction: discord.Interaction,
+                         player: Optional[discord.Member] = None):
+        """Render a player's season averages and scoring trend as an image"""
+        target = player or interaction.user
+        
+        season = get_active_season(interaction.guild_id)
+        
+        if not season:
+            await interaction.response.send_message(
+                "❌ No active season.",
+                ephemeral=True
+            )
+            return
+        
+        await interaction.response.defer()
+        
+        stats = await asyncio.to_thread(get_player_season_stats, target.id, interaction.guild_id, season['id'])
+        if not stats:
+            await interaction.followup.send(
+                f"📊 No stats found for {target.display_name} this season."
+            )
+            return
+        
+        player_team = await asyncio.to_thread(get_player_team, interaction.guild_id, target.id)
+        team = (player_team or {}).get('teams') or {}
+        team_name = team.get('team_name') or team.get('name')
+        color = target.color.to_rgb() if target.color.value else (88, 101, 242)
+        avatar_url = target.display_avatar.replace(size=128, static_format='png').url
+        
+        async def build():
+            game_log = await asyncio.to_thread(get_player_game_log, target.id, season['id'])
+            return player_card(
+                target.display_name, season['season_name'], team_name,
+                color, stats, game_log, avatar_url
+            )
+        
+        # Name, avatar, color and team change without a stat write, so they're part of the key
+        key = ('player', str(target.id), str(season['id']), get_season_version(season['id']),
+               inputs_digest(target.display_name, season['season_name'], team_name, color, avatar_url))
+        png = await self.cards.get_card(key, build, self.fetch_image)
+        
+        await interaction.followup.send(file=discord.File(io.BytesIO(png), filename="playercard.png"))
+    
+    @app_commands.command(name="teamcard", description="View a team's season stat card")
+    @app_commands.describe(team="The team to view")
+    async def teamcard(self, interaction: discord.Interaction, team: discord.Role):
+        """Render a team's record, scoring and recent margins as an image"""
+        team_data = get_team_by_role(interaction.guild_id, team.id)
+        
+        if not team_data:
+            await interaction.response.send_message(
+                f"❌ {team.mention} is not a registered team.",
+                ephemeral=True
+            )
+            return
+        
+        season = get_active_season(interaction.guild_id)
+        
+        if not season:
+            await interaction.response.send_message(
+                "❌ No active season.",
+                ephemeral=True
+            )
+            return
+        
+        await interaction.response.defer()
+        
+        color = team.color.to_rgb() if team.color.value else (88, 101, 242)
+        logo_url = get_team_logo_url(team_data.get('team_logo_emoji'))
+        
+        async def build():
+            standing = await asyncio.to_thread(get_team_standing, season['id'], team_data['id'])
+            games = await asyncio.to_thread(get_recent_games, interaction.guild_id, 10, team_data['id'])
+            return team_card(
+                team_data['team_name'], season['season_name'], color,
+                standing, games, team_data['id'], logo_url
+            )
+        
+        key = ('team', str(team_data['id']), str(season['id']), get_season_version(season['id']),
+               inputs_digest(team_data['team_name'], season['season_name'], color, logo_url))
+        png = await self.cards.get_card(key, build, self.fetch_image)
+        
+        await interaction.followup.send(file=discord.File(io.BytesIO(png), filename="teamcard.png"))
+    
     @app_commands.command(name="leaderboard", description="View stat leaderboards")
-    @app_commands.describe(stat="The stat to rank by")
+    @app_commands.describe(
+        stat="The stat to rank by",
+        season_name="Past season to view (leave empty for the active season)"
+    )
     @app_commands.choices(stat=[
         app_commands.Choice(name="Points (PPG)", value="ppg"),
         app_commands.Choice(name="Rebounds (RPG)", value="rpg"),
         app_commands.Choice(name="Assists (APG)", value="apg"),
         app_commands.Choice(name="Steals (SPG)", value="spg"),
         app_commands.Choice(name="Blocks (BPG)", value="bpg"),
+        app_commands.Choice(name="Efficiency (EFF)", value="eff"),
+        app_commands.Choice(name="Game Score (GmSc)", value="gmsc"),
+        app_commands.Choice(name="Share of Team Points (PTS%)", value="pts_share"),
+        app_commands.Choice(name="Stocks (STL+BLK)", value="stocks"),
+        app_commands.Choice(name="Assist/Turnover (AST/TO)", value="ast_to"),
     ])
-    async def leaderboard(self, interaction: discord.Interaction, stat: str = "ppg"):
+    async def leaderboard(self, interaction: discord.Interaction, stat: str = "ppg",
+                          season_name: Optional[str] = None):
         """View statistical leaderboards"""
-        # Get current season
-        season = get_active_season(interaction.guild_id)
+        if season_name:
+            season = get_season_by_name(interaction.guild_id, season_name.upper())
+        else:
+            # Get current season
+            season = get_active_season(interaction.guild_id)
         
         if not season:
             await interaction.response.send_message(
-                "❌ No active season.",
+                f"❌ Season **{season_name.upper()}** not found." if season_name else "❌ No active season.",
                 ephemeral=True
             )
             return
         
-        season_name = season['season_name']
+        await interaction.response.defer()
         
-        # Map stat to column
-        stat_map = {
-            "ppg": ("points", "PPG", "Points Per Game"),
-            "rpg": ("rebounds", "RPG", "Rebounds Per Game"),
-            "apg": ("assists", "APG", "Assists Per Game"),
-            "spg": ("steals", "SPG", "Steals Per Game"),
-            "bpg": ("blocks", "BPG", "Blocks Per Game"),
-        }
+        embed, view = await self.build_leaderboard_page(season, stat, 0)
+        if not embed:
+            await interaction.followup.send("📊 No stats recorded yet this season.")
+            return
         
-        column, abbrev, full_name = stat_map[stat]
+        await interaction.followup.send(embed=embed, view=view)
+    
+    async def build_leaderboard_page(self, season: dict, stat: str, page: int,
+                                     cursor: tuple = None, previous: bool = False) -> tuple:
+        """Build one leaderboard page and its Previous/Next buttons, (None, None) if empty"""
+        season_id = season['id']
         
-        # Get leaderboard
-        leaders = get_leaderboard(interaction.guild_id, column, 10)
+        # Advanced metrics come from the cached per-season analytics,
+        # already sorted in memory so a page is just a slice
+        if stat in METRICS:
+            metrics = await asyncio.to_thread(get_season_metrics, season_id)
+            leaders = metrics.leaders(stat, PAGE_SIZE + 1, offset=page * PAGE_SIZE)
+            has_next = len(leaders) > PAGE_SIZE
+            leaders = leaders[:PAGE_SIZE]
+            abbrev, full_name, _, _ = METRICS[stat]
+            lines = [
+                (player_id, f"**{format_metric(stat, value)}** ({games}G)")
+                for player_id, value, games in leaders
+            ]
+            first_cursor = last_cursor = ('', '')
+        else:
+            column, abbrev, full_name = LEADERBOARD_STATS[stat]
+            archive = get_archive(season_id)
+            if archive:
+                # Archived orderings are precomputed, so the page number is enough
+                leaders = archive.leaderboard(column, page * PAGE_SIZE, PAGE_SIZE + 1)
+                has_next = len(leaders) > PAGE_SIZE
+            else:
+                # One extra row going forward tells us whether there is a next page
+                limit = PAGE_SIZE if previous else PAGE_SIZE + 1
+                leaders = await asyncio.to_thread(
+                    get_leaderboard, season['guild_id'], season_id, column, limit, cursor, previous
+                )
+                has_next = previous or len(leaders) > PAGE_SIZE
+            leaders = leaders[:PAGE_SIZE]
+            lines = []
+            for leader in leaders:
+                games = leader['games_played']
+                total = leader[f'total_{column}']
+                avg = round(total / games, 1) if games > 0 else 0
+                lines.append((leader['player_id'], f"**{avg}** ({total} total, {games}G)"))
+            if leaders:
+                first_cursor = (leaders[0][f'total_{column}'], leaders[0]['player_id'])
+                last_cursor = (leaders[-1][f'total_{column}'], leaders[-1]['player_id'])
         
         if not leaders:
-            await interaction.response.send_message(
-                "📊 No stats recorded yet this season.",
-                ephemeral=True
-            )
-            return
+            return None, None
         
         embed = discord.Embed(
             title=f"🏆 {full_name} Leaders",
-            description=f"**{season_name}**",
+            description=f"**{season['season_name']}**",
             color=discord.Color.gold()
         )
         
         leaderboard_text = ""
         medals = ["🥇", "🥈", "🥉"]
         
-        for i, leader in enumerate(leaders):
-            games = leader['games_played']
-            total = leader[f'total_{column}']
-            avg = round(total / games, 1) if games > 0 else 0
-            player_id = leader['player_id']
-            
-            medal = medals[i] if i < 3 else f"`{i+1}.`"
-            leaderboard_text += f"{medal} <@{player_id}> - **{avg}** ({total} total, {games}G)\n"
+        for i, (player_id, text) in enumerate(lines):
+            rank = page * PAGE_SIZE + i
+            medal = medals[rank] if rank < 3 else f"`{rank+1}.`"
+            leaderboard_text += f"{medal} <@{player_id}> - {text}\n"
         
         embed.add_field(name=abbrev, value=leaderboard_text, inline=False)
+        embed.set_footer(text=f"Page {page + 1}")
+        
+        view = discord.ui.View(timeout=None)
+        view.add_item(LeaderboardPageButton('p', stat, page - 1, season_id, *first_cursor, disabled=page == 0))
+        view.add_item(LeaderboardPageButton('n', stat, page + 1, season_id, *last_cursor, disabled=not has_next))
+        return embed, view
+    
+    @app_commands.command(name="standings", description="View the current season standings")
+    async def standings(self, interaction: discord.Interaction):
+        """View conference standings for the active season"""
+        season = get_active_season(interaction.guild_id)
+        
+        if not season:
+            await interaction.response.send_message(
+                "❌ No active season.",
+                ephemeral=True
+            )
+            return
+        
+        rows = get_team_standings(interaction.guild_id, season['id'])
+        
+        if not rows:
+            await interaction.response.send_message(
+                "📊 No games recorded yet this season.",
+                ephemeral=True
+            )
+            return
+        
+        teams = {row['team_id']: row.get('teams') or {} for row in rows}
+        team_names = {tid: t.get('name') or t.get('team_name') or '' for tid, t in teams.items()}
+        grouped = group_by_conference(sort_standings(rows, team_names), teams)
+        
+        embed = discord.Embed(
+            title="🏆 Standings",
+            description=f"**{season['season_name']}**",
+            color=discord.Color.gold()
+        )
+        
+        conference_icons = {"Desert": "🏜️", "Plains": "🌾"}
+        for conference in CONFERENCES + [c for c in grouped if c not in CONFERENCES]:
+            conference_rows = grouped.get(conference)
+            if not conference_rows:
+                continue
+            
+            lines = []
+            for i, row in enumerate(conference_rows):
+                team = teams.get(row['team_id']) or {}
+                logo = team.get('team_logo_emoji')
+                name = team_names.get(row['team_id']) or 'Unknown'
+                record = f"{row['wins']}-{row['losses']}" + (f"-{row['ties']}" if row.get('ties') else "")
+                diff = row['points_for'] - row['points_against']
+                lines.append(
+                    f"`{i+1}.` {logo + ' ' if logo else ''}**{name}** {record} "
+                    f"(Conf {row['conference_wins']}-{row['conference_losses']}) "
+                    f"{'+' if diff > 0 else ''}{diff} • {format_streak(row['streak'])}"
+                )
+            
+            icon = conference_icons.get(conference, "🏀")
+            embed.add_field(
+                name=f"{icon} {conference} Conference",
+                value="\n".join(lines),
+                inline=False
+            )
+        
+        embed.set_footer(text="Tiebreakers: Win % • Conference record • Point differential")
+        
+        await interaction.response.send_message(embed=embed)
+    
+    @app_commands.command(name="h2h", description="View the head-to-head record between two teams")
+    @app_commands.describe(team1="First team", team2="Second team")
+    async def h2h(self, interaction: discord.Interaction,
+                  team1: discord.Role, team2: discord.Role):
+        """View this season's head-to-head record between two teams"""
+        season = get_active_season(interaction.guild_id)
+        
+        if not season:
+            await interaction.response.send_message(
+                "❌ No active season.",
+                ephemeral=True
+            )
+            return
+        
+        t1 = get_team_by_role(interaction.guild_id, team1.id)
+        t2 = get_team_by_role(interaction.guild_id, team2.id)
+        
+        if not t1 or not t2:
+            await interaction.response.send_message(
+                "❌ One or both teams are not registered.",
+                ephemeral=True
+            )
+            return
+        
+        if t1['id'] == t2['id']:
+            await interaction.response.send_message(
+                "❌ Pick two different teams.",
+                ephemeral=True
+            )
+            return
+        
+        t1_name = t1.get('name') or t1.get('team_name')
+        t2_name = t2.get('name') or t2.get('team_name')
+        
+        row = get_head_to_head(season['id'], t1['id'], t2['id'])
+        record = head_to_head_for(row, t1['id'])
+        
+        embed = discord.Embed(
+            title=f"⚔️ {t1_name} vs {t2_name}",
+            description=f"**{season['season_name']}** Head-to-Head",
+            color=team1.color if team1.color.value != 0 else discord.Color.blue()
+        )
+        
+        if not row:
+            embed.add_field(name="Record", value="These teams haven't played this season.", inline=False)
+            await interaction.response.send_message(embed=embed)
+            return
+        
+        ties_text = f" ({record['ties']} tie{'s' if record['ties'] != 1 else ''})" if record['ties'] else ""
+        embed.add_field(name=t1_name, value=f"**{record['wins']}** W", inline=True)
+        embed.add_field(name="vs", value="⚔️", inline=True)
+        embed.add_field(name=t2_name, value=f"**{record['losses']}** W", inline=True)
+        
+        # Recent meetings, newest first, scores oriented to team1
+        team1_is_a = pair_key(t1['id'], t2['id'])[0] == t1['id']
+        lines = []
+        for game in reversed(row.get('recent_games') or []):
+            t1_score, t2_score = (game['a_score'], game['b_score']) if team1_is_a else (game['b_score'], game['a_score'])
+            result = "W" if t1_score > t2_score else "L" if t2_score > t1_score else "T"
+            lines.append(f"`{result}` {t1_name} **{t1_score}** - **{t2_score}** {t2_name} (Game #{game['game_id']})")
+        
+        embed.add_field(
+            name=f"Recent Meetings{ties_text}",
+            value="\n".join(lines) if lines else "None",
+            inline=False
+        )
+        
+        # Current form for both teams from their rolling result buffers
+        form_lines = []
+        for team_data, name in ((t1, t1_name), (t2, t2_name)):
+            standing = get_team_standing(season['id'], team_data['id'])
+            if standing:
+                form_lines.append(
+                    f"**{name}:** {standing.get('last_results') or '-'} "
+                    f"(Streak {format_streak(standing['streak'])})"
+                )
+        if form_lines:
+            embed.add_field(name="📈 Form", value="\n".join(form_lines), inline=False)
         
         await interaction.response.send_message(embed=embed)
     
     @app_commands.command(name="gamehistory", description="View recent games")
-    @app_commands.describe(team="Filter by team (optional)")
+    @app_commands.describe(
+        team="Filter by team (optional)",
+        season_name="Season to view (leave empty for recent games)"
+    )
     async def gamehistory(self, interaction: discord.Interaction, 
-                         team: Optional[discord.Role] = None):
+                         team: Optional[discord.Role] = None,
+                         season_name: Optional[str] = None):
         """View recent game history"""
         team_id = None
         if team:
@@ -327,38 +966,261 @@ class StatsCommands(commands.Cog):
             if team_data:
                 team_id = team_data['id']
         
-        games = get_recent_games(interaction.guild_id, 10, team_id)
+        season = None
+        archive = None
+        if season_name:
+            season = get_season_by_name(interaction.guild_id, season_name.upper())
+            if not season:
+                await interaction.response.send_message(
+                    f"❌ Season **{season_name.upper()}** not found.",
+                    ephemeral=True
+                )
+                return
+            # Seasons without a snapshot are read from the live tables
+            archive = get_archive(season['id'])
         
-        if not games:
-            await interaction.response.send_message(
-                "📊 No games recorded yet.",
-                ephemeral=True
-            )
+        await interaction.response.defer()
+        
+        embed, view = await self.build_game_history_page(
+            interaction.guild_id, team_id, team.name if team_id else None, 0, archive=archive, season=season
+        )
+        if not embed:
+            await interaction.followup.send("📊 No games recorded yet.")
             return
         
+        await interaction.followup.send(embed=embed, view=view)
+    
+    async def build_game_history_page(self, guild_id: int, team_id, team_name: str, page: int,
+                                      cursor: tuple = None, previous: bool = False,
+                                      archive=None, season: dict = None) -> tuple:
+        """
+        Build one page of game history and its Previous/Next buttons, (None, None) if empty.
+        season limits the live query to one season; archive pages an archived one.
+        """
+        season_id = season['id'] if season else None
+        if archive:
+            games = archive.games(page * PAGE_SIZE, PAGE_SIZE + 1, team_id)
+            has_next = len(games) > PAGE_SIZE
+        else:
+            # One extra row going forward tells us whether there is a next page
+            limit = PAGE_SIZE if previous else PAGE_SIZE + 1
+            games = await asyncio.to_thread(get_recent_games, guild_id, limit, team_id, cursor, previous,
+                                            season_id)
+            has_next = previous or len(games) > PAGE_SIZE
+        games = games[:PAGE_SIZE]
+        
+        if not games:
+            return None, None
+        
         embed = discord.Embed(
             title="🏀 Recent Games",
             color=discord.Color.blue()
         )
         
+        if archive:
+            embed.title = f"🏀 {archive.season['season_name']} Games"
+        elif season:
+            embed.title = f"🏀 {season['season_name']} Games"
+        
+        # Team form comes from the standings row's rolling buffer, not a games scan
+        if team_id and not archive:
+            form_season = season or get_active_season(guild_id)
+            standing = get_team_standing(form_season['id'], team_id) if form_season else None
+            if standing:
+                embed.description = (
+                    f"**{team_name}** • {standing['wins']}-{standing['losses']} • "
+                    f"Streak {format_streak(standing['streak'])} • "
+                    f"Last {len(standing.get('last_results') or '')}: {standing.get('last_results') or '-'}"
+                )
+        
         for game in games:
             game_id = game['id']
             t1_name = game['team1']['team_name'] if game.get('team1') else 'Unknown'
             t2_name = game['team2']['team_name'] if game.get('team2') else 'Unknown'
             t1_score = game['team1_score']
             t2_score = game['team2_score']
-            season = game['seasons']['season_name'] if game.get('seasons') else 'Unknown'
+            game_season = game['seasons']['season_name'] if game.get('seasons') else 'Unknown'
             
             winner = "🏆" if t1_score > t2_score else ""
             loser = "🏆" if t2_score > t1_score else ""
             embed.add_field(
-                name=f"Game #{game_id} ({season})",
+                name=f"Game #{game_id} ({game_season})",
                 value=f"{winner}{t1_name} **{t1_score}** - **{t2_score}** {t2_name}{loser}",
                 inline=False
             )
         
-        await interaction.response.send_message(embed=embed)
+        embed.set_footer(text=f"Page {page + 1}")
+        
+        team_token = str(team_id) if team_id else ''
+        view = discord.ui.View(timeout=None)
+        if archive:
+            season_id = archive.season['id']
+            view.add_item(ArchivedGamesPageButton('p', season_id, team_token, page - 1, disabled=page == 0))
+            view.add_item(ArchivedGamesPageButton('n', season_id, team_token, page + 1, disabled=not has_next))
+            return embed, view
+        
+        season_token = str(season_id) if season_id else ''
+        view.add_item(GameHistoryPageButton(
+            'p', team_token, page - 1, encode_timestamp(games[0]['played_at']), str(games[0]['id']),
+            season_token, disabled=page == 0
+        ))
+        view.add_item(GameHistoryPageButton(
+            'n', team_token, page + 1, encode_timestamp(games[-1]['played_at']), str(games[-1]['id']),
+            season_token, disabled=not has_next
+        ))
+        return embed, view
+    
+    @app_commands.command(name="exportstats", description="Export a season's games and stats as a file")
+    @app_commands.default_permissions(administrator=True)
+    @app_commands.describe(
+        season_name="Season to export (leave empty for the active season)",
+        file_format="File format (default CSV)"
+    )
+    @app_commands.choices(file_format=[
+        app_commands.Choice(name="CSV", value="csv"),
+        app_commands.Choice(name="Parquet", value="parquet"),
+    ])
+    async def exportstats(self, interaction: discord.Interaction,
+                          season_name: Optional[str] = None,
+                          file_format: Optional[app_commands.Choice[str]] = None):
+        """Stream a season's games, game stats and season stats into a zip archive"""
+        fmt = file_format.value if file_format else 'csv'
+        
+        if season_name:
+            season = get_season_by_name(interaction.guild_id, season_name.upper())
+        else:
+            season = get_active_season(interaction.guild_id)
+        
+        if not season:
+            await interaction.response.send_message(
+                f"❌ Season **{season_name.upper()}** not found." if season_name else "❌ No active season.",
+                ephemeral=True
+            )
+            return
+        
+        if fmt == 'parquet' and not parquet_available():
+            await interaction.response.send_message(
+                "❌ Parquet export is not available on this bot (pyarrow is not installed).",
+                ephemeral=True
+            )
+            return
+        
+        await interaction.response.defer(ephemeral=True)
+        
+        try:
+            path, stats = await asyncio.to_thread(export_season, season['id'], fmt)
+        except Exception as e:
+            print(f"Error exporting season {season['id']}: {e}")
+            await interaction.followup.send(f"❌ Export failed: {e}", ephemeral=True)
+            return
+        
+        try:
+            tables = "\n".join(f"**{table}:** {rows:,} rows" for table, rows in stats['tables'].items())
+            summary = (
+                f"✅ Exported **{season['season_name']}** ({fmt.upper()})\n{tables}\n"
+                f"{stats['rows']:,} rows in {stats['seconds']:.2f}s "
+                f"({stats['rows_per_second']:,.0f} rows/s)"
+            )
+            
+            if stats['bytes'] > interaction.guild.filesize_limit:
+                await interaction.followup.send(
+                    f"{summary}\n\n❌ The file is too large to attach ({stats['bytes'] / 1024 / 1024:.1f} MB). "
+                    f"Download it from the API export endpoint instead.",
+                    ephemeral=True
+                )
+                return
+            
+            filename = f"{season['season_name']}_stats_{fmt}.zip"
+            await interaction.followup.send(
+                summary,
+                file=discord.File(path, filename=filename),
+                ephemeral=True
+            )
+        finally:
+            os.remove(path)
+
+    
+    @app_commands.command(name="importstats", description="Import games and box scores from a CSV file")
+    @app_commands.default_permissions(administrator=True)
+    @app_commands.describe(
+        file="CSV with columns game, played_at, team1, team2, team1_score, team2_score, player, team, points, rebounds, assists, steals, blocks, turnovers",
+        season_name="Season to import into (leave empty for the active season)",
+        dry_run="Only validate the file, don't write anything"
+    )
+    async def importstats(self, interaction: discord.Interaction,
+                          file: discord.Attachment,
+                          season_name: Optional[str] = None,
+                          dry_run: bool = False):
+        """Validate a box-score CSV in full, then write it in batches"""
+        if season_name:
+            season = get_season_by_name(interaction.guild_id, season_name.upper())
+        else:
+            season = get_active_season(interaction.guild_id)
+        
+        if not season:
+            await interaction.response.send_message(
+                f"❌ Season **{season_name.upper()}** not found." if season_name else "❌ No active season.",
+                ephemeral=True
+            )
+            return
+        
+        if not file.filename.lower().endswith('.csv'):
+            await interaction.response.send_message(
+                "❌ Please attach a .csv file.",
+                ephemeral=True
+            )
+            return
+        
+        await interaction.response.defer(ephemeral=True)
+        
+        try:
+            text = (await file.read()).decode('utf-8')
+        except UnicodeDecodeError:
+            await interaction.followup.send("❌ The file must be UTF-8 encoded.", ephemeral=True)
+            return
+        
+        # Directories are loaded once so every row resolves from memory
+        teams = build_team_directory(await asyncio.to_thread(get_all_teams, interaction.guild_id))
+        users = await asyncio.to_thread(get_user_directory)
+        players = build_player_directory(users, interaction.guild.members)
+        
+        games, errors = parse_box_scores(text, teams, players)
+        if errors:
+            await interaction.followup.send(
+                f"❌ {len(errors)} problem(s) found, nothing was imported:\n" +
+                "\n".join(f"• {error}" for error in errors)[:1800],
+                ephemeral=True
+            )
+            return
+        
+        line_count = sum(len(game['lines']) for game in games)
+        if dry_run:
+            await interaction.followup.send(
+                f"✅ {len(games)} games and {line_count} player lines are valid for "
+                f"**{season['season_name']}** (dry run, nothing written).",
+                ephemeral=True
+            )
+            return
+        
+        try:
+            summary = await asyncio.to_thread(
+                import_box_scores, interaction.guild_id, season['id'], games, interaction.user.id
+            )
+        except Exception as e:
+            print(f"Error importing stats for season {season['id']}: {e}")
+            await interaction.followup.send(f"❌ Import failed: {e}", ephemeral=True)
+            return
+        
+        skipped = f" Skipped {summary['skipped']} games already imported." if summary['skipped'] else ""
+        await interaction.followup.send(
+            f"✅ Imported **{summary['games']}** games and **{summary['lines']}** player lines into "
+            f"**{season['season_name']}**. Season stats rebuilt for {summary['players']} players "
+            f"and standings for {summary['teams']} teams.{skipped}",
+            ephemeral=True
+        )
 
 
 async def setup(bot):
+    # Pagination buttons are routed by custom_id, so they survive restarts
+    bot.add_dynamic_items(LeaderboardPageButton, GameHistoryPageButton, ArchivedGamesPageButton)
     await bot.add_cog(StatsCommands(bot))
@@ -6,9 +6,16 @@ This allows both the Discord bot and website to share the same data.
 """
 
 import os
+import time
 from dotenv import load_dotenv
 from supabase import create_client, Client
 from datetime import datetime
+from utils.standings import (
+    new_standings_row, apply_game_result,
+    pair_key, new_head_to_head_row, apply_head_to_head_result
+)
+from utils.archive import archive_exists, discard_archive
+from utils.mc_roster import apply_minecraft_link, apply_roster_move, discord_id_from_user
 
 load_dotenv()
 
@@ -133,6 +140,53 @@ def update_server_config(guild_id: int, **kwargs) -> bool:
     return len(result.data) > 0 if result.data else False
 
 
+def get_mc_status_configs() -> list:
+    """Get server_config rows for every guild with a Minecraft status embed"""
+    client = get_supabase()
+    result = client.table('server_config').select(
+        'guild_id, mc_status_channel_id, mc_status_message_id, mc_server_address, mc_poll_min_seconds, mc_poll_max_seconds'
+    ).not_.is_('mc_status_channel_id', 'null').not_.is_('mc_status_message_id', 'null').execute()
+    return result.data or []
+
+def insert_mc_activity(rows: list, batch_size: int = 500) -> int:
+    """Bulk insert Minecraft status samples, returns the row count written"""
+    client = get_supabase()
+    
+    written = 0
+    for start in range(0, len(rows), batch_size):
+        result = client.table('mc_activity').insert(rows[start:start + batch_size]).execute()
+        written += len(result.data or [])
+    return written
+
+def get_mc_activity(server_address: str, since: str, page_size: int = 1000) -> list:
+    """
+    Get a server's status samples since an ISO timestamp, oldest first.
+    Pages seek on (sampled_at, id), so every page costs the same and
+    samples sharing a timestamp are neither skipped nor repeated.
+    """
+    client = get_supabase()
+    
+    rows = []
+    last = None
+    while True:
+        query = client.table('mc_activity').select('id, sampled_at, players_online, players').eq(
+            'server_address', server_address
+        )
+        if last is None:
+            query = query.gte('sampled_at', since)
+        else:
+            # Timestamps contain reserved characters, so they are quoted
+            query = query.or_(f'sampled_at.gt."{last["sampled_at"]}",'
+                              f'and(sampled_at.eq."{last["sampled_at"]}",id.gt.{last["id"]})')
+        result = query.order('sampled_at').order('id').limit(page_size).execute()
+        page = result.data or []
+        rows.extend(page)
+        if len(page) < page_size:
+            break
+        last = page[-1]
+    
+    return rows
+
 # ============================================
 # Team Functions
 # ============================================
@@ -159,6 +213,16 @@ def get_all_teams(guild_id: int) -> list:
     result = client.table('teams').select('*').eq('guild_id', str(guild_id)).execute()
     return result.data or []
 
+def get_teams_for_guilds(guild_ids: list) -> list:
+    """Get id, guild and display columns of every team in the given guilds"""
+    if not guild_ids:
+        return []
+    client = get_supabase()
+    result = client.table('teams').select(
+        'id, guild_id, name, team_name, team_logo_emoji'
+    ).in_('guild_id', [str(g) for g in guild_ids]).execute()
+    return result.data or []
+
 def create_team(guild_id: int, team_name: str, team_role_id: int, conference: str) -> dict:
     """Create a new team"""
     client = get_supabase()
@@ -230,12 +294,15 @@ def update_user_team(discord_id: int, team_id: str) -> bool:
         'updated_at': datetime.utcnow().isoformat()
     }).eq('id', f'discord-{discord_id}').execute()
     if result.data and len(result.data) > 0:
+        apply_roster_move(discord_id, team_id)
         return True
     # Fallback to raw ID
     result = client.table('users').update({
         'team_id': team_id,
         'updated_at': datetime.utcnow().isoformat()
     }).eq('id', str(discord_id)).execute()
+    if result.data:
+        apply_roster_move(discord_id, team_id)
     return len(result.data) > 0 if result.data else False
 
 def add_player_to_team(guild_id: int, user_id: int, team_id: str) -> bool:
@@ -261,12 +328,15 @@ def remove_player_from_team(guild_id: int, user_id: int, team_id: str = None) ->
         'updated_at': datetime.utcnow().isoformat()
     }).eq('id', f'discord-{user_id}').execute()
     if result.data and len(result.data) > 0:
+        apply_roster_move(user_id, None)
         return True
     # Fallback to raw ID
     result = client.table('users').update({
         'team_id': None,
         'updated_at': datetime.utcnow().isoformat()
     }).eq('id', str(user_id)).execute()
+    if result.data:
+        apply_roster_move(user_id, None)
     
     return len(result.data) > 0 if result.data else False
 
@@ -278,6 +348,49 @@ def get_team_roster(team_id: str) -> list:
     result = client.table('users').select('id').eq('team_id', team_id).execute()
     return [row['id'] for row in result.data] if result.data else []
 
+def get_users_by_discord_ids(discord_ids: list) -> list:
+    """Get id and team_id of the website users for many Discord IDs at once"""
+    if not discord_ids:
+        return []
+    client = get_supabase()
+    # Match both formats: with and without 'discord-' prefix
+    ids = [f'discord-{d}' for d in discord_ids] + [str(d) for d in discord_ids]
+    result = client.table('users').select('id, team_id').in_('id', ids).execute()
+    return result.data or []
+
+def get_team_rosters(team_ids: list, page_size: int = 1000) -> list:
+    """Get id and team_id of every user on any of the given teams"""
+    if not team_ids:
+        return []
+    client = get_supabase()
+    
+    rows = []
+    start = 0
+    while True:
+        result = client.table('users').select('id, team_id').in_(
+            'team_id', [str(t) for t in team_ids]
+        ).order('id').range(start, start + page_size - 1).execute()
+        page = result.data or []
+        rows.extend(page)
+        if len(page) < page_size:
+            break
+        start += page_size
+    
+    return rows
+
+def set_users_team(user_ids: list, team_id: str = None) -> int:
+    """Move many users (by users.id) to one team, or off their teams, in one update"""
+    if not user_ids:
+        return 0
+    client = get_supabase()
+    result = client.table('users').update({
+        'team_id': team_id,
+        'updated_at': datetime.utcnow().isoformat()
+    }).in_('id', list(user_ids)).execute()
+    for row in result.data or []:
+        apply_roster_move(discord_id_from_user(row['id']), team_id)
+    return len(result.data or [])
+
 def get_roster_count(team_id: str) -> int:
     """Get roster count for a team"""
     roster = get_team_roster(team_id)
@@ -462,6 +575,22 @@ def get_active_season(guild_id: int) -> dict:
         return result.data[0]
     return None
 
+def get_season_by_id(season_id) -> dict:
+    """Get a season by ID"""
+    client = get_supabase()
+    result = client.table('seasons').select('*').eq('id', season_id).execute()
+    if result.data and len(result.data) > 0:
+        return result.data[0]
+    return None
+
+def get_season_by_name(guild_id: int, season_name: str) -> dict:
+    """Get a season by name"""
+    client = get_supabase()
+    result = client.table('seasons').select('*').eq('guild_id', str(guild_id)).eq('season_name', season_name).execute()
+    if result.data and len(result.data) > 0:
+        return result.data[0]
+    return None
+
 def create_or_activate_season(guild_id: int, season_name: str) -> dict:
     """Create or activate a season"""
     client = get_supabase()
@@ -473,6 +602,8 @@ def create_or_activate_season(guild_id: int, season_name: str) -> dict:
     existing = client.table('seasons').select('*').eq('guild_id', str(guild_id)).eq('season_name', season_name).execute()
     
     if existing.data and len(existing.data) > 0:
+        # Reopened seasons are live again, so their snapshot is dropped
+        discard_archive(existing.data[0]['id'])
         result = client.table('seasons').update({'is_active': True}).eq('id', existing.data[0]['id']).execute()
         return result.data[0] if result.data else None
     else:
@@ -506,8 +637,28 @@ def record_game(guild_id: int, season_id: int, team1_id: int, team2_id: int,
         'played_at': datetime.utcnow().isoformat(),
         'recorded_by': str(recorded_by)
     }).execute()
-    
-    return result.data[0]['id'] if result.data else None
+
+    if not result.data:
+        return None
+
+    game_id = result.data[0]['id']
+
+    # Keep the season standings and matchup index current without rescanning games
+    try:
+        update_team_standings(guild_id, season_id, team1_id, team2_id,
+                              team1_score, team2_score, game_id)
+        update_head_to_head(guild_id, season_id, team1_id, team2_id,
+                            team1_score, team2_score, game_id, result.data[0].get('played_at'))
+    except Exception as e:
+        # A half-applied game would leave the standings wrong for good, so recount them
+        print(f"Error updating standings for game {game_id}, rebuilding: {e}")
+        try:
+            rebuild_team_standings(guild_id, season_id)
+        except Exception as e:
+            print(f"Error rebuilding standings for season {season_id}: {e}")
+
+    bump_season_version(season_id)
+    return game_id
 
 def add_player_game_stats(game_id: int, player_id: int, team_id: int,
                           points: int, rebounds: int, assists: int,
@@ -561,6 +712,7 @@ def update_player_season_stats(player_id: int, season_id: int, guild_id: int,
             'total_turnovers': turnovers
         }).execute()
     
+    bump_season_version(season_id)
     return True
 
 def get_player_season_stats(player_id: int, guild_id: int, season_id: int = None) -> dict:
@@ -580,23 +732,497 @@ def get_player_season_stats(player_id: int, guild_id: int, season_id: int = None
         return result.data[0]
     return None
 
-def get_leaderboard(guild_id: int, season_id: int, stat: str, limit: int = 10) -> list:
-    """Get stat leaderboard"""
+def get_player_game_log(player_id: int, season_id: int, limit: int = 20) -> list:
+    """Get a player's most recent stat lines for a season, oldest first"""
+    client = get_supabase()
+    result = client.table('player_game_stats').select(
+        'game_id, points, rebounds, assists, steals, blocks, turnovers, games!inner(season_id)'
+    ).eq('player_id', str(player_id)).eq('games.season_id', season_id).order('game_id', desc=True).limit(limit).execute()
+    return (result.data or [])[::-1]
+
+def get_leaderboard(guild_id: int, season_id: int, stat: str, limit: int = 10,
+                    cursor: tuple = None, previous: bool = False) -> list:
+    """
+    Get one page of a stat leaderboard, ordered by (total desc, player_id).
+    cursor is the (total, player_id) of the row to page from: the page after
+    it, or the page before it when previous is set. Seeking on the sort key
+    keeps every page as cheap as the first.
+    """
     client = get_supabase()
     
     stat_column = f'total_{stat}' if stat != 'ppg' else 'total_points'
     
-    result = client.table('player_season_stats').select('*').eq('guild_id', str(guild_id)).eq('season_id', season_id).gt('games_played', 0).order(stat_column, desc=True).limit(limit).execute()
+    query = client.table('player_season_stats').select('*').eq('guild_id', str(guild_id)).eq('season_id', season_id).gt('games_played', 0)
+    
+    if cursor:
+        value, player_id = cursor
+        if previous:
+            query = query.or_(f'{stat_column}.gt.{value},and({stat_column}.eq.{value},player_id.lt.{player_id})')
+        else:
+            query = query.or_(f'{stat_column}.lt.{value},and({stat_column}.eq.{value},player_id.gt.{player_id})')
+    
+    # Walk backwards for the previous page, then flip back into display order
+    result = query.order(stat_column, desc=not previous).order('player_id', desc=previous).limit(limit).execute()
+    rows = result.data or []
+    return rows[::-1] if previous else rows
+
+def get_season_player_stats(season_id: int, page_size: int = 1000) -> list:
+    """Get every player_season_stats row for a season (paged past the API row limit)"""
+    client = get_supabase()
+    
+    rows = []
+    start = 0
+    while True:
+        result = client.table('player_season_stats').select('*').eq('season_id', season_id).order('id').range(start, start + page_size - 1).execute()
+        page = result.data or []
+        rows.extend(page)
+        if len(page) < page_size:
+            break
+        start += page_size
+    
+    return rows
+
+def get_season_game_stats(season_id: int, page_size: int = 1000) -> list:
+    """Get every player_game_stats row for a season (paged past the API row limit)"""
+    client = get_supabase()
+    
+    rows = []
+    start = 0
+    while True:
+        result = client.table('player_game_stats').select(
+            'game_id, player_id, team_id, points, rebounds, assists, steals, blocks, turnovers, games!inner(season_id)'
+        ).eq('games.season_id', season_id).order('id').range(start, start + page_size - 1).execute()
+        page = result.data or []
+        rows.extend(page)
+        if len(page) < page_size:
+            break
+        start += page_size
+    
+    return rows
+
+
+def iter_season_rows(table: str, season_id, columns: list, page_size: int = 500):
+    """
+    Yield a season's rows from games, player_game_stats or player_season_stats
+    one page at a time, seeking on id so every page costs the same.
+    """
+    client = get_supabase()
+    
+    select = ', '.join(columns)
+    if table == 'player_game_stats':
+        # No season column on per-game lines - filter through the games join
+        select += ', games!inner(season_id)'
+    
+    last_id = None
+    while True:
+        query = client.table(table).select(select)
+        if table == 'player_game_stats':
+            query = query.eq('games.season_id', season_id)
+        else:
+            query = query.eq('season_id', season_id)
+        if last_id is not None:
+            query = query.gt('id', last_id)
+        
+        result = query.order('id').limit(page_size).execute()
+        page = result.data or []
+        if not page:
+            break
+        for row in page:
+            row.pop('games', None)
+        yield page
+        if len(page) < page_size:
+            break
+        last_id = page[-1]['id']
+
+
+def get_season_game_notes(season_id, prefix: str, page_size: int = 1000) -> list:
+    """Get the notes of every game in a season whose notes start with prefix"""
+    client = get_supabase()
+    
+    notes = []
+    last_id = None
+    while True:
+        query = client.table('games').select('id, notes').eq('season_id', season_id).like('notes', f'{prefix}%')
+        if last_id is not None:
+            query = query.gt('id', last_id)
+        page = query.order('id').limit(page_size).execute().data or []
+        notes.extend(row['notes'] for row in page)
+        if len(page) < page_size:
+            break
+        last_id = page[-1]['id']
+    return notes
+
+def insert_games_bulk(games: list, batch_size: int = 200) -> list:
+    """
+    Insert game rows in batches, returns the inserted rows in input order.
+    If a batch fails, the batches already inserted are deleted again.
+    """
+    client = get_supabase()
+    
+    inserted = []
+    try:
+        for start in range(0, len(games), batch_size):
+            result = client.table('games').insert(games[start:start + batch_size]).execute()
+            inserted.extend(result.data or [])
+    except Exception:
+        delete_games([row['id'] for row in inserted])
+        raise
+    return inserted
+
+def delete_games(game_ids: list, batch_size: int = 200):
+    """Delete games and their player lines"""
+    client = get_supabase()
+    
+    for start in range(0, len(game_ids), batch_size):
+        batch = game_ids[start:start + batch_size]
+        client.table('player_game_stats').delete().in_('game_id', batch).execute()
+        client.table('games').delete().in_('id', batch).execute()
+
+def insert_player_game_stats_bulk(lines: list, batch_size: int = 500) -> int:
+    """Upsert player_game_stats rows in batches, returns the row count written"""
+    client = get_supabase()
+    
+    written = 0
+    for start in range(0, len(lines), batch_size):
+        result = client.table('player_game_stats').upsert(
+            lines[start:start + batch_size], on_conflict='game_id,player_id'
+        ).execute()
+        written += len(result.data or [])
+    return written
+
+def rebuild_player_season_stats(guild_id: int, season_id: int, batch_size: int = 500) -> int:
+    """Recompute a season's player_season_stats from its player_game_stats, returns player count"""
+    client = get_supabase()
+    
+    totals = {}
+    for line in get_season_game_stats(season_id):
+        player_id = str(line['player_id'])
+        row = totals.setdefault(player_id, {
+            'player_id': player_id,
+            'season_id': season_id,
+            'guild_id': str(guild_id),
+            'games_played': 0,
+            'total_points': 0,
+            'total_rebounds': 0,
+            'total_assists': 0,
+            'total_steals': 0,
+            'total_blocks': 0,
+            'total_turnovers': 0
+        })
+        row['games_played'] += 1
+        for stat in ('points', 'rebounds', 'assists', 'steals', 'blocks', 'turnovers'):
+            row[f'total_{stat}'] += line.get(stat) or 0
+    
+    # Upsert over the old rows, then drop players with no lines left, so
+    # readers never see the season empty and a failed write loses nothing
+    rows = list(totals.values())
+    for start in range(0, len(rows), batch_size):
+        client.table('player_season_stats').upsert(
+            rows[start:start + batch_size], on_conflict='player_id,season_id'
+        ).execute()
+    
+    stale = [row['id'] for row in get_season_player_stats(season_id) if str(row['player_id']) not in totals]
+    for start in range(0, len(stale), batch_size):
+        client.table('player_season_stats').delete().in_('id', stale[start:start + batch_size]).execute()
+    
+    bump_season_version(season_id)
+    return len(rows)
+
+def get_rostered_users(page_size: int = 1000) -> list:
+    """Get id, team_id and minecraft_username for every website user on a team"""
+    client = get_supabase()
+    
+    rows = []
+    start = 0
+    while True:
+        result = client.table('users').select(
+            'id, team_id, minecraft_username'
+        ).not_.is_('team_id', 'null').order('id').range(start, start + page_size - 1).execute()
+        page = result.data or []
+        rows.extend(page)
+        if len(page) < page_size:
+            break
+        start += page_size
+    
+    return rows
+
+def get_user_directory(page_size: int = 1000) -> list:
+    """Get id and name columns for every website user (for resolving players by name)"""
+    client = get_supabase()
+    
+    rows = []
+    start = 0
+    while True:
+        result = client.table('users').select(
+            'id, username, display_name, minecraft_username'
+        ).order('id').range(start, start + page_size - 1).execute()
+        page = result.data or []
+        rows.extend(page)
+        if len(page) < page_size:
+            break
+        start += page_size
+    
+    return rows
+
+
+# ============================================
+# Season Versions
+# seasons.stats_version is bumped by database triggers on every
+# games / player stats write, whoever makes it (the bot, the CLI
+# importer, the website), so in-memory caches keyed by
+# (season, version) know when to rebuild
+# ============================================
+
+# Seconds a version read from the database is reused
+SEASON_VERSION_TTL = 30
+
+_season_versions = {}  # season_id -> (version, time.monotonic() it was read)
+
+def get_season_version(season_id) -> int:
+    """Get the current stats version for a season (read at most every SEASON_VERSION_TTL seconds)"""
+    key = str(season_id)
+    cached = _season_versions.get(key)
+    if cached and time.monotonic() - cached[1] < SEASON_VERSION_TTL:
+        return cached[0]
+
+    try:
+        client = get_supabase()
+        result = client.table('seasons').select('stats_version').eq('id', season_id).execute()
+        version = (result.data[0].get('stats_version') or 0) if result.data else 0
+    except Exception as e:
+        print(f"Error reading stats version for season {season_id}: {e}")
+        return cached[0] if cached else 0
+
+    _season_versions[key] = (version, time.monotonic())
+    return version
+
+def bump_season_version(season_id):
+    """After the bot writes a season's stats: re-read its version on next use, so the write shows at once"""
+    # A frozen snapshot no longer matches once the season is written to
+    if archive_exists(season_id):
+        discard_archive(season_id)
+    _season_versions.pop(str(season_id), None)
+
+
+# ============================================
+# Park Stats Functions
+# Long-form copy of the game server's MySQL players table,
+# written by the park stats sync worker
+# ============================================
+
+def get_park_stat_hashes(page_size: int = 1000) -> dict:
+    """Get the stored row hash of every park_stats row, keyed by (player_uuid, season)"""
+    client = get_supabase()
+    
+    hashes = {}
+    start = 0
+    while True:
+        result = client.table('park_stats').select('player_uuid, season, row_hash').order('id').range(start, start + page_size - 1).execute()
+        page = result.data or []
+        for row in page:
+            hashes[(row['player_uuid'], int(row['season']))] = row['row_hash']
+        if len(page) < page_size:
+            break
+        start += page_size
+    
+    return hashes
+
+def get_park_stats(page_size: int = 1000) -> list:
+    """Get every park_stats row (for the in-memory park stats snapshot)"""
+    client = get_supabase()
+    
+    rows = []
+    start = 0
+    while True:
+        result = client.table('park_stats').select('*').order('id').range(start, start + page_size - 1).execute()
+        page = result.data or []
+        rows.extend(page)
+        if len(page) < page_size:
+            break
+        start += page_size
     
+    return rows
+
+def upsert_park_stats(rows: list, batch_size: int = 500) -> int:
+    """Upsert park_stats rows in batches, returns the row count written"""
+    client = get_supabase()
+    
+    written = 0
+    for start in range(0, len(rows), batch_size):
+        result = client.table('park_stats').upsert(
+            rows[start:start + batch_size], on_conflict='player_uuid,season'
+        ).execute()
+        written += len(result.data or [])
+    return written
+
+def delete_park_stats(keys: list, batch_size: int = 500) -> int:
+    """Delete park_stats rows by (player_uuid, season), returns the row count deleted"""
+    client = get_supabase()
+    
+    by_season = {}
+    for player_uuid, season in keys:
+        by_season.setdefault(season, []).append(player_uuid)
+    
+    deleted = 0
+    for season, uuids in by_season.items():
+        for start in range(0, len(uuids), batch_size):
+            result = client.table('park_stats').delete().eq('season', season).in_(
+                'player_uuid', uuids[start:start + batch_size]
+            ).execute()
+            deleted += len(result.data or [])
+    return deleted
+
+
+# ============================================
+# Standings Functions
+# One row per (season, team) and per (season, team pair),
+# updated as games are recorded
+# ============================================
+
+def update_team_standings(guild_id: int, season_id: int, team1_id: int, team2_id: int,
+                          team1_score: int, team2_score: int, game_id: int = None) -> bool:
+    """Apply a single game result to both teams' season standings"""
+    client = get_supabase()
+
+    teams = client.table('teams').select('id, conference').in_('id', [team1_id, team2_id]).execute()
+    conferences = {str(t['id']): t.get('conference') for t in (teams.data or [])}
+    conference_game = (conferences.get(str(team1_id)) is not None and
+                       conferences.get(str(team1_id)) == conferences.get(str(team2_id)))
+
+    # The database adds the result to the stored counters (wins = wins + 1, ...)
+    # in one statement, so concurrent writers can't overwrite each other's games
+    result = client.rpc('record_standings_result', {
+        'p_guild_id': str(guild_id),
+        'p_season_id': season_id,
+        'p_team1_id': team1_id,
+        'p_team2_id': team2_id,
+        'p_team1_score': team1_score,
+        'p_team2_score': team2_score,
+        'p_conference_game': conference_game,
+        'p_game_id': game_id
+    }).execute()
+    return len(result.data) > 0 if result.data else False
+
+def rebuild_team_standings(guild_id: int, season_id: int, page_size: int = 1000) -> int:
+    """
+    Recompute a season's standings and head-to-head rows from its games
+    (backfill / repair), returns team count. The rows are overwritten with
+    the recount, so a game recorded while it runs can be missed until the
+    next rebuild.
+    """
+    client = get_supabase()
+
+    teams = get_all_teams(guild_id)
+    conferences = {str(t['id']): t.get('conference') for t in teams}
+
+    games = []
+    start = 0
+    while True:
+        result = client.table('games').select(
+            'id, team1_id, team2_id, team1_score, team2_score, played_at'
+        ).eq('season_id', season_id).order('played_at').order('id').range(start, start + page_size - 1).execute()
+        page = result.data or []
+        games.extend(page)
+        if len(page) < page_size:
+            break
+        start += page_size
+
+    rows = {}
+    matchups = {}
+    for game in games:
+        t1, t2 = game['team1_id'], game['team2_id']
+        if t1 is None or t2 is None:
+            continue
+        conference_game = (conferences.get(str(t1)) is not None and
+                           conferences.get(str(t1)) == conferences.get(str(t2)))
+        row1 = rows.setdefault(str(t1), new_standings_row(guild_id, season_id, t1))
+        row2 = rows.setdefault(str(t2), new_standings_row(guild_id, season_id, t2))
+        apply_game_result(row1, game['team1_score'], game['team2_score'], conference_game, game['id'])
+        apply_game_result(row2, game['team2_score'], game['team1_score'], conference_game, game['id'])
+
+        key = tuple(str(t) for t in pair_key(t1, t2))
+        matchup = matchups.setdefault(key, new_head_to_head_row(guild_id, season_id, t1, t2))
+        apply_head_to_head_result(matchup, t1, t2, game['team1_score'], game['team2_score'],
+                                  game['id'], game.get('played_at'))
+
+    now = datetime.utcnow().isoformat()
+    for row in list(rows.values()) + list(matchups.values()):
+        row['updated_at'] = now
+
+    # Upsert over the old rows, then drop the ones no game backs any more,
+    # so readers never see the season without standings
+    if rows:
+        client.table('team_season_standings').upsert(list(rows.values()), on_conflict='season_id,team_id').execute()
+    if matchups:
+        client.table('head_to_head').upsert(list(matchups.values()), on_conflict='season_id,team_a_id,team_b_id').execute()
+
+    existing = client.table('team_season_standings').select('id, team_id').eq('season_id', season_id).execute()
+    stale = [r['id'] for r in existing.data or [] if str(r['team_id']) not in rows]
+    if stale:
+        client.table('team_season_standings').delete().in_('id', stale).execute()
+
+    existing = client.table('head_to_head').select('id, team_a_id, team_b_id').eq('season_id', season_id).execute()
+    stale = [r['id'] for r in existing.data or [] if (str(r['team_a_id']), str(r['team_b_id'])) not in matchups]
+    if stale:
+        client.table('head_to_head').delete().in_('id', stale).execute()
+
+    return len(rows)
+
+def get_team_standings(guild_id: int, season_id: int) -> list:
+    """Get standings rows for a season, joined with team info"""
+    client = get_supabase()
+    result = client.table('team_season_standings').select('*, teams(*)').eq('guild_id', str(guild_id)).eq('season_id', season_id).execute()
     return result.data or []
 
+def get_team_standing(season_id: int, team_id) -> dict:
+    """Get one team's standings row (record, streak, last results)"""
+    client = get_supabase()
+    result = client.table('team_season_standings').select('*').eq('season_id', season_id).eq('team_id', team_id).execute()
+    if result.data and len(result.data) > 0:
+        return result.data[0]
+    return None
+
+def update_head_to_head(guild_id: int, season_id: int, team1_id: int, team2_id: int,
+                        team1_score: int, team2_score: int, game_id: int = None,
+                        played_at: str = None) -> bool:
+    """Apply a single game result to the pair's head-to-head row"""
+    client = get_supabase()
+
+    team_a_id, team_b_id = pair_key(team1_id, team2_id)
+    if str(team1_id) == str(team_a_id):
+        a_score, b_score = team1_score, team2_score
+    else:
+        a_score, b_score = team2_score, team1_score
+
+    # Counted in place by the database, like the standings
+    result = client.rpc('record_head_to_head_result', {
+        'p_guild_id': str(guild_id),
+        'p_season_id': season_id,
+        'p_team_a_id': team_a_id,
+        'p_team_b_id': team_b_id,
+        'p_a_score': a_score,
+        'p_b_score': b_score,
+        'p_game_id': game_id,
+        'p_played_at': played_at
+    }).execute()
+    return len(result.data) > 0 if result.data else False
+
+def get_head_to_head(season_id: int, team1_id, team2_id) -> dict:
+    """Get the head-to-head row for a team pair (either order)"""
+    client = get_supabase()
+    team_a_id, team_b_id = pair_key(team1_id, team2_id)
+    result = client.table('head_to_head').select('*').eq('season_id', season_id).eq('team_a_id', team_a_id).eq('team_b_id', team_b_id).execute()
+    if result.data and len(result.data) > 0:
+        return result.data[0]
+    return None
+
 
 # ============================================
 # Minecraft Link Functions
 # ============================================
 
-def link_minecraft(guild_id: int, user_id: int, minecraft_username: str) -> bool:
-    """Link a Discord user to their Minecraft username"""
+def link_minecraft(guild_id: int, user_id: int, minecraft_username: str, minecraft_uuid: str = None) -> bool:
+    """Link a Discord user to their Minecraft username and UUID"""
     client = get_supabase()
     
     # Check if link already exists
@@ -606,6 +1232,7 @@ def link_minecraft(guild_id: int, user_id: int, minecraft_username: str) -> bool
         # Update existing
         result = client.table('minecraft_links').update({
             'minecraft_username': minecraft_username,
+            'minecraft_uuid': minecraft_uuid,
             'updated_at': datetime.utcnow().isoformat()
         }).eq('guild_id', str(guild_id)).eq('user_id', str(user_id)).execute()
     else:
@@ -613,33 +1240,78 @@ def link_minecraft(guild_id: int, user_id: int, minecraft_username: str) -> bool
         result = client.table('minecraft_links').insert({
             'guild_id': str(guild_id),
             'user_id': str(user_id),
-            'minecraft_username': minecraft_username
+            'minecraft_username': minecraft_username,
+            'minecraft_uuid': minecraft_uuid
         }).execute()
     
+    if result.data:
+        apply_minecraft_link(guild_id, user_id, minecraft_username)
     return len(result.data) > 0 if result.data else False
 
+def get_minecraft_links(guild_ids: list, page_size: int = 1000) -> list:
+    """Get every Minecraft link in the given guilds"""
+    if not guild_ids:
+        return []
+    client = get_supabase()
+    
+    rows = []
+    start = 0
+    while True:
+        result = client.table('minecraft_links').select(
+            'guild_id, user_id, minecraft_username, minecraft_uuid'
+        ).in_('guild_id', [str(g) for g in guild_ids]).order('id').range(start, start + page_size - 1).execute()
+        page = result.data or []
+        rows.extend(page)
+        if len(page) < page_size:
+            break
+        start += page_size
+    
+    return rows
+
 def get_minecraft_link(guild_id: int, user_id: int) -> str:
     """Get a user's linked Minecraft username"""
+    link = get_minecraft_identity(guild_id, user_id)
+    return link['minecraft_username'] if link else None
+
+def get_minecraft_identity(guild_id: int, user_id: int) -> dict:
+    """Get a user's linked Minecraft username and UUID"""
     client = get_supabase()
-    result = client.table('minecraft_links').select('minecraft_username').eq('guild_id', str(guild_id)).eq('user_id', str(user_id)).execute()
+    result = client.table('minecraft_links').select('minecraft_username, minecraft_uuid').eq('guild_id', str(guild_id)).eq('user_id', str(user_id)).execute()
     
     if result.data and len(result.data) > 0:
-        return result.data[0]['minecraft_username']
+        return result.data[0]
     return None
 
-def get_recent_games(guild_id: int, limit: int = 10, team_id: str = None) -> list:
-    """Get recent games for a guild, optionally filtered by team"""
+def get_recent_games(guild_id: int, limit: int = 10, team_id: str = None,
+                     cursor: tuple = None, previous: bool = False, season_id=None) -> list:
+    """
+    Get a page of games for a guild, newest first, optionally filtered by team
+    and season. cursor is the (played_at, id) of the game to page from: older
+    games after it, or newer games before it when previous is set.
+    """
     client = get_supabase()
     
     query = client.table('games').select('*, team1:teams!games_team1_id_fkey(name, team_name, team_logo_emoji), team2:teams!games_team2_id_fkey(name, team_name, team_logo_emoji), seasons(season_name)').eq('guild_id', str(guild_id))
+    if season_id:
+        query = query.eq('season_id', season_id)
     
+    filters = []
     if team_id:
         # Filter by team (either team1 or team2)
-        query = query.or_(f'team1_id.eq.{team_id},team2_id.eq.{team_id}')
+        filters.append(f'or(team1_id.eq.{team_id},team2_id.eq.{team_id})')
+    if cursor:
+        played_at, game_id = cursor
+        op = 'gt' if previous else 'lt'
+        # Timestamps contain reserved characters, so they are quoted
+        filters.append(f'or(played_at.{op}."{played_at}",and(played_at.eq."{played_at}",id.{op}.{game_id}))')
     
-    result = query.order('played_at', desc=True).limit(limit).execute()
+    if filters:
+        query = query.or_(f'and({",".join(filters)})')
     
-    return result.data or []
+    # Walk backwards for the previous page, then flip back into newest-first order
+    result = query.order('played_at', desc=not previous).order('id', desc=not previous).limit(limit).execute()
+    rows = result.data or []
+    return rows[::-1] if previous else rows
 
 
 # ============================================
@@ -659,6 +1331,14 @@ def create_gametime(guild_id: int, team1_id: int, team2_id: int,
     }).execute()
     return result.data[0]['id'] if result.data else None
 
+def get_pending_gametimes(guild_ids: list) -> list:
+    """Get the scheduled times of pending gametimes for a set of guilds"""
+    if not guild_ids:
+        return []
+    client = get_supabase()
+    result = client.table('pending_gametimes').select('guild_id, scheduled_time').in_('guild_id', [str(g) for g in guild_ids]).execute()
+    return result.data or []
+
 def delete_gametime(gametime_id: int) -> bool:
     """Delete a gametime"""
     client = get_supabase()
@@ -674,6 +1354,39 @@ def get_gametime(gametime_id: int) -> dict:
     return None
 
 
+
+# ============================================
+# API Job Functions
+# Website transactions queued for the bot, kept
+# here so a restart picks up unfinished jobs
+# ============================================
+
+def create_api_job(job: dict) -> dict:
+    """Insert a queued API job"""
+    client = get_supabase()
+    result = client.table('api_jobs').insert(job).execute()
+    return result.data[0] if result.data else None
+
+def update_api_job(job_id: str, **kwargs) -> bool:
+    """Update an API job's status, result or timestamps"""
+    client = get_supabase()
+    result = client.table('api_jobs').update(kwargs).eq('id', job_id).execute()
+    return len(result.data) > 0 if result.data else False
+
+def get_api_job(job_id: str) -> dict:
+    """Get an API job by ID"""
+    client = get_supabase()
+    result = client.table('api_jobs').select('*').eq('id', job_id).execute()
+    if result.data and len(result.data) > 0:
+        return result.data[0]
+    return None
+
+def get_open_api_jobs() -> list:
+    """Get queued and interrupted API jobs, oldest first"""
+    client = get_supabase()
+    result = client.table('api_jobs').select('*').in_('status', ['queued', 'running']).order('created_at').execute()
+    return result.data or []
+
 if __name__ == "__main__":
     # Test connection
     init_database()
@@ -36,6 +36,8 @@ CREATE TABLE IF NOT EXISTS server_config (
     mc_status_channel_id TEXT,
     mc_status_message_id TEXT,
     mc_server_address TEXT DEFAULT '45.126.211.8:8105',
+    mc_poll_min_seconds INTEGER DEFAULT 30,
+    mc_poll_max_seconds INTEGER DEFAULT 1800,
     
     roster_cap INTEGER DEFAULT 10,
     created_at TIMESTAMPTZ DEFAULT NOW(),
@@ -152,9 +154,126 @@ CREATE TABLE IF NOT EXISTS seasons (
     is_active BOOLEAN DEFAULT FALSE,
     start_date TIMESTAMPTZ,
     end_date TIMESTAMPTZ,
+    stats_version BIGINT DEFAULT 0,  -- bumped by trigger on every stats write
     UNIQUE(guild_id, season_name)
 );
 
+-- =============================================
+-- TEAM SEASON STANDINGS (maintained incrementally by record_game)
+-- =============================================
+CREATE TABLE IF NOT EXISTS team_season_standings (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    guild_id TEXT NOT NULL,
+    season_id UUID REFERENCES seasons(id) ON DELETE CASCADE,
+    team_id TEXT REFERENCES teams(id) ON DELETE CASCADE,
+    wins INTEGER DEFAULT 0,
+    losses INTEGER DEFAULT 0,
+    ties INTEGER DEFAULT 0,
+    points_for INTEGER DEFAULT 0,
+    points_against INTEGER DEFAULT 0,
+    conference_wins INTEGER DEFAULT 0,
+    conference_losses INTEGER DEFAULT 0,
+    streak INTEGER DEFAULT 0,
+    last_results TEXT DEFAULT '',
+    last_game_id TEXT,
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    UNIQUE(season_id, team_id)
+);
+
+-- =============================================
+-- HEAD TO HEAD (one row per season + sorted team pair)
+-- =============================================
+CREATE TABLE IF NOT EXISTS head_to_head (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    guild_id TEXT NOT NULL,
+    season_id UUID REFERENCES seasons(id) ON DELETE CASCADE,
+    team_a_id TEXT REFERENCES teams(id) ON DELETE CASCADE,
+    team_b_id TEXT REFERENCES teams(id) ON DELETE CASCADE,
+    team_a_wins INTEGER DEFAULT 0,
+    team_b_wins INTEGER DEFAULT 0,
+    ties INTEGER DEFAULT 0,
+    recent_games JSONB DEFAULT '[]'::jsonb,
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    UNIQUE(season_id, team_a_id, team_b_id)
+);
+
+-- =============================================
+-- PARK STATS (synced from the game server's MySQL players table)
+-- =============================================
+CREATE TABLE IF NOT EXISTS park_stats (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    player_uuid TEXT NOT NULL,
+    player_name TEXT,
+    season INTEGER NOT NULL,
+    wins INTEGER DEFAULT 0,
+    losses INTEGER DEFAULT 0,
+    games_played INTEGER DEFAULT 0,
+    points INTEGER DEFAULT 0,
+    assists INTEGER DEFAULT 0,
+    rebounds INTEGER DEFAULT 0,
+    steals INTEGER DEFAULT 0,
+    blocks INTEGER DEFAULT 0,
+    turnovers INTEGER DEFAULT 0,
+    fg_made INTEGER DEFAULT 0,
+    fg_attempted INTEGER DEFAULT 0,
+    three_fg_made INTEGER DEFAULT 0,
+    three_fg_attempted INTEGER DEFAULT 0,
+    threes INTEGER DEFAULT 0,
+    row_hash TEXT NOT NULL,
+    synced_at TIMESTAMPTZ DEFAULT NOW(),
+    UNIQUE(player_uuid, season)
+);
+
+-- =============================================
+-- MINECRAFT LINKS (Discord user <-> Minecraft account)
+-- =============================================
+CREATE TABLE IF NOT EXISTS minecraft_links (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    guild_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    minecraft_username TEXT NOT NULL,
+    minecraft_uuid TEXT,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    UNIQUE(guild_id, user_id)
+);
+
+-- minecraft_uuid for links created before it existed
+DO $$ 
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name = 'minecraft_links' AND column_name = 'minecraft_uuid') THEN
+        ALTER TABLE minecraft_links ADD COLUMN minecraft_uuid TEXT;
+    END IF;
+END $$;
+
+-- =============================================
+-- MC ACTIVITY (one row per Minecraft status probe)
+-- =============================================
+CREATE TABLE IF NOT EXISTS mc_activity (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    server_address TEXT NOT NULL,
+    sampled_at TIMESTAMPTZ NOT NULL,
+    players_online INTEGER DEFAULT 0,
+    players TEXT[] DEFAULT '{}'
+);
+
+-- =============================================
+-- API JOBS (website transactions queued for the bot)
+-- =============================================
+CREATE TABLE IF NOT EXISTS api_jobs (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    guild_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    payload JSONB NOT NULL DEFAULT '{}'::jsonb,
+    status TEXT NOT NULL DEFAULT 'queued',
+    result JSONB,
+    webhook_url TEXT,
+    attempts INTEGER DEFAULT 0,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    started_at TIMESTAMPTZ,
+    finished_at TIMESTAMPTZ
+);
+
 -- =============================================
 -- TRANSACTION HISTORY (audit log)
 -- =============================================
@@ -206,6 +325,30 @@ BEGIN
     END IF;
 END $$;
 
+-- =============================================
+-- ADD Minecraft status poll bounds TO SERVER_CONFIG (if not exists)
+-- =============================================
+DO $$ 
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name = 'server_config' AND column_name = 'mc_poll_min_seconds') THEN
+        ALTER TABLE server_config ADD COLUMN mc_poll_min_seconds INTEGER DEFAULT 30;
+    END IF;
+    
+    IF NOT EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name = 'server_config' AND column_name = 'mc_poll_max_seconds') THEN
+        ALTER TABLE server_config ADD COLUMN mc_poll_max_seconds INTEGER DEFAULT 1800;
+    END IF;
+END $$;
+
+-- =============================================
+-- ADD stats_version TO SEASONS (if not exists)
+-- =============================================
+DO $$ 
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name = 'seasons' AND column_name = 'stats_version') THEN
+        ALTER TABLE seasons ADD COLUMN stats_version BIGINT DEFAULT 0;
+    END IF;
+END $$;
+
 -- =============================================
 -- INDEXES
 -- =============================================
@@ -215,7 +358,15 @@ CREATE INDEX IF NOT EXISTS idx_pending_offers_expires ON pending_offers(expires_
 CREATE INDEX IF NOT EXISTS idx_players_discord ON players(discord_id);
 CREATE INDEX IF NOT EXISTS idx_players_mc ON players(minecraft_name);
 CREATE INDEX IF NOT EXISTS idx_seasons_active ON seasons(guild_id, is_active);
+CREATE INDEX IF NOT EXISTS idx_games_guild_played ON games(guild_id, played_at DESC, id DESC);
 CREATE INDEX IF NOT EXISTS idx_transaction_history_player ON transaction_history(player_id);
+CREATE INDEX IF NOT EXISTS idx_team_season_standings_guild_season ON team_season_standings(guild_id, season_id);
+CREATE INDEX IF NOT EXISTS idx_park_stats_season ON park_stats(season);
+CREATE INDEX IF NOT EXISTS idx_minecraft_links_uuid ON minecraft_links(minecraft_uuid);
+-- Activity pages seek on (sampled_at, id); replaces the index without id
+DROP INDEX IF EXISTS idx_mc_activity_server_sampled;
+CREATE INDEX IF NOT EXISTS idx_mc_activity_server_sampled_id ON mc_activity(server_address, sampled_at, id);
+CREATE INDEX IF NOT EXISTS idx_api_jobs_status ON api_jobs(status, created_at);
 
 -- =============================================
 -- ENABLE RLS
@@ -231,6 +382,12 @@ ALTER TABLE pending_gametimes ENABLE ROW LEVEL SECURITY;
 ALTER TABLE players ENABLE ROW LEVEL SECURITY;
 ALTER TABLE seasons ENABLE ROW LEVEL SECURITY;
 ALTER TABLE transaction_history ENABLE ROW LEVEL SECURITY;
+ALTER TABLE team_season_standings ENABLE ROW LEVEL SECURITY;
+ALTER TABLE head_to_head ENABLE ROW LEVEL SECURITY;
+ALTER TABLE park_stats ENABLE ROW LEVEL SECURITY;
+ALTER TABLE minecraft_links ENABLE ROW LEVEL SECURITY;
+ALTER TABLE mc_activity ENABLE ROW LEVEL SECURITY;
+ALTER TABLE api_jobs ENABLE ROW LEVEL SECURITY;
 
 -- =============================================
 -- POLICIES (allow service role full access)
@@ -246,5 +403,152 @@ CREATE POLICY "Full access pending_gametimes" ON pending_gametimes FOR ALL USING
 CREATE POLICY "Full access players" ON players FOR ALL USING (true);
 CREATE POLICY "Full access seasons" ON seasons FOR ALL USING (true);
 CREATE POLICY "Full access transaction_history" ON transaction_history FOR ALL USING (true);
+CREATE POLICY "Full access team_season_standings" ON team_season_standings FOR ALL USING (true);
+CREATE POLICY "Full access head_to_head" ON head_to_head FOR ALL USING (true);
+CREATE POLICY "Full access park_stats" ON park_stats FOR ALL USING (true);
+CREATE POLICY "Full access minecraft_links" ON minecraft_links FOR ALL USING (true);
+CREATE POLICY "Full access mc_activity" ON mc_activity FOR ALL USING (true);
+CREATE POLICY "Full access api_jobs" ON api_jobs FOR ALL USING (true);
+
+-- =============================================
+-- FUNCTIONS (called by the bot through rpc())
+-- =============================================
+-- Function: Add one game to both teams' standings rows.
+-- Counters are incremented in place (wins = wins + 1, ...), so games
+-- recorded at the same time can't overwrite each other.
+CREATE OR REPLACE FUNCTION record_standings_result(
+    p_guild_id TEXT,
+    p_season_id UUID,
+    p_team1_id TEXT,
+    p_team2_id TEXT,
+    p_team1_score INTEGER,
+    p_team2_score INTEGER,
+    p_conference_game BOOLEAN,
+    p_game_id TEXT DEFAULT NULL
+)
+RETURNS SETOF team_season_standings AS $$
+    INSERT INTO team_season_standings AS s (
+        guild_id, season_id, team_id, wins, losses, ties, points_for, points_against,
+        conference_wins, conference_losses, streak, last_results, last_game_id
+    )
+    SELECT
+        p_guild_id, p_season_id, r.team_id,
+        (r.pf > r.pa)::INTEGER, (r.pf < r.pa)::INTEGER, (r.pf = r.pa)::INTEGER,
+        r.pf, r.pa,
+        (p_conference_game AND r.pf > r.pa)::INTEGER,
+        (p_conference_game AND r.pf < r.pa)::INTEGER,
+        SIGN(r.pf - r.pa)::INTEGER,
+        CASE WHEN r.pf > r.pa THEN 'W' WHEN r.pf < r.pa THEN 'L' ELSE 'T' END,
+        p_game_id
+    FROM (VALUES (p_team1_id, p_team1_score, p_team2_score),
+                 (p_team2_id, p_team2_score, p_team1_score)) AS r(team_id, pf, pa)
+    ON CONFLICT (season_id, team_id) DO UPDATE SET
+        wins = s.wins + EXCLUDED.wins,
+        losses = s.losses + EXCLUDED.losses,
+        ties = s.ties + EXCLUDED.ties,
+        points_for = s.points_for + EXCLUDED.points_for,
+        points_against = s.points_against + EXCLUDED.points_against,
+        conference_wins = s.conference_wins + EXCLUDED.conference_wins,
+        conference_losses = s.conference_losses + EXCLUDED.conference_losses,
+        -- A win extends a winning streak or starts one, a tie resets it
+        streak = CASE
+            WHEN EXCLUDED.streak > 0 THEN GREATEST(s.streak, 0) + 1
+            WHEN EXCLUDED.streak < 0 THEN LEAST(s.streak, 0) - 1
+            ELSE 0
+        END,
+        last_results = RIGHT(COALESCE(s.last_results, '') || EXCLUDED.last_results, 10),
+        last_game_id = COALESCE(EXCLUDED.last_game_id, s.last_game_id),
+        updated_at = NOW()
+    RETURNING *;
+$$ LANGUAGE sql;
+
+-- Function: Add one game to a team pair's head-to-head row.
+-- Team ids come sorted and the scores oriented to them (see utils/standings.py).
+CREATE OR REPLACE FUNCTION record_head_to_head_result(
+    p_guild_id TEXT,
+    p_season_id UUID,
+    p_team_a_id TEXT,
+    p_team_b_id TEXT,
+    p_a_score INTEGER,
+    p_b_score INTEGER,
+    p_game_id TEXT DEFAULT NULL,
+    p_played_at TEXT DEFAULT NULL
+)
+RETURNS SETOF head_to_head AS $$
+    INSERT INTO head_to_head AS h (
+        guild_id, season_id, team_a_id, team_b_id, team_a_wins, team_b_wins, ties, recent_games
+    )
+    VALUES (
+        p_guild_id, p_season_id, p_team_a_id, p_team_b_id,
+        (p_a_score > p_b_score)::INTEGER, (p_b_score > p_a_score)::INTEGER, (p_a_score = p_b_score)::INTEGER,
+        jsonb_build_array(jsonb_build_object(
+            'game_id', p_game_id, 'a_score', p_a_score, 'b_score', p_b_score, 'played_at', p_played_at
+        ))
+    )
+    ON CONFLICT (season_id, team_a_id, team_b_id) DO UPDATE SET
+        team_a_wins = h.team_a_wins + EXCLUDED.team_a_wins,
+        team_b_wins = h.team_b_wins + EXCLUDED.team_b_wins,
+        ties = h.ties + EXCLUDED.ties,
+        -- Last 10 games, oldest first
+        recent_games = (
+            SELECT COALESCE(jsonb_agg(game ORDER BY n), '[]'::jsonb)
+            FROM (
+                SELECT game, n
+                FROM jsonb_array_elements(COALESCE(h.recent_games, '[]'::jsonb) || EXCLUDED.recent_games)
+                     WITH ORDINALITY AS g(game, n)
+                ORDER BY n DESC
+                LIMIT 10
+            ) latest
+        ),
+        updated_at = NOW()
+    RETURNING *;
+$$ LANGUAGE sql;
+
+-- =============================================
+-- TRIGGERS
+-- =============================================
+-- Any write to a season's games or player stats, from the bot, the
+-- importer or the website, moves seasons.stats_version so the bot's
+-- caches know to rebuild
+CREATE OR REPLACE FUNCTION bump_season_stats_version()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_row RECORD;
+    v_season_id seasons.id%TYPE;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        v_row := OLD;
+    ELSE
+        v_row := NEW;
+    END IF;
+
+    IF TG_TABLE_NAME = 'player_game_stats' THEN
+        SELECT season_id INTO v_season_id FROM games WHERE id = v_row.game_id;
+    ELSE
+        v_season_id := v_row.season_id;
+    END IF;
+
+    UPDATE seasons SET stats_version = stats_version + 1 WHERE id = v_season_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS bump_games_season_version ON games;
+CREATE TRIGGER bump_games_season_version
+    AFTER INSERT OR UPDATE OR DELETE ON games
+    FOR EACH ROW
+    EXECUTE FUNCTION bump_season_stats_version();
+
+DROP TRIGGER IF EXISTS bump_player_game_stats_season_version ON player_game_stats;
+CREATE TRIGGER bump_player_game_stats_season_version
+    AFTER INSERT OR UPDATE OR DELETE ON player_game_stats
+    FOR EACH ROW
+    EXECUTE FUNCTION bump_season_stats_version();
+
+DROP TRIGGER IF EXISTS bump_player_season_stats_season_version ON player_season_stats;
+CREATE TRIGGER bump_player_season_stats_season_version
+    AFTER INSERT OR UPDATE OR DELETE ON player_season_stats
+    FOR EACH ROW
+    EXECUTE FUNCTION bump_season_stats_version();
 
 SELECT 'Migration complete! Bot tables added to existing schema.' as status;
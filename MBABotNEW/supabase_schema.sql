@@ -37,6 +37,8 @@ CREATE TABLE IF NOT EXISTS server_config (
     mc_status_channel_id TEXT,
     mc_status_message_id TEXT,
     mc_server_address TEXT DEFAULT '45.126.211.8:8105',
+    mc_poll_min_seconds INTEGER DEFAULT 30,
+    mc_poll_max_seconds INTEGER DEFAULT 1800,
     
     -- Settings
     roster_cap INTEGER DEFAULT 10,
@@ -197,6 +199,7 @@ CREATE TABLE IF NOT EXISTS seasons (
     is_active BOOLEAN DEFAULT FALSE,
     start_date TIMESTAMPTZ,
     end_date TIMESTAMPTZ,
+    stats_version BIGINT DEFAULT 0,  -- bumped by trigger on every stats write
     
     UNIQUE(guild_id, season_name)
 );
@@ -224,6 +227,8 @@ CREATE TABLE IF NOT EXISTS games (
 
 CREATE INDEX IF NOT EXISTS idx_games_season ON games(season_id);
 CREATE INDEX IF NOT EXISTS idx_games_teams ON games(team1_id, team2_id);
+-- Keyset pagination for /gamehistory seeks on (played_at, id) within a guild
+CREATE INDEX IF NOT EXISTS idx_games_guild_played ON games(guild_id, played_at DESC, id DESC);
 
 -- =============================================
 -- PLAYER GAME STATS (per-game stats)
@@ -269,6 +274,83 @@ CREATE TABLE IF NOT EXISTS player_season_stats (
 CREATE INDEX IF NOT EXISTS idx_player_season_stats_player ON player_season_stats(player_id);
 CREATE INDEX IF NOT EXISTS idx_player_season_stats_season ON player_season_stats(season_id);
 
+-- =============================================
+-- TEAM SEASON STANDINGS (maintained incrementally by record_game)
+-- =============================================
+
+CREATE TABLE IF NOT EXISTS team_season_standings (
+    id BIGSERIAL PRIMARY KEY,
+    guild_id TEXT NOT NULL,
+    season_id BIGINT REFERENCES seasons(id) ON DELETE CASCADE,
+    team_id BIGINT REFERENCES teams(id) ON DELETE CASCADE,
+    wins INTEGER DEFAULT 0,
+    losses INTEGER DEFAULT 0,
+    ties INTEGER DEFAULT 0,
+    points_for INTEGER DEFAULT 0,
+    points_against INTEGER DEFAULT 0,
+    conference_wins INTEGER DEFAULT 0,
+    conference_losses INTEGER DEFAULT 0,
+    streak INTEGER DEFAULT 0, -- +N = won last N, -N = lost last N
+    last_results TEXT DEFAULT '', -- rolling W/L/T buffer, oldest first (last 10)
+    last_game_id BIGINT,
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    
+    UNIQUE(season_id, team_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_team_season_standings_guild_season ON team_season_standings(guild_id, season_id);
+
+-- =============================================
+-- HEAD TO HEAD (one row per season + sorted team pair)
+-- =============================================
+
+CREATE TABLE IF NOT EXISTS head_to_head (
+    id BIGSERIAL PRIMARY KEY,
+    guild_id TEXT NOT NULL,
+    season_id BIGINT REFERENCES seasons(id) ON DELETE CASCADE,
+    team_a_id BIGINT REFERENCES teams(id) ON DELETE CASCADE,
+    team_b_id BIGINT REFERENCES teams(id) ON DELETE CASCADE,
+    team_a_wins INTEGER DEFAULT 0,
+    team_b_wins INTEGER DEFAULT 0,
+    ties INTEGER DEFAULT 0,
+    recent_games JSONB DEFAULT '[]'::jsonb, -- last 10 games, oldest first
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    
+    UNIQUE(season_id, team_a_id, team_b_id)
+);
+
+-- =============================================
+-- PARK STATS (synced from the game server's MySQL players table,
+-- one row per player per park season)
+-- =============================================
+
+CREATE TABLE IF NOT EXISTS park_stats (
+    id BIGSERIAL PRIMARY KEY,
+    player_uuid TEXT NOT NULL,
+    player_name TEXT,
+    season INTEGER NOT NULL,
+    wins INTEGER DEFAULT 0,
+    losses INTEGER DEFAULT 0,
+    games_played INTEGER DEFAULT 0,
+    points INTEGER DEFAULT 0,
+    assists INTEGER DEFAULT 0,
+    rebounds INTEGER DEFAULT 0,
+    steals INTEGER DEFAULT 0,
+    blocks INTEGER DEFAULT 0,
+    turnovers INTEGER DEFAULT 0,
+    fg_made INTEGER DEFAULT 0,
+    fg_attempted INTEGER DEFAULT 0,
+    three_fg_made INTEGER DEFAULT 0,
+    three_fg_attempted INTEGER DEFAULT 0,
+    threes INTEGER DEFAULT 0,
+    row_hash TEXT NOT NULL,
+    synced_at TIMESTAMPTZ DEFAULT NOW(),
+    
+    UNIQUE(player_uuid, season)
+);
+
+CREATE INDEX IF NOT EXISTS idx_park_stats_season ON park_stats(season);
+
 -- =============================================
 -- TRANSACTION HISTORY (audit log)
 -- =============================================
@@ -321,6 +403,9 @@ ALTER TABLE seasons ENABLE ROW LEVEL SECURITY;
 ALTER TABLE games ENABLE ROW LEVEL SECURITY;
 ALTER TABLE player_game_stats ENABLE ROW LEVEL SECURITY;
 ALTER TABLE player_season_stats ENABLE ROW LEVEL SECURITY;
+ALTER TABLE team_season_standings ENABLE ROW LEVEL SECURITY;
+ALTER TABLE head_to_head ENABLE ROW LEVEL SECURITY;
+ALTER TABLE park_stats ENABLE ROW LEVEL SECURITY;
 ALTER TABLE transaction_history ENABLE ROW LEVEL SECURITY;
 ALTER TABLE accolades ENABLE ROW LEVEL SECURITY;
 
@@ -332,6 +417,9 @@ CREATE POLICY "Public read access" ON seasons FOR SELECT USING (true);
 CREATE POLICY "Public read access" ON games FOR SELECT USING (true);
 CREATE POLICY "Public read access" ON player_game_stats FOR SELECT USING (true);
 CREATE POLICY "Public read access" ON player_season_stats FOR SELECT USING (true);
+CREATE POLICY "Public read access" ON team_season_standings FOR SELECT USING (true);
+CREATE POLICY "Public read access" ON head_to_head FOR SELECT USING (true);
+CREATE POLICY "Public read access" ON park_stats FOR SELECT USING (true);
 CREATE POLICY "Public read access" ON transaction_history FOR SELECT USING (true);
 CREATE POLICY "Public read access" ON accolades FOR SELECT USING (true);
 
@@ -350,6 +438,9 @@ CREATE POLICY "Service role full access" ON seasons FOR ALL USING (true);
 CREATE POLICY "Service role full access" ON games FOR ALL USING (true);
 CREATE POLICY "Service role full access" ON player_game_stats FOR ALL USING (true);
 CREATE POLICY "Service role full access" ON player_season_stats FOR ALL USING (true);
+CREATE POLICY "Service role full access" ON team_season_standings FOR ALL USING (true);
+CREATE POLICY "Service role full access" ON head_to_head FOR ALL USING (true);
+CREATE POLICY "Service role full access" ON park_stats FOR ALL USING (true);
 CREATE POLICY "Service role full access" ON transaction_history FOR ALL USING (true);
 CREATE POLICY "Service role full access" ON accolades FOR ALL USING (true);
 
@@ -381,7 +472,7 @@ FROM player_season_stats ps
 JOIN seasons s ON ps.season_id = s.id
 LEFT JOIN players p ON ps.player_id = p.discord_id AND ps.guild_id = p.guild_id;
 
--- View: Team standings
+-- View: Team standings (active season only, reads the incremental table)
 CREATE OR REPLACE VIEW team_standings AS
 SELECT 
     t.id,
@@ -390,13 +481,18 @@ SELECT
     t.team_role_id,
     t.conference,
     t.team_logo_emoji,
-    COUNT(CASE WHEN g.winner_id = t.id THEN 1 END) as wins,
-    COUNT(CASE WHEN (g.team1_id = t.id OR g.team2_id = t.id) AND g.winner_id != t.id AND g.winner_id IS NOT NULL THEN 1 END) as losses,
-    COUNT(CASE WHEN g.team1_id = t.id OR g.team2_id = t.id THEN 1 END) as games_played
+    COALESCE(st.wins, 0) as wins,
+    COALESCE(st.losses, 0) as losses,
+    COALESCE(st.wins + st.losses + st.ties, 0) as games_played,
+    COALESCE(st.ties, 0) as ties,
+    COALESCE(st.points_for - st.points_against, 0) as point_differential,
+    COALESCE(st.conference_wins, 0) as conference_wins,
+    COALESCE(st.conference_losses, 0) as conference_losses,
+    COALESCE(st.streak, 0) as streak,
+    COALESCE(st.last_results, '') as last_results
 FROM teams t
-LEFT JOIN games g ON (g.team1_id = t.id OR g.team2_id = t.id)
-LEFT JOIN seasons s ON g.season_id = s.id AND s.is_active = true
-GROUP BY t.id, t.guild_id, t.team_name, t.team_role_id, t.conference, t.team_logo_emoji;
+LEFT JOIN seasons s ON s.guild_id = t.guild_id AND s.is_active = true
+LEFT JOIN team_season_standings st ON st.team_id = t.id AND st.season_id = s.id;
 
 -- View: Recent transactions
 CREATE OR REPLACE VIEW recent_transactions AS
@@ -513,6 +609,97 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
+-- Function: Add one game to both teams' standings rows.
+-- Counters are incremented in place (wins = wins + 1, ...), so games
+-- recorded at the same time can't overwrite each other.
+CREATE OR REPLACE FUNCTION record_standings_result(
+    p_guild_id TEXT,
+    p_season_id BIGINT,
+    p_team1_id BIGINT,
+    p_team2_id BIGINT,
+    p_team1_score INTEGER,
+    p_team2_score INTEGER,
+    p_conference_game BOOLEAN,
+    p_game_id BIGINT DEFAULT NULL
+)
+RETURNS SETOF team_season_standings AS $$
+    INSERT INTO team_season_standings AS s (
+        guild_id, season_id, team_id, wins, losses, ties, points_for, points_against,
+        conference_wins, conference_losses, streak, last_results, last_game_id
+    )
+    SELECT
+        p_guild_id, p_season_id, r.team_id,
+        (r.pf > r.pa)::INTEGER, (r.pf < r.pa)::INTEGER, (r.pf = r.pa)::INTEGER,
+        r.pf, r.pa,
+        (p_conference_game AND r.pf > r.pa)::INTEGER,
+        (p_conference_game AND r.pf < r.pa)::INTEGER,
+        SIGN(r.pf - r.pa)::INTEGER,
+        CASE WHEN r.pf > r.pa THEN 'W' WHEN r.pf < r.pa THEN 'L' ELSE 'T' END,
+        p_game_id
+    FROM (VALUES (p_team1_id, p_team1_score, p_team2_score),
+                 (p_team2_id, p_team2_score, p_team1_score)) AS r(team_id, pf, pa)
+    ON CONFLICT (season_id, team_id) DO UPDATE SET
+        wins = s.wins + EXCLUDED.wins,
+        losses = s.losses + EXCLUDED.losses,
+        ties = s.ties + EXCLUDED.ties,
+        points_for = s.points_for + EXCLUDED.points_for,
+        points_against = s.points_against + EXCLUDED.points_against,
+        conference_wins = s.conference_wins + EXCLUDED.conference_wins,
+        conference_losses = s.conference_losses + EXCLUDED.conference_losses,
+        -- A win extends a winning streak or starts one, a tie resets it
+        streak = CASE
+            WHEN EXCLUDED.streak > 0 THEN GREATEST(s.streak, 0) + 1
+            WHEN EXCLUDED.streak < 0 THEN LEAST(s.streak, 0) - 1
+            ELSE 0
+        END,
+        last_results = RIGHT(COALESCE(s.last_results, '') || EXCLUDED.last_results, 10),
+        last_game_id = COALESCE(EXCLUDED.last_game_id, s.last_game_id),
+        updated_at = NOW()
+    RETURNING *;
+$$ LANGUAGE sql;
+
+-- Function: Add one game to a team pair's head-to-head row.
+-- Team ids come sorted and the scores oriented to them (see utils/standings.py).
+CREATE OR REPLACE FUNCTION record_head_to_head_result(
+    p_guild_id TEXT,
+    p_season_id BIGINT,
+    p_team_a_id BIGINT,
+    p_team_b_id BIGINT,
+    p_a_score INTEGER,
+    p_b_score INTEGER,
+    p_game_id BIGINT DEFAULT NULL,
+    p_played_at TEXT DEFAULT NULL
+)
+RETURNS SETOF head_to_head AS $$
+    INSERT INTO head_to_head AS h (
+        guild_id, season_id, team_a_id, team_b_id, team_a_wins, team_b_wins, ties, recent_games
+    )
+    VALUES (
+        p_guild_id, p_season_id, p_team_a_id, p_team_b_id,
+        (p_a_score > p_b_score)::INTEGER, (p_b_score > p_a_score)::INTEGER, (p_a_score = p_b_score)::INTEGER,
+        jsonb_build_array(jsonb_build_object(
+            'game_id', p_game_id, 'a_score', p_a_score, 'b_score', p_b_score, 'played_at', p_played_at
+        ))
+    )
+    ON CONFLICT (season_id, team_a_id, team_b_id) DO UPDATE SET
+        team_a_wins = h.team_a_wins + EXCLUDED.team_a_wins,
+        team_b_wins = h.team_b_wins + EXCLUDED.team_b_wins,
+        ties = h.ties + EXCLUDED.ties,
+        -- Last 10 games, oldest first
+        recent_games = (
+            SELECT COALESCE(jsonb_agg(game ORDER BY n), '[]'::jsonb)
+            FROM (
+                SELECT game, n
+                FROM jsonb_array_elements(COALESCE(h.recent_games, '[]'::jsonb) || EXCLUDED.recent_games)
+                     WITH ORDINALITY AS g(game, n)
+                ORDER BY n DESC
+                LIMIT 10
+            ) latest
+        ),
+        updated_at = NOW()
+    RETURNING *;
+$$ LANGUAGE sql;
+
 -- =============================================
 -- TRIGGERS
 -- =============================================
@@ -530,3 +717,44 @@ CREATE TRIGGER update_server_config_updated_at
     BEFORE UPDATE ON server_config
     FOR EACH ROW
     EXECUTE FUNCTION update_updated_at();
+
+-- Season stats version trigger: any write to a season's games or player
+-- stats, from the bot, the importer or the website, moves
+-- seasons.stats_version so the bot's caches know to rebuild
+CREATE OR REPLACE FUNCTION bump_season_stats_version()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_row RECORD;
+    v_season_id seasons.id%TYPE;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        v_row := OLD;
+    ELSE
+        v_row := NEW;
+    END IF;
+
+    IF TG_TABLE_NAME = 'player_game_stats' THEN
+        SELECT season_id INTO v_season_id FROM games WHERE id = v_row.game_id;
+    ELSE
+        v_season_id := v_row.season_id;
+    END IF;
+
+    UPDATE seasons SET stats_version = stats_version + 1 WHERE id = v_season_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER bump_games_season_version
+    AFTER INSERT OR UPDATE OR DELETE ON games
+    FOR EACH ROW
+    EXECUTE FUNCTION bump_season_stats_version();
+
+CREATE TRIGGER bump_player_game_stats_season_version
+    AFTER INSERT OR UPDATE OR DELETE ON player_game_stats
+    FOR EACH ROW
+    EXECUTE FUNCTION bump_season_stats_version();
+
+CREATE TRIGGER bump_player_season_stats_season_version
+    AFTER INSERT OR UPDATE OR DELETE ON player_season_stats
+    FOR EACH ROW
+    EXECUTE FUNCTION bump_season_stats_version();
@@ -0,0 +1,321 @@
+"""
+In-memory stand-in for the parts of the Supabase client database.py uses.
+
+Rows live in plain lists per table. Like PostgREST, a select never returns
+more than MAX_ROWS rows, so code that forgets to page shows up in tests.
+Embedded selects such as 'games!inner(season_id)' are ignored, and a filter
+on 'games.season_id' is resolved through the row's game_id. or_() takes
+PostgREST's logic-tree syntax (and(...), or(...), col.op.value).
+rpc() runs Python versions of the SQL functions in supabase_schema.sql,
+and writes to games and player stats bump seasons.stats_version like its
+trigger does.
+"""
+
+import copy
+import itertools
+import re
+
+from utils.standings import (
+    new_standings_row, apply_game_result, new_head_to_head_row, apply_head_to_head_result
+)
+
+MAX_ROWS = 1000
+
+# Tables whose writes bump seasons.stats_version in the schema
+VERSIONED_TABLES = ('games', 'player_game_stats', 'player_season_stats')
+
+
+def _split(text: str) -> list:
+    """Split a logic tree on its top-level commas"""
+    parts, depth, quoted, current = [], 0, False, ''
+    for char in text:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == '(':
+            depth += 1
+        elif not quoted and char == ')':
+            depth -= 1
+        elif not quoted and char == ',' and depth == 0:
+            parts.append(current)
+            current = ''
+            continue
+        current += char
+    parts.append(current)
+    return parts
+
+
+def _coerce(stored, value: str):
+    """Compare a filter value as the stored value's type"""
+    value = value.strip('"')
+    if isinstance(stored, bool) or stored is None:
+        return value
+    if isinstance(stored, int):
+        return int(value)
+    if isinstance(stored, float):
+        return float(value)
+    return value
+
+
+def _condition(text: str):
+    """Logic-tree text -> predicate over a row"""
+    for group, combine in (('and(', all), ('or(', any)):
+        if text.startswith(group):
+            tests = [_condition(part) for part in _split(text[len(group):-1])]
+            return lambda row, tests=tests, combine=combine: combine(test(row) for test in tests)
+    column, op, value = text.split('.', 2)
+    compare = {
+        'eq': lambda a, b: a == b, 'neq': lambda a, b: a != b,
+        'gt': lambda a, b: a > b, 'gte': lambda a, b: a >= b,
+        'lt': lambda a, b: a < b, 'lte': lambda a, b: a <= b,
+    }[op]
+
+    def test(row):
+        stored = row.get(column)
+        if stored is None:
+            return False
+        if not isinstance(stored, (int, float)):
+            stored = str(stored)
+        return compare(stored, _coerce(stored, value))
+    return test
+
+
+class Result:
+    def __init__(self, data):
+        self.data = data
+
+
+class Query:
+    def __init__(self, client, table: str):
+        self.client = client
+        self.table = table
+        self.action = 'select'
+        self.payload = None
+        self.on_conflict = None
+        self.filters = []
+        self.orders = []
+        self.start = 0
+        self.end = None
+        self.negate = False
+
+    # Actions
+
+    def select(self, columns='*'):
+        self.action = 'select'
+        return self
+
+    def insert(self, rows):
+        self.action, self.payload = 'insert', rows
+        return self
+
+    def upsert(self, rows, on_conflict: str = 'id'):
+        self.action, self.payload, self.on_conflict = 'upsert', rows, on_conflict
+        return self
+
+    def update(self, values: dict):
+        self.action, self.payload = 'update', values
+        return self
+
+    def delete(self):
+        self.action = 'delete'
+        return self
+
+    # Filters
+
+    @property
+    def not_(self):
+        self.negate = True
+        return self
+
+    def _filter(self, test):
+        negate, self.negate = self.negate, False
+        self.filters.append((lambda row: not test(row)) if negate else test)
+        return self
+
+    def _value(self, row: dict, column: str):
+        if '.' in column:
+            # games.season_id on a player_game_stats row -> that game's season_id
+            related, column = column.split('.', 1)
+            key = row.get(related[:-1] + '_id')
+            match = next((r for r in self.client.tables.get(related, []) if str(r.get('id')) == str(key)), {})
+            return match.get(column)
+        return row.get(column)
+
+    def eq(self, column, value):
+        return self._filter(lambda row: str(self._value(row, column)) == str(value))
+
+    def neq(self, column, value):
+        return self._filter(lambda row: str(self._value(row, column)) != str(value))
+
+    def gt(self, column, value):
+        return self._filter(lambda row: self._value(row, column) is not None and self._value(row, column) > value)
+
+    def gte(self, column, value):
+        return self._filter(lambda row: self._value(row, column) is not None and self._value(row, column) >= value)
+
+    def lt(self, column, value):
+        return self._filter(lambda row: self._value(row, column) is not None and self._value(row, column) < value)
+
+    def like(self, column, pattern: str):
+        regex = re.compile(''.join('.*' if c == '%' else '.' if c == '_' else re.escape(c) for c in pattern) + r'\Z',
+                           re.DOTALL)
+        return self._filter(lambda row: self._value(row, column) is not None
+                            and regex.match(str(self._value(row, column))) is not None)
+
+    def in_(self, column, values):
+        values = {str(v) for v in values}
+        return self._filter(lambda row: str(self._value(row, column)) in values)
+
+    def is_(self, column, value):
+        return self._filter(lambda row: self._value(row, column) is None)
+
+    def or_(self, filters: str):
+        return self._filter(_condition(f'or({filters})'))
+
+    def order(self, column, desc: bool = False):
+        self.orders.append((column, desc))
+        return self
+
+    def range(self, start: int, end: int):
+        self.start, self.end = start, end
+        return self
+
+    def limit(self, count: int):
+        self.end = self.start + count - 1
+        return self
+
+    # Execution
+
+    def _matching(self) -> list:
+        return [row for row in self.client.tables.setdefault(self.table, [])
+                if all(test(row) for test in self.filters)]
+
+    def execute(self) -> Result:
+        result = self._execute()
+        if self.action != 'select' and self.table in VERSIONED_TABLES:
+            self.client.bump_stats_versions(self.table, result.data)
+        return result
+
+    def _execute(self) -> Result:
+        self.client.calls.append((self.table, self.action))
+        rows = self.client.tables.setdefault(self.table, [])
+        if self.client.fail_on and (self.table, self.action) in self.client.fail_on:
+            raise RuntimeError(f"{self.action} on {self.table} failed")
+
+        if self.action == 'select':
+            found = self._matching()
+            for column, desc in reversed(self.orders):
+                found.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+            end = len(found) if self.end is None else self.end + 1
+            found = found[self.start:end][:MAX_ROWS]
+            return Result(copy.deepcopy(found))
+
+        if self.action == 'insert':
+            payload = self.payload if isinstance(self.payload, list) else [self.payload]
+            written = [self.client.add(self.table, row) for row in payload]
+            return Result(copy.deepcopy(written))
+
+        if self.action == 'upsert':
+            payload = self.payload if isinstance(self.payload, list) else [self.payload]
+            keys = [k.strip() for k in self.on_conflict.split(',')]
+            written = []
+            for row in payload:
+                existing = next((r for r in rows if all(str(r.get(k)) == str(row.get(k)) for k in keys)), None)
+                if existing is None:
+                    written.append(self.client.add(self.table, row))
+                else:
+                    existing.update(copy.deepcopy(row))
+                    written.append(existing)
+            return Result(copy.deepcopy(written))
+
+        if self.action == 'update':
+            found = self._matching()
+            for row in found:
+                row.update(copy.deepcopy(self.payload))
+            return Result(copy.deepcopy(found))
+
+        if self.action == 'delete':
+            found = self._matching()
+            self.client.tables[self.table] = [row for row in rows if row not in found]
+            return Result(copy.deepcopy(found))
+
+        raise ValueError(self.action)
+
+
+def _find(client, table: str, **keys) -> dict:
+    return next((row for row in client.tables.setdefault(table, [])
+                 if all(str(row.get(k)) == str(v) for k, v in keys.items())), None)
+
+
+def _record_standings_result(client, p: dict) -> list:
+    written = []
+    for team_id, points_for, points_against in ((p['p_team1_id'], p['p_team1_score'], p['p_team2_score']),
+                                                (p['p_team2_id'], p['p_team2_score'], p['p_team1_score'])):
+        row = _find(client, 'team_season_standings', season_id=p['p_season_id'], team_id=team_id)
+        if row is None:
+            row = client.add('team_season_standings', new_standings_row(p['p_guild_id'], p['p_season_id'], team_id))
+        apply_game_result(row, points_for, points_against, p['p_conference_game'], p['p_game_id'])
+        written.append(row)
+    return written
+
+
+def _record_head_to_head_result(client, p: dict) -> list:
+    row = _find(client, 'head_to_head', season_id=p['p_season_id'],
+                team_a_id=p['p_team_a_id'], team_b_id=p['p_team_b_id'])
+    if row is None:
+        row = client.add('head_to_head', new_head_to_head_row(p['p_guild_id'], p['p_season_id'],
+                                                              p['p_team_a_id'], p['p_team_b_id']))
+    apply_head_to_head_result(row, p['p_team_a_id'], p['p_team_b_id'], p['p_a_score'], p['p_b_score'],
+                              p['p_game_id'], p['p_played_at'])
+    return [row]
+
+
+FUNCTIONS = {
+    'record_standings_result': _record_standings_result,
+    'record_head_to_head_result': _record_head_to_head_result,
+}
+
+
+class Rpc:
+    def __init__(self, client, name: str, params: dict):
+        self.client = client
+        self.name = name
+        self.params = params
+
+    def execute(self) -> Result:
+        self.client.calls.append((self.name, 'rpc'))
+        if self.client.fail_on and (self.name, 'rpc') in self.client.fail_on:
+            raise RuntimeError(f"rpc {self.name} failed")
+        return Result(copy.deepcopy(FUNCTIONS[self.name](self.client, self.params)))
+
+
+class FakeSupabase:
+    def __init__(self, tables: dict = None):
+        self.tables = {name: [dict(row) for row in rows] for name, rows in (tables or {}).items()}
+        self.calls = []
+        # (table, action) pairs whose next executions raise
+        self.fail_on = set()
+        self._ids = itertools.count(1)
+
+    def add(self, table: str, row: dict) -> dict:
+        row = copy.deepcopy(row)
+        row.setdefault('id', next(self._ids))
+        self.tables.setdefault(table, []).append(row)
+        return row
+
+    def table(self, name: str) -> Query:
+        return Query(self, name)
+
+    def bump_stats_versions(self, table: str, rows: list):
+        """The bump_season_stats_version trigger, once per written row"""
+        for row in rows:
+            if table == 'player_game_stats':
+                game = _find(self, 'games', id=row.get('game_id')) or {}
+                season_id = game.get('season_id')
+            else:
+                season_id = row.get('season_id')
+            season = _find(self, 'seasons', id=season_id)
+            if season is not None:
+                season['stats_version'] = (season.get('stats_version') or 0) + 1
+
+    def rpc(self, name: str, params: dict = None) -> Rpc:
+        return Rpc(self, name, params or {})
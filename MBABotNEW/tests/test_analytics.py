@@ -0,0 +1,86 @@
+import pytest
+
+import database
+from fake_supabase import FakeSupabase
+from utils.analytics import compute_season_metrics, get_season_metrics, format_metric, METRICS
+
+
+def line(game_id, player_id, team_id, points=0, rebounds=0, assists=0, steals=0, blocks=0, turnovers=0):
+    return {
+        'game_id': game_id, 'player_id': player_id, 'team_id': team_id, 'points': points,
+        'rebounds': rebounds, 'assists': assists, 'steals': steals, 'blocks': blocks, 'turnovers': turnovers
+    }
+
+
+ROWS = [
+    line(1, 'a', 't1', points=20, rebounds=5, assists=4, steals=1, blocks=0, turnovers=2),
+    line(1, 'b', 't1', points=10, rebounds=5, assists=6, steals=0, blocks=2, turnovers=0),
+    line(1, 'c', 't2', points=12, rebounds=8, assists=1, steals=2, blocks=1, turnovers=3),
+    line(2, 'a', 't1', points=8, rebounds=2, assists=2, steals=0, blocks=0, turnovers=1),
+    line(2, 'c', 't2', points=16, rebounds=4, assists=3, steals=1, blocks=1, turnovers=1),
+]
+
+
+def test_metrics_match_per_line_arithmetic():
+    metrics = compute_season_metrics(ROWS)
+    a = metrics.for_player('a')
+    assert a['games_played'] == 2
+    assert a['total_points'] == 28
+    # EFF = pts + reb + ast + stl + blk - tov, averaged over games
+    assert a['eff'] == pytest.approx(((20 + 5 + 4 + 1 - 2) + (8 + 2 + 2 - 1)) / 2)
+    # a scored 20 of t1's 30 in game 1 and all 8 in game 2
+    assert a['pts_share'] == pytest.approx(28 / 38 * 100)
+    assert a['ast_to'] == pytest.approx(6 / 3)
+
+
+def test_ratios_fall_back_to_the_numerator_without_turnovers():
+    b = compute_season_metrics(ROWS).for_player('b')
+    assert b['ast_to'] == 6
+    assert b['stk_to'] == 2
+
+
+def test_leaders_and_rank_agree():
+    metrics = compute_season_metrics(ROWS)
+    leaders = metrics.leaders('eff')
+    assert [pid for pid, _, _ in leaders] == ['b', 'c', 'a']
+    for position, (player_id, _, _) in enumerate(leaders, start=1):
+        assert metrics.rank(player_id, 'eff') == (position, 3)
+
+
+def test_min_games_filters_leaders_and_rank():
+    metrics = compute_season_metrics(ROWS)
+    assert [pid for pid, _, _ in metrics.leaders('eff', min_games=2)] == ['c', 'a']
+    assert metrics.rank('b', 'eff', min_games=2) == (None, 2)
+
+
+def test_empty_season():
+    metrics = compute_season_metrics([])
+    assert len(metrics) == 0
+    assert metrics.leaders('eff') == []
+    assert metrics.for_player('a') is None
+
+
+def test_format_metric():
+    assert format_metric('pts_share', 12.345) == '12.3%'
+    assert format_metric('ast_to', 1.5) == '1.50'
+    assert set(METRICS) >= {'eff', 'gmsc', 'ast_to'}
+
+
+def test_cached_metrics_follow_writes_made_outside_the_bot(monkeypatch):
+    season_id = 'analytics-version-season'
+    fake = FakeSupabase({
+        'seasons': [{'id': season_id, 'stats_version': 0}],
+        'games': [{'id': 1, 'season_id': season_id}, {'id': 2, 'season_id': season_id}],
+        'player_game_stats': ROWS,
+    })
+    monkeypatch.setattr(database, 'get_supabase', lambda: fake)
+    assert get_season_metrics(season_id).for_player('b')['games_played'] == 1
+
+    # The website adds a line: the trigger moves the version, not the bot
+    fake.table('player_game_stats').insert(line(2, 'b', 't1', points=4)).execute()
+    assert fake.tables['seasons'][0]['stats_version'] == 1
+    # Within the TTL the cached version (and metrics) stand
+    assert get_season_metrics(season_id).for_player('b')['games_played'] == 1
+
+    monkeypatch.setattr(database, 'SEASON_VERSION_TTL', 0)
+    assert get_season_metrics(season_id).for_player('b')['games_played'] == 2
@@ -0,0 +1,82 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import api_server
+import database
+
+TEAMS = [{'id': 't1', 'guild_id': '1', 'team_name': 'Buckets', 'team_role_id': '50'},
+         {'id': 't2', 'guild_id': '1', 'team_name': 'Magma Cubes', 'team_role_id': '60'}]
+
+
+@pytest.fixture
+def guild(monkeypatch):
+    members = {i: SimpleNamespace(id=i, display_name=f'P{i}', roles=[]) for i in range(1, 5)}
+    guild = SimpleNamespace(get_member=members.get, get_role=lambda role_id: None, get_channel=lambda c: None,
+                            owner_id=1)
+    monkeypatch.setattr(api_server, 'bot_instance', SimpleNamespace(get_guild=lambda guild_id: guild))
+    monkeypatch.setattr(database, 'get_all_teams', lambda guild_id: TEAMS)
+    # t1 already has two players
+    monkeypatch.setattr(database, 'get_team_rosters', lambda team_ids: [{'team_id': 't1'}, {'team_id': 't1'}])
+    monkeypatch.setattr(database, 'get_users_by_discord_ids',
+                        lambda ids: [{'id': f'discord-{i}', 'team_id': None} for i in ids])
+    written = []
+    monkeypatch.setattr(database, 'set_users_team', lambda user_ids, team_id: written.append((user_ids, team_id)))
+    guild.members = members
+    guild.written = written
+    return guild
+
+
+def signs(*player_ids, team_id='t1'):
+    return [{'op': 'sign', 'player_id': str(p), 'team_id': team_id} for p in player_ids]
+
+
+def test_batch_uses_the_guild_roster_cap(guild, monkeypatch):
+    monkeypatch.setattr(database, 'get_server_config', lambda guild_id: {'roster_cap': 3})
+    result = asyncio.run(api_server.execute_batch(1, 'discord-1', signs(1, 2)))
+    assert not result['success']
+    assert result['errors'] == ['#2 sign P2: roster is full (3/3)']
+    assert guild.written == []
+
+
+def test_batch_falls_back_to_the_default_cap(guild, monkeypatch):
+    monkeypatch.setattr(database, 'get_server_config', lambda guild_id: {'roster_cap': None})
+    result = asyncio.run(api_server.execute_batch(1, 'discord-1', signs(1, 2, 3)))
+    assert result['success'] and result['applied'] == 3
+    assert guild.written == [(['discord-1', 'discord-2', 'discord-3'], 't1')]
+
+
+def test_roster_cap():
+    assert api_server.roster_cap(None) == api_server.ROSTER_CAP
+    assert api_server.roster_cap({'roster_cap': 12}) == 12
+
+
+def test_a_failed_team_write_reports_what_was_applied(guild, monkeypatch):
+    monkeypatch.setattr(database, 'get_server_config', lambda guild_id: {'roster_cap': 10})
+
+    def set_users_team(user_ids, team_id):
+        if team_id == 't2':
+            raise RuntimeError("update on users failed")
+        guild.written.append((user_ids, team_id))
+    monkeypatch.setattr(database, 'set_users_team', set_users_team)
+
+    result = asyncio.run(api_server.execute_batch(1, 'discord-1', signs(1, 2) + signs(3, team_id='t2')))
+    assert not result['success']
+    assert result['applied'] == 2
+    assert (result['applied_teams'], result['failed_teams']) == (['t1'], ['t2'])
+    assert 'Saving Magma Cubes failed' in result['message'] and 'Buckets' in result['message']
+    assert guild.written == [(['discord-1', 'discord-2'], 't1')]
+
+
+def test_members_who_leave_mid_batch_are_skipped(guild, monkeypatch):
+    monkeypatch.setattr(database, 'get_server_config', lambda guild_id: {'roster_cap': 10})
+
+    def set_users_team(user_ids, team_id):
+        guild.written.append((user_ids, team_id))
+        del guild.members[2]
+    monkeypatch.setattr(database, 'set_users_team', set_users_team)
+
+    result = asyncio.run(api_server.execute_batch(1, 'discord-1', signs(1, 2)))
+    assert result['success'] and result['applied'] == 2
+    assert result['warnings'] == ["Couldn't update roles for 2: no longer in the Discord server"]
@@ -0,0 +1,101 @@
+import asyncio
+import hashlib
+import hmac
+import json
+
+import pytest
+
+from utils import api_jobs
+from utils.api_jobs import JobQueue
+
+
+@pytest.fixture
+def stored(monkeypatch):
+    rows = {}
+    monkeypatch.setattr(api_jobs, 'create_api_job', lambda job: rows.__setitem__(job['id'], dict(job)))
+    monkeypatch.setattr(api_jobs, 'update_api_job', lambda job_id, **fields: rows[job_id].update(fields))
+    monkeypatch.setattr(api_jobs, 'get_open_api_jobs', lambda: [r for r in rows.values() if r['status'] in ('queued', 'running')])
+    monkeypatch.setattr(api_jobs, 'get_api_job', lambda job_id: rows.get(job_id))
+    return rows
+
+
+def test_jobs_run_in_order_per_guild_and_in_parallel_across_guilds(stored):
+    events = []
+
+    async def move(payload):
+        events.append(('start', payload['n']))
+        await asyncio.sleep(0.01)
+        events.append(('end', payload['n']))
+        return {'success': payload['n'] != 'a2', 'message': 'done'}
+
+    async def scenario():
+        queue = JobQueue({'move': move}, workers=4)
+        await queue.start()
+        jobs = [await queue.submit('move', 1, {'n': 'a1'}), await queue.submit('move', 1, {'n': 'a2'}),
+                await queue.submit('move', 2, {'n': 'b1'}), await queue.submit('unknown', 2, {'n': 'b2'})]
+        while queue.depth():
+            await asyncio.sleep(0.005)
+        await queue.stop(1)
+        return jobs
+
+    jobs = asyncio.run(scenario())
+    order = [n for kind, n in events]
+    # a2 only starts once a1 finished, b1 overlaps a1
+    assert events.index(('end', 'a1')) < events.index(('start', 'a2'))
+    assert order.index('b1') < order.index('a2')
+    assert [stored[j['id']]['status'] for j in jobs] == ['succeeded', 'failed', 'succeeded', 'failed']
+    assert stored[jobs[3]['id']]['result']['message'] == 'Unknown job kind: unknown'
+
+
+def test_unfinished_jobs_are_picked_up_on_start(stored):
+    stored['j1'] = {'id': 'j1', 'guild_id': '1', 'kind': 'move', 'payload': {}, 'status': 'running', 'attempts': 1}
+    ran = []
+
+    async def move(payload):
+        ran.append(payload)
+        return {'success': True}
+
+    async def scenario():
+        queue = JobQueue({'move': move}, workers=1)
+        await queue.start()
+        while queue.depth():
+            await asyncio.sleep(0.005)
+        await queue.stop(1)
+        assert (await queue.get('j1'))['attempts'] == 2
+        assert await queue.get('not-a-uuid') is None
+
+    asyncio.run(scenario())
+    assert ran == [{}] and stored['j1']['status'] == 'succeeded'
+
+
+def test_webhooks_are_signed_and_retried(monkeypatch):
+    monkeypatch.setenv('API_SECRET_KEY', 'secret')
+    sleep = asyncio.sleep
+    # No real backoff between attempts
+    monkeypatch.setattr(api_jobs.asyncio, 'sleep', lambda seconds: sleep(0))
+    posts = []
+
+    class Response:
+        def __init__(self, status):
+            self.status = status
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+    class Session:
+        def post(self, url, data, headers):
+            posts.append((url, data, headers))
+            return Response(503 if len(posts) == 1 else 200)
+
+    queue = JobQueue({})
+    monkeypatch.setattr(queue, '_session', lambda: Session())
+    job = {'id': 'j1', 'kind': 'sign', 'status': 'succeeded', 'webhook_url': 'https://example.com/hook'}
+    asyncio.run(queue._notify(job))
+
+    assert len(posts) == 2
+    url, body, headers = posts[-1]
+    assert json.loads(body)['job_id'] == 'j1'
+    assert headers['X-Signature'] == 'sha256=' + hmac.new(b'secret', body, hashlib.sha256).hexdigest()
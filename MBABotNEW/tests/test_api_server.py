@@ -0,0 +1,56 @@
+import asyncio
+from types import SimpleNamespace
+
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+import api_server
+
+
+def serve(app: web.Application, scenario):
+    async def run():
+        async with TestClient(TestServer(app)) as client:
+            await scenario(client)
+
+    asyncio.run(run())
+
+
+def test_health_auth_and_readiness(monkeypatch):
+    monkeypatch.setattr(api_server, 'bot_instance', SimpleNamespace(is_ready=lambda: False))
+    monkeypatch.delenv('API_SECRET_KEY', raising=False)
+
+    async def scenario(client):
+        health = await client.get('/health')
+        assert await health.json() == {'status': 'ok', 'bot_ready': False, 'jobs_queued': 0}
+        # No key configured means nobody is authorized
+        unset = await client.post('/api/transaction/sign', json={})
+        assert unset.status == 401
+
+        monkeypatch.setenv('API_SECRET_KEY', 'secret')
+        wrong = await client.post('/api/transaction/sign', json={}, headers={'X-API-Key': 'nope'})
+        assert wrong.status == 401
+        not_ready = await client.post('/api/transaction/sign', json={}, headers={'X-API-Key': 'secret'})
+        assert not_ready.status == 503
+
+    serve(api_server.create_app(), scenario)
+
+
+def test_limit_sheds_load_past_the_queue():
+    release = asyncio.Event()
+
+    async def slow(request):
+        await release.wait()
+        return web.json_response({'ok': True})
+
+    async def scenario(client):
+        # One running, one waiting, the third is turned away
+        running = [asyncio.create_task(client.get('/slow')) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        busy = await client.get('/slow')
+        assert busy.status == 503 and busy.headers['Retry-After'] == '1'
+        release.set()
+        assert [r.status for r in await asyncio.gather(*running)] == [200, 200]
+
+    app = web.Application(middlewares=[api_server.create_limit_middleware(max_concurrency=1, max_pending=1)])
+    app.router.add_get('/slow', slow)
+    serve(app, scenario)
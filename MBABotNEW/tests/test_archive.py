@@ -0,0 +1,81 @@
+import random
+
+import pytest
+
+import database
+from fake_supabase import FakeSupabase
+from utils.archive import archive_season, get_archive, discard_archive, archive_exists
+
+SEASON = {'id': 'season-archived', 'guild_id': '1', 'season_name': 'S1'}
+TEAMS = [{'id': 't1', 'guild_id': '1', 'team_name': 'Buckets'}, {'id': 't2', 'guild_id': '1', 'team_name': 'Cubes'}]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    rng = random.Random(5)
+    fake = FakeSupabase({'teams': TEAMS})
+    for i in range(15):
+        game = fake.add('games', {
+            'season_id': SEASON['id'], 'guild_id': '1', 'team1_id': 't1', 'team2_id': 't2',
+            'team1_score': rng.randint(10, 30), 'team2_score': rng.randint(10, 30),
+            'played_at': f'2026-02-{1 + i:02d}T20:00:00'
+        })
+        for player in ('p1', 'p2', 'p3'):
+            fake.add('player_game_stats', {'game_id': game['id'], 'player_id': player, 'team_id': 't1',
+                                           'points': rng.randint(0, 20), 'rebounds': 1})
+    for player in ('p1', 'p2', 'p3', 'p4'):
+        fake.add('player_season_stats', {
+            'player_id': player, 'season_id': SEASON['id'], 'guild_id': '1',
+            'games_played': 0 if player == 'p4' else 15, 'total_points': rng.choice([100, 150]),
+            'total_rebounds': 15
+        })
+    monkeypatch.setattr(database, 'get_supabase', lambda: fake)
+    return fake
+
+
+def test_archive_serves_the_same_pages_as_the_live_tables(client, tmp_path):
+    archive = archive_season(SEASON, directory=str(tmp_path))
+    try:
+        live = database.get_leaderboard(1, SEASON['id'], 'points', limit=10)
+        archived = archive.leaderboard('points')
+        assert [(r['player_id'], r['total_points']) for r in archived] == \
+            [(r['player_id'], r['total_points']) for r in live]
+
+        games = archive.games(limit=20)
+        assert [g['played_at'] for g in games] == sorted((g['played_at'] for g in games), reverse=True)
+        assert games[0]['team1']['team_name'] == 'Buckets'
+        assert archive.games(offset=10, limit=10, team_id='t2')[0]['id'] == games[10]['id']
+
+        assert len(archive.game_stat_rows()) == 45
+        assert archive.player_stats('p4')['games_played'] == 0
+        assert archive.player_stats('nobody') is None
+    finally:
+        discard_archive(SEASON['id'], directory=str(tmp_path))
+    assert get_archive(SEASON['id'], directory=str(tmp_path)) is None
+
+
+@pytest.fixture
+def discards(tmp_path, monkeypatch):
+    """Point the database module at a temporary archive directory, recording each discard"""
+    calls = []
+
+    def discard(season_id):
+        calls.append(season_id)
+        discard_archive(season_id, directory=str(tmp_path))
+    monkeypatch.setattr(database, 'discard_archive', discard)
+    monkeypatch.setattr(database, 'archive_exists',
+                        lambda season_id: archive_exists(season_id, directory=str(tmp_path)))
+    return calls
+
+
+def test_a_stat_write_discards_the_archive(client, tmp_path, discards):
+    archive_season(SEASON, directory=str(tmp_path))
+    assert get_archive(SEASON['id'], directory=str(tmp_path)) is not None
+    database.bump_season_version(SEASON['id'])
+    assert get_archive(SEASON['id'], directory=str(tmp_path)) is None
+    assert discards == [SEASON['id']]
+
+
+def test_writes_to_unarchived_seasons_leave_the_archives_alone(client, discards):
+    database.bump_season_version('season-live')
+    assert discards == []
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from utils.cards import CardCache, CardRenderer, card_digest, inputs_digest, player_card
+
+PNG_MAGIC = b'\x89PNG\r\n\x1a\n'
+
+STATS = {'games_played': 2, 'total_points': 30, 'total_rebounds': 8, 'total_assists': 4,
+         'total_steals': 2, 'total_blocks': 1}
+
+
+def card_for(name: str, team: str) -> dict:
+    return player_card(name, 'S1', team, (200, 30, 30), STATS, [{'points': 12}, {'points': 18}])
+
+
+@pytest.fixture
+def renderer(tmp_path):
+    renderer = CardRenderer(CardCache(directory=str(tmp_path)), max_workers=1)
+    yield renderer
+    renderer.shutdown()
+
+
+def test_renders_in_a_spawned_pool_and_serves_repeats_from_the_index(renderer):
+    builds = []
+
+    async def build():
+        builds.append(1)
+        return card_for('Steve', 'Buckets')
+
+    async def view():
+        key = ('player', '1', 's1', 3, inputs_digest('Steve', 'Buckets'))
+        return await renderer.get_card(key, build), await renderer.get_card(key, build)
+
+    first, second = asyncio.run(view())
+    assert first.startswith(PNG_MAGIC)
+    assert first == second
+    assert len(builds) == 1
+    assert renderer._executor._mp_context.get_start_method() == 'spawn'
+
+
+def test_changed_inputs_miss_the_index(renderer):
+    team = {'name': 'Buckets'}
+
+    async def build():
+        return card_for('Steve', team['name'])
+
+    async def view():
+        return await renderer.get_card(('player', '1', 's1', 3, inputs_digest('Steve', team['name'])), build)
+
+    before = asyncio.run(view())
+    # A trade changes the card without any stat write bumping the version
+    team['name'] = 'Magma Cubes'
+    after = asyncio.run(view())
+    assert before != after
+
+
+def test_digest_covers_everything_drawn():
+    assert card_digest(card_for('Steve', 'Buckets')) == card_digest(card_for('Steve', 'Buckets'))
+    assert card_digest(card_for('Steve', 'Buckets')) != card_digest(card_for('Steve', None))
+    assert inputs_digest('a', (1, 2, 3)) != inputs_digest('a', (1, 2, 4))
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    cache = CardCache(directory=str(tmp_path), max_disk_bytes=250, max_memory_items=1)
+    for digest in ('a', 'b', 'c'):
+        cache.put(digest, b'x' * 100)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['b.png', 'c.png']
+    assert cache.get('a') is None
+    # A fresh cache picks the files up again
+    assert CardCache(directory=str(tmp_path)).get('b') == b'x' * 100
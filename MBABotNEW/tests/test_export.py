@@ -0,0 +1,66 @@
+import csv
+import io
+import os
+import zipfile
+
+import pytest
+
+import database
+from fake_supabase import FakeSupabase
+from utils.export import export_season, EXPORT_TABLES
+
+SEASON = 'season-1'
+
+
+@pytest.fixture
+def client(monkeypatch):
+    fake = FakeSupabase()
+    for game_id in range(1, 8):
+        fake.add('games', {
+            'id': game_id, 'guild_id': '1', 'season_id': SEASON, 'team1_id': 't1', 'team2_id': 't2',
+            'team1_score': 20 + game_id, 'team2_score': 15, 'winner_id': 't1',
+            'played_at': f'2026-01-0{game_id}T00:00:00', 'recorded_by': '99'
+        })
+        for player in ('p1', 'p2'):
+            fake.add('player_game_stats', {
+                'game_id': game_id, 'player_id': player, 'team_id': 't1', 'points': game_id,
+                'rebounds': 1, 'assists': 2, 'steals': 0, 'blocks': 0, 'turnovers': 1
+            })
+    # Another season's rows stay out of the export
+    fake.add('games', {'id': 100, 'season_id': 'season-2', 'team1_score': 1, 'team2_score': 0})
+    fake.add('player_game_stats', {'game_id': 100, 'player_id': 'p1', 'points': 50})
+    for player in ('p1', 'p2'):
+        fake.add('player_season_stats', {
+            'player_id': player, 'season_id': SEASON, 'guild_id': '1', 'games_played': 7, 'total_points': 28
+        })
+    monkeypatch.setattr(database, 'get_supabase', lambda: fake)
+    return fake
+
+
+def read_tables(path: str) -> dict:
+    with zipfile.ZipFile(path) as archive:
+        return {
+            name[:-len('.csv')]: list(csv.DictReader(io.TextIOWrapper(archive.open(name), encoding='utf-8')))
+            for name in archive.namelist()
+        }
+
+
+def test_csv_export_pages_through_every_row(client, tmp_path):
+    # A page size smaller than the tables makes every table take several seeks
+    path, stats = export_season(SEASON, 'csv', page_size=3, directory=str(tmp_path))
+    try:
+        tables = read_tables(path)
+    finally:
+        os.remove(path)
+
+    assert set(tables) == set(EXPORT_TABLES)
+    assert stats['tables'] == {'games': 7, 'player_game_stats': 14, 'player_season_stats': 2}
+    assert stats['rows'] == 23
+    assert [int(row['team1_score']) for row in tables['games']] == [21, 22, 23, 24, 25, 26, 27]
+    assert sum(int(row['points']) for row in tables['player_game_stats']) == 2 * sum(range(1, 8))
+    assert list(tables['player_season_stats'][0]) == EXPORT_TABLES['player_season_stats'][0] + EXPORT_TABLES['player_season_stats'][1]
+
+
+def test_unknown_format_is_rejected(client):
+    with pytest.raises(ValueError):
+        export_season(SEASON, 'xlsx')
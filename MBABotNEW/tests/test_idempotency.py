@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from api_server import create_idempotency_middleware
+from utils.idempotency import IdempotencyConflict, IdempotencyStore
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_replay_conflict_and_single_flight():
+    runs = []
+
+    async def call():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        return len(runs)
+
+    async def scenario():
+        store = IdempotencyStore()
+        (first, replayed_first), (second, replayed_second) = await asyncio.gather(
+            store.run('k', 'body', call), store.run('k', 'body', call))
+        assert (first, second) == (1, 1)
+        assert (replayed_first, replayed_second) == (False, True)
+        assert await store.run('k', 'body', call) == (1, True)
+        with pytest.raises(IdempotencyConflict):
+            await store.run('k', 'other body', call)
+        assert (store.calls, store.replays) == (1, 2)
+
+    asyncio.run(scenario())
+
+
+def test_failures_and_unkept_results_run_again():
+    async def scenario():
+        store = IdempotencyStore()
+
+        async def broken():
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            await store.run('k', 'body', broken)
+        assert len(store) == 0
+
+        async def unavailable():
+            return 503
+
+        await store.run('k', 'body', unavailable, keep=lambda status: status < 500)
+        assert len(store) == 0
+
+    asyncio.run(scenario())
+
+
+def test_keys_expire_and_are_capped():
+    clock = Clock()
+
+    async def call():
+        return 'ok'
+
+    async def scenario():
+        store = IdempotencyStore(ttl=60, max_keys=2, clock=clock)
+        await store.run('a', 'x', call)
+        clock.now = 30
+        await store.run('b', 'x', call)
+        await store.run('c', 'x', call)
+        # The oldest key made room
+        assert list(store._entries) == ['b', 'c']
+        clock.now = 100
+        await store.run('d', 'x', call)
+        assert list(store._entries) == ['d']
+
+    asyncio.run(scenario())
+
+
+def test_middleware_replays_and_rejects_reused_keys(monkeypatch):
+    monkeypatch.setenv('API_SECRET_KEY', 'secret')
+    handled = []
+
+    async def handler(request):
+        handled.append(await request.json())
+        return web.json_response({'job_id': len(handled)}, status=202)
+
+    async def scenario():
+        app = web.Application(middlewares=[create_idempotency_middleware(IdempotencyStore())])
+        app.router.add_post('/api/sign', handler)
+        async with TestClient(TestServer(app)) as client:
+            headers = {'X-API-Key': 'secret', 'Idempotency-Key': 'abc'}
+            first = await client.post('/api/sign', json={'player': 1}, headers=headers)
+            retry = await client.post('/api/sign', json={'player': 1}, headers=headers)
+            assert (first.status, await first.json()) == (202, {'job_id': 1})
+            assert (retry.status, await retry.json()) == (202, {'job_id': 1})
+            assert retry.headers['Idempotent-Replayed'] == 'true'
+
+            reused = await client.post('/api/sign', json={'player': 2}, headers=headers)
+            assert reused.status == 422
+
+            # Without a valid API key the store is never consulted
+            await client.post('/api/sign', json={'player': 1}, headers={'Idempotency-Key': 'abc'})
+
+    asyncio.run(scenario())
+    assert handled == [{'player': 1}, {'player': 1}]
@@ -0,0 +1,181 @@
+import pytest
+
+import database
+from fake_supabase import FakeSupabase, Query
+from utils.importer import (
+    build_team_directory, build_player_directory, parse_box_scores, import_box_scores, MAX_ERRORS
+)
+
+HEADER = 'game,played_at,team1,team2,team1_score,team2_score,player,team,points,rebounds,assists,steals,blocks,turnovers\n'
+
+TEAMS = [
+    {'id': 't1', 'team_name': 'Buckets', 'team_role_id': '111', 'guild_id': '1', 'conference': 'Desert'},
+    {'id': 't2', 'team_name': 'Magma Cubes', 'team_role_id': '222', 'guild_id': '1', 'conference': 'Plains'},
+]
+USERS = [
+    {'id': 'discord-1001', 'username': 'steve', 'display_name': 'Steve', 'minecraft_username': 'SteveMC'},
+    {'id': 'discord-1002', 'username': 'alex', 'display_name': 'Alex', 'minecraft_username': None},
+    # Two users share a display name, so it can't be used to pick one
+    {'id': 'discord-1003', 'username': 'sam1', 'display_name': 'Sam', 'minecraft_username': None},
+    {'id': 'discord-1004', 'username': 'sam2', 'display_name': 'Sam', 'minecraft_username': None},
+]
+
+
+def parse(body: str):
+    return parse_box_scores(HEADER + body, build_team_directory(TEAMS), build_player_directory(USERS))
+
+
+def test_valid_file_groups_lines_by_game():
+    games, errors = parse(
+        'g1,2026-01-05,Buckets,Magma Cubes,21,18,steve,Buckets,10,3,2,1,0,1\n'
+        'g1,2026-01-05,Buckets,Magma Cubes,21,18,<@1002>,Magma Cubes,8,,,,,\n'
+        'g2,,222,t1,15,21,,,,,,,,\n'
+    )
+    assert errors == []
+    assert [g['key'] for g in games] == ['g1', 'g2']
+    assert games[0]['played_at'] == '2026-01-05T00:00:00'
+    assert [line['player_id'] for line in games[0]['lines']] == ['1001', '1002']
+    assert games[0]['lines'][1]['rebounds'] == 0
+    # Teams resolve by name, role ID or ID
+    assert (games[1]['team1_id'], games[1]['team2_id']) == ('t2', 't1')
+    assert games[1]['lines'] == []
+
+
+@pytest.mark.parametrize('body, message', [
+    ('g1,,Buckets,Nobody,21,18,,,,,,,,\n', "unknown team2 'Nobody'"),
+    ('g1,,Buckets,Buckets,21,18,,,,,,,,\n', "a team can't play itself"),
+    ('g1,,Buckets,Magma Cubes,21,x,,,,,,,,\n', "team2_score must be a whole number"),
+    ('g1,,Buckets,Magma Cubes,21,18,steve,Buckets,-3,,,,,\n', "points can't be negative"),
+    ('g1,yesterday,Buckets,Magma Cubes,21,18,,,,,,,,\n', "played_at must be an ISO date"),
+    ('g1,,Buckets,Magma Cubes,21,18,Sam,Buckets,1,,,,,\n', "matches more than one user"),
+    ('g1,,Buckets,Magma Cubes,21,18,herobrine,Buckets,1,,,,,\n', "unknown player 'herobrine'"),
+    ('g1,,Buckets,Magma Cubes,21,18,steve,Buckets,1,,,,,\n'
+     'g1,,Buckets,Magma Cubes,21,18,steve,Buckets,2,,,,,\n', "appears twice in game 'g1'"),
+    ('g1,,Buckets,Magma Cubes,21,18,,,,,,,,\n'
+     'g1,,Buckets,Magma Cubes,21,19,,,,,,,,\n', "different teams or score"),
+    (',,Buckets,Magma Cubes,21,18,,,,,,,,\n', "game is required"),
+])
+def test_validation_errors_name_the_row(body, message):
+    _, errors = parse(body)
+    assert len(errors) == 1
+    assert errors[0].startswith('Row ')
+    assert message in errors[0]
+
+
+def test_missing_columns_are_reported_before_any_row():
+    games, errors = parse_box_scores('game,team1,team2\ng1,t1,t2\n', build_team_directory(TEAMS), {})
+    assert games == []
+    assert errors == ['Missing column(s): team1_score, team2_score, player, team']
+
+
+def test_empty_file_is_an_error():
+    assert parse('') == ([], ['The file has no games'])
+
+
+def test_error_report_is_capped():
+    _, errors = parse('g1,,Nobody,Magma Cubes,21,18,,,,,,,,\n' * (MAX_ERRORS * 2))
+    assert len(errors) == MAX_ERRORS
+
+
+def test_import_writes_games_and_rebuilds_aggregates(monkeypatch):
+    client = FakeSupabase({'teams': TEAMS})
+    # A player left over from an earlier import with no lines any more
+    client.add('player_season_stats', {'player_id': '9999', 'season_id': 's1', 'guild_id': '1', 'games_played': 3})
+    monkeypatch.setattr(database, 'get_supabase', lambda: client)
+
+    games, errors = parse(
+        'g1,2026-01-05,Buckets,Magma Cubes,21,18,steve,Buckets,10,3,2,1,0,1\n'
+        'g1,2026-01-05,Buckets,Magma Cubes,21,18,alex,Magma Cubes,8,,,,,\n'
+        'g2,2026-01-06,Magma Cubes,Buckets,21,15,steve,Buckets,6,,,,,\n'
+    )
+    assert errors == []
+    counts = import_box_scores(1, 's1', games, recorded_by=42)
+    assert counts == {'games': 2, 'skipped': 0, 'lines': 3, 'players': 2, 'teams': 2}
+
+    season_stats = {row['player_id']: row for row in client.tables['player_season_stats']}
+    assert set(season_stats) == {'1001', '1002'}
+    assert (season_stats['1001']['games_played'], season_stats['1001']['total_points']) == (2, 16)
+
+    standings = {row['team_id']: row for row in client.tables['team_season_standings']}
+    assert (standings['t1']['wins'], standings['t1']['losses']) == (1, 1)
+    assert standings['t2']['last_results'] == 'LW'
+
+
+def test_rebuild_keeps_existing_rows_when_the_write_fails(monkeypatch):
+    client = FakeSupabase()
+    client.add('games', {'id': 1, 'season_id': 's1'})
+    client.add('player_game_stats', {'game_id': 1, 'player_id': '1001', 'points': 12})
+    client.add('player_season_stats', {'player_id': '1001', 'season_id': 's1', 'guild_id': '1',
+                                       'games_played': 1, 'total_points': 10})
+    monkeypatch.setattr(database, 'get_supabase', lambda: client)
+
+    client.fail_on = {('player_season_stats', 'upsert')}
+    with pytest.raises(RuntimeError):
+        database.rebuild_player_season_stats(1, 's1')
+    assert [row['total_points'] for row in client.tables['player_season_stats']] == [10]
+
+    client.fail_on = set()
+    database.rebuild_player_season_stats(1, 's1')
+    assert [row['total_points'] for row in client.tables['player_season_stats']] == [12]
+
+
+IMPORT = (
+    'g1,2026-01-05,Buckets,Magma Cubes,21,18,steve,Buckets,10,3,2,1,0,1\n'
+    'g1,2026-01-05,Buckets,Magma Cubes,21,18,alex,Magma Cubes,8,,,,,\n'
+    'g2,2026-01-06,Magma Cubes,Buckets,21,15,steve,Buckets,6,,,,,\n'
+)
+
+
+def test_failed_line_insert_removes_the_games_it_added(monkeypatch):
+    client = FakeSupabase({'teams': TEAMS})
+    monkeypatch.setattr(database, 'get_supabase', lambda: client)
+    games, _ = parse(IMPORT)
+
+    client.fail_on = {('player_game_stats', 'upsert')}
+    with pytest.raises(RuntimeError):
+        import_box_scores(1, 's1', games)
+    assert client.tables['games'] == []
+    assert client.tables.get('player_season_stats', []) == []
+
+    # Nothing was left behind, so the same file goes in cleanly
+    client.fail_on = set()
+    assert import_box_scores(1, 's1', games)['games'] == 2
+
+
+def test_failed_game_batch_removes_earlier_batches(monkeypatch):
+    client = FakeSupabase({'teams': TEAMS})
+    monkeypatch.setattr(database, 'get_supabase', lambda: client)
+    rows = [{'season_id': 's1', 'notes': f'Imported (g{i})'} for i in range(5)]
+
+    # The third batch fails
+    inserts = []
+    execute = Query.execute
+
+    def failing_execute(query):
+        if (query.table, query.action) == ('games', 'insert'):
+            inserts.append(len(query.payload))
+            if len(inserts) == 3:
+                raise RuntimeError("insert on games failed")
+        return execute(query)
+    monkeypatch.setattr(Query, 'execute', failing_execute)
+
+    with pytest.raises(RuntimeError):
+        database.insert_games_bulk(rows, batch_size=2)
+    assert inserts == [2, 2, 1]
+    assert client.tables['games'] == []
+
+
+def test_rerunning_an_import_skips_games_already_in_the_season(monkeypatch):
+    client = FakeSupabase({'teams': TEAMS})
+    monkeypatch.setattr(database, 'get_supabase', lambda: client)
+    games, _ = parse(IMPORT)
+    import_box_scores(1, 's1', games[:1])
+
+    counts = import_box_scores(1, 's1', games)
+    assert (counts['games'], counts['skipped'], counts['lines']) == (1, 1, 1)
+    assert sorted(row['notes'] for row in client.tables['games']) == ['Imported (g1)', 'Imported (g2)']
+    season_stats = {row['player_id']: row for row in client.tables['player_season_stats']}
+    assert season_stats['1001']['games_played'] == 2
+
+    # Keys are per season
+    assert import_box_scores(1, 's2', games)['skipped'] == 0
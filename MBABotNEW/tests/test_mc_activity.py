@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+import database
+from fake_supabase import FakeSupabase
+from utils.mc_activity import ActivityRecorder, ActivityRing, rows_to_arrays, summarize_activity
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+
+def test_ring_keeps_the_last_lap():
+    ring = ActivityRing(capacity=4)
+    for i in range(6):
+        ring.append(i, i, [f'p{i}'])
+    slots, mark = ring.pending()
+    assert ring.times[slots].tolist() == [2, 3, 4, 5]
+    assert mark == 6
+
+
+def test_flush_advances_only_after_the_insert_lands():
+    recorder = ActivityRecorder(capacity=16)
+    recorder.record({'address': 'a', 'online': True, 'players_online': 2, 'players': ['x', 'y']})
+    recorder.record({'address': 'a', 'online': False})
+
+    def failing(rows):
+        raise OSError("down")
+
+    with pytest.raises(OSError):
+        recorder.flush(failing)
+    written = []
+    assert recorder.flush(written.extend) == 2
+    assert [(r['players_online'], r['players']) for r in written] == [(2, ['x', 'y']), (0, [])]
+    assert recorder.flush(written.extend) == 0
+    times, counts, names = recorder.unflushed('a')
+    assert len(times) == 0 and recorder.unflushed('b')[2] == []
+
+
+def test_summary_by_hour_and_day():
+    times = np.array([0, 10, HOUR, DAY + HOUR, DAY + 2 * HOUR, 3 * DAY])
+    counts = np.array([2, 4, 1, 3, 0, 1])
+    names = [('A', 'b'), ('a', 'B', 'c', 'd'), ('a',), ('C', 'e', 'f'), (), ('a',)]
+    summary = summarize_activity(times, counts, names)
+    assert summary['samples'] == 6
+    assert summary['hourly_avg'][:3] == [pytest.approx(7 / 3), 2.0, 0.0]
+    assert summary['hourly_peak'][:2] == [4, 3]
+    assert summary['peak_hours'] == [0, 1, 2]
+    # The day without probes still shows, as zero
+    assert summary['daily_unique'] == [4, 3, 0, 1]
+    assert summary['unique_players'] == 6
+
+    shifted = summarize_activity(times, counts, names, utc_offset=-1)
+    assert shifted['hourly_peak'][23] == 4
+
+
+def test_rows_round_trip():
+    rows = [{'sampled_at': '1970-01-02T00:00:00+00:00', 'players_online': 1, 'players': ['a']}]
+    times, counts, names = rows_to_arrays(rows)
+    assert (times.tolist(), counts.tolist(), names) == ([DAY], [1], [('a',)])
+
+
+def test_paging_keeps_samples_that_share_a_timestamp(monkeypatch):
+    client = FakeSupabase()
+    monkeypatch.setattr(database, 'get_supabase', lambda: client)
+    # Samples from one probe cycle share a timestamp, and with pages of
+    # three a page boundary falls inside most groups of five
+    for minute in range(4):
+        for i in range(5):
+            client.add('mc_activity', {'server_address': 'a', 'sampled_at': f'2026-01-01T00:0{minute}:00+00:00',
+                                       'players_online': i, 'players': []})
+        client.add('mc_activity', {'server_address': 'b', 'sampled_at': f'2026-01-01T00:0{minute}:00+00:00',
+                                   'players_online': 0, 'players': []})
+
+    rows = database.get_mc_activity('a', '2026-01-01T00:01:00+00:00', page_size=3)
+    expected = [r['id'] for r in client.tables['mc_activity']
+                if r['server_address'] == 'a' and r['sampled_at'] >= '2026-01-01T00:01:00+00:00']
+    assert [r['id'] for r in rows] == expected
+    assert len(rows) == 15
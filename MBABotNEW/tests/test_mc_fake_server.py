@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+
+from utils import mc_status
+from utils.mc_fake_server import FakeMinecraftServer, offline_uuid
+from utils.mc_identity import IdentityResolver
+
+
+@pytest.fixture
+def resolver(monkeypatch):
+    resolver = IdentityResolver(upstream=object(), path=None)
+    monkeypatch.setattr(mc_status, 'get_resolver', lambda: resolver)
+    monkeypatch.setattr(mc_status, 'CONNECT_TIMEOUT', 0.5)
+    monkeypatch.setattr(mc_status, 'READ_TIMEOUT', 0.5)
+    mc_status._resolved.clear()
+    yield resolver
+    mc_status._resolved.clear()
+
+
+def probe(server: FakeMinecraftServer, mode: str = None) -> dict:
+    async def scenario():
+        await server.start()
+        try:
+            if mode:
+                await server.set_mode(mode)
+            return await mc_status.probe_server(server.address)
+        finally:
+            await server.stop()
+
+    return asyncio.run(scenario())
+
+
+def test_probe_reads_the_status_sample(resolver):
+    server = FakeMinecraftServer(players=['Steve', 'Alex'], motd='Park')
+    result = probe(server)
+    assert result['online'] and result['players'] == ['Steve', 'Alex']
+    assert (result['players_online'], result['players_max']) == (2, 20)
+    assert result['motd'].startswith('Park')
+    # The sample's UUIDs feed the name cache
+    assert resolver.cached_uuid('steve') == offline_uuid('Steve')
+
+
+def test_probe_falls_back_to_query_without_a_sample(resolver):
+    server = FakeMinecraftServer(players=['Steve', 'Alex'], sample=False)
+    assert probe(server)['players'] == ['Steve', 'Alex']
+    assert server.query_requests == 1
+
+
+@pytest.mark.parametrize('mode', ['hang', 'refuse'])
+def test_unreachable_servers_probe_offline(resolver, mode):
+    result = probe(FakeMinecraftServer(players=['Steve']), mode)
+    assert result['online'] is False
+    assert 'players' not in result
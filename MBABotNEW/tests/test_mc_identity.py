@@ -0,0 +1,94 @@
+import asyncio
+
+from utils.mc_identity import IdentityResolver, dashed_uuid
+
+STEVE = '8667ba71-b85a-4004-af54-457a9734eed7'
+
+
+class FakeUpstream:
+    """Answers like Mojang from a fixed name table and counts requests"""
+
+    def __init__(self, players: dict):
+        self.players = players
+        self.batches = []
+        self.fail = False
+
+    async def names_to_profiles(self, names):
+        self.batches.append(list(names))
+        await asyncio.sleep(0)
+        if self.fail:
+            raise OSError("unreachable")
+        return {n: (uuid, n.title()) for n, uuid in self.players.items() if n in names}
+
+    async def uuid_to_name(self, uuid):
+        names = [n.title() for n, u in self.players.items() if u == uuid]
+        return names[0] if names else None
+
+
+def test_dashed_uuid():
+    assert dashed_uuid(STEVE.replace('-', '').upper()) == STEVE
+    assert dashed_uuid('not-a-uuid') == 'not-a-uuid'
+
+
+def test_concurrent_lookups_share_one_request_and_misses_are_cached():
+    upstream = FakeUpstream({'steve': STEVE})
+    resolver = IdentityResolver(upstream, path=None)
+
+    async def scenario():
+        first, second = await asyncio.gather(resolver.resolve_name('Steve'), resolver.resolve_name(' steve '))
+        assert first == second == STEVE
+        assert await resolver.resolve_name('typo') is None
+        assert await resolver.resolve_name('typo') is None
+        assert await resolver.resolve_uuid(STEVE) == 'Steve'
+
+    asyncio.run(scenario())
+    assert upstream.batches == [['steve'], ['typo']]
+
+
+def test_names_are_batched_and_expired_entries_survive_an_outage():
+    players = {f'p{i}': dashed_uuid(f'{i:032x}') for i in range(25)}
+    upstream = FakeUpstream(players)
+    resolver = IdentityResolver(upstream, path=None, ttl=0)
+
+    resolved = asyncio.run(resolver.resolve_names(list(players)))
+    assert resolved == players
+    assert sorted(len(b) for b in upstream.batches) == [5, 10, 10]
+
+    upstream.fail = True
+    assert asyncio.run(resolver.resolve_name('p3')) == players['p3']
+
+
+def test_cache_persists_across_resolvers(tmp_path):
+    path = str(tmp_path / 'profiles.json')
+    resolver = IdentityResolver(FakeUpstream({'steve': STEVE}), path=path)
+    asyncio.run(resolver.resolve_name('Steve'))
+
+    reloaded = IdentityResolver(FakeUpstream({}), path=path)
+    assert reloaded.cached_uuid('STEVE') == STEVE
+    assert reloaded.cached_name(STEVE) == 'Steve'
+
+
+def test_flush_writes_off_the_loop_only_when_changed(tmp_path, monkeypatch):
+    import utils.mc_identity as mc_identity
+
+    path = tmp_path / 'missing' / 'profiles.json'
+    resolver = IdentityResolver(FakeUpstream({}), path=str(path))
+    threaded = []
+    to_thread = asyncio.to_thread
+
+    async def spy(func, *args):
+        threaded.append(func.__name__)
+        return await to_thread(func, *args)
+
+    monkeypatch.setattr(mc_identity.asyncio, 'to_thread', spy)
+    resolver.observe(STEVE, 'Steve')
+
+    # A failed write leaves the cache dirty for the next flush
+    asyncio.run(resolver.flush())
+    assert resolver._dirty and threaded == ['_write']
+
+    path.parent.mkdir()
+    asyncio.run(resolver.flush())
+    asyncio.run(resolver.flush())
+    assert not resolver._dirty and threaded == ['_write', '_write']
+    assert IdentityResolver(FakeUpstream({}), path=str(path)).cached_uuid('steve') == STEVE
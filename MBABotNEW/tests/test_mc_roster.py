@@ -0,0 +1,56 @@
+from utils import mc_roster
+from utils.mc_roster import RosterIndex, discord_id_from_user, team_label
+
+TEAMS = [
+    {'id': 't1', 'guild_id': '1', 'team_name': 'Buckets', 'team_logo_emoji': '🪣'},
+    {'id': 't2', 'guild_id': '1', 'team_name': 'Cubes'},
+    {'id': 't3', 'guild_id': '2', 'team_name': 'Elsewhere'},
+]
+USERS = [
+    {'id': 'discord-10', 'team_id': 't1', 'minecraft_username': 'SiteSteve'},
+    {'id': '11', 'team_id': 't2'},
+    {'id': '12', 'team_id': 't1'},
+    {'id': '13', 'team_id': 't3'},
+]
+LINKS = [
+    {'guild_id': '1', 'user_id': '11', 'minecraft_username': 'Alex'},
+    {'guild_id': '1', 'user_id': '12', 'minecraft_username': 'Notch'},
+    {'guild_id': '1', 'user_id': '13', 'minecraft_username': 'Jeb'},
+]
+
+
+def test_helpers():
+    assert discord_id_from_user('discord-10') == '10'
+    assert discord_id_from_user(10) == '10'
+    assert team_label(TEAMS[0]) == '🪣 Buckets'
+    assert team_label({}) == 'Unknown'
+
+
+def test_groups_online_players_by_guild_team():
+    index = RosterIndex(LINKS, USERS, TEAMS)
+    teams, others = index.group_online(1, ['sitesteve', 'ALEX', 'Notch', 'Jeb', 'Herobrine'])
+    assert teams == [('🪣 Buckets', ['sitesteve', 'Notch']), ('Cubes', ['ALEX'])]
+    # Jeb's team belongs to another guild
+    assert others == ['Jeb', 'Herobrine']
+
+
+def test_links_and_moves_update_single_entries():
+    index = RosterIndex(LINKS, USERS, TEAMS)
+    index.link(1, 11, 'Alex2')
+    assert index.team_of(1, 'alex') is None
+    assert index.team_of(1, 'alex2') == 'Cubes'
+    index.set_team(11, 't1')
+    assert index.team_of(1, 'Alex2') == '🪣 Buckets'
+    index.set_team(11, None)
+    assert index.team_of(1, 'Alex2') is None
+
+
+def test_shared_index_ignores_writes_until_loaded(monkeypatch):
+    monkeypatch.setattr(mc_roster, '_index', None)
+    mc_roster.apply_roster_move('11', 't1')
+    assert mc_roster.get_roster_index() is None
+    index = mc_roster.load_roster_index(LINKS, USERS, TEAMS)
+    mc_roster.apply_minecraft_link('1', '12', 'Dinnerbone')
+    mc_roster.apply_roster_move('12', 't2')
+    assert mc_roster.get_roster_index() is index
+    assert index.team_of('1', 'dinnerbone') == 'Cubes'
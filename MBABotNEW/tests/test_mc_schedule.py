@@ -0,0 +1,107 @@
+import asyncio
+from types import SimpleNamespace
+
+import discord
+
+from utils import mc_schedule
+from utils.mc_schedule import PollScheduler, gametime_near, parse_gametime, poll_bounds
+
+ONLINE = {'online': True, 'players_online': 0}
+BUSY = {'online': True, 'players_online': 3}
+OFFLINE = {'online': False}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_offline_servers_back_off_up_to_the_ceiling():
+    scheduler = PollScheduler(rng=lambda: 0, clock=Clock())
+    intervals = [scheduler.record('a', OFFLINE, 30, 1800) for _ in range(7)]
+    assert intervals == [60, 120, 240, 480, 960, 1800, 1800]
+    # Coming back online resets the streak
+    assert scheduler.record('a', BUSY, 30, 1800) == 30
+    assert scheduler.record('a', OFFLINE, 30, 1800) == 60
+
+
+def test_intervals_respect_the_floor_and_jitter():
+    scheduler = PollScheduler(rng=lambda: 0, clock=Clock())
+    assert scheduler.record('a', BUSY, 45, 1800) == 45
+    assert scheduler.record('a', ONLINE, 30, 1800, busy=True) == 30
+    # The first offline retry would be sooner than this guild allows
+    assert scheduler.record('a', OFFLINE, 90, 1800) == 90
+    assert scheduler.record('b', ONLINE, 30, 100) == 100
+
+    jittered = PollScheduler(rng=lambda: 1, clock=Clock())
+    assert jittered.record('a', ONLINE, 30, 1800) == mc_schedule.IDLE_SECONDS * (1 + mc_schedule.JITTER)
+
+
+def test_due_poll_now_and_forget():
+    clock = Clock()
+    scheduler = PollScheduler(rng=lambda: 0, clock=clock)
+    assert scheduler.due(['a', 'b']) == ['a', 'b']
+    scheduler.record('a', BUSY, 30, 1800)
+    scheduler.record('b', ONLINE, 30, 1800)
+    assert scheduler.due(['a', 'b']) == []
+    clock.now += 30
+    assert scheduler.due(['a', 'b']) == ['a']
+    scheduler.poll_now('b')
+    assert scheduler.due(['a', 'b']) == ['a', 'b']
+    scheduler.forget_except(['b'])
+    assert 'a' not in scheduler._next_due
+
+
+def test_bounds_take_the_strictest_guild():
+    configs = [{'mc_poll_min_seconds': 60, 'mc_poll_max_seconds': 600},
+               {'mc_poll_min_seconds': None, 'mc_poll_max_seconds': 40}]
+    assert poll_bounds(configs) == (60, 60)
+    assert poll_bounds([]) == (mc_schedule.DEFAULT_FLOOR, mc_schedule.DEFAULT_CEILING)
+
+
+def test_gametimes():
+    assert parse_gametime('Game 3 <t:1700000000:F>') == 1700000000
+    assert parse_gametime('2026-03-01T20:00:00') == parse_gametime('2026-03-01T20:00:00+00:00')
+    assert parse_gametime('tonight at 8') is None
+    assert gametime_near([1000], now=1000 - 20 * 60)
+    assert not gametime_near([1000], now=1000 + 2 * 60 * 60)
+
+
+def test_a_reposted_status_message_updates_the_cached_config(monkeypatch):
+    from cogs import minecraft
+
+    sent = []
+
+    class Message:
+        async def edit(self, embed):
+            raise discord.NotFound(SimpleNamespace(status=404, reason='Not Found'), 'Unknown Message')
+
+    class Channel:
+        def get_partial_message(self, message_id):
+            return Message()
+
+        async def send(self, embed):
+            sent.append(embed)
+            return SimpleNamespace(id=200 + len(sent))
+
+    guild = SimpleNamespace(get_channel=lambda channel_id: Channel())
+    cog = minecraft.MinecraftStatus.__new__(minecraft.MinecraftStatus)
+    cog.bot = SimpleNamespace(get_guild=lambda guild_id: guild)
+    cog.shown, cog.edits, cog.reposts = {}, 0, 0
+    monkeypatch.setattr(minecraft, 'update_server_config', lambda *args, **kwargs: None)
+
+    config = {'guild_id': '1', 'mc_status_channel_id': '2', 'mc_status_message_id': '100'}
+
+    async def scenario():
+        semaphore = asyncio.Semaphore(1)
+        await cog.update_guild_status(config, None, ('a',), semaphore)
+        # Same view on the next poll: nothing to edit, and no second repost
+        cog.edits_skipped = 0
+        await cog.update_guild_status(config, None, ('a',), semaphore)
+
+    asyncio.run(scenario())
+    assert config['mc_status_message_id'] == '201'
+    assert len(sent) == 1 and cog.edits_skipped == 1
@@ -0,0 +1,179 @@
+import uuid
+
+import pytest
+
+import database
+from fake_supabase import FakeSupabase
+from utils.pagination import to_base36, encode_timestamp, decode_timestamp, pack_id, unpack_id
+
+
+@pytest.fixture
+def client(monkeypatch):
+    fake = FakeSupabase()
+    monkeypatch.setattr(database, 'get_supabase', lambda: fake)
+    return fake
+
+
+def test_base36():
+    assert to_base36(0) == '0'
+    assert to_base36(35) == 'z'
+    assert to_base36(36) == '10'
+    assert int(to_base36(10 ** 15), 36) == 10 ** 15
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('2026-03-01T20:15:30.123456+00:00', '2026-03-01T20:15:30.123456+00:00'),
+    # Naive timestamps are UTC
+    ('2026-03-01T20:15:30', '2026-03-01T20:15:30+00:00'),
+    # Other offsets come back as the same moment in UTC
+    ('2026-03-01T22:15:30+02:00', '2026-03-01T20:15:30+00:00'),
+])
+def test_timestamp_round_trip_is_exact(value, expected):
+    token = encode_timestamp(value)
+    assert token.isalnum() and token == token.lower()
+    assert decode_timestamp(token) == expected
+
+
+@pytest.mark.parametrize('value', [str(uuid.uuid4()), '12345', 'not-a-uuid', uuid.uuid4().hex])
+def test_ids_round_trip_through_pack_id(value):
+    token = pack_id(value)
+    assert ':' not in token
+    assert unpack_id(token) == value
+
+
+def test_uuids_pack_to_22_characters():
+    assert len(pack_id(str(uuid.uuid4()))) == 22
+    assert pack_id('') == pack_id(None) == unpack_id('') == ''
+
+
+def matched(button_class, button):
+    return button_class.__discord_ui_compiled_template__.fullmatch(button.item.custom_id)
+
+
+def test_longest_custom_ids_fit_discords_limit():
+    from cogs.stats import LeaderboardPageButton, GameHistoryPageButton, ArchivedGamesPageButton, LEADERBOARD_STATS
+
+    # Largest values each field can take: UUIDs, 20-digit snowflakes, far-future timestamps
+    longest_id = str(uuid.UUID(int=2 ** 128 - 1))
+    page = -999999
+    played = encode_timestamp('9999-12-31T23:59:59.999999+00:00')
+    stat = max((column for column, _, _ in LEADERBOARD_STATS.values()), key=len)
+    buttons = [
+        LeaderboardPageButton('p', stat, page, longest_id, 10 ** 12, '9' * 20),
+        GameHistoryPageButton('p', longest_id, page, played, longest_id, longest_id),
+        ArchivedGamesPageButton('p', longest_id, longest_id, page),
+    ]
+    for button in buttons:
+        assert len(button.item.custom_id) <= 100, button.item.custom_id
+        assert matched(type(button), button)
+
+
+def test_game_history_custom_id_round_trips():
+    from cogs.stats import GameHistoryPageButton
+
+    game_id, team_id, season_id = str(uuid.uuid4()), str(uuid.uuid4()), str(uuid.uuid4())
+    played_at = '2026-03-01T20:15:30.123456+00:00'
+    button = GameHistoryPageButton('n', team_id, 12, encode_timestamp(played_at), game_id, season_id)
+
+    match = matched(GameHistoryPageButton, button)
+    restored = GameHistoryPageButton(match['direction'], unpack_id(match['team']), int(match['page']),
+                                     match['played'], unpack_id(match['game']), unpack_id(match['season']))
+    assert restored.cursor == (played_at, game_id)
+    assert (restored.team_id, restored.season_id, restored.page) == (team_id, season_id, 12)
+
+    # No team or season filter
+    unfiltered = GameHistoryPageButton('n', '', 0, encode_timestamp(played_at), game_id)
+    match = matched(GameHistoryPageButton, unfiltered)
+    assert (match['team'], match['season']) == ('', '')
+
+
+def test_leaderboard_custom_id_round_trips():
+    from cogs.stats import LeaderboardPageButton
+
+    season_id = str(uuid.uuid4())
+    button = LeaderboardPageButton('p', 'points', 3, season_id, 120, '123456789012345678')
+    match = matched(LeaderboardPageButton, button)
+    assert (unpack_id(match['season']), match['value'], match['player']) == (season_id, '120', '123456789012345678')
+
+
+def leaderboard_pages(limit: int):
+    """Walk /leaderboard forward to the end, then back to the start, as the buttons do"""
+    forward = [database.get_leaderboard(1, 's1', 'points', limit)]
+    while True:
+        last = forward[-1][-1]
+        page = database.get_leaderboard(1, 's1', 'points', limit, cursor=(last['total_points'], last['player_id']))
+        if not page:
+            break
+        forward.append(page)
+
+    backward = [forward[-1]]
+    while True:
+        first = backward[-1][0]
+        page = database.get_leaderboard(1, 's1', 'points', limit, cursor=(first['total_points'], first['player_id']),
+                                        previous=True)
+        if not page:
+            break
+        backward.append(page)
+    return forward, backward[::-1]
+
+
+def test_leaderboard_keyset_walks_both_ways(client):
+    # Lots of ties on the total, so the player_id tiebreak matters
+    for i in range(23):
+        client.add('player_season_stats', {
+            'guild_id': '1', 'season_id': 's1', 'player_id': f'{1000 + i}', 'games_played': 1,
+            'total_points': (i % 4) * 10
+        })
+    client.add('player_season_stats', {'guild_id': '1', 'season_id': 's1', 'player_id': '999',
+                                       'games_played': 0, 'total_points': 500})
+
+    forward, backward = leaderboard_pages(5)
+    rows = [row['player_id'] for page in forward for row in page]
+    expected = sorted((r for r in client.tables['player_season_stats'] if r['games_played'] > 0),
+                      key=lambda r: (-r['total_points'], r['player_id']))
+    assert rows == [r['player_id'] for r in expected]
+    assert [len(page) for page in forward] == [5, 5, 5, 5, 3]
+    # Previous pages line up with the pages walked forward (the first one is full)
+    assert backward[1:] == forward[1:]
+
+
+def test_game_history_keyset_walks_through_encoded_cursors(client):
+    for i in range(12):
+        client.add('games', {
+            'guild_id': '1', 'team1_id': 't1', 'team2_id': 't2' if i % 2 else 't3',
+            # Pairs of games share a timestamp, so the id tiebreak matters
+            'played_at': f'2026-01-{1 + i // 2:02d}T20:00:00+00:00'
+        })
+
+    seen = []
+    page = database.get_recent_games(1, limit=5)
+    while page:
+        seen.extend(game['id'] for game in page)
+        last = page[-1]
+        # Cursors round-trip through the button's base-36 token
+        cursor = (decode_timestamp(encode_timestamp(last['played_at'])), last['id'])
+        page = database.get_recent_games(1, limit=5, cursor=cursor)
+    assert seen == sorted(seen, reverse=True)
+    assert len(seen) == 12
+
+    team_games = database.get_recent_games(1, limit=50, team_id='t2')
+    assert {game['team2_id'] for game in team_games} == {'t2'}
+    assert len(team_games) == 6
+
+
+def test_game_history_pages_one_season(client):
+    # An older season without an archive is read from the live table
+    for i in range(14):
+        client.add('games', {
+            'guild_id': '1', 'season_id': 's1' if i % 2 else 's2', 'team1_id': 't1', 'team2_id': 't2',
+            'played_at': f'2026-01-{1 + i // 4:02d}T20:00:00+00:00'
+        })
+
+    seen = []
+    page = database.get_recent_games(1, limit=3, season_id='s1')
+    while page:
+        seen.extend(game['id'] for game in page)
+        last = page[-1]
+        page = database.get_recent_games(1, limit=3, cursor=(last['played_at'], last['id']), season_id='s1')
+    expected = [row['id'] for row in client.tables['games'] if row['season_id'] == 's1']
+    assert seen == sorted(expected, reverse=True)
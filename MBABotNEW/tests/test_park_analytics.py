@@ -0,0 +1,60 @@
+import pytest
+
+from utils.park_analytics import ParkSeasonTable, format_park_metric, get_park_table
+
+
+def park_row(uuid, games=5, points=50, fg_made=0, fg_attempted=0, three_made=0, three_attempted=0,
+             threes=0, wins=0, losses=0):
+    return {'player_uuid': uuid, 'player_name': uuid.upper(), 'games_played': games, 'points': points,
+            'fg_made': fg_made, 'fg_attempted': fg_attempted, 'three_fg_made': three_made,
+            'three_fg_attempted': three_attempted, 'threes': threes, 'wins': wins, 'losses': losses}
+
+
+def test_shooting_splits_and_qualification():
+    table = ParkSeasonTable([
+        park_row('a', fg_made=10, fg_attempted=20, three_made=4, three_attempted=10),
+        park_row('b', fg_made=2, fg_attempted=2),
+        park_row('c', games=0),
+    ])
+    assert len(table) == 2
+    # The 2-for-2 shooter doesn't qualify for FG%
+    assert [l[0] for l in table.leaders('fg_pct')] == ['a']
+    assert table.leaders('efg_pct')[0][2] == pytest.approx(60.0)
+    assert table.leaders('three_pct')[0][2] == pytest.approx(40.0)
+    assert table.percentiles('b')['fg_pct'] == (100.0, None, 1, None)
+    assert table.percentiles('c') is None
+
+
+def test_old_seasons_fall_back_to_threes():
+    table = ParkSeasonTable([park_row('a', threes=10)])
+    assert table.leaders('tpg')[0][2] == pytest.approx(2.0)
+
+
+def test_ranks_and_percentiles_share_ties():
+    table = ParkSeasonTable([park_row('a', points=100), park_row('b', points=50),
+                             park_row('c', points=50), park_row('d', points=0)])
+    assert [l[0] for l in table.leaders('ppg')] == ['a', 'b', 'c', 'd']
+    assert [l[0] for l in table.leaders('ppg', limit=2, offset=1)] == ['b', 'c']
+    assert table.percentiles('a')['ppg'][1:] == (1, 4, 100.0)
+    assert table.percentiles('c')['ppg'][1:3] == (2, 4)
+    assert table.percentiles('d')['ppg'][3] == 0.0
+    assert table.percentile_table('ppg', points=(50,)) == {50: 10.0}
+
+
+def test_tables_are_cached_per_generation():
+    class Snapshot:
+        generation = 1
+
+        def season_rows(self, season):
+            return [park_row('a')]
+
+    snapshot = Snapshot()
+    table = get_park_table(snapshot, 1)
+    assert get_park_table(snapshot, 1) is table
+    snapshot.generation = 2
+    assert get_park_table(snapshot, 1) is not table
+
+
+def test_format():
+    assert format_park_metric('fg_pct', 47.26) == '47.3%'
+    assert format_park_metric('wins', 3) == '3'
@@ -0,0 +1,97 @@
+import asyncio
+
+from utils.park_stats import ParkSnapshot, ParkStatsCache
+
+
+def park_row(uuid, name, season, points=10, synced_at='2026-01-01T00:00:00'):
+    return {'player_uuid': uuid, 'player_name': name, 'season': season, 'points': points, 'synced_at': synced_at}
+
+
+def test_snapshot_indexes_by_uuid_name_and_season():
+    snapshot = ParkSnapshot([park_row('u1', 'Steve', 1), park_row('u1', 'Steve', 2, 30), park_row('u2', 'Alex', 1)])
+    assert snapshot.latest_season == 2
+    assert snapshot.find(' steve ') == 'u1'
+    assert snapshot.player('u1', 2)['points'] == 30
+    assert snapshot.player('u2', 2) is None
+    assert {r['player_uuid'] for r in snapshot.season_rows(1)} == {'u1', 'u2'}
+
+
+def test_first_read_waits_then_stale_reads_revalidate_in_the_background():
+    rows = [park_row('u1', 'Steve', 1)]
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return list(rows)
+
+    async def scenario():
+        cache = ParkStatsCache(loader, max_age=0)
+        # Concurrent first reads share one load
+        first, second = await asyncio.gather(cache.get(), cache.get())
+        assert first is second and len(loads) == 1
+
+        # Nothing synced: the reload keeps the same snapshot and generation
+        await cache.get()
+        await cache._refresh
+        assert cache.snapshot is first and cache.generation == 1
+
+        rows.append(park_row('u2', 'Alex', 1, synced_at='2026-01-02T00:00:00'))
+        stale = await cache.get()
+        # Served the old snapshot while the reload ran
+        assert stale is first
+        await cache._refresh
+        assert cache.snapshot.find('alex') == 'u2'
+        assert cache.generation == 2
+
+    asyncio.run(scenario())
+
+
+def test_failed_first_load_returns_none():
+    def loader():
+        raise RuntimeError("down")
+
+    assert asyncio.run(ParkStatsCache(loader).get()) is None
+
+
+class FakeInteraction:
+    """Records the order of response calls, like Discord sees them"""
+
+    def __init__(self):
+        self.calls = []
+        self.guild_id = 1
+        self.user = object()
+        interaction = self
+
+        class Response:
+            async def defer(self, **kwargs):
+                interaction.calls.append('defer')
+
+            async def send_message(self, *args, **kwargs):
+                interaction.calls.append('send_message')
+
+        class Followup:
+            async def send(self, *args, **kwargs):
+                interaction.calls.append('followup')
+
+        self.response = Response()
+        self.followup = Followup()
+
+
+def test_park_commands_defer_before_the_first_load(monkeypatch):
+    from cogs import parkstats
+
+    async def scenario():
+        cog = parkstats.ParkStats(bot=None)
+
+        async def slow_get():
+            return None
+
+        cog.park.get = slow_get
+        for command, args in ((parkstats.ParkStats.parkleaders, ('ppg', None)),
+                              (parkstats.ParkStats.parkstats, (None, 'Steve', None))):
+            interaction = FakeInteraction()
+            await command.callback(cog, interaction, *args)
+            assert interaction.calls == ['defer', 'followup']
+
+    monkeypatch.setattr(parkstats, 'mysql_configured', lambda: False)
+    asyncio.run(scenario())
@@ -0,0 +1,127 @@
+import hashlib
+
+import pytest
+
+import utils.park_sync as park_sync
+from utils.park_sync import ParkStatsSync, normalize_player, row_hash, source_hash_sql
+
+COLUMNS = ['uuid', 'ign', 'SEASON_1_POINTS', 'SEASON_1_WINS', 'SEASON_2_POINTS', 'SEASON_2_WINS']
+
+
+def test_hash_sql_coalesces_every_column():
+    sql = source_hash_sql(['uuid', 'SEASON_1_POINTS', 'SEASON_1_WINS'])
+    assert sql == ("MD5(CONCAT_WS('|', COALESCE(`uuid`, ''), COALESCE(`SEASON_1_POINTS`, ''), "
+                   "COALESCE(`SEASON_1_WINS`, '')))")
+
+
+def test_normalize_drops_empty_seasons_and_hashes_content():
+    rows = normalize_player({'uuid': 'u1', 'ign': 'Steve', 'SEASON_1_POINTS': 10, 'SEASON_1_WINS': None,
+                             'SEASON_2_POINTS': 0, 'SEASON_2_WINS': 0, 'last_seen': '2026-01-01'})
+    assert [(r['season'], r['points'], r['wins']) for r in rows] == [(1, 10, 0)]
+    assert rows[0]['row_hash'] == row_hash(rows[0])
+    moved = dict(rows[0], points=0, wins=10)
+    assert row_hash(moved) != rows[0]['row_hash']
+
+
+class FakeCursor:
+    """Answers the sync's three queries from an in-memory players table"""
+
+    def __init__(self, players: list):
+        self.players = players
+        self.result = []
+
+    def execute(self, sql, params=None):
+        if 'information_schema' in sql:
+            self.result = [(c,) for c in COLUMNS]
+        elif sql.startswith('SELECT uuid, MD5('):
+            # CONCAT_WS over COALESCEd columns, as MySQL would compute it
+            self.result = [
+                (p['uuid'], hashlib.md5('|'.join('' if p.get(c) is None else str(p[c]) for c in COLUMNS).encode()).hexdigest())
+                for p in self.players
+            ]
+        else:
+            self.result = [dict(p) for p in self.players if p['uuid'] in params]
+
+    def fetchall(self):
+        return self.result
+
+    def fetchmany(self, size):
+        batch, self.result = self.result[:size], self.result[size:]
+        return batch
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, players):
+        self.players = players
+
+    def cursor(self, **kwargs):
+        return FakeCursor(self.players)
+
+    def close(self):
+        pass
+
+
+class FakePool:
+    def __init__(self, players):
+        self.players = players
+
+    def get_connection(self):
+        return FakeConnection(self.players)
+
+
+@pytest.fixture
+def sync(monkeypatch):
+    written = []
+    deleted = []
+    monkeypatch.setattr(park_sync, 'get_park_stat_hashes', lambda: {})
+    monkeypatch.setattr(park_sync, 'upsert_park_stats', lambda rows: written.extend(rows) or len(rows))
+    monkeypatch.setattr(park_sync, 'delete_park_stats', lambda keys: deleted.extend(keys) or len(keys))
+    players = [
+        {'uuid': f'u{i}', 'ign': f'P{i}', 'SEASON_1_POINTS': i * 10, 'SEASON_1_WINS': None,
+         'SEASON_2_POINTS': None, 'SEASON_2_WINS': None}
+        for i in range(1, 6)
+    ]
+    # The pool needs mysql-connector, which the tests don't
+    job = ParkStatsSync.__new__(ParkStatsSync)
+    job.pool = FakePool(players)
+    job.columns = None
+    job.source_hashes = {}
+    job.stored_hashes = None
+    job.generation = 0
+    return job, players, written, deleted
+
+
+def test_only_changed_players_are_written(sync):
+    job, players, written, deleted = sync
+    assert job.run_once()['rows_written'] == 5
+    assert job.run_once()['rows_written'] == 0
+
+    # Moving a value between two adjacent nullable columns is a change
+    players[2]['SEASON_1_WINS'], players[2]['SEASON_1_POINTS'] = players[2]['SEASON_1_POINTS'], None
+    written.clear()
+    summary = job.run_once()
+    assert (summary['changed_players'], summary['rows_written']) == (1, 1)
+    assert (written[0]['player_uuid'], written[0]['points'], written[0]['wins']) == ('u3', 0, 30)
+    assert job.generation == 2
+
+
+def test_rows_gone_from_mysql_are_deleted(sync):
+    job, players, written, deleted = sync
+    players[0]['SEASON_2_POINTS'] = 5
+    job.run_once()
+    assert ('u1', 2) in job.stored_hashes
+
+    # u1 sits season 2 out after all, and u5 leaves the server
+    players[0]['SEASON_2_POINTS'] = None
+    del players[4]
+    summary = job.run_once()
+    assert sorted(deleted) == [('u1', 2), ('u5', 1)]
+    assert (summary['rows_written'], summary['rows_deleted']) == (0, 2)
+    assert ('u1', 2) not in job.stored_hashes and ('u5', 1) not in job.stored_hashes
+    assert job.generation == 2
+
+    deleted.clear()
+    assert job.run_once()['rows_deleted'] == 0
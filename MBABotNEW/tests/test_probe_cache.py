@@ -0,0 +1,56 @@
+import asyncio
+
+from utils.mc_status import ProbeCache, parse_address, status_fingerprint
+
+
+def test_parse_address():
+    assert parse_address('play.example.com') == ('play.example.com', 25565)
+    assert parse_address('1.2.3.4:25570') == ('1.2.3.4', 25570)
+
+
+def test_fingerprint_ignores_ping_and_check_time():
+    base = {'address': 'a', 'online': True, 'players_online': 2, 'players_max': 20,
+            'players': ['b', 'a'], 'version': '1.20', 'motd': 'hi', 'latency': 40, 'checked_at': 1}
+    assert status_fingerprint(base) == status_fingerprint(dict(base, latency=90, checked_at=2, players=['a', 'b']))
+    assert status_fingerprint(base) != status_fingerprint(dict(base, players_online=3))
+    assert status_fingerprint({'address': 'a', 'online': False}) == ('a', False)
+
+
+def test_concurrent_callers_share_one_probe_and_force_respects_the_floor():
+    async def probe(address):
+        await asyncio.sleep(0.01)
+        return {'address': address, 'online': True}
+
+    async def scenario():
+        cache = ProbeCache(probe, ttl=60, min_interval=60)
+        results = await asyncio.gather(*(cache.get('a') for _ in range(5)))
+        assert all(r is results[0] for r in results)
+        assert cache.probes == 1
+
+        await cache.get('a', force=True)
+        assert (cache.probes, cache.hits) == (1, 1)
+
+        cache.min_interval = 0
+        await cache.get('a', force=True)
+        assert cache.probes == 2
+
+    asyncio.run(scenario())
+
+
+def test_a_cancelled_caller_does_not_cancel_the_probe():
+    async def probe(address):
+        await asyncio.sleep(0.02)
+        return {'address': address, 'online': False}
+
+    async def scenario():
+        cache = ProbeCache(probe, ttl=60)
+        impatient = asyncio.create_task(asyncio.wait_for(cache.get('a'), 0.001))
+        patient = asyncio.create_task(cache.get('a'))
+        try:
+            await impatient
+        except asyncio.TimeoutError:
+            pass
+        assert (await patient)['address'] == 'a'
+        assert cache.probes == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,62 @@
+import random
+
+from utils.ranks import SeasonRanks, RANK_STATS, get_season_ranks
+
+
+def row(player_id, games, points, rebounds=0):
+    return {'player_id': player_id, 'games_played': games, 'total_points': points, 'total_rebounds': rebounds}
+
+
+def brute_force(rows: list, player_id, stat: str) -> tuple:
+    """(rank, count) by sorting the whole season, ties sharing the best rank"""
+    column = RANK_STATS[stat][0]
+    values = {r['player_id']: round((r.get(column) or 0) / r['games_played'], 4)
+              for r in rows if r['games_played'] > 0}
+    mine = values[player_id]
+    return sum(1 for v in values.values() if v > mine) + 1, len(values)
+
+
+def test_ties_share_the_best_rank():
+    ranks = SeasonRanks([row('a', 2, 40), row('b', 1, 20), row('c', 4, 40), row('d', 1, 0)])
+    assert ranks.lookup('a')['ppg'][:3] == (20.0, 1, 4)
+    assert ranks.lookup('b')['ppg'][:3] == (20.0, 1, 4)
+    assert ranks.lookup('c')['ppg'][:3] == (10.0, 3, 4)
+    value, rank, total, percentile = ranks.lookup('d')['ppg']
+    assert (rank, percentile) == (4, 0.0)
+
+
+def test_players_without_games_are_not_ranked():
+    ranks = SeasonRanks([row('a', 0, 0), row('b', 1, 10)])
+    assert ranks.lookup('a') is None
+    assert len(ranks) == 1
+    assert ranks.lookup('b')['ppg'][3] == 100.0
+
+
+def test_bisect_ranks_match_a_full_sort():
+    rng = random.Random(3)
+    rows = [row(str(i), rng.randint(0, 5), rng.randint(0, 100), rng.randint(0, 40)) for i in range(60)]
+    ranks = SeasonRanks(rows)
+
+    live = [r for r in rows if r['games_played'] > 0]
+    assert len(ranks) == len(live)
+    for r in live:
+        result = ranks.lookup(r['player_id'])
+        for stat in ('ppg', 'rpg'):
+            assert result[stat][1:3] == brute_force(live, r['player_id'], stat)
+
+
+def test_registry_reloads_when_the_version_moves():
+    loads = []
+    season_rows = [row('a', 1, 10), row('b', 1, 20)]
+
+    def loader(season_id):
+        loads.append(season_id)
+        return list(season_rows)
+
+    assert get_season_ranks('s-version-test', loader, 1).lookup('a')['ppg'][1] == 2
+    season_rows[0] = row('a', 2, 60)
+    assert get_season_ranks('s-version-test', loader, 1).lookup('a')['ppg'][1] == 2
+    assert loads == ['s-version-test']
+
+    assert get_season_ranks('s-version-test', loader, 2).lookup('a')['ppg'][1] == 1
+    assert loads == ['s-version-test', 's-version-test']
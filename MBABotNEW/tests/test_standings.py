@@ -0,0 +1,153 @@
+import random
+
+import pytest
+
+import database
+from fake_supabase import FakeSupabase, MAX_ROWS
+from utils.standings import (
+    new_standings_row, apply_game_result, push_recent_result, format_streak,
+    sort_standings, pair_key, new_head_to_head_row, apply_head_to_head_result,
+    head_to_head_for, RECENT_RESULTS
+)
+
+GUILD = 1
+SEASON = 'season-1'
+TEAMS = [
+    {'id': 't1', 'guild_id': str(GUILD), 'conference': 'Desert'},
+    {'id': 't2', 'guild_id': str(GUILD), 'conference': 'Desert'},
+    {'id': 't3', 'guild_id': str(GUILD), 'conference': 'Plains'},
+    {'id': 't4', 'guild_id': str(GUILD), 'conference': 'Plains'},
+]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    fake = FakeSupabase({'teams': TEAMS})
+    monkeypatch.setattr(database, 'get_supabase', lambda: fake)
+    return fake
+
+
+def standings_view(client) -> dict:
+    skip = ('id', 'updated_at')
+    return {
+        str(row['team_id']): {k: v for k, v in row.items() if k not in skip}
+        for row in client.tables.get('team_season_standings', [])
+    }
+
+
+def head_to_head_view(client) -> dict:
+    skip = ('id', 'updated_at')
+    return {
+        (str(row['team_a_id']), str(row['team_b_id'])): {k: v for k, v in row.items() if k not in skip}
+        for row in client.tables.get('head_to_head', [])
+    }
+
+
+def record_games(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    for _ in range(count):
+        team1, team2 = rng.sample([t['id'] for t in TEAMS], 2)
+        score1, score2 = rng.randint(10, 30), rng.randint(10, 30)
+        database.record_game(GUILD, SEASON, team1, team2, score1, score2, recorded_by=99)
+
+
+def test_apply_game_result_tracks_record_and_streak():
+    row = new_standings_row(GUILD, SEASON, 't1')
+    apply_game_result(row, 21, 15, conference_game=True, game_id=1)
+    apply_game_result(row, 21, 18, conference_game=False, game_id=2)
+    assert (row['wins'], row['losses'], row['conference_wins'], row['streak']) == (2, 0, 1, 2)
+    apply_game_result(row, 10, 21, conference_game=True, game_id=3)
+    assert (row['losses'], row['conference_losses'], row['streak']) == (1, 1, -1)
+    apply_game_result(row, 15, 15, conference_game=False, game_id=4)
+    assert (row['ties'], row['streak'], row['last_game_id']) == (1, 0, 4)
+    assert row['last_results'] == 'WWLT'
+    assert (row['points_for'], row['points_against']) == (67, 69)
+
+
+def test_recent_results_keep_the_last_ten():
+    buffer = ''
+    for result in 'WL' * RECENT_RESULTS:
+        buffer = push_recent_result(buffer, result)
+    assert len(buffer) == RECENT_RESULTS
+    assert buffer.endswith('WL')
+
+
+def test_format_streak():
+    assert format_streak(3) == 'W3'
+    assert format_streak(-2) == 'L2'
+    assert format_streak(0) == '-'
+
+
+def test_sort_standings_breaks_ties_on_point_differential():
+    rows = [
+        {'team_id': 'a', 'wins': 5, 'losses': 5, 'points_for': 100, 'points_against': 110},
+        {'team_id': 'b', 'wins': 5, 'losses': 5, 'points_for': 100, 'points_against': 90},
+        {'team_id': 'c', 'wins': 7, 'losses': 3, 'points_for': 80, 'points_against': 90},
+    ]
+    assert [r['team_id'] for r in sort_standings(rows)] == ['c', 'b', 'a']
+
+
+def test_head_to_head_is_the_same_row_in_either_order():
+    row = new_head_to_head_row(GUILD, SEASON, 't2', 't1')
+    assert (row['team_a_id'], row['team_b_id']) == pair_key('t1', 't2')
+    apply_head_to_head_result(row, 't2', 't1', 21, 10, game_id=1)
+    apply_head_to_head_result(row, 't1', 't2', 21, 10, game_id=2)
+    apply_head_to_head_result(row, 't1', 't2', 5, 21, game_id=3)
+    assert head_to_head_for(row, 't2') == {'wins': 2, 'losses': 1, 'ties': 0, 'recent': 'WLW'}
+    assert head_to_head_for(row, 't1') == {'wins': 1, 'losses': 2, 'ties': 0, 'recent': 'LWL'}
+
+
+def test_rebuild_matches_incremental_updates(client):
+    record_games(60)
+    incremental = standings_view(client)
+    matchups = head_to_head_view(client)
+    assert sum(row['wins'] + row['losses'] + row['ties'] for row in incremental.values()) == 120
+
+    assert database.rebuild_team_standings(GUILD, SEASON) == len(TEAMS)
+    assert standings_view(client) == incremental
+    assert head_to_head_view(client) == matchups
+
+
+def test_record_game_leaves_the_counting_to_the_database(client):
+    record_games(3)
+    # No standings row is read back and rewritten, so concurrent writers can't lose a game
+    assert not [call for call in client.calls if call[0] in ('team_season_standings', 'head_to_head')]
+    assert client.calls.count(('record_standings_result', 'rpc')) == 3
+    assert client.calls.count(('record_head_to_head_result', 'rpc')) == 3
+
+
+def test_rebuild_pages_past_the_row_limit(client):
+    for i in range(MAX_ROWS + 50):
+        client.add('games', {
+            'guild_id': str(GUILD), 'season_id': SEASON, 'team1_id': 't1', 'team2_id': 't2',
+            'team1_score': 21, 'team2_score': 10, 'played_at': f'2026-01-01T00:{i // 60:02d}:{i % 60:02d}'
+        })
+    database.rebuild_team_standings(GUILD, SEASON)
+    assert standings_view(client)['t1']['wins'] == MAX_ROWS + 50
+    assert standings_view(client)['t2']['losses'] == MAX_ROWS + 50
+
+
+def test_rebuild_drops_rows_without_games(client):
+    record_games(10)
+    client.tables['games'] = [g for g in client.tables['games'] if 't4' not in (g['team1_id'], g['team2_id'])]
+    database.rebuild_team_standings(GUILD, SEASON)
+    assert 't4' not in standings_view(client)
+    assert all('t4' not in key for key in head_to_head_view(client))
+
+
+def test_failed_standings_write_triggers_rebuild(client, monkeypatch):
+    record_games(5)
+    original = database.update_head_to_head
+
+    def failing(*args, **kwargs):
+        raise RuntimeError("network")
+
+    monkeypatch.setattr(database, 'update_head_to_head', failing)
+    database.record_game(GUILD, SEASON, 't1', 't2', 21, 10, recorded_by=99)
+    monkeypatch.setattr(database, 'update_head_to_head', original)
+
+    # record_game fell back to a rebuild, so nothing was double counted or lost
+    rebuilt = standings_view(client)
+    database.rebuild_team_standings(GUILD, SEASON)
+    assert standings_view(client) == rebuilt
+    assert sum(row['wins'] + row['losses'] + row['ties'] for row in rebuilt.values()) == 12
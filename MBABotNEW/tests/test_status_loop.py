@@ -0,0 +1,80 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from cogs import minecraft
+from utils.mc_activity import ActivityRecorder
+from utils.mc_schedule import PollScheduler
+from utils.mc_status import ProbeCache
+
+
+class Channel:
+    def __init__(self, edits: list):
+        self.edits = edits
+
+    def get_partial_message(self, message_id):
+        edits = self.edits
+
+        class Message:
+            async def edit(self, embed):
+                edits.append(message_id)
+
+        return Message()
+
+
+@pytest.fixture
+def cog(monkeypatch):
+    monkeypatch.setattr(minecraft, 'get_roster_index', lambda: None)
+    edits = []
+    guild = SimpleNamespace(get_channel=lambda channel_id: Channel(edits))
+    probed = []
+
+    async def probe(address):
+        probed.append(address)
+        return {'address': address, 'online': False}
+
+    cog = minecraft.MinecraftStatus.__new__(minecraft.MinecraftStatus)
+    cog.bot = SimpleNamespace(get_guild=lambda guild_id: guild)
+    cog.probes = ProbeCache(probe, ttl=0, min_interval=0)
+    cog.shown, cog.edits, cog.edits_skipped, cog.reposts = {}, 0, 0, 0
+    cog.scheduler = PollScheduler(rng=lambda: 0)
+    cog.activity = ActivityRecorder(capacity=16)
+    cog.gametimes = {}
+    cog.configs_loaded_at = time.monotonic()
+    cog.servers = {
+        'a': [{'guild_id': str(g), 'mc_status_channel_id': '1', 'mc_status_message_id': str(100 + g)} for g in (1, 2, 3)],
+        'b': [{'guild_id': '4', 'mc_status_channel_id': '1', 'mc_status_message_id': '104'}],
+    }
+    return cog, probed, edits
+
+
+def run_cycle(cog):
+    asyncio.run(cog.update_status.coro(cog))
+
+
+def test_each_server_is_probed_once_per_cycle(cog):
+    cog, probed, edits = cog
+    run_cycle(cog)
+    assert sorted(probed) == ['a', 'b']
+    assert sorted(edits) == [101, 102, 103, 104]
+
+
+def test_unchanged_embeds_are_not_edited(cog):
+    cog, probed, edits = cog
+    run_cycle(cog)
+    # Due again, same result: probed but not edited
+    cog.scheduler.poll_now('a')
+    run_cycle(cog)
+    assert probed.count('a') == 2
+    assert len(edits) == 4 and cog.edits_skipped == 3
+
+    async def online(address):
+        return {'address': address, 'online': True, 'players_online': 1, 'players_max': 20,
+                'players': ['Steve'], 'version': '1.20', 'motd': None, 'latency': 10}
+
+    cog.probes.probe = online
+    cog.scheduler.poll_now('a')
+    run_cycle(cog)
+    assert sorted(edits[4:]) == [101, 102, 103]
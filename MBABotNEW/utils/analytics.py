@@ -0,0 +1,157 @@
+"""
+Advanced stat metrics computed over a season's player_game_stats.
+
+A season's box-score lines are loaded into NumPy arrays once and every
+derived metric is computed column-wise. Results are cached per
+(season, stats version) so repeat views cost a dictionary lookup.
+"""
+
+import numpy as np
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database import get_season_game_stats, get_season_version
+from utils.archive import get_archive
+
+BOX_COLUMNS = ('points', 'rebounds', 'assists', 'steals', 'blocks', 'turnovers')
+
+# metric key -> (abbreviation, full name, decimals, is_percentage)
+METRICS = {
+    'eff': ("EFF", "Efficiency Per Game", 1, False),
+    'gmsc': ("GmSc", "Game Score Per Game", 1, False),
+    'pts_share': ("PTS%", "Share of Team Points", 1, True),
+    'reb_share': ("REB%", "Share of Team Rebounds", 1, True),
+    'ast_share': ("AST%", "Share of Team Assists", 1, True),
+    'stocks': ("STK", "Stocks (STL+BLK) Per Game", 1, False),
+    'ast_to': ("AST/TO", "Assist to Turnover Ratio", 2, False),
+    'stk_to': ("STK/TO", "Stocks to Turnover Ratio", 2, False),
+}
+
+
+def _safe_divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """Element-wise divide that yields 0 where the denominator is 0"""
+    out = np.zeros(np.broadcast(numerator, denominator).shape, dtype=np.float64)
+    np.divide(numerator, denominator, out=out, where=denominator != 0)
+    return out
+
+
+class SeasonMetrics:
+    """Per-player advanced metrics for one season, stored as aligned arrays"""
+
+    def __init__(self, player_ids: np.ndarray, games: np.ndarray,
+                 totals: dict, metrics: dict):
+        self.player_ids = player_ids
+        self.games = games
+        self.totals = totals
+        self.metrics = metrics
+        self._index = {pid: i for i, pid in enumerate(player_ids.tolist())}
+
+    def __len__(self):
+        return len(self.player_ids)
+
+    def for_player(self, player_id) -> dict:
+        """All metrics for one player, or None if they have no games"""
+        i = self._index.get(str(player_id))
+        if i is None:
+            return None
+        row = {'player_id': str(self.player_ids[i]), 'games_played': int(self.games[i])}
+        for column, values in self.totals.items():
+            row[f'total_{column}'] = int(values[i])
+        for key, values in self.metrics.items():
+            row[key] = float(values[i])
+        return row
+
+    def leaders(self, metric: str, limit: int = 10, min_games: int = 1, offset: int = 0) -> list:
+        """Top players for a metric as (player_id, value, games_played) tuples"""
+        values = self.metrics[metric]
+        qualified = np.flatnonzero(self.games >= min_games)
+        if qualified.size == 0:
+            return []
+        # Stable sort so equal values keep a deterministic order
+        order = qualified[np.argsort(-values[qualified], kind='stable')][offset:offset + limit]
+        return [(str(self.player_ids[i]), float(values[i]), int(self.games[i])) for i in order]
+
+    def rank(self, player_id, metric: str, min_games: int = 1) -> tuple:
+        """(rank, qualified player count) for a player in a metric"""
+        i = self._index.get(str(player_id))
+        qualified = self.games >= min_games
+        if i is None or not qualified[i]:
+            return None, int(qualified.sum())
+        values = self.metrics[metric]
+        better = int(np.count_nonzero(qualified & (values > values[i])))
+        return better + 1, int(qualified.sum())
+
+
+def compute_season_metrics(rows: list) -> SeasonMetrics:
+    """Build SeasonMetrics from player_game_stats rows"""
+    if not rows:
+        empty = np.zeros(0)
+        return SeasonMetrics(np.array([], dtype=object), empty.astype(np.int64),
+                             {c: empty for c in BOX_COLUMNS},
+                             {m: empty for m in METRICS})
+
+    # Columnar load: one pass over the rows, then everything is array math
+    box = np.array([[r.get(c) or 0 for c in BOX_COLUMNS] for r in rows], dtype=np.float64)
+    pts, reb, ast, stl, blk, tov = box.T
+
+    player_ids, player_idx = np.unique(np.array([str(r['player_id']) for r in rows]), return_inverse=True)
+    n_players = len(player_ids)
+
+    # Team totals per (game, team) group, broadcast back onto each line
+    group_keys = np.array([f"{r['game_id']}:{r.get('team_id')}" for r in rows])
+    _, group_idx = np.unique(group_keys, return_inverse=True)
+    team_pts = np.bincount(group_idx, weights=pts)[group_idx]
+    team_reb = np.bincount(group_idx, weights=reb)[group_idx]
+    team_ast = np.bincount(group_idx, weights=ast)[group_idx]
+
+    # Per-line efficiency and game score (no shooting splits are tracked)
+    eff_line = pts + reb + ast + stl + blk - tov
+    gmsc_line = pts + 0.7 * reb + 0.7 * ast + stl + 0.7 * blk - tov
+
+    def per_player(values: np.ndarray) -> np.ndarray:
+        return np.bincount(player_idx, weights=values, minlength=n_players)
+
+    games = np.bincount(player_idx, minlength=n_players).astype(np.int64)
+    totals = {column: per_player(box[:, i]) for i, column in enumerate(BOX_COLUMNS)}
+    stocks = totals['steals'] + totals['blocks']
+
+    metrics = {
+        'eff': _safe_divide(per_player(eff_line), games),
+        'gmsc': _safe_divide(per_player(gmsc_line), games),
+        'pts_share': _safe_divide(totals['points'], per_player(team_pts)) * 100,
+        'reb_share': _safe_divide(totals['rebounds'], per_player(team_reb)) * 100,
+        'ast_share': _safe_divide(totals['assists'], per_player(team_ast)) * 100,
+        'stocks': _safe_divide(stocks, games),
+        # Ratios fall back to the raw numerator when a player has no turnovers
+        'ast_to': np.where(totals['turnovers'] > 0, _safe_divide(totals['assists'], totals['turnovers']), totals['assists']),
+        'stk_to': np.where(totals['turnovers'] > 0, _safe_divide(stocks, totals['turnovers']), stocks),
+    }
+
+    return SeasonMetrics(player_ids, games, totals, metrics)
+
+
+# ============================================
+# Cache
+# ============================================
+
+_metrics_cache = {}
+
+def get_season_metrics(season_id) -> SeasonMetrics:
+    """Get advanced metrics for a season, recomputing only when its stats version changed"""
+    version = get_season_version(season_id)
+    cached = _metrics_cache.get(str(season_id))
+    if cached and cached[0] == version:
+        return cached[1]
+
+    # Completed seasons are read from their frozen snapshot instead of the live tables
+    archive = get_archive(season_id)
+    rows = archive.game_stat_rows() if archive else get_season_game_stats(season_id)
+    metrics = compute_season_metrics(rows)
+    _metrics_cache[str(season_id)] = (version, metrics)
+    return metrics
+
+
+def format_metric(metric: str, value: float) -> str:
+    """Format a metric value for display"""
+    _, _, decimals, is_percentage = METRICS[metric]
+    return f"{value:.{decimals}f}{'%' if is_percentage else ''}"
@@ -0,0 +1,206 @@
+"""
+Durable job queue for website transactions.
+
+The sign and release endpoints only validate a request, write it to api_jobs
+and answer 202 with the job ID. A pool of API_JOB_WORKERS workers then runs
+the jobs on the bot loop, one at a time per guild and in submission order,
+so two moves in the same guild never interleave their roster checks.
+GET /api/jobs/<id> reports progress. A job submitted with a webhook_url
+also gets its final state POSTed there. When API_SECRET_KEY is set the POST
+carries an X-Signature header: sha256=<HMAC of the body>.
+
+Jobs still queued or running when the bot stops are picked up again on the
+next start, so a job can run twice if the bot died partway through it.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import uuid
+from collections import OrderedDict, deque
+from datetime import datetime
+import aiohttp
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database import create_api_job, update_api_job, get_api_job, get_open_api_jobs
+
+WORKERS = int(os.getenv('API_JOB_WORKERS', 4))
+JOB_TIMEOUT = float(os.getenv('API_JOB_TIMEOUT', 120))
+
+WEBHOOK_ATTEMPTS = 3
+WEBHOOK_TIMEOUT = 10
+
+# Jobs kept in memory for status lookups; older ones are read back from the database
+RECENT_JOBS = 1000
+
+
+def job_view(job: dict) -> dict:
+    """The public part of a job, for GET /api/jobs/<id> and webhooks"""
+    return {
+        'job_id': job['id'],
+        'kind': job['kind'],
+        'status': job['status'],
+        'result': job.get('result'),
+        'created_at': job.get('created_at'),
+        'started_at': job.get('started_at'),
+        'finished_at': job.get('finished_at')
+    }
+
+
+class JobQueue:
+    """Per-guild ordered job queue drained by a pool of workers"""
+
+    def __init__(self, handlers: dict, workers: int = WORKERS, timeout: float = JOB_TIMEOUT):
+        # kind -> async handler(payload) returning {'success': ..., 'message': ...}
+        self.handlers = handlers
+        self.workers = workers
+        self.timeout = timeout
+        self._pending = {}            # guild_id -> deque of jobs, present while queued or running
+        self._ready = asyncio.Queue()  # guild IDs with a job waiting and no worker on them
+        self._recent = OrderedDict()  # job id -> job
+        self._workers = []
+        self._running = set()
+        self._webhooks = set()
+        self._http = None
+
+    async def start(self):
+        """Re-queue unfinished jobs from the database and start the workers"""
+        for job in await asyncio.to_thread(get_open_api_jobs):
+            self._remember(job)
+            self._enqueue(job)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self, timeout: float):
+        """Stop taking jobs and give running ones up to timeout seconds to finish"""
+        pending = self._running | self._webhooks
+        for worker in self._workers:
+            worker.cancel()
+        if pending:
+            await asyncio.wait(pending, timeout=timeout)
+        if self._http is not None:
+            await self._http.close()
+
+    async def submit(self, kind: str, guild_id, payload: dict, webhook_url: str = None) -> dict:
+        """Store a job and queue it behind the guild's earlier jobs"""
+        job = {
+            'id': str(uuid.uuid4()),
+            'guild_id': str(guild_id),
+            'kind': kind,
+            'payload': payload,
+            'status': 'queued',
+            'webhook_url': webhook_url,
+            'attempts': 0,
+            'created_at': datetime.utcnow().isoformat()
+        }
+        await asyncio.to_thread(create_api_job, job)
+        self._remember(job)
+        self._enqueue(job)
+        return job
+
+    async def get(self, job_id: str) -> dict:
+        """A job by ID, or None"""
+        job = self._recent.get(job_id)
+        if job is not None:
+            return job
+        try:
+            uuid.UUID(job_id)
+        except ValueError:
+            return None
+        return await asyncio.to_thread(get_api_job, job_id)
+
+    def depth(self) -> int:
+        """Jobs queued or running"""
+        return sum(len(queue) for queue in self._pending.values()) + len(self._running)
+
+    def _remember(self, job: dict):
+        self._recent[job['id']] = job
+        self._recent.move_to_end(job['id'])
+        while len(self._recent) > RECENT_JOBS:
+            self._recent.popitem(last=False)
+
+    def _enqueue(self, job: dict):
+        queue = self._pending.get(job['guild_id'])
+        if queue is None:
+            # Nothing queued or running for this guild, so it needs a worker
+            queue = self._pending[job['guild_id']] = deque()
+            self._ready.put_nowait(job['guild_id'])
+        queue.append(job)
+
+    async def _worker(self):
+        while True:
+            guild_id = await self._ready.get()
+            queue = self._pending[guild_id]
+            job = queue.popleft()
+            task = asyncio.create_task(self._run(job))
+            self._running.add(task)
+            try:
+                # Shielded so stopping the workers lets a running job finish
+                await asyncio.shield(task)
+            except Exception as e:
+                print(f"Error running API job {job['id']}: {e}")
+            finally:
+                self._running.discard(task)
+                if queue:
+                    self._ready.put_nowait(guild_id)
+                else:
+                    del self._pending[guild_id]
+
+    async def _run(self, job: dict):
+        job.update(status='running', started_at=datetime.utcnow().isoformat(), attempts=(job.get('attempts') or 0) + 1)
+        await self._save(job, 'status', 'started_at', 'attempts')
+
+        handler = self.handlers.get(job['kind'])
+        try:
+            if handler is None:
+                raise ValueError(f"Unknown job kind: {job['kind']}")
+            result = await asyncio.wait_for(handler(job['payload']), self.timeout)
+        except asyncio.TimeoutError:
+            result = {'success': False, 'message': f'Timed out after {self.timeout:.0f}s'}
+        except Exception as e:
+            result = {'success': False, 'message': str(e)}
+
+        job.update(
+            status='succeeded' if result.get('success') else 'failed',
+            result=result,
+            finished_at=datetime.utcnow().isoformat()
+        )
+        await self._save(job, 'status', 'result', 'finished_at')
+
+        if job.get('webhook_url'):
+            # Delivery doesn't hold up the guild's next job
+            task = asyncio.create_task(self._notify(job))
+            self._webhooks.add(task)
+            task.add_done_callback(self._webhooks.discard)
+
+    async def _save(self, job: dict, *fields):
+        try:
+            await asyncio.to_thread(update_api_job, job['id'], **{f: job[f] for f in fields})
+        except Exception as e:
+            print(f"Error saving API job {job['id']}: {e}")
+
+    def _session(self) -> aiohttp.ClientSession:
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=WEBHOOK_TIMEOUT))
+        return self._http
+
+    async def _notify(self, job: dict):
+        """POST a finished job to its webhook, retrying server errors with backoff"""
+        body = json.dumps(job_view(job)).encode()
+        headers = {'Content-Type': 'application/json'}
+        secret = os.getenv('API_SECRET_KEY')
+        if secret:
+            headers['X-Signature'] = 'sha256=' + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+        error = None
+        for attempt in range(WEBHOOK_ATTEMPTS):
+            try:
+                async with self._session().post(job['webhook_url'], data=body, headers=headers) as response:
+                    if response.status < 500:
+                        return
+                    error = f"HTTP {response.status}"
+            except Exception as e:
+                error = e
+            await asyncio.sleep(2 ** attempt)
+        print(f"Webhook for API job {job['id']} failed: {error}")
@@ -0,0 +1,233 @@
+"""
+Frozen snapshots of completed seasons.
+
+When a season ends its games, player_game_stats and player_season_stats
+never change, so they are written once to a directory of .npy column files
+and read back memory-mapped. Leaderboard orderings and newest-first game
+order are computed at archive time, so historical pages are array slices.
+
+A write that touches an archived season (late /addstats, reactivating it
+with /setseason) discards the archive and queries fall back to the live
+tables until it is archived again.
+"""
+
+import json
+import os
+import shutil
+import threading
+from datetime import datetime
+import numpy as np
+
+ARCHIVE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.season_archive')
+
+# Bump when the on-disk layout changes; older archives are ignored
+ARCHIVE_VERSION = 1
+
+STAT_COLUMNS = ('points', 'rebounds', 'assists', 'steals', 'blocks', 'turnovers')
+TOTAL_COLUMNS = tuple(f'total_{c}' for c in STAT_COLUMNS)
+
+# table -> (text columns, integer columns)
+ARCHIVE_TABLES = {
+    'games': (('id', 'team1_id', 'team2_id', 'played_at'), ('team1_score', 'team2_score')),
+    'player_game_stats': (('game_id', 'player_id', 'team_id'), STAT_COLUMNS),
+    'player_season_stats': (('player_id',), ('games_played',) + TOTAL_COLUMNS),
+}
+
+
+def _text_array(values: list) -> np.ndarray:
+    """Fixed-width unicode array (mmap-able, unlike object arrays)"""
+    values = ['' if v is None else str(v) for v in values]
+    width = max((len(v) for v in values), default=1) or 1
+    return np.array(values, dtype=f'<U{width}')
+
+
+def _write_table(directory: str, table: str, rows: list, order: np.ndarray = None):
+    text_columns, int_columns = ARCHIVE_TABLES[table]
+    for column in text_columns:
+        values = _text_array([r.get(column) for r in rows])
+        np.save(os.path.join(directory, f'{table}.{column}.npy'), values if order is None else values[order])
+    for column in int_columns:
+        values = np.array([r.get(column) or 0 for r in rows], dtype=np.int64)
+        np.save(os.path.join(directory, f'{table}.{column}.npy'), values if order is None else values[order])
+
+
+# Held while an archive directory is swapped in or removed
+_write_lock = threading.Lock()
+
+def write_archive(season: dict, games: list, game_stats: list, season_stats: list,
+                  teams: list, directory: str = ARCHIVE_DIR) -> str:
+    """Write a season snapshot atomically, returns its directory"""
+    final = os.path.join(directory, str(season['id']))
+    staging = f'{final}.tmp-{os.getpid()}'
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    # Newest first, matching game history order
+    game_order = np.array(sorted(range(len(games)),
+                                 key=lambda i: (games[i].get('played_at') or '', str(games[i]['id'])),
+                                 reverse=True), dtype=np.int64)
+    _write_table(staging, 'games', games, game_order)
+    _write_table(staging, 'player_game_stats', game_stats)
+    _write_table(staging, 'player_season_stats', season_stats)
+
+    # Leaderboard order per total: value desc, then player_id (players with games only)
+    player_ids = [str(r['player_id']) for r in season_stats]
+    ranked = [i for i, r in enumerate(season_stats) if (r.get('games_played') or 0) > 0]
+    for column in TOTAL_COLUMNS:
+        order = sorted(ranked, key=lambda i: (-(season_stats[i].get(column) or 0), player_ids[i]))
+        np.save(os.path.join(staging, f'order.{column}.npy'), np.array(order, dtype=np.int64))
+
+    meta = {
+        'version': ARCHIVE_VERSION,
+        'season': season,
+        'teams': {str(t['id']): {'team_name': t.get('team_name'), 'team_logo_emoji': t.get('team_logo_emoji')}
+                  for t in teams},
+        'counts': {'games': len(games), 'player_game_stats': len(game_stats),
+                   'player_season_stats': len(season_stats)},
+        'archived_at': datetime.utcnow().isoformat()
+    }
+    with open(os.path.join(staging, 'meta.json'), 'w') as f:
+        json.dump(meta, f, default=str)
+
+    # Swapped in under the lock so a concurrent discard_archive sees either no archive or this one
+    with _write_lock:
+        shutil.rmtree(final, ignore_errors=True)
+        os.replace(staging, final)
+    return final
+
+
+class SeasonArchive:
+    """Read-only, memory-mapped view of an archived season"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, 'meta.json')) as f:
+            self.meta = json.load(f)
+        self.season = self.meta['season']
+        self.teams = self.meta['teams']
+        self._columns = {}
+        self._player_index = None
+
+    def column(self, table: str, column: str) -> np.ndarray:
+        key = f'{table}.{column}'
+        if key not in self._columns:
+            self._columns[key] = np.load(os.path.join(self.path, f'{key}.npy'), mmap_mode='r')
+        return self._columns[key]
+
+    def _season_row(self, i: int) -> dict:
+        row = {'player_id': str(self.column('player_season_stats', 'player_id')[i]),
+               'season_id': self.season['id'],
+               'guild_id': self.season.get('guild_id'),
+               'seasons': {'season_name': self.season['season_name']}}
+        for column in ('games_played',) + TOTAL_COLUMNS:
+            row[column] = int(self.column('player_season_stats', column)[i])
+        return row
+
+    def player_stats(self, player_id) -> dict:
+        """A player's player_season_stats row, or None"""
+        if self._player_index is None:
+            ids = self.column('player_season_stats', 'player_id')
+            self._player_index = {str(pid): i for i, pid in enumerate(ids.tolist())}
+        i = self._player_index.get(str(player_id))
+        return self._season_row(i) if i is not None else None
+
+    def leaderboard(self, stat: str, offset: int = 0, limit: int = 10) -> list:
+        """One page of player_season_stats rows ordered by total_<stat>"""
+        order = self.column('order', f'total_{stat}')
+        return [self._season_row(int(i)) for i in order[offset:offset + limit]]
+
+    def games(self, offset: int = 0, limit: int = 10, team_id=None) -> list:
+        """One page of games, newest first, shaped like get_recent_games rows"""
+        indices = np.arange(int(self.meta['counts']['games']))
+        if team_id:
+            team = str(team_id)
+            mask = (self.column('games', 'team1_id') == team) | (self.column('games', 'team2_id') == team)
+            indices = np.flatnonzero(mask)
+
+        rows = []
+        for i in indices[offset:offset + limit]:
+            team1_id = str(self.column('games', 'team1_id')[i])
+            team2_id = str(self.column('games', 'team2_id')[i])
+            rows.append({
+                'id': str(self.column('games', 'id')[i]),
+                'season_id': self.season['id'],
+                'team1_id': team1_id,
+                'team2_id': team2_id,
+                'team1_score': int(self.column('games', 'team1_score')[i]),
+                'team2_score': int(self.column('games', 'team2_score')[i]),
+                'played_at': str(self.column('games', 'played_at')[i]),
+                'team1': self.teams.get(team1_id),
+                'team2': self.teams.get(team2_id),
+                'seasons': {'season_name': self.season['season_name']}
+            })
+        return rows
+
+    def game_stat_rows(self) -> list:
+        """All player_game_stats rows (for the advanced metrics pipeline)"""
+        columns = {c: self.column('player_game_stats', c) for c in
+                   ARCHIVE_TABLES['player_game_stats'][0] + STAT_COLUMNS}
+        count = int(self.meta['counts']['player_game_stats'])
+        return [{c: (values[i].item() if values.dtype.kind == 'i' else str(values[i]))
+                 for c, values in columns.items()} for i in range(count)]
+
+
+# ============================================
+# Registry
+# ============================================
+
+_archives = {}
+_lock = threading.Lock()
+
+def get_archive(season_id, directory: str = ARCHIVE_DIR) -> SeasonArchive:
+    """Open archive for a season, or None if it isn't archived"""
+    key = str(season_id)
+    archive = _archives.get(key)
+    if archive is not None:
+        return archive
+
+    path = os.path.join(directory, key)
+    if not os.path.exists(os.path.join(path, 'meta.json')):
+        return None
+    archive = SeasonArchive(path)
+    if archive.meta.get('version') != ARCHIVE_VERSION:
+        return None
+    with _lock:
+        return _archives.setdefault(key, archive)
+
+def archive_season(season: dict, directory: str = ARCHIVE_DIR) -> SeasonArchive:
+    """Snapshot a completed season from the live tables"""
+    from database import iter_season_rows, get_all_teams
+
+    def read(table):
+        text_columns, int_columns = ARCHIVE_TABLES[table]
+        columns = ['id'] + [c for c in text_columns + int_columns if c != 'id']
+        rows = []
+        for page in iter_season_rows(table, season['id'], columns):
+            rows.extend(page)
+        return rows
+
+    games = read('games')
+    game_stats = read('player_game_stats')
+    season_stats = read('player_season_stats')
+    teams = get_all_teams(int(season['guild_id']))
+
+    discard_archive(season['id'], directory)
+    write_archive(season, games, game_stats, season_stats, teams, directory)
+    print(f"Archived season {season['season_name']} ({season['id']}): {len(games)} games, "
+          f"{len(game_stats)} stat lines, {len(season_stats)} players")
+    return get_archive(season['id'], directory)
+
+def archive_exists(season_id, directory: str = ARCHIVE_DIR) -> bool:
+    """Whether a season has an archive open or on disk"""
+    key = str(season_id)
+    return key in _archives or os.path.exists(os.path.join(directory, key))
+
+def discard_archive(season_id, directory: str = ARCHIVE_DIR):
+    """Drop a season's archive so queries go back to the live tables"""
+    key = str(season_id)
+    path = os.path.join(directory, key)
+    with _write_lock:
+        with _lock:
+            _archives.pop(key, None)
+        if os.path.exists(path):
+            shutil.rmtree(path, ignore_errors=True)
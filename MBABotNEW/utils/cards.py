@@ -0,0 +1,394 @@
+"""
+Rendered player and team stat cards.
+
+Cards are drawn with Pillow in a process pool so rendering never blocks
+the event loop. Finished PNGs are content-addressed: the file name is a
+hash of everything drawn on the card, so identical inputs are rendered
+once. An in-memory index maps (kind, id, season, stats version, inputs
+hash) to that hash so repeat views skip the database too. The inputs hash
+covers what can change without a stat write (name, avatar, color, team),
+so a renamed player or a traded one never gets their old card. PNGs are
+kept in an LRU both in memory and on disk.
+"""
+
+import asyncio
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, ImageDraw, ImageFont
+
+CARD_SIZE = (800, 360)
+
+# Bump when the layout changes so cached files from the old layout are not reused
+RENDER_VERSION = 1
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.card_cache')
+
+BACKGROUND = (24, 26, 32)
+PANEL = (36, 39, 48)
+TEXT = (240, 240, 245)
+MUTED = (150, 155, 170)
+
+
+# ============================================
+# Rendering (runs in worker processes)
+# ============================================
+
+def _font(size: int, bold: bool = False):
+    """DejaVu if the host has it, otherwise Pillow's built-in font"""
+    name = 'DejaVuSans-Bold.ttf' if bold else 'DejaVuSans.ttf'
+    try:
+        return ImageFont.truetype(name, size)
+    except OSError:
+        return ImageFont.load_default(size=size)
+
+
+def _draw_sparkline(draw: ImageDraw.ImageDraw, box: tuple, values: list, color: tuple):
+    """Draw a line chart of values inside box, with a baseline at zero if it's in range"""
+    left, top, right, bottom = box
+    if len(values) < 2:
+        draw.text((left, top + (bottom - top) // 2 - 8), "Not enough games yet", font=_font(16), fill=MUTED)
+        return
+
+    low, high = min(min(values), 0), max(max(values), 0)
+    span = (high - low) or 1
+    step = (right - left) / (len(values) - 1)
+
+    def y(value):
+        return bottom - (value - low) / span * (bottom - top)
+
+    if low < 0 < high:
+        draw.line([(left, y(0)), (right, y(0))], fill=MUTED, width=1)
+
+    points = [(left + i * step, y(v)) for i, v in enumerate(values)]
+    draw.line(points, fill=color, width=3, joint='curve')
+    last_x, last_y = points[-1]
+    draw.ellipse((last_x - 5, last_y - 5, last_x + 5, last_y + 5), fill=color)
+
+
+def render_card(card: dict, image: bytes = None) -> bytes:
+    """
+    Draw a stat card and return it as PNG bytes.
+    card holds title, subtitle, color, initials, stats [(label, value)],
+    spark (list of numbers) and spark_label; image is an optional avatar/logo.
+    """
+    color = tuple(card.get('color') or (88, 101, 242))
+    width, height = CARD_SIZE
+    canvas = Image.new('RGB', CARD_SIZE, BACKGROUND)
+    draw = ImageDraw.Draw(canvas)
+
+    # Accent bar and header
+    draw.rectangle((0, 0, width, 8), fill=color)
+    badge = (24, 32, 120, 128)
+    if image:
+        try:
+            picture = Image.open(io.BytesIO(image)).convert('RGBA').resize((96, 96))
+            mask = Image.new('L', (96, 96), 0)
+            ImageDraw.Draw(mask).ellipse((0, 0, 96, 96), fill=255)
+            canvas.paste(picture, badge[:2], mask)
+        except Exception:
+            image = None
+    if not image:
+        draw.ellipse(badge, fill=color)
+        initials = card.get('initials') or '?'
+        draw.text(((badge[0] + badge[2]) / 2, (badge[1] + badge[3]) / 2), initials,
+                  font=_font(36, bold=True), fill=TEXT, anchor='mm')
+
+    draw.text((140, 40), card['title'], font=_font(36, bold=True), fill=TEXT)
+    draw.text((140, 88), card.get('subtitle', ''), font=_font(20), fill=MUTED)
+
+    # Stat tiles
+    stats = card.get('stats') or []
+    if stats:
+        tile_width = (width - 48 - 12 * (len(stats) - 1)) / len(stats)
+        for i, (label, value) in enumerate(stats):
+            left = 24 + i * (tile_width + 12)
+            draw.rounded_rectangle((left, 148, left + tile_width, 228), radius=10, fill=PANEL)
+            draw.text((left + tile_width / 2, 178), str(value), font=_font(28, bold=True), fill=TEXT, anchor='mm')
+            draw.text((left + tile_width / 2, 210), label, font=_font(14), fill=MUTED, anchor='mm')
+
+    # Sparkline panel
+    draw.rounded_rectangle((24, 244, width - 24, height - 20), radius=10, fill=PANEL)
+    draw.text((40, 252), card.get('spark_label', ''), font=_font(14), fill=MUTED)
+    _draw_sparkline(draw, (48, 280, width - 48, height - 36), card.get('spark') or [], color)
+
+    out = io.BytesIO()
+    canvas.save(out, format='PNG', optimize=True)
+    return out.getvalue()
+
+
+def render_activity_chart(title: str, subtitle: str, hourly_avg: list, hourly_peak: list,
+                          day_labels: list, daily_unique: list) -> bytes:
+    """
+    Draw server activity as PNG bytes: average and peak players by hour of
+    day as bars, and unique players per day as a line underneath.
+    """
+    color = (88, 101, 242)
+    width, height = 800, 480
+    canvas = Image.new('RGB', (width, height), BACKGROUND)
+    draw = ImageDraw.Draw(canvas)
+    draw.rectangle((0, 0, width, 8), fill=color)
+    draw.text((24, 24), title, font=_font(28, bold=True), fill=TEXT)
+    draw.text((24, 62), subtitle, font=_font(16), fill=MUTED)
+
+    # Hour-of-day bars: peak behind, average in front
+    draw.rounded_rectangle((24, 96, width - 24, 300), radius=10, fill=PANEL)
+    draw.text((40, 104), "Players by hour (avg, peak)", font=_font(14), fill=MUTED)
+    top, bottom = 130, 276
+    high = max(max(hourly_peak, default=0), 1)
+    slot = (width - 96) / 24
+    for hour in range(24):
+        left = 48 + hour * slot
+        peak_y = bottom - hourly_peak[hour] / high * (bottom - top)
+        avg_y = bottom - hourly_avg[hour] / high * (bottom - top)
+        draw.rectangle((left + 2, peak_y, left + slot - 2, bottom), fill=MUTED)
+        draw.rectangle((left + 2, avg_y, left + slot - 2, bottom), fill=color)
+        if hour % 3 == 0:
+            draw.text((left + slot / 2, bottom + 10), f"{hour:02d}", font=_font(12), fill=MUTED, anchor='mm')
+
+    # Daily unique players
+    draw.rounded_rectangle((24, 316, width - 24, height - 20), radius=10, fill=PANEL)
+    label = "Unique players per day"
+    if day_labels:
+        label += f" ({day_labels[0]} to {day_labels[-1]})"
+    draw.text((40, 324), label, font=_font(14), fill=MUTED)
+    _draw_sparkline(draw, (48, 352, width - 48, height - 36), daily_unique, color)
+
+    out = io.BytesIO()
+    canvas.save(out, format='PNG', optimize=True)
+    return out.getvalue()
+
+
+def card_digest(card: dict) -> str:
+    """Content hash of everything that ends up on a card"""
+    payload = json.dumps({'v': RENDER_VERSION, 'card': card}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def inputs_digest(*inputs) -> str:
+    """Short hash of the non-stat inputs of a card, for its index key"""
+    payload = json.dumps(inputs, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def _initials(name: str) -> str:
+    words = [w for w in name.replace('_', ' ').split() if w]
+    return ''.join(w[0] for w in words[:2]).upper() or '?'
+
+
+def player_card(name: str, season_name: str, team_name: str, color: tuple,
+                stats: dict, game_log: list, avatar_url: str = None) -> dict:
+    """Card content for a player's season from their player_season_stats row and game log"""
+    games = stats.get('games_played') or 0
+
+    def avg(column):
+        return f"{(stats.get(f'total_{column}') or 0) / games:.1f}" if games else "0.0"
+
+    return {
+        'kind': 'player',
+        'title': name,
+        'subtitle': f"{season_name} • {team_name or 'Free Agent'} • {games} GP",
+        'initials': _initials(name),
+        'color': list(color),
+        'image_url': avatar_url,
+        'stats': [('PPG', avg('points')), ('RPG', avg('rebounds')), ('APG', avg('assists')),
+                  ('SPG', avg('steals')), ('BPG', avg('blocks'))],
+        'spark': [line.get('points') or 0 for line in game_log],
+        'spark_label': f"Points, last {len(game_log)} games"
+    }
+
+
+def team_card(team_name: str, season_name: str, color: tuple, standing: dict,
+              games: list, team_id, logo_url: str = None) -> dict:
+    """Card content for a team's season from its standings row and recent games (newest first)"""
+    standing = standing or {}
+    wins, losses = standing.get('wins') or 0, standing.get('losses') or 0
+    played = wins + losses + (standing.get('ties') or 0)
+    pf, pa = standing.get('points_for') or 0, standing.get('points_against') or 0
+    streak = standing.get('streak') or 0
+
+    margins = []
+    for game in reversed(games):
+        if str(game.get('team1_id')) == str(team_id):
+            margins.append(game['team1_score'] - game['team2_score'])
+        else:
+            margins.append(game['team2_score'] - game['team1_score'])
+
+    return {
+        'kind': 'team',
+        'title': team_name,
+        'subtitle': f"{season_name} • Last {len(standing.get('last_results') or '')}: {standing.get('last_results') or '-'}",
+        'initials': _initials(team_name),
+        'color': list(color),
+        'image_url': logo_url,
+        'stats': [('RECORD', f"{wins}-{losses}"),
+                  ('PPG', f"{pf / played:.1f}" if played else "0.0"),
+                  ('OPP PPG', f"{pa / played:.1f}" if played else "0.0"),
+                  ('DIFF', f"{pf - pa:+d}"),
+                  ('STREAK', f"W{streak}" if streak > 0 else f"L{-streak}" if streak < 0 else "-")],
+        'spark': margins,
+        'spark_label': f"Point margin, last {len(margins)} games"
+    }
+
+
+# ============================================
+# Cache
+# ============================================
+
+class CardCache:
+    """LRU of rendered PNGs by content hash, in memory and on disk"""
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_disk_bytes: int = 100 * 1024 * 1024,
+                 max_memory_items: int = 64, max_index_items: int = 4096):
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self.max_memory_items = max_memory_items
+        self.max_index_items = max_index_items
+        self.hits = 0
+        self.misses = 0
+
+        self._memory = OrderedDict()   # digest -> png
+        self._index = OrderedDict()    # (kind, id, season, version, inputs) -> digest
+        self._disk = OrderedDict()     # digest -> size, least recently used first
+        self._disk_bytes = 0
+
+        os.makedirs(directory, exist_ok=True)
+        # Pick up files from earlier runs, oldest access first
+        entries = []
+        for name in os.listdir(directory):
+            if name.endswith('.png'):
+                path = os.path.join(directory, name)
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, name[:-4], stat.st_size))
+        for _, digest, size in sorted(entries):
+            self._disk[digest] = size
+            self._disk_bytes += size
+        self._evict_disk()
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.directory, f'{digest}.png')
+
+    def lookup(self, key: tuple) -> str:
+        """Digest last rendered for a (kind, id, season, version, inputs) key"""
+        digest = self._index.get(key)
+        if digest:
+            self._index.move_to_end(key)
+        return digest
+
+    def remember(self, key: tuple, digest: str):
+        self._index[key] = digest
+        self._index.move_to_end(key)
+        while len(self._index) > self.max_index_items:
+            self._index.popitem(last=False)
+
+    def get(self, digest: str) -> bytes:
+        """PNG for a digest from memory, then disk, or None"""
+        png = self._memory.get(digest)
+        if png is not None:
+            self._memory.move_to_end(digest)
+            self.hits += 1
+            return png
+
+        if digest in self._disk:
+            try:
+                with open(self._path(digest), 'rb') as f:
+                    png = f.read()
+                os.utime(self._path(digest))
+            except OSError:
+                self._disk_bytes -= self._disk.pop(digest)
+            else:
+                self._disk.move_to_end(digest)
+                self._remember_memory(digest, png)
+                self.hits += 1
+                return png
+
+        self.misses += 1
+        return None
+
+    def put(self, digest: str, png: bytes):
+        self._remember_memory(digest, png)
+        if digest in self._disk:
+            return
+        path = self._path(digest)
+        tmp = f'{path}.tmp'
+        try:
+            with open(tmp, 'wb') as f:
+                f.write(png)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"Error writing card cache file: {e}")
+            return
+        self._disk[digest] = len(png)
+        self._disk_bytes += len(png)
+        self._evict_disk()
+
+    def _remember_memory(self, digest: str, png: bytes):
+        self._memory[digest] = png
+        self._memory.move_to_end(digest)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        while self._disk_bytes > self.max_disk_bytes and self._disk:
+            digest, size = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            try:
+                os.remove(self._path(digest))
+            except OSError:
+                pass
+
+
+class CardRenderer:
+    """Serves cards from the cache, rendering misses in a process pool"""
+
+    def __init__(self, cache: CardCache = None, max_workers: int = 2):
+        self.cache = cache or CardCache()
+        self.max_workers = max_workers
+        self._executor = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        # Created on first miss so a bot that never renders never starts workers.
+        # Spawned, not forked: forking the threaded event-loop process can copy held locks
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._executor
+
+    async def get_card(self, key: tuple, build, fetch_image=None) -> bytes:
+        """
+        Get the PNG for a (kind, id, season, stats version, inputs hash) key.
+        build() is an async callable returning the card dict; fetch_image(url)
+        is an async callable returning image bytes, only called on a render.
+        """
+        digest = self.cache.lookup(key)
+        if digest:
+            png = self.cache.get(digest)
+            if png is not None:
+                return png
+
+        card = await build()
+        digest = card_digest(card)
+        self.cache.remember(key, digest)
+
+        png = self.cache.get(digest)
+        if png is None:
+            image = None
+            if fetch_image and card.get('image_url'):
+                try:
+                    image = await fetch_image(card['image_url'])
+                except Exception as e:
+                    print(f"Error fetching card image: {e}")
+            loop = asyncio.get_running_loop()
+            png = await loop.run_in_executor(self._pool(), render_card, card, image)
+            self.cache.put(digest, png)
+        return png
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -70,6 +70,32 @@ def create_release_embed(player: discord.Member, team_name: str, team_logo: str,
     
     return embed
 
+def create_roster_digest_embed(team_name: str, team_logo: str, coach: discord.Member,
+                               signed: list, released: list, roster_count: int, roster_cap: int,
+                               role_color: discord.Color = None) -> discord.Embed:
+    """Create one embed summing up a batch of signings and releases for a team"""
+    embed = discord.Embed(
+        title="📋 Roster Update",
+        color=role_color or discord.Color.blue(),
+        timestamp=datetime.utcnow()
+    )
+    
+    logo_url = get_team_logo_url(team_logo)
+    if logo_url:
+        embed.set_thumbnail(url=logo_url)
+    
+    team_display = f"{team_logo} • {team_name}" if team_logo else team_name
+    
+    embed.add_field(name="Team", value=team_display, inline=True)
+    embed.add_field(name="Roster", value=f"{roster_count}/{roster_cap}", inline=True)
+    if signed:
+        embed.add_field(name=f"📝 Signed ({len(signed)})", value="\n".join(p.mention for p in signed)[:1024], inline=False)
+    if released:
+        embed.add_field(name=f"📤 Released ({len(released)})", value="\n".join(p.mention for p in released)[:1024], inline=False)
+    embed.add_field(name="Updated by", value=coach.mention, inline=False)
+    
+    return embed
+
 def create_trade_embed(team1_name: str, team2_name: str,
                       team1_logo: str, team2_logo: str,
                       player1: discord.Member, player2: discord.Member,
@@ -0,0 +1,134 @@
+"""
+Streaming season exports.
+
+Each table is read page by page and written straight into a zip archive,
+so memory stays bounded by one page no matter how large the season is.
+CSV is always available; Parquet needs pyarrow installed.
+"""
+
+import csv
+import io
+import os
+import sys
+import tempfile
+import time
+import zipfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database import iter_season_rows
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+EXPORT_FORMATS = ('csv', 'parquet')
+
+# table -> (id-like columns exported as text, integer columns)
+EXPORT_TABLES = {
+    'games': (
+        ['id', 'guild_id', 'season_id', 'team1_id', 'team2_id', 'winner_id',
+         'played_at', 'recorded_by', 'vod_url', 'notes'],
+        ['team1_score', 'team2_score']
+    ),
+    'player_game_stats': (
+        ['id', 'game_id', 'player_id', 'team_id'],
+        ['points', 'rebounds', 'assists', 'steals', 'blocks', 'turnovers']
+    ),
+    'player_season_stats': (
+        ['id', 'player_id', 'season_id', 'guild_id'],
+        ['games_played', 'total_points', 'total_rebounds', 'total_assists',
+         'total_steals', 'total_blocks', 'total_turnovers']
+    ),
+}
+
+
+def parquet_available() -> bool:
+    """Whether Parquet exports can be written"""
+    return pa is not None
+
+
+def _columns(table: str) -> list:
+    text_columns, int_columns = EXPORT_TABLES[table]
+    return text_columns + int_columns
+
+
+def _write_csv(archive: zipfile.ZipFile, table: str, pages) -> int:
+    """Write pages of rows into <table>.csv inside the archive"""
+    columns = _columns(table)
+    rows = 0
+    with archive.open(f'{table}.csv', 'w') as raw:
+        out = io.TextIOWrapper(raw, encoding='utf-8', newline='')
+        writer = csv.DictWriter(out, fieldnames=columns, extrasaction='ignore')
+        writer.writeheader()
+        for page in pages:
+            writer.writerows(page)
+            rows += len(page)
+        out.flush()
+        out.detach()
+    return rows
+
+
+def _parquet_schema(table: str):
+    text_columns, int_columns = EXPORT_TABLES[table]
+    return pa.schema(
+        [(c, pa.string()) for c in text_columns] + [(c, pa.int64()) for c in int_columns]
+    )
+
+
+def _write_parquet(archive: zipfile.ZipFile, table: str, pages) -> int:
+    """Write pages of rows into <table>.parquet, one row group per page"""
+    text_columns, int_columns = EXPORT_TABLES[table]
+    schema = _parquet_schema(table)
+    rows = 0
+    with archive.open(f'{table}.parquet', 'w') as raw:
+        with pq.ParquetWriter(raw, schema) as writer:
+            for page in pages:
+                # IDs are BIGINT or UUID depending on the schema - keep them as text
+                data = {c: [None if r.get(c) is None else str(r[c]) for r in page] for c in text_columns}
+                data.update({c: [r.get(c) for r in page] for c in int_columns})
+                writer.write_table(pa.Table.from_pydict(data, schema=schema))
+                rows += len(page)
+            if rows == 0:
+                writer.write_table(schema.empty_table())
+    return rows
+
+
+def export_season(season_id, fmt: str = 'csv', page_size: int = 500, directory: str = None) -> tuple:
+    """
+    Export a season's games, player_game_stats and player_season_stats
+    into a zip archive. Returns (path, stats) where stats holds per-table
+    row counts, total rows, elapsed seconds and rows per second.
+    The caller owns the file and should delete it when done.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    if fmt == 'parquet' and not parquet_available():
+        raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)")
+
+    write_table = _write_parquet if fmt == 'parquet' else _write_csv
+    fd, path = tempfile.mkstemp(prefix=f'season_{season_id}_', suffix='.zip', dir=directory)
+    os.close(fd)
+
+    stats = {'tables': {}}
+    start = time.perf_counter()
+    try:
+        # Parquet is already compressed, so only deflate the CSVs
+        compression = zipfile.ZIP_STORED if fmt == 'parquet' else zipfile.ZIP_DEFLATED
+        with zipfile.ZipFile(path, 'w', compression=compression) as archive:
+            for table in EXPORT_TABLES:
+                pages = iter_season_rows(table, season_id, _columns(table), page_size)
+                stats['tables'][table] = write_table(archive, table, pages)
+    except Exception:
+        os.remove(path)
+        raise
+
+    elapsed = time.perf_counter() - start
+    stats['rows'] = sum(stats['tables'].values())
+    stats['seconds'] = elapsed
+    stats['rows_per_second'] = stats['rows'] / elapsed if elapsed > 0 else 0.0
+    stats['bytes'] = os.path.getsize(path)
+    print(f"Exported season {season_id} ({fmt}): {stats['rows']} rows in {elapsed:.2f}s "
+          f"({stats['rows_per_second']:.0f} rows/s)")
+    return path, stats
@@ -0,0 +1,85 @@
+"""
+Idempotency-Key support for the website API.
+
+A POST that carries an Idempotency-Key header is answered once. The stored
+response (status, body and a few headers) is replayed for any retry with the
+same key and the same body. A retry that arrives while the first request is
+still running waits for that request instead of starting a second one.
+Reusing a key with a different body is rejected.
+
+Keys live in memory for API_IDEMPOTENCY_TTL seconds, capped at
+API_IDEMPOTENCY_MAX_KEYS with the oldest dropped first. Responses that say
+to try again later (5xx) are not kept, so the retry really runs.
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+
+TTL = int(os.getenv('API_IDEMPOTENCY_TTL', 24 * 3600))
+MAX_KEYS = int(os.getenv('API_IDEMPOTENCY_MAX_KEYS', 10000))
+
+
+class IdempotencyConflict(Exception):
+    """The key was already used for a different request"""
+
+
+class IdempotencyStore:
+    """Results by idempotency key, with a TTL, a size cap and one call in flight per key"""
+
+    def __init__(self, ttl: int = TTL, max_keys: int = MAX_KEYS, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self.clock = clock
+        self.calls = 0
+        self.replays = 0
+        self._entries = OrderedDict()   # key -> (stored at, request fingerprint, future)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _evict(self):
+        """Drop expired keys, and the oldest ones until there's room for one more"""
+        cutoff = self.clock() - self.ttl
+        # Entries are in insertion order, so expired ones are at the front
+        while self._entries:
+            key, (stored_at, _, _) = next(iter(self._entries.items()))
+            if stored_at > cutoff and len(self._entries) < self.max_keys:
+                break
+            self._entries.popitem(last=False)
+
+    async def run(self, key, fingerprint: str, call, keep=lambda result: True) -> tuple:
+        """
+        (result, replayed) for a keyed call: call() runs the first time, later
+        calls with the key get the same result. keep(result) decides whether
+        the result is stored for future retries.
+        """
+        self._evict()
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[1] != fingerprint:
+                raise IdempotencyConflict(key)
+            self.replays += 1
+            # Shielded so a retry that gives up doesn't cancel the first request
+            return await asyncio.shield(entry[2]), True
+
+        future = asyncio.get_running_loop().create_future()
+        self._entries[key] = (self.clock(), fingerprint, future)
+        self.calls += 1
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            self._entries.pop(key, None)
+            future.cancel()
+            raise
+        except Exception as e:
+            self._entries.pop(key, None)
+            future.set_exception(e)
+            # Waiters see the error; nobody else has to retrieve it
+            future.exception()
+            raise
+        future.set_result(result)
+        if not keep(result):
+            self._entries.pop(key, None)
+        return result, False
@@ -0,0 +1,325 @@
+"""
+Bulk box-score import from CSV.
+
+One CSV row per player line. Rows sharing a `game` key belong to the same
+game and must agree on its teams and score:
+
+    game,played_at,team1,team2,team1_score,team2_score,player,team,points,rebounds,assists,steals,blocks,turnovers
+
+Teams and players are resolved against directories loaded once up front,
+the whole file is validated in memory, and nothing is written unless every
+row is valid. Games and player lines are then inserted in batches and the
+season's aggregates (player season stats, standings, head-to-head) are
+rebuilt once at the end.
+
+Games already imported into the season (matched on the key kept in their
+notes) are skipped, and if a write fails the games this run inserted are
+deleted again, so a failed import can simply be run again.
+
+Usage:
+    python utils/importer.py <file.csv> --guild <guild_id> --season <season_name> [--recorded-by <user_id>] [--dry-run]
+"""
+
+import argparse
+import csv
+import io
+import re
+import sys
+import os
+from datetime import datetime
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database import (
+    get_all_teams, get_user_directory, get_season_by_name, get_season_game_notes,
+    insert_games_bulk, insert_player_game_stats_bulk, delete_games,
+    rebuild_player_season_stats, rebuild_team_standings
+)
+
+GAME_COLUMNS = ('game', 'team1', 'team2', 'team1_score', 'team2_score')
+LINE_COLUMNS = ('player', 'team')
+STAT_COLUMNS = ('points', 'rebounds', 'assists', 'steals', 'blocks', 'turnovers')
+REQUIRED_COLUMNS = GAME_COLUMNS + LINE_COLUMNS
+
+# Stop collecting errors after this many so a bad file gives a readable report
+MAX_ERRORS = 25
+
+# Imported games carry their file key in their notes: "Imported (<key>)"
+IMPORT_NOTE_PREFIX = 'Imported ('
+
+AMBIGUOUS = object()
+
+_MENTION = re.compile(r'^<@!?(\d+)>$')
+
+
+def _add_name(directory: dict, name, value):
+    """Map a lowercased name to a value, marking names that map to two values"""
+    if not name:
+        return
+    key = str(name).strip().lower()
+    if not key:
+        return
+    existing = directory.get(key)
+    if existing is None or existing == value:
+        directory[key] = value
+    else:
+        directory[key] = AMBIGUOUS
+
+
+def build_team_directory(teams: list) -> dict:
+    """Map team name, role ID and ID -> team row"""
+    directory = {}
+    for team in teams:
+        _add_name(directory, team.get('team_name'), team['id'])
+        _add_name(directory, team.get('team_role_id'), team['id'])
+        _add_name(directory, team['id'], team['id'])
+    by_id = {team['id']: team for team in teams}
+    return {key: (by_id[value] if value is not AMBIGUOUS else AMBIGUOUS)
+            for key, value in directory.items()}
+
+
+def build_player_directory(users: list, members: list = None) -> dict:
+    """
+    Map usernames, display names and Minecraft names -> Discord ID.
+    users are website rows (id may carry a 'discord-' prefix);
+    members are optional discord.Member objects from the guild.
+    """
+    directory = {}
+    for user in users:
+        discord_id = str(user['id']).replace('discord-', '')
+        for name in (user.get('username'), user.get('display_name'), user.get('minecraft_username')):
+            _add_name(directory, name, discord_id)
+    for member in members or []:
+        for name in (member.name, member.display_name):
+            _add_name(directory, name, str(member.id))
+    return directory
+
+
+def _resolve_player(value: str, players: dict):
+    """Discord ID, mention or known name -> Discord ID string"""
+    value = value.strip()
+    mention = _MENTION.match(value)
+    if mention:
+        return mention.group(1)
+    if value.isdigit():
+        return value
+    return players.get(value.lower())
+
+
+def _parse_int(value: str, column: str, errors: list, row_number: int) -> int:
+    value = (value or '').strip()
+    if not value:
+        return 0
+    try:
+        number = int(value)
+    except ValueError:
+        errors.append(f"Row {row_number}: {column} must be a whole number (got '{value}')")
+        return 0
+    if number < 0:
+        errors.append(f"Row {row_number}: {column} can't be negative")
+    return number
+
+
+def parse_box_scores(text: str, teams: dict, players: dict) -> tuple:
+    """
+    Parse and validate a box-score CSV against team and player directories.
+    Returns (games, errors); games is a list of dicts in file order, each
+    with its game fields and a 'lines' list of player stat lines.
+    """
+    reader = csv.DictReader(io.StringIO(text.lstrip('\ufeff')))
+    header = [(c or '').strip().lower() for c in reader.fieldnames or []]
+    missing = [c for c in REQUIRED_COLUMNS if c not in header]
+    if missing:
+        return [], [f"Missing column(s): {', '.join(missing)}"]
+    reader.fieldnames = header
+
+    games = {}
+    errors = []
+
+    def resolve_team(value: str, column: str, row_number: int):
+        team = teams.get((value or '').strip().lower())
+        if team is AMBIGUOUS:
+            errors.append(f"Row {row_number}: {column} '{value}' matches more than one team")
+            return None
+        if team is None:
+            errors.append(f"Row {row_number}: unknown {column} '{value}'")
+        return team
+
+    # Header is row 1
+    for row_number, row in enumerate(reader, start=2):
+        if len(errors) >= MAX_ERRORS:
+            break
+        key = (row.get('game') or '').strip()
+        if not key:
+            errors.append(f"Row {row_number}: game is required")
+            continue
+
+        team1 = resolve_team(row.get('team1'), 'team1', row_number)
+        team2 = resolve_team(row.get('team2'), 'team2', row_number)
+        team1_score = _parse_int(row.get('team1_score'), 'team1_score', errors, row_number)
+        team2_score = _parse_int(row.get('team2_score'), 'team2_score', errors, row_number)
+        if not team1 or not team2:
+            continue
+        if team1['id'] == team2['id']:
+            errors.append(f"Row {row_number}: a team can't play itself")
+            continue
+
+        played_at = (row.get('played_at') or '').strip() or None
+        if played_at:
+            try:
+                played_at = datetime.fromisoformat(played_at).isoformat()
+            except ValueError:
+                errors.append(f"Row {row_number}: played_at must be an ISO date (e.g. 2024-05-01 or 2024-05-01T20:00)")
+                continue
+
+        game = games.get(key)
+        if game is None:
+            game = games[key] = {
+                'key': key,
+                'team1_id': team1['id'],
+                'team2_id': team2['id'],
+                'team1_score': team1_score,
+                'team2_score': team2_score,
+                'played_at': played_at,
+                'lines': [],
+                'players': set()
+            }
+        elif (game['team1_id'], game['team2_id'], game['team1_score'], game['team2_score']) != \
+                (team1['id'], team2['id'], team1_score, team2_score):
+            errors.append(f"Row {row_number}: game '{key}' has different teams or score than its earlier rows")
+            continue
+
+        # A row may carry only the game result with no player line
+        player_value = (row.get('player') or '').strip()
+        if not player_value:
+            continue
+
+        player_id = _resolve_player(player_value, players)
+        if player_id is AMBIGUOUS:
+            errors.append(f"Row {row_number}: player '{player_value}' matches more than one user, use their Discord ID")
+            continue
+        if player_id is None:
+            errors.append(f"Row {row_number}: unknown player '{player_value}'")
+            continue
+        if player_id in game['players']:
+            errors.append(f"Row {row_number}: player '{player_value}' appears twice in game '{key}'")
+            continue
+
+        team = resolve_team(row.get('team'), 'team', row_number)
+        if not team:
+            continue
+        if team['id'] not in (game['team1_id'], game['team2_id']):
+            errors.append(f"Row {row_number}: {team['team_name']} didn't play in game '{key}'")
+            continue
+
+        line = {'player_id': player_id, 'team_id': team['id']}
+        for stat in STAT_COLUMNS:
+            line[stat] = _parse_int(row.get(stat), stat, errors, row_number)
+        game['players'].add(player_id)
+        game['lines'].append(line)
+
+    if not games and not errors:
+        errors.append("The file has no games")
+
+    for game in games.values():
+        del game['players']
+    return list(games.values()), errors
+
+
+def import_box_scores(guild_id: int, season_id, games: list, recorded_by=None) -> dict:
+    """
+    Write validated games and their player lines, then rebuild the
+    season's aggregates once. Games already imported into the season are
+    skipped. Returns counts of what was written and skipped.
+    """
+    imported = {note[len(IMPORT_NOTE_PREFIX):-1]
+                for note in get_season_game_notes(season_id, IMPORT_NOTE_PREFIX)}
+    new_games = [game for game in games if game['key'] not in imported]
+
+    now = datetime.utcnow().isoformat()
+    game_rows = []
+    for game in new_games:
+        if game['team1_score'] > game['team2_score']:
+            winner_id = game['team1_id']
+        elif game['team2_score'] > game['team1_score']:
+            winner_id = game['team2_id']
+        else:
+            winner_id = None
+        game_rows.append({
+            'guild_id': str(guild_id),
+            'season_id': season_id,
+            'team1_id': game['team1_id'],
+            'team2_id': game['team2_id'],
+            'team1_score': game['team1_score'],
+            'team2_score': game['team2_score'],
+            'winner_id': winner_id,
+            'played_at': game['played_at'] or now,
+            'recorded_by': str(recorded_by) if recorded_by else None,
+            'notes': f"{IMPORT_NOTE_PREFIX}{game['key']})"
+        })
+
+    # Removes its own rows if a batch fails
+    inserted = insert_games_bulk(game_rows)
+    try:
+        if len(inserted) != len(game_rows):
+            raise RuntimeError(f"Inserted {len(inserted)} of {len(game_rows)} games")
+
+        lines = []
+        for game, row in zip(new_games, inserted):
+            for line in game['lines']:
+                lines.append({'game_id': row['id'], **line})
+        line_count = insert_player_game_stats_bulk(lines)
+    except Exception:
+        # Leave the season as it was so the import can be run again
+        delete_games([row['id'] for row in inserted])
+        raise
+
+    # Rebuilt even when every game was skipped, so re-running an import
+    # whose rebuild failed finishes the job
+    players = rebuild_player_season_stats(guild_id, season_id)
+    teams = rebuild_team_standings(guild_id, season_id)
+
+    return {'games': len(inserted), 'skipped': len(games) - len(new_games), 'lines': line_count,
+            'players': players, 'teams': teams}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import box scores from a CSV file")
+    parser.add_argument('file', help="CSV file to import")
+    parser.add_argument('--guild', type=int, required=True, help="Discord server ID")
+    parser.add_argument('--season', required=True, help="Season name (e.g. S1)")
+    parser.add_argument('--recorded-by', type=int, default=None, help="Discord ID to record as the submitter")
+    parser.add_argument('--dry-run', action='store_true', help="Validate only, write nothing")
+    args = parser.parse_args()
+
+    season = get_season_by_name(args.guild, args.season.upper())
+    if not season:
+        print(f"❌ Season {args.season.upper()} not found. Create it with /setseason first.")
+        return 1
+
+    with open(args.file, encoding='utf-8') as f:
+        text = f.read()
+
+    teams = build_team_directory(get_all_teams(args.guild))
+    players = build_player_directory(get_user_directory())
+    games, errors = parse_box_scores(text, teams, players)
+
+    if errors:
+        print(f"❌ {len(errors)} problem(s) found, nothing was imported:")
+        for error in errors:
+            print(f"  {error}")
+        return 1
+
+    line_count = sum(len(game['lines']) for game in games)
+    if args.dry_run:
+        print(f"✅ {len(games)} games and {line_count} player lines are valid (dry run, nothing written)")
+        return 0
+
+    summary = import_box_scores(args.guild, season['id'], games, args.recorded_by)
+    print(f"✅ Imported {summary['games']} games and {summary['lines']} player lines into {season['season_name']} "
+          f"({summary['players']} players, {summary['teams']} teams rebuilt)")
+    if summary['skipped']:
+        print(f"   Skipped {summary['skipped']} games already imported into {season['season_name']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,154 @@
+"""
+Online-player history from the status probes.
+
+Every probe the status loop already makes is appended to a per-server ring
+buffer (NumPy arrays for time and player count, the names seen alongside),
+and the unflushed part is bulk-inserted into mc_activity every few minutes.
+/mcactivity reads weeks of samples back and aggregates them column-wise:
+average and peak players per hour of day, and unique players per day.
+"""
+
+import time
+from datetime import datetime, timezone
+import numpy as np
+
+# Probes kept in memory per server; at the 30s floor this is about three days
+RING_CAPACITY = 8192
+
+FLUSH_SECONDS = 300
+
+
+class ActivityRing:
+    """Fixed-size ring of (probe time, players online, names) for one server"""
+
+    def __init__(self, capacity: int = RING_CAPACITY):
+        self.capacity = capacity
+        self.times = np.zeros(capacity, dtype=np.int64)
+        self.counts = np.zeros(capacity, dtype=np.int32)
+        self.names = np.empty(capacity, dtype=object)
+        self.written = 0   # probes appended ever
+        self.flushed = 0   # probes written to the database
+
+    def append(self, when: float, online: int, names: list):
+        slot = self.written % self.capacity
+        self.times[slot] = int(when)
+        self.counts[slot] = online
+        self.names[slot] = tuple(names or ())
+        self.written += 1
+
+    def _slots(self, start: int) -> np.ndarray:
+        # Anything older than one lap has been overwritten
+        start = max(start, self.written - self.capacity)
+        return np.arange(start, self.written) % self.capacity
+
+    def pending(self) -> tuple:
+        """(slots, written mark) for probes not yet flushed"""
+        return self._slots(self.flushed), self.written
+
+    def mark_flushed(self, mark: int):
+        self.flushed = max(self.flushed, mark)
+
+
+class ActivityRecorder:
+    """Activity rings for every polled server, with batched flushes"""
+
+    def __init__(self, capacity: int = RING_CAPACITY):
+        self.capacity = capacity
+        self.rings = {}
+        self.last_flush = time.monotonic()
+
+    def record(self, status: dict):
+        """Append one probe result"""
+        ring = self.rings.get(status['address'])
+        if ring is None:
+            ring = self.rings[status['address']] = ActivityRing(self.capacity)
+        online = (status.get('players_online') or 0) if status['online'] else 0
+        ring.append(time.time(), online, status.get('players') if status['online'] else ())
+
+    def flush_due(self) -> bool:
+        return time.monotonic() - self.last_flush >= FLUSH_SECONDS
+
+    def flush(self, insert) -> int:
+        """Write every unflushed probe through insert(rows), returns the row count"""
+        self.last_flush = time.monotonic()
+        rows = []
+        marks = []
+        for address, ring in self.rings.items():
+            slots, mark = ring.pending()
+            marks.append((ring, mark))
+            for slot in slots:
+                rows.append({
+                    'server_address': address,
+                    'sampled_at': datetime.fromtimestamp(int(ring.times[slot]), timezone.utc).isoformat(),
+                    'players_online': int(ring.counts[slot]),
+                    'players': list(ring.names[slot])
+                })
+        if rows:
+            insert(rows)
+        # Only advance once the insert landed, so a failed flush is retried
+        for ring, mark in marks:
+            ring.mark_flushed(mark)
+        return len(rows)
+
+    def unflushed(self, address: str) -> tuple:
+        """(times, counts, names) for a server's probes not in the database yet"""
+        ring = self.rings.get(address)
+        if ring is None:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int32), []
+        slots, _ = ring.pending()
+        return ring.times[slots], ring.counts[slots], list(ring.names[slots])
+
+
+def rows_to_arrays(rows: list) -> tuple:
+    """mc_activity rows -> (times, counts, names)"""
+    times = np.array([int(datetime.fromisoformat(r['sampled_at']).timestamp()) for r in rows], dtype=np.int64)
+    counts = np.array([r.get('players_online') or 0 for r in rows], dtype=np.int32)
+    names = [tuple(r.get('players') or ()) for r in rows]
+    return times, counts, names
+
+
+def summarize_activity(times: np.ndarray, counts: np.ndarray, names: list, utc_offset: int = 0) -> dict:
+    """
+    Aggregate samples: hourly_avg / hourly_peak (24 values, local hour of
+    day), days / daily_unique (unique names per local day), peak_hours
+    (best three by average), samples and unique_players.
+    """
+    local = times + utc_offset * 3600
+    hours = (local // 3600) % 24
+    samples_per_hour = np.bincount(hours, minlength=24)
+    hourly_avg = np.zeros(24)
+    np.divide(np.bincount(hours, weights=counts, minlength=24), samples_per_hour,
+              out=hourly_avg, where=samples_per_hour > 0)
+    hourly_peak = np.zeros(24, dtype=np.int64)
+    np.maximum.at(hourly_peak, hours, counts)
+
+    # Unique (day, player) pairs: one code per name, then unique over day * names + code
+    days = local // 86400
+    lengths = np.array([len(n) for n in names], dtype=np.int64)
+    flat = [name.lower() for group in names for name in group]
+    day_list, daily_unique = [], []
+    unique_players = 0
+    if flat:
+        codes_by_name, codes = np.unique(np.array(flat), return_inverse=True)
+        unique_players = len(codes_by_name)
+        pair_days = np.repeat(days, lengths)
+        pairs = np.unique(pair_days * unique_players + codes)
+        day_values, per_day = np.unique(pairs // unique_players, return_counts=True)
+        # Days with probes but nobody online count as zero
+        all_days = np.arange(days.min(), days.max() + 1)
+        filled = np.zeros(len(all_days), dtype=np.int64)
+        filled[day_values - all_days[0]] = per_day
+        day_list = [datetime.fromtimestamp(int(d) * 86400, timezone.utc).strftime('%b %d') for d in all_days]
+        daily_unique = filled.tolist()
+
+    peak_hours = [int(h) for h in np.argsort(-hourly_avg, kind='stable')[:3] if samples_per_hour[h] > 0]
+
+    return {
+        'samples': int(len(times)),
+        'hourly_avg': hourly_avg.tolist(),
+        'hourly_peak': hourly_peak.tolist(),
+        'days': day_list,
+        'daily_unique': daily_unique,
+        'peak_hours': peak_hours,
+        'unique_players': unique_players
+    }
@@ -0,0 +1,236 @@
+"""
+Benchmark for the Minecraft status loop.
+
+Starts local fake servers (utils/mc_fake_server.py), points hundreds of
+simulated guilds at them and drives MinecraftStatus.update_status directly,
+with Discord and Supabase replaced by in-process fakes that count calls and
+add configurable latency. Every cycle forces every server due, and between
+cycles some servers gain or lose a player so a realistic share of embeds
+changes. Reports cycle time, probes and protocol requests, embed edits
+(made and skipped), re-posts and database calls.
+
+Needs the bot's own requirements (discord.py, mcstatus, numpy); nothing
+touches the network besides 127.0.0.1.
+
+    python utils/mc_bench.py --guilds 300 --servers 20 --cycles 5
+    python utils/mc_bench.py --offline 0.2 --offline-mode hang --edit-latency 0.1
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import random
+import statistics
+import sys
+import os
+import time
+from collections import Counter
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import cogs.minecraft as minecraft
+from utils import mc_identity
+from utils.mc_status import ProbeCache
+from utils.mc_fake_server import start_fake_servers
+
+
+class FakeMessage:
+    def __init__(self, bench, message_id: int):
+        self.bench = bench
+        self.id = message_id
+
+    async def edit(self, embed=None):
+        self.bench.calls['discord.edit'] += 1
+        await asyncio.sleep(self.bench.edit_latency)
+
+
+class FakeChannel:
+    def __init__(self, bench, channel_id: int):
+        self.bench = bench
+        self.id = channel_id
+
+    def get_partial_message(self, message_id: int) -> FakeMessage:
+        return FakeMessage(self.bench, message_id)
+
+    async def send(self, embed=None) -> FakeMessage:
+        self.bench.calls['discord.send'] += 1
+        await asyncio.sleep(self.bench.edit_latency)
+        return FakeMessage(self.bench, random.getrandbits(60))
+
+
+class FakeGuild:
+    def __init__(self, bench, guild_id: int):
+        self.id = guild_id
+        self.channel = FakeChannel(bench, guild_id + 1)
+
+    def get_channel(self, channel_id: int):
+        return self.channel if channel_id == self.channel.id else None
+
+
+class FakeBot:
+    def __init__(self, guilds: dict):
+        self.guilds = guilds
+
+    def get_guild(self, guild_id: int):
+        return self.guilds.get(guild_id)
+
+    async def wait_until_ready(self):
+        await asyncio.Event().wait()
+
+
+class StatusBench:
+    """Simulated guilds, players and rosters around a set of fake servers"""
+
+    def __init__(self, args, servers: list):
+        self.args = args
+        self.servers = servers
+        self.edit_latency = args.edit_latency
+        self.calls = Counter()
+        self.pool = [f"Player{i:04d}" for i in range(args.servers * args.players * 2)]
+
+        self.configs = []
+        self.guilds = {}
+        for g in range(args.guilds):
+            guild_id = 1_000_000 + g * 10
+            self.guilds[guild_id] = FakeGuild(self, guild_id)
+            self.configs.append({
+                'guild_id': str(guild_id),
+                'mc_status_channel_id': str(guild_id + 1),
+                'mc_status_message_id': str(guild_id + 2),
+                'mc_server_address': servers[g % len(servers)].address,
+                'mc_poll_min_seconds': 30,
+                'mc_poll_max_seconds': 1800
+            })
+
+        # Every pool player is rostered in one guild, on one of its teams, and linked there
+        self.teams, self.users, self.links = [], [], []
+        for config in self.configs:
+            for t in range(args.teams):
+                self.teams.append({
+                    'id': f"{config['guild_id']}-{t}", 'guild_id': config['guild_id'],
+                    'name': None, 'team_name': f"Team {t + 1}", 'team_logo_emoji': '🏀'
+                })
+        for i, name in enumerate(self.pool):
+            config = self.configs[i % len(self.configs)]
+            discord_id = str(5_000_000 + i)
+            self.users.append({'id': f'discord-{discord_id}', 'team_id': f"{config['guild_id']}-{i % args.teams}",
+                               'minecraft_username': None})
+            self.links.append({'guild_id': config['guild_id'], 'user_id': discord_id,
+                               'minecraft_username': name, 'minecraft_uuid': None})
+
+        for server in servers:
+            server.players = random.sample(self.pool, args.players)
+
+    def db(self, name: str, result):
+        """A database function replacement that counts calls and sleeps like a round trip"""
+        def call(*args, **kwargs):
+            self.calls[f'db.{name}'] += 1
+            time.sleep(self.args.db_latency)
+            return result(*args, **kwargs) if callable(result) else result
+        return call
+
+    def install(self):
+        """Swap the cog module's database functions for counting fakes"""
+        minecraft.get_mc_status_configs = self.db('get_mc_status_configs', lambda: self.configs)
+        minecraft.get_pending_gametimes = self.db('get_pending_gametimes', [])
+        minecraft.insert_mc_activity = self.db('insert_mc_activity', lambda rows: len(rows))
+        minecraft.get_minecraft_links = self.db('get_minecraft_links', lambda guild_ids: self.links)
+        minecraft.get_rostered_users = self.db('get_rostered_users', lambda: self.users)
+        minecraft.get_teams_for_guilds = self.db('get_teams_for_guilds', lambda guild_ids: self.teams)
+        minecraft.update_server_config = self.db('update_server_config', True)
+        # Keep fake names out of the real profile cache
+        mc_identity._resolver = mc_identity.IdentityResolver(path=None)
+
+    def churn(self):
+        """Swap one player on a share of the online servers"""
+        for server in self.servers:
+            if server.mode == 'online' and server.players and random.random() < self.args.churn:
+                server.players[random.randrange(len(server.players))] = random.choice(self.pool)
+
+    def server_requests(self) -> tuple:
+        return (sum(s.status_requests for s in self.servers),
+                sum(s.query_requests for s in self.servers))
+
+
+async def run(args) -> int:
+    random.seed(args.seed)
+    servers = await start_fake_servers(
+        args.servers, latency=args.latency, jitter=args.jitter,
+        sample=not args.no_sample, max_players=max(20, args.players)
+    )
+    offline = servers[:int(round(len(servers) * args.offline))]
+    for server in offline:
+        await server.set_mode(args.offline_mode)
+
+    bench = StatusBench(args, servers)
+    bench.install()
+    bot = FakeBot(bench.guilds)
+    cog = minecraft.MinecraftStatus(bot)
+    # Driven by hand below, not by its own loop
+    cog.update_status.cancel()
+    cog.probes = ProbeCache(ttl=0, min_interval=0)
+
+    print(f"{args.guilds} guilds on {args.servers} servers ({len(offline)} {args.offline_mode}), "
+          f"{args.players} players each, {args.latency * 1000:.0f}ms server latency, "
+          f"{args.edit_latency * 1000:.0f}ms per Discord edit")
+    print(f"{'cycle':>5} {'seconds':>8} {'probes':>6} {'status':>6} {'query':>5} "
+          f"{'edits':>5} {'skipped':>7} {'sends':>5} {'db':>4}")
+
+    times = []
+    for cycle in range(args.cycles):
+        if cycle:
+            bench.churn()
+        for address in cog.servers:
+            cog.scheduler.poll_now(address)
+
+        calls = bench.calls.copy()
+        probes, skipped = cog.probes.probes, cog.edits_skipped
+        status_before, query_before = bench.server_requests()
+        started = time.perf_counter()
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output if not args.verbose else sys.stdout):
+            await cog.update_status()
+        elapsed = time.perf_counter() - started
+        status_after, query_after = bench.server_requests()
+
+        delta = bench.calls - calls
+        db_calls = sum(n for key, n in delta.items() if key.startswith('db.'))
+        label = 'cold' if cycle == 0 else str(cycle)
+        if cycle:
+            times.append(elapsed)
+        print(f"{label:>5} {elapsed:8.3f} {cog.probes.probes - probes:6d} {status_after - status_before:6d} "
+              f"{query_after - query_before:5d} {delta['discord.edit']:5d} {cog.edits_skipped - skipped:7d} "
+              f"{delta['discord.send']:5d} {db_calls:4d}")
+
+    if times:
+        print(f"\nwarm cycles: mean {statistics.mean(times):.3f}s, median {statistics.median(times):.3f}s, "
+              f"max {max(times):.3f}s ({statistics.mean(times) / args.guilds * 1000:.2f}ms per guild)")
+    print("calls: " + ", ".join(f"{key} {n}" for key, n in sorted(bench.calls.items())))
+
+    for server in servers:
+        await server.stop()
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Minecraft status loop against local fake servers")
+    parser.add_argument('--guilds', type=int, default=300)
+    parser.add_argument('--servers', type=int, default=20)
+    parser.add_argument('--players', type=int, default=12, help="players online per server")
+    parser.add_argument('--teams', type=int, default=4, help="teams per guild")
+    parser.add_argument('--cycles', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=0.05, help="server reply latency in seconds")
+    parser.add_argument('--jitter', type=float, default=0.02, help="random extra server latency in seconds")
+    parser.add_argument('--offline', type=float, default=0.1, help="share of servers that are down")
+    parser.add_argument('--offline-mode', choices=('refuse', 'hang'), default='refuse')
+    parser.add_argument('--no-sample', action='store_true', help="servers hide the sample, so probes fall back to query")
+    parser.add_argument('--churn', type=float, default=0.3, help="share of servers whose player list changes per cycle")
+    parser.add_argument('--edit-latency', type=float, default=0.05, help="seconds per Discord edit or send")
+    parser.add_argument('--db-latency', type=float, default=0.02, help="seconds per database call")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--verbose', action='store_true', help="show the cog's own log lines")
+    args = parser.parse_args()
+    return asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,259 @@
+"""
+Local fake Minecraft servers for exercising the status loop.
+
+A FakeMinecraftServer listens on localhost and answers the server-list-ping
+(TCP) and query (UDP, same port) protocols the way a vanilla server does.
+Each one has its own player list, sample and query switches, injected
+latency and an offline mode:
+  - online: answers normally
+  - hang: accepts connections but never answers (probes hit their timeout)
+  - refuse: not listening at all (connection refused)
+Everything can be changed while it runs, and it counts the requests it saw.
+
+Run one by hand and point /mcserver at the address it prints:
+    python utils/mc_fake_server.py --players Steve Alex --latency 0.05
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import struct
+import uuid
+
+PROTOCOL_VERSION = 765
+# Vanilla servers send at most this many names in the status sample
+SAMPLE_SIZE = 12
+
+QUERY_MAGIC = b'\xfe\xfd'
+
+
+def offline_uuid(name: str) -> str:
+    """The UUID an offline-mode server gives a player name"""
+    digest = hashlib.md5(f'OfflinePlayer:{name}'.encode()).digest()
+    return str(uuid.UUID(bytes=digest, version=3))
+
+
+def write_varint(value: int) -> bytes:
+    out = bytearray()
+    value &= 0xFFFFFFFF
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+async def read_varint(reader: asyncio.StreamReader) -> int:
+    value = 0
+    for shift in range(0, 35, 7):
+        byte = (await reader.readexactly(1))[0]
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value
+    raise ValueError("VarInt too long")
+
+
+def packet(packet_id: int, payload: bytes) -> bytes:
+    body = write_varint(packet_id) + payload
+    return write_varint(len(body)) + body
+
+
+class _QueryProtocol(asyncio.DatagramProtocol):
+    def __init__(self, server):
+        self.server = server
+        self.transport = None
+        self.challenges = {}   # client address -> challenge token
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr):
+        server = self.server
+        if server.mode != 'online' or not server.query or data[:2] != QUERY_MAGIC or len(data) < 7:
+            return
+        kind, session = data[2], data[3:7]
+        if kind == 9:
+            server.query_handshakes += 1
+            token = random.randint(1, 2 ** 31 - 1)
+            self.challenges[addr] = token
+            reply = b'\x09' + session + str(token).encode() + b'\x00'
+        elif kind == 0 and len(data) >= 11:
+            token = struct.unpack('>i', data[7:11])[0]
+            if self.challenges.pop(addr, None) != token:
+                return
+            server.query_requests += 1
+            reply = b'\x00' + session + server.query_payload()
+        else:
+            return
+        asyncio.get_running_loop().call_later(server.delay(), self._send, reply, addr)
+
+    def _send(self, reply: bytes, addr):
+        if self.transport is not None and not self.transport.is_closing():
+            self.transport.sendto(reply, addr)
+
+
+class FakeMinecraftServer:
+    """One fake server on 127.0.0.1, speaking server-list-ping and query"""
+
+    def __init__(self, players: list = None, max_players: int = 20, version: str = '1.20.4',
+                 motd: str = 'A Minecraft Server', latency: float = 0.0, jitter: float = 0.0,
+                 mode: str = 'online', sample: bool = True, query: bool = True,
+                 host: str = '127.0.0.1', port: int = 0):
+        self.players = list(players or [])
+        self.max_players = max_players
+        self.version = version
+        self.motd = motd
+        self.latency = latency
+        self.jitter = jitter
+        self.mode = mode
+        self.sample = sample
+        self.query = query
+        self.host = host
+        self.port = port
+        self.connections = 0
+        self.status_requests = 0
+        self.pings = 0
+        self.query_handshakes = 0
+        self.query_requests = 0
+        self._tcp = None
+        self._udp = None
+        self._clients = set()
+
+    @property
+    def address(self) -> str:
+        return f"{self.host}:{self.port}"
+
+    def delay(self) -> float:
+        """Injected latency for one reply"""
+        return self.latency + random.uniform(0, self.jitter) if self.jitter else self.latency
+
+    async def start(self):
+        """Start listening (keeps the same port across restarts)"""
+        if self.mode == 'refuse' or self._tcp is not None:
+            return
+        loop = asyncio.get_running_loop()
+        self._tcp = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._tcp.sockets[0].getsockname()[1]
+        # Query listens on the game port, like a server with query.port unset
+        self._udp, _ = await loop.create_datagram_endpoint(
+            lambda: _QueryProtocol(self), local_addr=(self.host, self.port)
+        )
+
+    async def stop(self):
+        """Stop listening and drop open connections"""
+        if self._udp is not None:
+            self._udp.close()
+            self._udp = None
+        if self._tcp is not None:
+            self._tcp.close()
+            for writer in list(self._clients):
+                writer.close()
+            await self._tcp.wait_closed()
+            self._tcp = None
+
+    async def set_mode(self, mode: str):
+        """Switch between online, hang and refuse while running"""
+        self.mode = mode
+        if mode == 'refuse':
+            await self.stop()
+        else:
+            await self.start()
+
+    def status_payload(self) -> dict:
+        players = {'max': self.max_players, 'online': len(self.players)}
+        if self.sample and self.players:
+            players['sample'] = [
+                {'name': name, 'id': offline_uuid(name)} for name in self.players[:SAMPLE_SIZE]
+            ]
+        return {
+            'version': {'name': self.version, 'protocol': PROTOCOL_VERSION},
+            'players': players,
+            'description': {'text': self.motd}
+        }
+
+    def query_payload(self) -> bytes:
+        values = {
+            'hostname': self.motd, 'gametype': 'SMP', 'game_id': 'MINECRAFT',
+            'version': self.version, 'plugins': '', 'map': 'world',
+            'numplayers': str(len(self.players)), 'maxplayers': str(self.max_players),
+            'hostport': str(self.port), 'hostip': self.host
+        }
+        body = b'splitnum\x00\x80\x00'
+        body += b''.join(k.encode() + b'\x00' + v.encode('latin-1', 'replace') + b'\x00' for k, v in values.items())
+        body += b'\x00\x01player_\x00\x00'
+        body += b''.join(name.encode() + b'\x00' for name in self.players)
+        return body + b'\x00'
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        self._clients.add(writer)
+        try:
+            while True:
+                length = await read_varint(reader)
+                data = await reader.readexactly(length)
+                if self.mode == 'hang':
+                    continue
+                packet_id = data[0]
+                if packet_id == 0x00 and len(data) > 1:
+                    # Handshake, nothing to answer
+                    continue
+                await asyncio.sleep(self.delay())
+                if packet_id == 0x00:
+                    self.status_requests += 1
+                    text = json.dumps(self.status_payload()).encode()
+                    writer.write(packet(0x00, write_varint(len(text)) + text))
+                elif packet_id == 0x01:
+                    self.pings += 1
+                    writer.write(packet(0x01, data[1:9]))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            self._clients.discard(writer)
+            writer.close()
+
+
+async def start_fake_servers(count: int, **options) -> list:
+    """Start count fake servers with the same options"""
+    servers = [FakeMinecraftServer(**options) for _ in range(count)]
+    for server in servers:
+        await server.start()
+    return servers
+
+
+async def _serve(args):
+    server = FakeMinecraftServer(
+        players=args.players, max_players=args.max_players, latency=args.latency,
+        mode=args.mode, sample=not args.no_sample, query=not args.no_query, port=args.port
+    )
+    await server.start()
+    print(f"Fake Minecraft server on {server.address} ({len(server.players)} online, mode {server.mode})")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a fake Minecraft server on localhost")
+    parser.add_argument('--port', type=int, default=25565)
+    parser.add_argument('--players', nargs='*', default=[])
+    parser.add_argument('--max-players', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds added to every reply")
+    parser.add_argument('--mode', choices=('online', 'hang', 'refuse'), default='online')
+    parser.add_argument('--no-sample', action='store_true', help="leave names out of the status sample")
+    parser.add_argument('--no-query', action='store_true', help="don't answer the query protocol")
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,239 @@
+"""
+Minecraft username <-> UUID resolution with a persistent cache.
+
+Usernames can change but UUIDs can't, so links and park stats key on the
+UUID and names are looked up through this cache. Hits cost a dictionary
+lookup; misses are batched into Mojang's bulk profile endpoint (10 names
+per request), and concurrent lookups for the same name share one request.
+Names that don't exist are cached too, for a shorter time, so a typo isn't
+re-queried on every command. If Mojang is unreachable an expired entry is
+served rather than failing.
+
+The upstream is pluggable: anything with async `names_to_profiles(names)`
+and `uuid_to_name(uuid)` works, e.g. a local stand-in for testing.
+"""
+
+import asyncio
+import json
+import os
+import time
+import aiohttp
+
+CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.mc_profiles.json')
+
+# How long a resolved name or a "no such player" answer is trusted
+PROFILE_TTL = int(os.getenv('MC_PROFILE_TTL', 24 * 60 * 60))
+NEGATIVE_TTL = int(os.getenv('MC_PROFILE_NEGATIVE_TTL', 10 * 60))
+
+# Mojang's bulk endpoint accepts at most this many names per request
+MOJANG_BATCH = 10
+
+
+def dashed_uuid(uuid: str) -> str:
+    """Mojang returns UUIDs without dashes; park stats and links store them dashed"""
+    raw = uuid.replace('-', '').lower()
+    if len(raw) != 32:
+        return uuid
+    return f"{raw[:8]}-{raw[8:12]}-{raw[12:16]}-{raw[16:20]}-{raw[20:]}"
+
+
+class MojangUpstream:
+    """Mojang's public profile API"""
+
+    PROFILES_URL = 'https://api.mojang.com/profiles/minecraft'
+    SESSION_URL = 'https://sessionserver.mojang.com/session/minecraft/profile/{}'
+
+    def __init__(self):
+        self._http = None
+
+    def _session(self) -> aiohttp.ClientSession:
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
+        return self._http
+
+    async def names_to_profiles(self, names: list) -> dict:
+        """lowercased name -> (uuid, current name) for the names that exist"""
+        async with self._session().post(self.PROFILES_URL, json=names) as response:
+            response.raise_for_status()
+            data = await response.json()
+        return {p['name'].lower(): (dashed_uuid(p['id']), p['name']) for p in data}
+
+    async def uuid_to_name(self, uuid: str) -> str:
+        """Current name for a UUID, or None if there is no such profile"""
+        async with self._session().get(self.SESSION_URL.format(uuid.replace('-', ''))) as response:
+            if response.status in (204, 404):
+                return None
+            response.raise_for_status()
+            data = await response.json()
+        return data.get('name')
+
+    async def close(self):
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
+
+
+class IdentityResolver:
+    """Cached username <-> UUID lookups, persisted to a JSON file"""
+
+    def __init__(self, upstream=None, path: str = CACHE_PATH,
+                 ttl: int = PROFILE_TTL, negative_ttl: int = NEGATIVE_TTL):
+        self.upstream = upstream or MojangUpstream()
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.names = {}   # lowercased name -> [uuid or None, resolved at]
+        self.uuids = {}   # uuid -> [name or None, resolved at]
+        self._pending = {}
+        self._dirty = False
+        self._write_lock = asyncio.Lock()
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            self.names = data.get('names', {})
+            self.uuids = data.get('uuids', {})
+        except (OSError, ValueError) as e:
+            print(f"Error reading Minecraft profile cache: {e}")
+
+    async def flush(self):
+        """Write the cache to disk if it changed, without blocking the event loop"""
+        if not self._dirty or not self.path:
+            return
+        # Serialized on the loop so the write never sees the dicts mid-update
+        data = json.dumps({'names': self.names, 'uuids': self.uuids})
+        self._dirty = False
+        async with self._write_lock:
+            try:
+                await asyncio.to_thread(self._write, data)
+            except OSError as e:
+                self._dirty = True
+                print(f"Error writing Minecraft profile cache: {e}")
+
+    def _write(self, data: str):
+        tmp = f'{self.path}.tmp'
+        with open(tmp, 'w') as f:
+            f.write(data)
+        os.replace(tmp, self.path)
+
+    def _fresh(self, entry: list) -> bool:
+        ttl = self.ttl if entry[0] is not None else self.negative_ttl
+        return time.time() - entry[1] < ttl
+
+    def observe(self, uuid: str, name: str):
+        """Record a (uuid, name) pair seen elsewhere, e.g. in a server status sample"""
+        uuid = dashed_uuid(uuid)
+        now = time.time()
+        previous = self.uuids.get(uuid)
+        if previous and previous[0] == name and now - previous[1] < self.ttl / 2:
+            return
+        if previous and previous[0] and previous[0].lower() != name.lower():
+            # The old name no longer points here
+            self.names.pop(previous[0].lower(), None)
+        self.names[name.lower()] = [uuid, now]
+        self.uuids[uuid] = [name, now]
+        self._dirty = True
+
+    def cached_uuid(self, name: str) -> str:
+        """UUID for a name from the cache only (may be stale), or None"""
+        entry = self.names.get((name or '').strip().lower())
+        return entry[0] if entry else None
+
+    def cached_name(self, uuid: str) -> str:
+        """Name for a UUID from the cache only (may be stale), or None"""
+        entry = self.uuids.get(dashed_uuid(uuid))
+        return entry[0] if entry else None
+
+    async def resolve_names(self, names: list) -> dict:
+        """lowercased name -> dashed UUID (None if no such player)"""
+        keys = {(n or '').strip().lower() for n in names if n and n.strip()}
+        result = {}
+        misses = []
+        waits = []
+        for key in keys:
+            entry = self.names.get(key)
+            if entry and self._fresh(entry):
+                result[key] = entry[0]
+            elif key in self._pending:
+                waits.append((key, self._pending[key]))
+            else:
+                misses.append(key)
+
+        if misses:
+            loop = asyncio.get_running_loop()
+            futures = {key: loop.create_future() for key in misses}
+            self._pending.update(futures)
+            try:
+                for start in range(0, len(misses), MOJANG_BATCH):
+                    await self._fetch_names(misses[start:start + MOJANG_BATCH])
+            finally:
+                for key, future in futures.items():
+                    self._pending.pop(key, None)
+                    entry = self.names.get(key)
+                    future.set_result(entry[0] if entry else None)
+                    result[key] = entry[0] if entry else None
+            await self.flush()
+
+        for key, future in waits:
+            result[key] = await future
+        return result
+
+    async def _fetch_names(self, batch: list):
+        try:
+            profiles = await self.upstream.names_to_profiles(batch)
+        except Exception as e:
+            # Keep serving whatever (possibly expired) entries we have
+            print(f"Error resolving Minecraft names: {e}")
+            return
+        now = time.time()
+        for key in batch:
+            profile = profiles.get(key)
+            if profile:
+                self.observe(*profile)
+            else:
+                self.names[key] = [None, now]
+                self._dirty = True
+
+    async def resolve_name(self, name: str) -> str:
+        """Dashed UUID for a username, or None"""
+        key = (name or '').strip().lower()
+        if not key:
+            return None
+        return (await self.resolve_names([key])).get(key)
+
+    async def resolve_uuid(self, uuid: str) -> str:
+        """Current username for a UUID, or None"""
+        uuid = dashed_uuid(uuid)
+        entry = self.uuids.get(uuid)
+        if entry and self._fresh(entry):
+            return entry[0]
+        try:
+            name = await self.upstream.uuid_to_name(uuid)
+        except Exception as e:
+            print(f"Error resolving Minecraft UUID: {e}")
+            return entry[0] if entry else None
+        if name:
+            self.observe(uuid, name)
+        else:
+            self.uuids[uuid] = [None, time.time()]
+            self._dirty = True
+        await self.flush()
+        return name
+
+
+# ============================================
+# Shared resolver
+# ============================================
+
+_resolver = None
+
+def get_resolver() -> IdentityResolver:
+    """The process-wide resolver, so every cog shares one cache"""
+    global _resolver
+    if _resolver is None:
+        _resolver = IdentityResolver()
+    return _resolver
@@ -0,0 +1,128 @@
+"""
+Reverse index from Minecraft name to Discord user to team.
+
+The status embeds group online players by team ("3 Brooklyn Buckets,
+2 Miami Magma Cubes online"). The index is built once from minecraft_links,
+the users table (team_id and the website's minecraft_username) and the teams
+of the guilds with a status embed. After that, link_minecraft and roster
+moves feed single entries into it, so grouping a server's player list is one
+dict lookup per name. A periodic rebuild picks up changes made outside the
+bot (the website writes users.team_id directly).
+"""
+
+import threading
+
+
+def discord_id_from_user(user_id) -> str:
+    """users.id ('discord-<id>' from the website, or the raw id) -> Discord ID string"""
+    user_id = str(user_id)
+    return user_id[len('discord-'):] if user_id.startswith('discord-') else user_id
+
+
+def team_label(team: dict) -> str:
+    """Display name for a team row, with its emoji when it has one"""
+    name = team.get('team_name') or team.get('name') or 'Unknown'
+    emoji = team.get('team_logo_emoji')
+    return f"{emoji} {name}" if emoji else name
+
+
+class RosterIndex:
+    """Minecraft name -> Discord ID per guild, Discord ID -> team, team -> label"""
+
+    def __init__(self, links: list = None, users: list = None, teams: list = None):
+        self._lock = threading.Lock()
+        self._linked = {}       # guild_id -> {lowercase name: discord id}
+        self._link_names = {}   # (guild_id, discord id) -> lowercase name, to drop it on relink
+        self._site_names = {}   # lowercase name -> discord id, from website accounts
+        self._user_team = {}    # discord id -> team id
+        self._teams = {}        # team id -> (guild_id, label)
+
+        for team in teams or []:
+            self._teams[str(team['id'])] = (str(team['guild_id']), team_label(team))
+        for user in users or []:
+            discord_id = discord_id_from_user(user['id'])
+            if user.get('team_id'):
+                self._user_team[discord_id] = str(user['team_id'])
+            if user.get('minecraft_username'):
+                self._site_names[user['minecraft_username'].lower()] = discord_id
+        for link in links or []:
+            self._set_link(str(link['guild_id']), str(link['user_id']), link.get('minecraft_username'))
+
+    def _set_link(self, guild_id: str, discord_id: str, name: str):
+        names = self._linked.setdefault(guild_id, {})
+        old = self._link_names.pop((guild_id, discord_id), None)
+        if old is not None and names.get(old) == discord_id:
+            del names[old]
+        if name:
+            names[name.lower()] = discord_id
+            self._link_names[(guild_id, discord_id)] = name.lower()
+
+    def link(self, guild_id, user_id, minecraft_username: str):
+        """Point a Minecraft name at a Discord user in one guild (replaces their old name)"""
+        with self._lock:
+            self._set_link(str(guild_id), str(user_id), minecraft_username)
+
+    def set_team(self, user_id, team_id):
+        """Move a Discord user to a team, or off every team when team_id is None"""
+        with self._lock:
+            if team_id:
+                self._user_team[str(user_id)] = str(team_id)
+            else:
+                self._user_team.pop(str(user_id), None)
+
+    def team_of(self, guild_id, minecraft_username: str) -> str:
+        """Label of the guild team a Minecraft name plays for, or None"""
+        guild_id = str(guild_id)
+        key = minecraft_username.lower()
+        discord_id = self._linked.get(guild_id, {}).get(key) or self._site_names.get(key)
+        if discord_id is None:
+            return None
+        team = self._teams.get(self._user_team.get(discord_id))
+        # users.team_id is global, only teams of this guild count here
+        if team is None or team[0] != guild_id:
+            return None
+        return team[1]
+
+    def group_online(self, guild_id, names: list) -> tuple:
+        """
+        Split online names by team for one guild: ([(team label, names), ...]
+        largest team first, [names without a team]).
+        """
+        teams = {}
+        others = []
+        with self._lock:
+            for name in names:
+                label = self.team_of(guild_id, name)
+                if label is None:
+                    others.append(name)
+                else:
+                    teams.setdefault(label, []).append(name)
+        grouped = sorted(teams.items(), key=lambda item: (-len(item[1]), item[0]))
+        return grouped, others
+
+
+# ============================================
+# Shared index
+# ============================================
+
+_index = None
+
+def get_roster_index() -> RosterIndex:
+    """The loaded index, or None before the first build"""
+    return _index
+
+def load_roster_index(links: list, users: list, teams: list) -> RosterIndex:
+    """Build the index from full table reads and make it the shared one"""
+    global _index
+    _index = RosterIndex(links, users, teams)
+    return _index
+
+def apply_minecraft_link(guild_id, user_id, minecraft_username: str):
+    """Feed a written minecraft_links row into the index, if it is loaded"""
+    if _index is not None:
+        _index.link(guild_id, user_id, minecraft_username)
+
+def apply_roster_move(user_id, team_id):
+    """Feed a users.team_id change into the index, if it is loaded"""
+    if _index is not None:
+        _index.set_team(user_id, team_id)
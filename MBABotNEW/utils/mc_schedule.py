@@ -0,0 +1,111 @@
+"""
+Adaptive polling schedule for Minecraft status embeds.
+
+Each server gets its own next-due time instead of one fixed loop:
+  - players online, or a gametime within the window: poll at the floor
+  - online and empty: poll every MC_POLL_IDLE_SECONDS
+  - unreachable: back off exponentially from MC_POLL_OFFLINE_SECONDS
+Every interval gets up to MC_POLL_JITTER extra so servers that came up
+together drift apart, and is clamped to the floor and ceiling of the guilds
+watching that server (server_config.mc_poll_min_seconds / mc_poll_max_seconds).
+"""
+
+import os
+import random
+import re
+import time
+from datetime import datetime, timezone
+
+DEFAULT_FLOOR = 30
+DEFAULT_CEILING = 1800
+
+IDLE_SECONDS = int(os.getenv('MC_POLL_IDLE_SECONDS', 300))
+OFFLINE_SECONDS = int(os.getenv('MC_POLL_OFFLINE_SECONDS', 60))
+JITTER = float(os.getenv('MC_POLL_JITTER', 0.1))
+
+# A gametime counts as near from this long before it to this long after
+GAMETIME_LEAD = 30 * 60
+GAMETIME_TAIL = 90 * 60
+
+_DISCORD_TIMESTAMP = re.compile(r'<t:(\d+)(?::[a-zA-Z])?>')
+
+
+def parse_gametime(text: str) -> float:
+    """
+    Unix time of a gametime's scheduled_time, or None if it isn't machine
+    readable. Discord timestamps (<t:...>) and ISO dates are understood.
+    """
+    if not text:
+        return None
+    match = _DISCORD_TIMESTAMP.search(text)
+    if match:
+        return float(match.group(1))
+    try:
+        parsed = datetime.fromisoformat(text.strip())
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def gametime_near(times: list, now: float = None) -> bool:
+    """Whether any of the given unix times is inside the gametime window"""
+    now = time.time() if now is None else now
+    return any(t - GAMETIME_LEAD <= now <= t + GAMETIME_TAIL for t in times)
+
+
+def poll_bounds(configs: list) -> tuple:
+    """
+    (floor, ceiling) for a server watched by several guilds: the slowest
+    floor any guild asked for and the fastest ceiling, never below the floor.
+    """
+    floor = max((int(c.get('mc_poll_min_seconds') or DEFAULT_FLOOR) for c in configs), default=DEFAULT_FLOOR)
+    ceiling = min((int(c.get('mc_poll_max_seconds') or DEFAULT_CEILING) for c in configs), default=DEFAULT_CEILING)
+    return floor, max(ceiling, floor)
+
+
+class PollScheduler:
+    """Next-due times and offline streaks per server address"""
+
+    def __init__(self, rng=random.random, clock=time.monotonic):
+        self.rng = rng
+        self.clock = clock
+        self._next_due = {}   # address -> monotonic time
+        self._failures = {}   # address -> consecutive offline probes
+
+    def due(self, addresses) -> list:
+        """Addresses whose next poll time has passed (new addresses are due at once)"""
+        now = self.clock()
+        return [a for a in addresses if self._next_due.get(a, 0) <= now]
+
+    def poll_now(self, address: str):
+        """Make a server due on the next tick (e.g. after its settings changed)"""
+        self._next_due.pop(address, None)
+
+    def forget_except(self, addresses):
+        """Drop servers no guild watches any more"""
+        keep = set(addresses)
+        for address in [a for a in self._next_due if a not in keep]:
+            self._next_due.pop(address, None)
+            self._failures.pop(address, None)
+
+    def record(self, address: str, status: dict, floor: int, ceiling: int, busy: bool = False) -> float:
+        """
+        Schedule a server's next poll from its latest probe result, returns the
+        interval in seconds. busy means a gametime is near.
+        """
+        if not status['online']:
+            failures = self._failures.get(address, 0) + 1
+            self._failures[address] = failures
+            interval = OFFLINE_SECONDS * 2 ** min(failures - 1, 16)
+        else:
+            self._failures.pop(address, None)
+            if busy or status.get('players_online'):
+                interval = floor
+            else:
+                interval = IDLE_SECONDS
+
+        interval = min(max(interval * (1 + JITTER * self.rng()), floor), ceiling)
+        self._next_due[address] = self.clock() + interval
+        return interval
@@ -0,0 +1,198 @@
+"""
+Minecraft server probes for the status embeds.
+
+A probe talks to one server and returns a plain dict, so one result can be
+rendered into every guild's embed that points at that server.
+
+Probes go through a shared per-address cache: a result is reused for
+MC_PROBE_TTL seconds, callers asking for the same server while a probe is
+running wait on that probe instead of starting another, and a forced
+refresh (/mcupdate) only re-probes once the result is MC_PROBE_MIN_INTERVAL
+seconds old. However often the commands are used, a server sees at most
+one probe per interval.
+
+Probes use mcstatus's asyncio API, so a poll of many servers costs sockets
+rather than executor threads. The SRV lookup and DNS resolution for an
+address are cached for MC_DNS_TTL seconds, and the status ping and the
+query protocol run concurrently, each under MC_CONNECT_TIMEOUT for
+connecting and MC_READ_TIMEOUT for the whole exchange.
+"""
+
+import asyncio
+import socket
+import time
+from datetime import datetime
+from mcstatus import JavaServer
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.mc_identity import get_resolver
+
+DEFAULT_PORT = 25565
+
+# Most names listed in the embed
+MAX_LISTED_PLAYERS = 20
+
+PROBE_TTL = int(os.getenv('MC_PROBE_TTL', 30))
+PROBE_MIN_INTERVAL = int(os.getenv('MC_PROBE_MIN_INTERVAL', 10))
+
+CONNECT_TIMEOUT = float(os.getenv('MC_CONNECT_TIMEOUT', 3))
+READ_TIMEOUT = float(os.getenv('MC_READ_TIMEOUT', 5))
+DNS_TTL = int(os.getenv('MC_DNS_TTL', 600))
+
+
+def parse_address(server_address: str) -> tuple:
+    """'host' or 'host:port' -> (host, port)"""
+    if ':' in server_address:
+        host, port = server_address.rsplit(':', 1)
+        return host, int(port)
+    return server_address, DEFAULT_PORT
+
+
+def status_fingerprint(status: dict) -> tuple:
+    """The parts of a probe result that show in the embed (ping and check time excluded)"""
+    if not status['online']:
+        return (status['address'], False)
+    return (status['address'], True, status['players_online'], status['players_max'],
+            tuple(sorted(status['players'] or ())), status['version'], status['motd'])
+
+
+_resolved = {}   # address -> (resolved at, JavaServer pointed at an IP)
+
+async def resolve_server(server_address: str) -> JavaServer:
+    """JavaServer for an address with SRV and DNS already resolved (cached for DNS_TTL)"""
+    cached = _resolved.get(server_address)
+    if cached and time.monotonic() - cached[0] < DNS_TTL:
+        return cached[1]
+
+    host, port = parse_address(server_address)
+    if ':' not in server_address:
+        # Only bare hostnames use SRV records, an explicit port wins
+        looked_up = await asyncio.wait_for(JavaServer.async_lookup(host, timeout=CONNECT_TIMEOUT), READ_TIMEOUT)
+        host, port = looked_up.address.host, looked_up.address.port
+
+    infos = await asyncio.wait_for(
+        asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM), CONNECT_TIMEOUT
+    )
+    server = JavaServer(infos[0][4][0], port, timeout=CONNECT_TIMEOUT)
+    _resolved[server_address] = (time.monotonic(), server)
+    return server
+
+
+async def probe_server(server_address: str) -> dict:
+    """
+    Ping a server once. Returns online, players_online, players_max,
+    version, latency, motd and players (names, or None if the server
+    doesn't share them); offline results carry only online=False.
+    """
+    result = {'address': server_address, 'online': False, 'checked_at': datetime.utcnow()}
+    try:
+        server = await resolve_server(server_address)
+    except Exception:
+        return result
+
+    # Status and query start together; query only matters if the status sample is empty
+    query_task = asyncio.create_task(asyncio.wait_for(server.async_query(tries=1), READ_TIMEOUT))
+    # Mark its error as seen even when nobody awaits it
+    query_task.add_done_callback(lambda task: task.cancelled() or task.exception())
+    try:
+        status = await asyncio.wait_for(server.async_status(tries=1), READ_TIMEOUT)
+    except Exception:
+        query_task.cancel()
+        # Re-resolve next time in case the server moved
+        _resolved.pop(server_address, None)
+        return result
+
+    motd = getattr(status, 'description', None)
+    if isinstance(motd, dict):
+        motd = motd.get('text', '')
+
+    result.update({
+        'online': True,
+        'players_online': status.players.online,
+        'players_max': status.players.max,
+        'version': status.version.name,
+        'latency': round(status.latency),
+        'motd': str(motd)[:100] if motd else None,
+        'players': None
+    })
+
+    sample = getattr(status.players, 'sample', None) or []
+    if status.players.online > 0 and sample:
+        query_task.cancel()
+        # The sample carries UUIDs too, which keeps the name cache current for free
+        resolver = get_resolver()
+        for player in sample:
+            if player.id and player.name:
+                resolver.observe(player.id, player.name)
+        await resolver.flush()
+        result['players'] = [player.name for player in sample]
+    elif status.players.online > 0:
+        # The query protocol lists everyone, when the server enables it
+        try:
+            query = await query_task
+            # mcstatus 12 renamed players.names to players.list
+            names = getattr(query.players, 'list', None) or getattr(query.players, 'names', None)
+            if names:
+                result['players'] = list(names)
+        except Exception:
+            pass
+    else:
+        query_task.cancel()
+
+    return result
+
+
+class ProbeCache:
+    """Per-address probe results with a TTL and one probe in flight per address"""
+
+    def __init__(self, probe=probe_server, ttl: int = PROBE_TTL, min_interval: int = PROBE_MIN_INTERVAL):
+        self.probe = probe
+        self.ttl = ttl
+        self.min_interval = min_interval
+        self.probes = 0
+        self.hits = 0
+        self._results = {}    # address -> (probed at, result)
+        self._inflight = {}   # address -> task
+
+    async def get(self, server_address: str, force: bool = False) -> dict:
+        """
+        Status for a server, probing only if the cached result is older than
+        the TTL. force re-probes early, but never within min_interval.
+        """
+        cached = self._results.get(server_address)
+        if cached:
+            age = time.monotonic() - cached[0]
+            if age < (self.min_interval if force else self.ttl):
+                self.hits += 1
+                return cached[1]
+
+        task = self._inflight.get(server_address)
+        if task is None:
+            task = asyncio.create_task(self._probe(server_address))
+            self._inflight[server_address] = task
+        # Shielded so one caller timing out doesn't cancel the probe for the others
+        return await asyncio.shield(task)
+
+    async def _probe(self, server_address: str) -> dict:
+        try:
+            self.probes += 1
+            result = await self.probe(server_address)
+            self._results[server_address] = (time.monotonic(), result)
+            return result
+        finally:
+            self._inflight.pop(server_address, None)
+
+
+# ============================================
+# Shared cache
+# ============================================
+
+_probe_cache = None
+
+def get_probe_cache() -> ProbeCache:
+    """The process-wide probe cache, shared by the status loop and commands"""
+    global _probe_cache
+    if _probe_cache is None:
+        _probe_cache = ProbeCache()
+    return _probe_cache
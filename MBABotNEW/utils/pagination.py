@@ -0,0 +1,66 @@
+"""
+Compact keyset cursors for paginated embeds.
+
+Cursors ride inside button custom_ids (100 characters max), so timestamps
+are packed as base-36 microseconds since the epoch and UUIDs as 22
+characters of base64.
+"""
+
+import base64
+import uuid
+from datetime import datetime, timedelta, timezone
+
+PAGE_SIZE = 10
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+
+
+def to_base36(number: int) -> str:
+    """Encode a non-negative integer in base 36"""
+    if number == 0:
+        return '0'
+    digits = ''
+    while number:
+        number, remainder = divmod(number, 36)
+        digits = _DIGITS[remainder] + digits
+    return digits
+
+
+def encode_timestamp(value: str) -> str:
+    """ISO timestamp -> base-36 microseconds since the epoch (exact, no float rounding)"""
+    moment = datetime.fromisoformat(value)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return to_base36((moment - _EPOCH) // timedelta(microseconds=1))
+
+
+def decode_timestamp(token: str) -> str:
+    """Base-36 token from encode_timestamp -> ISO timestamp in UTC"""
+    return (_EPOCH + timedelta(microseconds=int(token, 36))).isoformat()
+
+
+def pack_id(value) -> str:
+    """
+    Row ID -> short custom_id token. UUIDs become their 16 bytes in
+    unpadded URL-safe base64; anything else is kept as-is behind a '.'
+    """
+    if value is None or value == '':
+        return ''
+    try:
+        parsed = uuid.UUID(str(value))
+    except ValueError:
+        parsed = None
+    # Only the canonical form packs, so unpacking gives back the same string
+    if parsed is None or str(parsed) != str(value):
+        return f'.{value}'
+    return base64.urlsafe_b64encode(parsed.bytes).decode().rstrip('=')
+
+
+def unpack_id(token: str) -> str:
+    """Token from pack_id -> the ID string it was made from"""
+    if not token:
+        return ''
+    if token.startswith('.'):
+        return token[1:]
+    return str(uuid.UUID(bytes=base64.urlsafe_b64decode(token + '==')))
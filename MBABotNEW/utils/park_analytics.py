@@ -0,0 +1,153 @@
+"""
+Park stat leaderboards and percentiles with shooting splits.
+
+A park season's rows are loaded into NumPy arrays once and every rate
+(FG%, 3P%, eFG%, win rate, per-game averages) is computed column-wise.
+Each metric has its own qualification rule (minimum games or attempts),
+so a 2-for-2 shooter doesn't top the FG% board. Results are cached per
+(snapshot generation, season) and reused until a sync brings new data.
+"""
+
+import numpy as np
+
+PARK_COLUMNS = ('wins', 'losses', 'games_played', 'points', 'rebounds', 'assists', 'steals',
+                'blocks', 'turnovers', 'fg_made', 'fg_attempted', 'three_fg_made',
+                'three_fg_attempted', 'threes')
+
+# Qualification minimums
+MIN_GAMES = 3
+MIN_FG_ATTEMPTS = 20
+MIN_3P_ATTEMPTS = 10
+
+# metric key -> (abbreviation, full name, decimals, is_percentage, qualifying column, minimum)
+PARK_METRICS = {
+    'ppg': ("PPG", "Points Per Game", 1, False, 'games_played', MIN_GAMES),
+    'rpg': ("RPG", "Rebounds Per Game", 1, False, 'games_played', MIN_GAMES),
+    'apg': ("APG", "Assists Per Game", 1, False, 'games_played', MIN_GAMES),
+    'spg': ("SPG", "Steals Per Game", 1, False, 'games_played', MIN_GAMES),
+    'bpg': ("BPG", "Blocks Per Game", 1, False, 'games_played', MIN_GAMES),
+    'tpg': ("3PM", "Threes Made Per Game", 1, False, 'games_played', MIN_GAMES),
+    'fg_pct': ("FG%", "Field Goal Percentage", 1, True, 'fg_attempted', MIN_FG_ATTEMPTS),
+    'three_pct': ("3P%", "Three Point Percentage", 1, True, 'three_fg_attempted', MIN_3P_ATTEMPTS),
+    'efg_pct': ("eFG%", "Effective Field Goal Percentage", 1, True, 'fg_attempted', MIN_FG_ATTEMPTS),
+    'win_pct': ("WIN%", "Win Percentage", 1, True, 'games_played', MIN_GAMES),
+    'wins': ("W", "Wins", 0, False, 'games_played', 1),
+}
+
+
+def _safe_divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """Element-wise divide that yields 0 where the denominator is 0"""
+    out = np.zeros(np.broadcast(numerator, denominator).shape, dtype=np.float64)
+    np.divide(numerator, denominator, out=out, where=denominator != 0)
+    return out
+
+
+class ParkSeasonTable:
+    """One park season as aligned arrays, with every metric precomputed"""
+
+    def __init__(self, rows: list):
+        rows = [r for r in rows if (r.get('games_played') or 0) > 0]
+        self.uuids = np.array([r['player_uuid'] for r in rows], dtype=object)
+        self.names = [r.get('player_name') or 'Unknown' for r in rows]
+        self._index = {uuid: i for i, uuid in enumerate(self.uuids.tolist())}
+
+        data = np.array([[r.get(c) or 0 for c in PARK_COLUMNS] for r in rows], dtype=np.float64).reshape(-1, len(PARK_COLUMNS))
+        self.totals = {column: data[:, i] for i, column in enumerate(PARK_COLUMNS)}
+        t = self.totals
+        games = t['games_played']
+        # Rows that only track THREES (older seasons) fall back to it for made threes
+        threes = np.where(t['three_fg_made'] > 0, t['three_fg_made'], t['threes'])
+
+        self.metrics = {
+            'ppg': _safe_divide(t['points'], games),
+            'rpg': _safe_divide(t['rebounds'], games),
+            'apg': _safe_divide(t['assists'], games),
+            'spg': _safe_divide(t['steals'], games),
+            'bpg': _safe_divide(t['blocks'], games),
+            'tpg': _safe_divide(threes, games),
+            'fg_pct': _safe_divide(t['fg_made'], t['fg_attempted']) * 100,
+            'three_pct': _safe_divide(t['three_fg_made'], t['three_fg_attempted']) * 100,
+            # A made three is worth 1.5 made twos
+            'efg_pct': _safe_divide(t['fg_made'] + 0.5 * threes, t['fg_attempted']) * 100,
+            'win_pct': _safe_divide(t['wins'], t['wins'] + t['losses']) * 100,
+            'wins': t['wins'],
+        }
+
+        # Per metric: qualified row indices, best first, and their values ascending for percentiles
+        self._order = {}
+        self._ascending = {}
+        for metric, values in self.metrics.items():
+            column, minimum = PARK_METRICS[metric][4], PARK_METRICS[metric][5]
+            qualified = np.flatnonzero(t[column] >= minimum)
+            # Stable sort so equal values keep a deterministic order
+            self._order[metric] = qualified[np.argsort(-values[qualified], kind='stable')]
+            self._ascending[metric] = np.sort(values[qualified])
+
+    def __len__(self):
+        return len(self.uuids)
+
+    def qualified(self, metric: str) -> int:
+        return len(self._order[metric])
+
+    def leaders(self, metric: str, limit: int = 10, offset: int = 0) -> list:
+        """Top qualified players as (uuid, name, value, games_played) tuples"""
+        order = self._order[metric][offset:offset + limit]
+        values = self.metrics[metric]
+        games = self.totals['games_played']
+        return [(self.uuids[i], self.names[i], float(values[i]), int(games[i])) for i in order]
+
+    def percentiles(self, uuid: str) -> dict:
+        """
+        metric -> (value, rank, qualified count, percentile) for one player.
+        Metrics the player doesn't qualify for map to (value, None, count, None).
+        Returns None if the player has no games this season.
+        """
+        i = self._index.get(uuid)
+        if i is None:
+            return None
+        result = {}
+        for metric, values in self.metrics.items():
+            value = float(values[i])
+            ascending = self._ascending[metric]
+            total = len(ascending)
+            column, minimum = PARK_METRICS[metric][4], PARK_METRICS[metric][5]
+            if self.totals[column][i] < minimum:
+                result[metric] = (value, None, total, None)
+                continue
+            above = total - int(np.searchsorted(ascending, value, side='right'))
+            below = int(np.searchsorted(ascending, value, side='left'))
+            percentile = below / (total - 1) * 100 if total > 1 else 100.0
+            result[metric] = (value, above + 1, total, percentile)
+        return result
+
+    def percentile_table(self, metric: str, points: tuple = (10, 25, 50, 75, 90)) -> dict:
+        """League distribution for a metric: percentile -> value among qualified players"""
+        ascending = self._ascending[metric]
+        if len(ascending) == 0:
+            return {}
+        return {p: float(v) for p, v in zip(points, np.percentile(ascending, points))}
+
+
+# ============================================
+# Cache
+# ============================================
+
+_tables = {}
+
+def get_park_table(snapshot, season: int) -> ParkSeasonTable:
+    """Table for a season of a ParkSnapshot, built once per snapshot generation"""
+    key = (snapshot.generation, season)
+    table = _tables.get(key)
+    if table is None:
+        table = ParkSeasonTable(snapshot.season_rows(season))
+        # Older generations can't be asked for again
+        for stale in [k for k in _tables if k[0] < snapshot.generation]:
+            _tables.pop(stale, None)
+        _tables[key] = table
+    return table
+
+
+def format_park_metric(metric: str, value: float) -> str:
+    """Format a park metric value for display"""
+    _, _, decimals, is_percentage = PARK_METRICS[metric][:4]
+    return f"{value:.{decimals}f}{'%' if is_percentage else ''}"
@@ -0,0 +1,98 @@
+"""
+In-memory snapshot of park_stats for the park stats commands.
+
+The whole table is small (one row per player per season), so it is loaded
+once and indexed by UUID and lowercased name. A command reads the current
+snapshot and never waits on the network: once the snapshot is older than
+PARK_SNAPSHOT_SECONDS the next read kicks off a background reload and keeps
+serving the old one until it lands (stale-while-revalidate). Only the very
+first read waits for a load.
+
+Each snapshot with new data gets a higher generation number, which
+derived views (park analytics) use as their cache key.
+"""
+
+import asyncio
+import os
+import time
+
+SNAPSHOT_SECONDS = int(os.getenv('PARK_SNAPSHOT_SECONDS', 300))
+
+
+class ParkSnapshot:
+    """Immutable view of park_stats at one point in time"""
+
+    def __init__(self, rows: list, generation: int = 0):
+        self.generation = generation
+        self.version = None
+        self.loaded_at = time.monotonic()
+        self.players = {}   # uuid -> {season: row}
+        self.names = {}     # lowercased name -> uuid
+        seasons = set()
+        for row in rows:
+            season = int(row['season'])
+            self.players.setdefault(row['player_uuid'], {})[season] = row
+            if row.get('player_name'):
+                self.names[row['player_name'].lower()] = row['player_uuid']
+            seasons.add(season)
+        self.seasons = sorted(seasons)
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.loaded_at
+
+    @property
+    def latest_season(self) -> int:
+        return self.seasons[-1] if self.seasons else None
+
+    def find(self, name: str) -> str:
+        """Player UUID for a Minecraft name, or None"""
+        return self.names.get((name or '').strip().lower())
+
+    def player(self, uuid: str, season: int) -> dict:
+        """A player's park_stats row for a season, or None"""
+        return self.players.get(uuid, {}).get(season)
+
+    def season_rows(self, season: int) -> list:
+        """Every player's park_stats row for a season"""
+        return [seasons[season] for seasons in self.players.values() if season in seasons]
+
+
+class ParkStatsCache:
+    """Serves the current ParkSnapshot, reloading it in the background when stale"""
+
+    def __init__(self, loader, max_age: int = SNAPSHOT_SECONDS):
+        self.loader = loader
+        self.max_age = max_age
+        self.snapshot = None
+        self.generation = 0
+        self._refresh = None
+
+    def refresh(self) -> asyncio.Task:
+        """Start a reload, or join the one already running"""
+        if self._refresh is None or self._refresh.done():
+            self._refresh = asyncio.create_task(self._load())
+        return self._refresh
+
+    async def _load(self):
+        try:
+            rows = await asyncio.to_thread(self.loader)
+        except Exception as e:
+            print(f"Error loading park stats snapshot: {e}")
+            return
+        # Nothing synced since the last load: keep the snapshot (and anything cached against it)
+        version = (len(rows), max((r.get('synced_at') or '' for r in rows), default=''))
+        if self.snapshot is not None and self.snapshot.version == version:
+            self.snapshot.loaded_at = time.monotonic()
+            return
+        self.generation += 1
+        self.snapshot = ParkSnapshot(rows, self.generation)
+        self.snapshot.version = version
+
+    async def get(self) -> ParkSnapshot:
+        """Current snapshot (None only if the first load failed)"""
+        if self.snapshot is None:
+            await asyncio.shield(self.refresh())
+        elif self.snapshot.age > self.max_age:
+            self.refresh()
+        return self.snapshot
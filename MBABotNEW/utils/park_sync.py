@@ -0,0 +1,262 @@
+"""
+Incremental sync of park stats from the game server's MySQL `players` table.
+
+Each run makes two reads on the MySQL side:
+  1. Stream (uuid, MD5 of the whole row) for every player. This is still a
+     full scan of the players table each run, but MySQL computes the
+     hashes, so only they cross the network, and players whose hash is
+     unchanged are skipped.
+  2. Stream the full rows for the changed players only, in batches.
+
+Changed rows are normalized from the wide SEASON_<n>_<STAT> columns into
+one row per (player, season). A per-season row hash is compared against
+what Supabase already holds, and only the rows that actually changed are
+bulk-upserted into park_stats. Rows whose player is gone from MySQL, or
+whose season a changed player no longer has, are deleted.
+
+Usage:
+    python utils/park_sync.py            # one sync
+    python utils/park_sync.py --loop     # sync every PARK_SYNC_MINUTES
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from datetime import datetime
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dotenv import load_dotenv
+from database import get_park_stat_hashes, upsert_park_stats, delete_park_stats
+
+try:
+    from mysql.connector import pooling
+except ImportError:
+    pooling = None
+
+load_dotenv()
+
+PARK_TABLE = 'players'
+SYNC_MINUTES = int(os.getenv('PARK_SYNC_MINUTES', 10))
+
+# Rows fetched per round trip from the streaming cursor
+FETCH_SIZE = 500
+
+_SEASON_COLUMN = re.compile(r'^SEASON_(\d+)_(.+)$')
+
+# MySQL stat suffix -> park_stats column
+PARK_STAT_COLUMNS = {
+    'WINS': 'wins',
+    'LOSSES': 'losses',
+    'GAMES_PLAYED': 'games_played',
+    'POINTS': 'points',
+    'ASSISTS': 'assists',
+    'REBOUNDS': 'rebounds',
+    'STEALS': 'steals',
+    'BLOCKS': 'blocks',
+    'TURNOVERS': 'turnovers',
+    'FG_MADE': 'fg_made',
+    'FG_ATTEMPTED': 'fg_attempted',
+    '3FG_MADE': 'three_fg_made',
+    '3FG_ATTEMPTED': 'three_fg_attempted',
+    'THREES': 'threes',
+}
+
+
+def mysql_configured() -> bool:
+    """Whether the park MySQL connection settings are present"""
+    return pooling is not None and bool(os.getenv('PARK_MYSQL_HOST'))
+
+
+def normalize_player(row: dict) -> list:
+    """
+    Wide MySQL row -> one park_stats row per season.
+    Seasons where the player never played are dropped.
+    """
+    seasons = {}
+    for column, value in row.items():
+        match = _SEASON_COLUMN.match(column)
+        if not match:
+            continue
+        stat = PARK_STAT_COLUMNS.get(match.group(2).upper())
+        if stat is None:
+            continue
+        seasons.setdefault(int(match.group(1)), {})[stat] = int(value or 0)
+
+    rows = []
+    for season, stats in sorted(seasons.items()):
+        if not any(stats.values()):
+            continue
+        long_row = {
+            'player_uuid': row['uuid'],
+            'player_name': row.get('ign') or 'Unknown',
+            'season': season,
+        }
+        for stat in PARK_STAT_COLUMNS.values():
+            long_row[stat] = stats.get(stat, 0)
+        long_row['row_hash'] = row_hash(long_row)
+        rows.append(long_row)
+    return rows
+
+
+def source_hash_sql(columns: list) -> str:
+    """
+    MySQL expression for the MD5 of a whole players row. CONCAT_WS skips
+    NULLs, so each column is COALESCEd first: otherwise a value moving
+    between two adjacent nullable columns would give the same hash.
+    """
+    values = ', '.join(f"COALESCE(`{c}`, '')" for c in columns)
+    return f"MD5(CONCAT_WS('|', {values}))"
+
+
+def row_hash(row: dict) -> str:
+    """Stable hash of a park_stats row's content"""
+    content = {k: v for k, v in row.items() if k not in ('row_hash', 'synced_at')}
+    return hashlib.sha1(json.dumps(content, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class ParkStatsSync:
+    """Holds the MySQL pool and what was seen last run, so each run only moves changes"""
+
+    def __init__(self, pool_size: int = 2):
+        if pooling is None:
+            raise RuntimeError("Park stats sync requires mysql-connector-python")
+        self.pool = pooling.MySQLConnectionPool(
+            pool_name='park_stats',
+            pool_size=pool_size,
+            host=os.getenv('PARK_MYSQL_HOST'),
+            port=int(os.getenv('PARK_MYSQL_PORT', 3306)),
+            user=os.getenv('PARK_MYSQL_USER'),
+            password=os.getenv('PARK_MYSQL_PASSWORD'),
+            database=os.getenv('PARK_MYSQL_DATABASE'),
+        )
+        self.columns = None
+        self.source_hashes = {}   # uuid -> MD5 of the MySQL row as of the last run
+        self.stored_hashes = None  # (uuid, season) -> row_hash in Supabase
+        self.generation = 0
+
+    def _load_columns(self, connection) -> list:
+        cursor = connection.cursor()
+        try:
+            cursor.execute(
+                "SELECT COLUMN_NAME FROM information_schema.COLUMNS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s ORDER BY ORDINAL_POSITION",
+                (PARK_TABLE,)
+            )
+            return [name for (name,) in cursor.fetchall()]
+        finally:
+            cursor.close()
+
+    def _scan_hashes(self, connection) -> dict:
+        """Stream uuid -> row MD5, computed by MySQL so rows don't cross the wire"""
+        cursor = connection.cursor(buffered=False)
+        try:
+            cursor.execute(f"SELECT uuid, {source_hash_sql(self.columns)} FROM `{PARK_TABLE}`")
+            hashes = {}
+            while True:
+                batch = cursor.fetchmany(FETCH_SIZE)
+                if not batch:
+                    break
+                for uuid, digest in batch:
+                    hashes[uuid] = digest
+            return hashes
+        finally:
+            cursor.close()
+
+    def _fetch_rows(self, connection, uuids: list):
+        """Stream full rows for the given players, FETCH_SIZE at a time"""
+        for start in range(0, len(uuids), FETCH_SIZE):
+            chunk = uuids[start:start + FETCH_SIZE]
+            placeholders = ', '.join(['%s'] * len(chunk))
+            cursor = connection.cursor(dictionary=True, buffered=False)
+            try:
+                cursor.execute(f"SELECT * FROM `{PARK_TABLE}` WHERE uuid IN ({placeholders})", chunk)
+                while True:
+                    batch = cursor.fetchmany(FETCH_SIZE)
+                    if not batch:
+                        break
+                    yield from batch
+            finally:
+                cursor.close()
+
+    def run_once(self) -> dict:
+        """Sync changed players, returns counts and timing for the run"""
+        start = time.perf_counter()
+        if self.stored_hashes is None:
+            self.stored_hashes = get_park_stat_hashes()
+
+        connection = self.pool.get_connection()
+        try:
+            if self.columns is None:
+                self.columns = self._load_columns(connection)
+            hashes = self._scan_hashes(connection)
+            changed = [uuid for uuid, digest in hashes.items() if self.source_hashes.get(uuid) != digest]
+
+            now = datetime.utcnow().isoformat()
+            upserts = []
+            current = set()  # (uuid, season) rows the changed players still have
+            for row in self._fetch_rows(connection, changed):
+                for long_row in normalize_player(row):
+                    key = (long_row['player_uuid'], long_row['season'])
+                    current.add(key)
+                    if self.stored_hashes.get(key) != long_row['row_hash']:
+                        long_row['synced_at'] = now
+                        upserts.append(long_row)
+        finally:
+            connection.close()
+
+        # Players deleted from MySQL, and seasons a changed player no longer has
+        changed_set = set(changed)
+        stale = [key for key in self.stored_hashes
+                 if key[0] not in hashes or (key[0] in changed_set and key not in current)]
+
+        written = upsert_park_stats(upserts) if upserts else 0
+        deleted = delete_park_stats(stale) if stale else 0
+        # Only remember hashes once the writes landed, so a failed run retries
+        for long_row in upserts:
+            self.stored_hashes[(long_row['player_uuid'], long_row['season'])] = long_row['row_hash']
+        for key in stale:
+            self.stored_hashes.pop(key, None)
+        self.source_hashes = hashes
+        if upserts or stale:
+            self.generation += 1
+
+        summary = {
+            'players': len(hashes),
+            'changed_players': len(changed),
+            'rows_written': written,
+            'rows_deleted': deleted,
+            'generation': self.generation,
+            'seconds': time.perf_counter() - start
+        }
+        print(f"Park stats sync: {summary['players']} players scanned, {summary['changed_players']} changed, "
+              f"{summary['rows_written']} rows written, {summary['rows_deleted']} deleted "
+              f"in {summary['seconds']:.2f}s")
+        return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync park stats from the game server's MySQL into Supabase")
+    parser.add_argument('--loop', action='store_true', help=f"Keep syncing every PARK_SYNC_MINUTES ({SYNC_MINUTES})")
+    args = parser.parse_args()
+
+    if not mysql_configured():
+        print("❌ Set PARK_MYSQL_HOST, PARK_MYSQL_USER, PARK_MYSQL_PASSWORD and PARK_MYSQL_DATABASE "
+              "and install mysql-connector-python.")
+        return 1
+
+    sync = ParkStatsSync()
+    while True:
+        try:
+            sync.run_once()
+        except Exception as e:
+            print(f"Park stats sync failed: {e}")
+        if not args.loop:
+            return 0
+        time.sleep(SYNC_MINUTES * 60)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
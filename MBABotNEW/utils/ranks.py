@@ -0,0 +1,86 @@
+"""
+League rank and percentile lookups from per-season sorted arrays.
+
+Each season keeps one ascending list of per-game averages per stat, so
+rank and percentile are two bisects instead of a sort per lookup. The
+registry rebuilds a season's index when its stats version moves.
+"""
+
+import threading
+from bisect import bisect_left, bisect_right
+
+# stat key -> (player_season_stats total column, label)
+RANK_STATS = {
+    'ppg': ('total_points', 'PPG'),
+    'rpg': ('total_rebounds', 'RPG'),
+    'apg': ('total_assists', 'APG'),
+    'spg': ('total_steals', 'SPG'),
+    'bpg': ('total_blocks', 'BPG'),
+}
+
+
+def per_game(row: dict) -> dict:
+    """Per-game averages for every ranked stat from a player_season_stats row"""
+    games = row.get('games_played') or 0
+    return {
+        stat: round((row.get(column) or 0) / games, 4) if games else 0.0
+        for stat, (column, _) in RANK_STATS.items()
+    }
+
+
+class SeasonRanks:
+    """Sorted per-game averages for one season"""
+
+    def __init__(self, rows: list = None):
+        self._players = {}
+        for row in rows or []:
+            if (row.get('games_played') or 0) > 0:
+                self._players[str(row['player_id'])] = per_game(row)
+        self._sorted = {
+            stat: sorted(values[stat] for values in self._players.values())
+            for stat in RANK_STATS
+        }
+
+    def __len__(self):
+        return len(self._players)
+
+    def lookup(self, player_id) -> dict:
+        """
+        stat -> (value, rank, player count, percentile) for one player,
+        or None if they have no games. Ties share the best rank.
+        """
+        values = self._players.get(str(player_id))
+        if values is None:
+            return None
+        total = len(self._players)
+        result = {}
+        for stat, value in values.items():
+            ordered = self._sorted[stat]
+            above = total - bisect_right(ordered, value)
+            below = bisect_left(ordered, value)
+            # Share of the rest of the league this player is ahead of
+            percentile = below / (total - 1) * 100 if total > 1 else 100.0
+            result[stat] = (value, above + 1, total, percentile)
+        return result
+
+
+# ============================================
+# Registry
+# ============================================
+
+_season_ranks = {}  # season_id -> (stats version, SeasonRanks)
+_registry_lock = threading.Lock()
+
+def get_season_ranks(season_id, loader, version=None) -> SeasonRanks:
+    """
+    Get a season's rank index, calling loader(season_id) for its rows on
+    first use and again whenever the season's stats version has moved
+    """
+    key = str(season_id)
+    cached = _season_ranks.get(key)
+    if cached is None or cached[0] != version:
+        ranks = SeasonRanks(loader(season_id))
+        with _registry_lock:
+            _season_ranks[key] = (version, ranks)
+        return ranks
+    return cached[1]
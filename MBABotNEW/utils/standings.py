@@ -0,0 +1,176 @@
+"""Helpers for maintaining and ordering team standings incrementally"""
+
+CONFERENCES = ["Desert", "Plains"]
+
+# How many recent results are kept per team / per matchup
+RECENT_RESULTS = 10
+
+STANDINGS_COUNTERS = (
+    'wins', 'losses', 'ties', 'points_for', 'points_against',
+    'conference_wins', 'conference_losses', 'streak'
+)
+
+
+def new_standings_row(guild_id: int, season_id, team_id) -> dict:
+    """Create an empty standings row for a team"""
+    row = {
+        'guild_id': str(guild_id),
+        'season_id': season_id,
+        'team_id': team_id,
+        'last_results': '',
+        'last_game_id': None
+    }
+    for counter in STANDINGS_COUNTERS:
+        row[counter] = 0
+    return row
+
+
+def apply_game_result(row: dict, points_for: int, points_against: int,
+                      conference_game: bool, game_id=None) -> dict:
+    """Apply one game result to a team's standings row (in place)"""
+    for counter in STANDINGS_COUNTERS:
+        row[counter] = row.get(counter) or 0
+
+    row['points_for'] += points_for
+    row['points_against'] += points_against
+
+    result = 'W' if points_for > points_against else 'L' if points_against > points_for else 'T'
+    row['last_results'] = push_recent_result(row.get('last_results') or '', result)
+
+    if points_for > points_against:
+        row['wins'] += 1
+        if conference_game:
+            row['conference_wins'] += 1
+        # Positive streak = consecutive wins
+        row['streak'] = row['streak'] + 1 if row['streak'] > 0 else 1
+    elif points_against > points_for:
+        row['losses'] += 1
+        if conference_game:
+            row['conference_losses'] += 1
+        # Negative streak = consecutive losses
+        row['streak'] = row['streak'] - 1 if row['streak'] < 0 else -1
+    else:
+        row['ties'] += 1
+        row['streak'] = 0
+
+    if game_id is not None:
+        row['last_game_id'] = game_id
+    return row
+
+
+def push_recent_result(buffer: str, result: str, size: int = RECENT_RESULTS) -> str:
+    """Append a W/L/T to a rolling result buffer (oldest first), keeping the last `size`"""
+    return (buffer + result)[-size:]
+
+
+def win_pct(wins: int, losses: int, ties: int = 0) -> float:
+    """Winning percentage, counting ties as half a win"""
+    games = wins + losses + ties
+    return (wins + ties / 2) / games if games > 0 else 0.0
+
+
+def format_streak(streak: int) -> str:
+    """Format a signed streak as W3 / L2"""
+    if not streak:
+        return "-"
+    return f"W{streak}" if streak > 0 else f"L{-streak}"
+
+
+def standings_sort_key(row: dict, team_name: str = ''):
+    """
+    Tiebreaker ordering: win %, wins, conference win %,
+    point differential, points scored, then team name.
+    """
+    wins = row.get('wins') or 0
+    losses = row.get('losses') or 0
+    ties = row.get('ties') or 0
+    pf = row.get('points_for') or 0
+    pa = row.get('points_against') or 0
+    conf_pct = win_pct(row.get('conference_wins') or 0, row.get('conference_losses') or 0)
+    return (-win_pct(wins, losses, ties), -wins, -conf_pct, -(pf - pa), -pf, team_name.lower())
+
+
+def sort_standings(rows: list, team_names: dict = None) -> list:
+    """Sort standings rows using the tiebreaker order"""
+    team_names = team_names or {}
+    return sorted(rows, key=lambda r: standings_sort_key(r, team_names.get(r.get('team_id'), '')))
+
+
+def group_by_conference(rows: list, teams: dict) -> dict:
+    """
+    Group sorted standings rows by conference.
+    teams maps team_id -> team row (needs 'conference').
+    """
+    grouped = {conference: [] for conference in CONFERENCES}
+    for row in rows:
+        team = teams.get(row.get('team_id')) or {}
+        conference = team.get('conference')
+        grouped.setdefault(conference or 'Other', []).append(row)
+    return grouped
+
+
+# ============================================
+# Head-to-head
+# Matchups are keyed by the sorted team pair so either
+# ordering of the two teams hits the same row
+# ============================================
+
+def pair_key(team1_id, team2_id) -> tuple:
+    """Sorted (team_a_id, team_b_id) key for a matchup"""
+    return tuple(sorted((team1_id, team2_id), key=str))
+
+
+def new_head_to_head_row(guild_id: int, season_id, team1_id, team2_id) -> dict:
+    """Create an empty head-to-head row for a team pair"""
+    team_a_id, team_b_id = pair_key(team1_id, team2_id)
+    return {
+        'guild_id': str(guild_id),
+        'season_id': season_id,
+        'team_a_id': team_a_id,
+        'team_b_id': team_b_id,
+        'team_a_wins': 0,
+        'team_b_wins': 0,
+        'ties': 0,
+        'recent_games': []
+    }
+
+
+def apply_head_to_head_result(row: dict, team1_id, team2_id, team1_score: int,
+                              team2_score: int, game_id=None, played_at: str = None) -> dict:
+    """Apply one game between the pair to its head-to-head row (in place)"""
+    # Orient the scores to the row's sorted pair
+    if str(team1_id) == str(row['team_a_id']):
+        a_score, b_score = team1_score, team2_score
+    else:
+        a_score, b_score = team2_score, team1_score
+
+    if a_score > b_score:
+        row['team_a_wins'] = (row.get('team_a_wins') or 0) + 1
+    elif b_score > a_score:
+        row['team_b_wins'] = (row.get('team_b_wins') or 0) + 1
+    else:
+        row['ties'] = (row.get('ties') or 0) + 1
+
+    recent = list(row.get('recent_games') or [])
+    recent.append({'game_id': game_id, 'a_score': a_score, 'b_score': b_score, 'played_at': played_at})
+    row['recent_games'] = recent[-RECENT_RESULTS:]
+    return row
+
+
+def head_to_head_for(row: dict, team_id) -> dict:
+    """View a head-to-head row from one team's perspective"""
+    if not row:
+        return {'wins': 0, 'losses': 0, 'ties': 0, 'recent': ''}
+
+    is_a = str(team_id) == str(row['team_a_id'])
+    recent = ''
+    for game in row.get('recent_games') or []:
+        mine, theirs = (game['a_score'], game['b_score']) if is_a else (game['b_score'], game['a_score'])
+        recent += 'W' if mine > theirs else 'L' if theirs > mine else 'T'
+
+    return {
+        'wins': row['team_a_wins'] if is_a else row['team_b_wins'],
+        'losses': row['team_b_wins'] if is_a else row['team_a_wins'],
+        'ties': row.get('ties') or 0,
+        'recent': recent
+    }
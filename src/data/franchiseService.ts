@@ -157,10 +157,68 @@ async function logTransaction(transaction: TransactionHistory) {
   }
 }
 
+export interface RosterMove {
+  op: 'sign' | 'release' | 'move';
+  playerId: string;
+  teamId: string;
+}
+
+/**
+ * Apply many signings, releases and moves in one bot request (e.g. pre-season setup).
+ * The bot checks them all first and applies none if any is invalid.
+ */
+export async function applyRosterMoves(moves: RosterMove[], coachId: string): Promise<{ success: boolean; message: string; errors?: string[] }> {
+  try {
+    const { data: players } = await supabase!
+      .from('users')
+      .select('id, team_id, discord_id')
+      .in('id', moves.map(move => move.playerId));
+
+    const byId = new Map((players || []).map(player => [player.id, player]));
+    const missing = moves.filter(move => !byId.get(move.playerId)?.discord_id);
+    if (missing.length > 0) {
+      return { success: false, message: `${missing.length} player(s) must be linked to Discord first` };
+    }
+
+    const result = await callBotAPI('batch', {
+      guild_id: GUILD_ID,
+      coach_id: coachId,
+      operations: moves.map(move => ({
+        op: move.op,
+        player_id: byId.get(move.playerId)!.discord_id.replace('discord-', ''),
+        team_id: move.teamId
+      }))
+    });
+
+    if (!result.success) {
+      return result;
+    }
+
+    const now = new Date().toISOString();
+    for (const move of moves) {
+      await logTransaction({
+        guild_id: GUILD_ID,
+        transaction_type: move.op === 'release' ? 'release' : 'sign',
+        player_id: move.playerId,
+        from_team_id: move.op === 'sign' ? undefined : (byId.get(move.playerId)?.team_id || undefined),
+        to_team_id: move.op === 'release' ? undefined : move.teamId,
+        performed_by: coachId,
+        notes: `Player ${move.op === 'move' ? 'moved' : move.op === 'sign' ? 'signed' : 'released'} via web app (batch)`,
+        created_at: now
+      });
+    }
+
+    return result;
+  } catch (error) {
+    console.error('Error applying roster moves:', error);
+    return { success: false, message: error instanceof Error ? error.message : 'Failed to apply roster moves' };
+  }
+}
+
 /**
  * Call bot API to execute transaction
  */
-async function callBotAPI(action: 'sign' | 'release', data: any): Promise<{ success: boolean; message: string }> {
+async function callBotAPI(action: 'sign' | 'release' | 'batch', data: any): Promise<{ success: boolean; message: string; errors?: string[] }> {
   console.log('callBotAPI - BOT_API_URL:', BOT_API_URL);
   console.log('callBotAPI - BOT_API_KEY set:', !!BOT_API_KEY);
   
@@ -172,14 +230,25 @@ async function callBotAPI(action: 'sign' | 'release', data: any): Promise<{ succ
     const url = `${BOT_API_URL}/api/transaction/${action}`;
     console.log('Calling bot API:', url, data);
     
-    const response = await fetch(url, {
+    // The same key on a retry makes the bot answer with the first attempt's job
+    // instead of running the transaction twice
+    const request = {
       method: 'POST',
       headers: {
         'Content-Type': 'application/json',
-        'X-API-Key': BOT_API_KEY
+        'X-API-Key': BOT_API_KEY,
+        'Idempotency-Key': crypto.randomUUID()
       },
       body: JSON.stringify(data)
-    });
+    };
+
+    let response: Response;
+    try {
+      response = await fetch(url, request);
+    } catch (error) {
+      console.warn('Bot API request failed, retrying once:', error);
+      response = await fetch(url, request);
+    }
 
     console.log('Bot API response status:', response.status);
     const responseText = await response.text();
@@ -197,9 +266,39 @@ async function callBotAPI(action: 'sign' | 'release', data: any): Promise<{ succ
     }
 
     const result = JSON.parse(responseText);
+    if (response.status === 202 && result.job_id) {
+      // The bot queued the transaction; wait for the job to finish
+      return await waitForBotJob(result.job_id);
+    }
     return result;
   } catch (error) {
     console.error('Error calling bot API:', error);
     return { success: false, message: `Failed to connect to bot API: ${error instanceof Error ? error.message : 'Unknown error'}` };
   }
 }
+
+/**
+ * Poll a queued bot transaction until it finishes
+ */
+async function waitForBotJob(jobId: string, timeoutMs = 60000): Promise<{ success: boolean; message: string; errors?: string[] }> {
+  const deadline = Date.now() + timeoutMs;
+  let delay = 250;
+
+  while (Date.now() < deadline) {
+    await new Promise(resolve => setTimeout(resolve, delay));
+    delay = Math.min(delay * 2, 2000);
+
+    const response = await fetch(`${BOT_API_URL}/api/jobs/${jobId}`, {
+      headers: { 'X-API-Key': BOT_API_KEY }
+    });
+    if (!response.ok) {
+      continue;
+    }
+    const job = await response.json();
+    if (job.status === 'succeeded' || job.status === 'failed') {
+      return job.result ?? { success: job.status === 'succeeded', message: job.status };
+    }
+  }
+
+  return { success: false, message: 'The bot is still processing this transaction. Check the transactions channel before retrying.' };
+}
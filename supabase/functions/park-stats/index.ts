@@ -1,12 +1,30 @@
-// Supabase Edge Function to query MySQL database for park stats
+// Supabase Edge Function serving park stats from the park_stats table.
+// The bot's park stats sync (MBABotNEW/utils/park_sync.py) copies the game
+// server's MySQL players table into park_stats incrementally, so page views
+// read Supabase instead of scanning MySQL.
 import { serve } from "https://deno.land/std@0.168.0/http/server.ts"
-import { Client } from "https://deno.land/x/mysql@v2.12.1/mod.ts"
+import { createClient } from "https://esm.sh/@supabase/supabase-js@2"
 
 const corsHeaders = {
   'Access-Control-Allow-Origin': '*',
   'Access-Control-Allow-Headers': 'authorization, x-client-info, apikey, content-type',
 }
 
+const STAT_COLUMNS = [
+  'player_uuid', 'player_name', 'season',
+  'wins', 'losses', 'games_played',
+  'points', 'assists', 'rebounds', 'steals', 'blocks', 'turnovers',
+  'fg_made', 'fg_attempted', 'three_fg_made', 'three_fg_attempted', 'threes',
+].join(', ')
+
+// PostgREST caps a single select, so the full list is read in pages
+const PAGE_SIZE = 1000
+
+const json = (body: unknown, status = 200) => new Response(
+  JSON.stringify(body),
+  { status, headers: { ...corsHeaders, 'Content-Type': 'application/json' } }
+)
+
 serve(async (req) => {
   // Handle CORS preflight requests
   if (req.method === 'OPTIONS') {
@@ -16,61 +34,37 @@ serve(async (req) => {
   try {
     const url = new URL(req.url)
     const fetchAll = url.searchParams.get('all') === 'true'
-    const season = url.searchParams.get('season') || '1'
-    
-    // Connect to MySQL database
-    const client = await new Client().connect({
-      hostname: "sql1.revivenode.com",
-      username: "u33066_lxlvlVUN8X",
-      db: "s33066_MBA",
-      password: "=j22tJcO3+=vXg@jFNSzma6L",
-      port: 3306,
-    })
+    const season = parseInt(url.searchParams.get('season') || '1')
 
-    // If fetching all players
-    if (fetchAll) {
-      const result = await client.execute('SELECT * FROM players')
-      await client.close()
+    const supabase = createClient(
+      Deno.env.get('SUPABASE_URL') ?? '',
+      Deno.env.get('SUPABASE_SERVICE_ROLE_KEY') ?? ''
+    )
 
-      if (!result.rows || result.rows.length === 0) {
-        return new Response(
-          JSON.stringify([]),
-          { headers: { ...corsHeaders, 'Content-Type': 'application/json' } }
-        )
+    // If fetching all players. Only players with a park_stats row for the
+    // season are listed: players who sat it out are left out, where the old
+    // MySQL scan listed every player with zeros.
+    if (fetchAll) {
+      const allStats = []
+      for (let start = 0; ; start += PAGE_SIZE) {
+        const { data, error } = await supabase
+          .from('park_stats')
+          .select(STAT_COLUMNS)
+          .eq('season', season)
+          .order('player_uuid')
+          .range(start, start + PAGE_SIZE - 1)
+        if (error) throw error
+        allStats.push(...(data || []))
+        if (!data || data.length < PAGE_SIZE) break
       }
-
-      // Map all players to stats format
-      const allStats = result.rows.map((row: any) => ({
-        player_uuid: row.uuid,
-        player_name: row.ign || 'Unknown',
-        season: parseInt(season),
-        wins: row.SEASON_1_WINS || 0,
-        losses: row.SEASON_1_LOSSES || 0,
-        games_played: row.SEASON_1_GAMES_PLAYED || 0,
-        points: row.SEASON_1_POINTS || 0,
-        assists: row.SEASON_1_ASSISTS || 0,
-        rebounds: row.SEASON_1_REBOUNDS || 0,
-        steals: row.SEASON_1_STEALS || 0,
-        blocks: row.SEASON_1_BLOCKS || 0,
-        turnovers: row.SEASON_1_TURNOVERS || 0,
-        fg_made: row.SEASON_1_FG_MADE || 0,
-        fg_attempted: row.SEASON_1_FG_ATTEMPTED || 0,
-        three_fg_made: row.SEASON_1_3FG_MADE || 0,
-        three_fg_attempted: row.SEASON_1_3FG_ATTEMPTED || 0,
-        threes: row.SEASON_1_THREES || 0,
-      }))
-
-      return new Response(
-        JSON.stringify(allStats),
-        { headers: { ...corsHeaders, 'Content-Type': 'application/json' } }
-      )
+      return json(allStats)
     }
 
     // Individual player lookup
     const pathParts = url.pathname.split('/').filter(Boolean)
     let playerIdentifier = pathParts[pathParts.length - 1]
     let playerUUID = playerIdentifier;
-    
+
     // If the identifier doesn't look like a UUID (no dashes), try to convert from username to UUID
     if (!playerIdentifier.includes('-')) {
       // Call Mojang API to convert username to UUID
@@ -88,64 +82,29 @@ serve(async (req) => {
       }
     }
 
-    // Query player stats from the players table
-    const result = await client.execute(
-      `SELECT * FROM players WHERE uuid = ?`,
-      [playerUUID]
-    )
-
-    await client.close()
+    const { data: rows, error } = await supabase
+      .from('park_stats')
+      .select(STAT_COLUMNS)
+      .eq('player_uuid', playerUUID)
+    if (error) throw error
 
-    if (!result.rows || result.rows.length === 0) {
-      return new Response(
-        JSON.stringify({ error: 'Player not found' }),
-        { 
-          status: 404,
-          headers: { ...corsHeaders, 'Content-Type': 'application/json' }
-        }
-      )
+    if (!rows || rows.length === 0) {
+      return json({ error: 'Player not found' }, 404)
     }
 
-    // Map database columns to response format
-    const row = result.rows[0]
-    const stats = {
-      player_uuid: row.uuid,
-      player_name: row.ign || 'Unknown',
-      season: parseInt(season),
-      
-      // Record
-      wins: row.SEASON_1_WINS || 0,
-      losses: row.SEASON_1_LOSSES || 0,
-      games_played: row.SEASON_1_GAMES_PLAYED || 0,
-      
-      // Stats
-      points: row.SEASON_1_POINTS || 0,
-      assists: row.SEASON_1_ASSISTS || 0,
-      rebounds: row.SEASON_1_REBOUNDS || 0,
-      steals: row.SEASON_1_STEALS || 0,
-      blocks: row.SEASON_1_BLOCKS || 0,
-      turnovers: row.SEASON_1_TURNOVERS || 0,
-      fg_made: row.SEASON_1_FG_MADE || 0,
-      fg_attempted: row.SEASON_1_FG_ATTEMPTED || 0,
-      three_fg_made: row.SEASON_1_3FG_MADE || 0,
-      three_fg_attempted: row.SEASON_1_3FG_ATTEMPTED || 0,
-      threes: row.SEASON_1_THREES || 0,
+    // Seasons a player sat out have no row, so they read as all zeros
+    const stats = rows.find((row: any) => row.season === season) || {
+      player_uuid: playerUUID,
+      player_name: rows[0].player_name || 'Unknown',
+      season,
+      wins: 0, losses: 0, games_played: 0,
+      points: 0, assists: 0, rebounds: 0, steals: 0, blocks: 0, turnovers: 0,
+      fg_made: 0, fg_attempted: 0, three_fg_made: 0, three_fg_attempted: 0, threes: 0,
     }
 
-    return new Response(
-      JSON.stringify(stats),
-      { 
-        headers: { ...corsHeaders, 'Content-Type': 'application/json' }
-      }
-    )
+    return json(stats)
   } catch (error) {
     console.error('Error:', error)
-    return new Response(
-      JSON.stringify({ error: error.message }),
-      { 
-        status: 500,
-        headers: { ...corsHeaders, 'Content-Type': 'application/json' }
-      }
-    )
+    return json({ error: error.message }, 500)
   }
 })